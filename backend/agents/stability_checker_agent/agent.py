@@ -6,6 +6,7 @@ from .core.loop import AgentLoop
 # Use original session manager that actually works with real MCP servers
 from .core.session import MultiMCP
 from .core.context import MemoryItem, AgentContext
+from .core.registry import get_agent_registry
 import datetime
 from pathlib import Path
 import json
@@ -24,7 +25,6 @@ except ImportError:
 # Add project root to path for config imports
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from config.config_loader import get_stability_checker_config
 
 def log(stage: str, msg: str):
     """Simple timestamped console logger."""
@@ -37,8 +37,10 @@ async def main():
     current_session = None
 
     try:
-        # Load configuration using centralized loader
-        profile = get_stability_checker_config()
+        # Load configuration and AI model clients once for the whole session
+        registry = get_agent_registry()
+        registry.load()
+        profile = registry.config
         
         # Extract MCP server configurations
         mcp_servers_config = profile.get("servers", {})
@@ -93,13 +95,16 @@ async def main():
             """
 
             while True:
+                agent_profile, model_manager = registry.acquire()
                 context = AgentContext(
                     user_input=formatted_input,
                     session_id=current_session,
                     dispatcher=multi_mcp,
                     mcp_server_descriptions=mcp_servers,
+                    subject=user_input,
+                    agent_profile=agent_profile,
                 )
-                agent = AgentLoop(context)
+                agent = AgentLoop(context, model_manager=model_manager)
                 if not current_session:
                     current_session = context.session_id
 
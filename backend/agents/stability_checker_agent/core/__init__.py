@@ -7,5 +7,6 @@ Contains the main agent loop, context management, and session handling.
 from .loop import AgentLoop
 from .context import AgentContext, MemoryItem
 from .session import MultiMCP
+from .registry import AgentRegistry, get_agent_registry
 
-__all__ = ['AgentLoop', 'AgentContext', 'MemoryItem', 'MultiMCP'] 
\ No newline at end of file
+__all__ = ['AgentLoop', 'AgentContext', 'MemoryItem', 'MultiMCP', 'AgentRegistry', 'get_agent_registry'] 
\ No newline at end of file
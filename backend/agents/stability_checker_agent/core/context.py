@@ -1,6 +1,6 @@
 # core/context.py - Stock Stability Checker Agent Context
 
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 from ..modules.memory import MemoryManager, MemoryItem
 from .session import MultiMCP  # For dispatcher typing
 from pathlib import Path
@@ -25,9 +25,11 @@ class StrategyProfile(BaseModel):
     max_lifelines_per_step: int
 
 class AgentProfile:
-    def __init__(self):
-        # Use centralized configuration loader
-        config = get_stability_checker_config()
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        # Use centralized configuration loader unless a loaded config is supplied
+        if config is None:
+            config = get_stability_checker_config()
+        self.config = config
 
         self.name = config["agent"]["name"]
         self.id = config["agent"]["id"]
@@ -35,6 +37,9 @@ class AgentProfile:
 
         self.strategy = StrategyProfile(**config["strategy"])
         self.memory_config = config["memory"]
+        self.plan_cache_config = config.get("plan_cache", {})
+        self.sandbox_config = config.get("sandbox", {})
+        self.prompt_config = config.get("prompt", {})
         
         # Handle different config structures
         if "ai_model" in config:
@@ -68,6 +73,9 @@ class AgentContext:
         session_id: Optional[str] = None,
         dispatcher: Optional[MultiMCP] = None,
         mcp_server_descriptions: Optional[List[Any]] = None,
+        subject: Optional[str] = None,
+        agent_profile: Optional[AgentProfile] = None,
+        event_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
     ):
         if session_id is None:
             today = datetime.now()
@@ -76,14 +84,19 @@ class AgentContext:
             session_id = f"{today.year}/{today.month:02}/{today.day:02}/stock-stability-{ts}-{uid}"
 
         self.user_input = user_input
-        self.agent_profile = AgentProfile()
-        self.memory = MemoryManager(session_id=session_id)
+        self.subject = subject.strip() if subject else None  # company/ticker being analysed
+        self.agent_profile = agent_profile or AgentProfile()
+        self.memory = MemoryManager(session_id=session_id, config=self.agent_profile.memory_config)
         self.session_id = self.memory.session_id
         self.dispatcher = dispatcher
         self.mcp_server_descriptions = mcp_server_descriptions
         self.step = 0
         self.task_progress = []  # Track stock analysis progress
+        self.related_memories = []  # Earlier analyses recalled from the memory index
         self.final_answer = None
+        self.event_callback = event_callback  # Progress events, e.g. for the SSE endpoint
+        self.started_at = time.time()
+        self.prompt_usage = []  # Token stats of each planning prompt
         
         # Stock analysis specific context
         self.stock_analysis_data = {
@@ -111,6 +124,21 @@ class AgentContext:
             }
         ))
 
+    def emit_event(self, event: str, **data):
+        """Report analysis progress to the event callback, if one is attached"""
+        if self.event_callback is None:
+            return
+        payload = {
+            "session_id": self.session_id,
+            "step": self.step,
+            "elapsed_ms": round((time.time() - self.started_at) * 1000),
+            **data
+        }
+        try:
+            self.event_callback(event, payload)
+        except Exception as e:
+            print(f"⚠️ Event callback failed for {event}: {e}")
+
     def add_memory(self, item: MemoryItem):
         """Add item to memory"""
         self.memory.add(item)
@@ -0,0 +1,58 @@
+# core/events.py - Progress events for Stock Stability Analysis
+
+import time
+from typing import Any, Callable, Dict, List
+
+
+def _is_error(result: Any) -> bool:
+    return isinstance(result, dict) and "error" in result
+
+
+class EventedDispatcher:
+    """Wraps MultiMCP so every tool call made by a plan reports start/end events.
+
+    Anything other than call_tool/call_tools_batch is passed straight through.
+
+    Args:
+        dispatcher: The MultiMCP instance tool calls are forwarded to
+        emit: Callable taking (event_name, **data), usually AgentContext.emit_event
+    """
+
+    def __init__(self, dispatcher, emit: Callable[..., None]):
+        self._dispatcher = dispatcher
+        self._emit = emit
+        self._call_ids = 0
+
+    def __getattr__(self, name):
+        return getattr(self._dispatcher, name)
+
+    def _next_call_id(self) -> int:
+        self._call_ids += 1
+        return self._call_ids
+
+    async def call_tool(self, server_id: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        call_id = self._next_call_id()
+        self._emit("tool_start", call_id=call_id, server=server_id, tool=tool_name, arguments=arguments)
+        started = time.perf_counter()
+        try:
+            result = await self._dispatcher.call_tool(server_id, tool_name, arguments)
+        except Exception as e:
+            self._emit("tool_end", call_id=call_id, server=server_id, tool=tool_name, success=False,
+                       duration_ms=round((time.perf_counter() - started) * 1000, 1), error=str(e))
+            raise
+        self._emit("tool_end", call_id=call_id, server=server_id, tool=tool_name, success=not _is_error(result),
+                   duration_ms=round((time.perf_counter() - started) * 1000, 1), result=result)
+        return result
+
+    async def call_tools_batch(self, server_id: str, calls: List[Dict[str, Any]]) -> List[Any]:
+        call_ids = [self._next_call_id() for _ in calls]
+        for call_id, call in zip(call_ids, calls):
+            self._emit("tool_start", call_id=call_id, server=server_id, tool=call.get("name"),
+                       arguments=call.get("arguments", {}), batch=True)
+        started = time.perf_counter()
+        results = await self._dispatcher.call_tools_batch(server_id, calls)
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        for call_id, call, result in zip(call_ids, calls, results):
+            self._emit("tool_end", call_id=call_id, server=server_id, tool=call.get("name"),
+                       success=not _is_error(result), duration_ms=duration_ms, result=result, batch=True)
+        return results
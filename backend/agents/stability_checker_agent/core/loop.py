@@ -1,14 +1,20 @@
 # core/loop.py - Stock Stability Checker Agent Loop
 
 import asyncio
+import time
+import hashlib
+from typing import Optional
 from ..modules.perception import run_perception
 from ..modules.decision import generate_plan
 from ..modules.action import run_python_sandbox
 from ..modules.model_manager import ModelManager
+from ..modules.plan_cache import get_plan_cache, normalize_workflow
+from ..modules.memory_index import ToolOutputDispatcher, get_memory_index
+from ..modules.prompt_builder import PromptBuilder
 from .session import MultiMCP
 from .strategy import select_decision_prompt_path
 from .context import AgentContext
-from ..modules.tools import summarize_tools
+from .events import EventedDispatcher
 import re
 
 try:
@@ -20,20 +26,113 @@ except ImportError:
         print(f"[{now}] [{stage}] {msg}")
 
 class AgentLoop:
-    def __init__(self, context: AgentContext):
+    def __init__(self, context: AgentContext, model_manager: Optional[ModelManager] = None):
         self.context = context
+        memory_config = self.context.agent_profile.memory_config
+        self.memory_index = get_memory_index(memory_config)
+        self.reuse_max_age = memory_config.get("reuse_max_age_hours", 0) * 3600
         self.mcp = self.context.dispatcher
-        # Initialize model manager with AI configuration
-        ai_config = self.context.agent_profile.llm_config
-        self.model = ModelManager(ai_config)
+        if self.memory_index is not None and self.context.subject and self.mcp is not None:
+            # Keep tool results for later sessions and reuse recent ones instead of refetching
+            self.mcp = ToolOutputDispatcher(self.mcp, self.memory_index, self.context.session_id,
+                                            self.context.subject, max_age=self.reuse_max_age)
+        if self.context.event_callback is not None and self.mcp is not None:
+            # Report each tool call the plan makes, with timings
+            self.mcp = EventedDispatcher(self.mcp, self.context.emit_event)
+        # Reuse a shared model manager if given, else initialize one from the AI configuration
+        self.model = model_manager or ModelManager(self.context.agent_profile.llm_config)
+        self.plan_cache = get_plan_cache(self.context.agent_profile.plan_cache_config)
+        self.prompt_builder = PromptBuilder(self.context.agent_profile.prompt_config)
+
+    def _workflow_id(self) -> str:
+        """Identify the requested workflow independently of the subject"""
+        workflow = normalize_workflow(self.context.user_input, self.context.subject or "")
+        return hashlib.sha256(workflow.encode()).hexdigest()[:16]
+
+    def _memory_key(self) -> str:
+        """Text an analysis is indexed and looked up by in the memory index"""
+        return self.context.subject or self.context.user_input
+
+    async def _recall_related_analyses(self):
+        """Look up earlier final analyses related to this request, and tool outputs for its subject, across sessions"""
+        if self.memory_index is None:
+            return []
+        related = await asyncio.to_thread(
+            self.memory_index.search, self._memory_key(), top_k=3, item_types=["final_analysis"]
+        )
+        if self.context.subject:
+            related += await asyncio.to_thread(
+                self.memory_index.search, self.context.subject, top_k=5, subject=self.context.subject,
+                item_types=["tool_output"], min_score=0.0
+            )
+        return related
+
+    def _find_reusable_analysis(self, related):
+        """A recent analysis of the same subject with the same workflow, if any"""
+        if not self.reuse_max_age or not self.context.subject:
+            return None
+        for entry in related:
+            if ((entry.get("subject") or "").lower() == self.context.subject.lower()
+                    and entry.get("metadata", {}).get("workflow") == self._workflow_id()
+                    and time.time() - entry["timestamp"] <= self.reuse_max_age):
+                return entry
+        return None
+
+    async def _remember_analysis(self, final_answer: str):
+        """Add a completed analysis to the cross-session memory index"""
+        if self.memory_index is None:
+            return
+        await asyncio.to_thread(
+            self.memory_index.add,
+            final_answer,
+            session_id=self.context.session_id,
+            item_type="final_analysis",
+            subject=self.context.subject,
+            key=self._memory_key(),
+            metadata={"workflow": self._workflow_id()}
+        )
+
+    def _log_prompt_usage(self):
+        """Log planning prompt tokens spent on this analysis"""
+        usage = self.context.prompt_usage
+        if usage:
+            total = sum(stats["prompt_tokens"] for stats in usage)
+            log("loop", f"🧾 Planning prompts: {len(usage)} | {total} tokens total | "
+                        f"{total // len(usage)} avg (budget {usage[-1]['max_tokens']})")
 
     async def run(self):
+        try:
+            return await self._run()
+        finally:
+            self._log_prompt_usage()
+
+    async def _run(self):
         max_steps = self.context.agent_profile.strategy.max_steps
+        self.context.emit_event("start", subject=self.context.subject, max_steps=max_steps)
+
+        # === Cross-session memory ===
+        related = await self._recall_related_analyses()
+        self.context.related_memories = related
+        reusable = self._find_reusable_analysis(related)
+        if reusable:
+            log("loop", f"🧠 Reusing analysis of {self.context.subject} from session {reusable['session_id']} "
+                        f"(similarity {reusable['score']:.2f})")
+            self.context.final_answer = reusable["text"]
+            self.context.emit_event("memory_reuse", source_session=reusable["session_id"], score=reusable["score"])
+            self.context.memory.add_tool_output(
+                tool_name="memory_index",
+                tool_args={"subject": self.context.subject},
+                tool_result={"result": reusable["text"], "source_session": reusable["session_id"]},
+                success=True,
+                tags=["memory_reuse", "stock_analysis"],
+            )
+            return {"status": "done", "result": self.context.final_answer}
 
         for step in range(max_steps):
             print(f"📊 Step {step+1}/{max_steps} - Stock Analysis in Progress...")
             self.context.step = step
             lifelines_left = self.context.agent_profile.strategy.max_lifelines_per_step
+            self.context.emit_event("step", max_steps=max_steps)
 
             while lifelines_left > 0:  # Changed from >= 0 to > 0
                 # === Perception ===
@@ -44,6 +143,7 @@ class AgentLoop:
                 )
 
                 print(f"[perception] {perception}")
+                self.context.emit_event("perception", **perception.model_dump())
 
                 selected_servers = perception.selected_servers
                 selected_tools = self.mcp.get_tools_from_servers(selected_servers)
@@ -52,38 +152,83 @@ class AgentLoop:
                     break
 
                 # === Planning ===
-                tool_descriptions = summarize_tools(selected_tools)
+                # Only describe tools relevant to the remaining workflow stages
+                planning_tools = self.prompt_builder.select_tools(selected_tools, perception.analysis_stage)
                 prompt_path = select_decision_prompt_path(
                     planning_mode=self.context.agent_profile.strategy.planning_mode,
                     exploration_mode=self.context.agent_profile.strategy.exploration_mode,
                 )
 
-                plan = await generate_plan(
-                    user_input=self.context.user_input,
-                    perception=perception,
-                    memory_items=self.context.memory.get_session_items(),
-                    tool_descriptions=tool_descriptions,
-                    prompt_path=prompt_path,
-                    step_num=step + 1,
-                    max_steps=max_steps,
-                    context=self.context,
-                    model_manager=self.model  # Pass existing ModelManager instance
-                )
+                # Plans are only reusable for the original request, not follow-up steps
+                plan_key = None
+                plan = None
+                if self.plan_cache is not None and self.context.subject and not user_input_override:
+                    plan_key = self.plan_cache.make_key(
+                        prompt_path,
+                        planning_tools.keys(),
+                        normalize_workflow(self.context.user_input, self.context.subject)
+                    )
+                    plan = self.plan_cache.lookup(plan_key, self.context.subject)
+                from_cache = plan is not None
+                plan_started = time.perf_counter()
+
+                if from_cache:
+                    log("loop", f"♻️ Reusing cached solve() plan for {self.context.subject}")
+                else:
+                    plan = await generate_plan(
+                        user_input=self.context.user_input,
+                        perception=perception,
+                        memory_items=self.context.memory.get_session_items(),
+                        tool_descriptions=None,
+                        tools=planning_tools,
+                        prompt_path=prompt_path,
+                        step_num=step + 1,
+                        max_steps=max_steps,
+                        context=self.context,
+                        model_manager=self.model  # Pass existing ModelManager instance
+                    )
                 print(f"[plan] {plan}")
+                self.context.emit_event(
+                    "plan",
+                    source="cache" if from_cache else "llm",
+                    duration_ms=round((time.perf_counter() - plan_started) * 1000, 1),
+                    prompt_tokens=None if from_cache or not self.context.prompt_usage
+                    else self.context.prompt_usage[-1]["prompt_tokens"],
+                    plan=plan
+                )
 
                 # === Execution ===
                 if re.search(r"^\s*(async\s+)?def\s+solve\s*\(", plan, re.MULTILINE):
                     print("[loop] Detected solve() plan — running sandboxed...")
 
                     self.context.log_subtask(tool_name="solve_sandbox", status="pending")
-                    result = await run_python_sandbox(plan, dispatcher=self.mcp)
+                    self.context.emit_event("sandbox_start")
+                    sandbox_started = time.perf_counter()
+                    result = await run_python_sandbox(plan, dispatcher=self.mcp, config=self.context.agent_profile.sandbox_config)
+                    self.context.emit_event(
+                        "sandbox_end",
+                        duration_ms=round((time.perf_counter() - sandbox_started) * 1000, 1),
+                        result=str(result)
+                    )
 
                     success = False
+                    if from_cache and not (isinstance(result, str) and result.strip().startswith("FINAL_ANSWER:")):
+                        # Cached plan no longer works - drop it and plan with the LLM instead
+                        log("loop", "⚠️ Cached plan did not reach FINAL_ANSWER — falling back to LLM planning")
+                        self.plan_cache.invalidate(plan_key)
+                        self.context.update_subtask_status("solve_sandbox", "failure")
+                        self.context.emit_event("retry", reason="cached_plan_failed", lifelines_left=lifelines_left)
+                        continue
+
                     if isinstance(result, str):
                         result = result.strip()
                         if result.startswith("FINAL_ANSWER:"):
                             success = True
+                            if plan_key and not from_cache:
+                                if self.plan_cache.store(plan_key, plan, self.context.subject):
+                                    log("loop", f"💾 Cached solve() plan for reuse ({len(self.plan_cache)} cached)")
                             self.context.final_answer = result
+                            await self._remember_analysis(result)
                             self.context.update_subtask_status("solve_sandbox", "success")
                             self.context.memory.add_tool_output(
                                 tool_name="solve_sandbox",
@@ -105,6 +250,7 @@ class AgentLoop:
                             )
                             log("loop", f"📨 Forwarding stock analysis result to next step:\n{self.context.user_input_override}\n\n")
                             log("loop", f"🔁 Continuing stock analysis — Step {step+1} continues...")
+                            self.context.emit_event("further_processing", content=content)
                             break  # Step will continue
                         elif result.startswith("[sandbox error:"):
                             success = False
@@ -133,6 +279,7 @@ class AgentLoop:
                     else:
                         lifelines_left -= 1
                         log("loop", f"🛠 Retrying stock analysis... Lifelines left: {lifelines_left}")
+                        self.context.emit_event("retry", reason="plan_failed", lifelines_left=lifelines_left)
                         if lifelines_left <= 0:
                             log("loop", "❌ No lifelines remaining - terminating analysis")
                             self.context.final_answer = "FINAL_ANSWER: [Analysis terminated - max retries exceeded]"
@@ -141,6 +288,7 @@ class AgentLoop:
                 else:
                     lifelines_left -= 1
                     log("loop", f"⚠️ Invalid plan detected — retrying... Lifelines left: {lifelines_left}")
+                    self.context.emit_event("retry", reason="invalid_plan", lifelines_left=lifelines_left)
                     if lifelines_left <= 0:
                         log("loop", "❌ No lifelines remaining - terminating analysis")
                         self.context.final_answer = "FINAL_ANSWER: [Analysis terminated - max retries exceeded]"
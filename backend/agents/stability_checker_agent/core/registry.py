@@ -0,0 +1,129 @@
+# core/registry.py - Shared agent resources for Stock Stability Analysis
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .context import AgentProfile
+from ..modules.model_manager import ModelManager
+
+# Add project root to path for config imports
+import sys
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.append(str(project_root))
+
+from config.config_loader import ConfigLoader, config_loader
+
+
+class AgentRegistry:
+    """Builds the agent configuration and AI model clients once per process.
+
+    Requests call acquire() to get the current AgentProfile and a per-request
+    view of the shared ModelManager. agents.yaml is checked for changes at most
+    every check_interval seconds; a changed file is reloaded in a background
+    thread and swapped in atomically, so requests never wait on a reload and
+    in-flight requests keep the objects they started with. The ModelManager
+    (and its Google/Ollama clients) is only rebuilt when the ai_model section
+    changes.
+    """
+
+    def __init__(self, agent_name: str = "stability_checker_agent", check_interval: float = 2.0,
+                 loader: Optional[ConfigLoader] = None):
+        self.agent_name = agent_name
+        self.check_interval = check_interval
+        self.loader = loader or config_loader
+        self.config_path = self.loader.config_dir / "agents.yaml"
+
+        self.profile: Optional[AgentProfile] = None
+        self.model_manager: Optional[ModelManager] = None
+        self.version = 0
+        self.loaded_at: Optional[float] = None
+
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._reloading = False
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Current agent configuration"""
+        return self.profile.config if self.profile else {}
+
+    def _config_mtime(self) -> Optional[float]:
+        try:
+            return self.config_path.stat().st_mtime
+        except OSError:
+            return None
+
+    def load(self):
+        """(Re)build profile and model manager from agents.yaml; blocking"""
+        with self._reload_lock:
+            mtime = self._config_mtime()
+            config = self.loader.load_agent_config(self.agent_name)
+            profile = AgentProfile(config=config)
+
+            model_manager = self.model_manager
+            if model_manager is None or model_manager.config != profile.llm_config:
+                model_manager = ModelManager(profile.llm_config)
+
+            # Swap references last so readers see either the old or the new set
+            self.profile, self.model_manager = profile, model_manager
+            self._mtime = mtime
+            self.version += 1
+            self.loaded_at = time.time()
+            print(f"🗂️ Agent registry loaded config v{self.version} for {self.agent_name}")
+
+    def _reload_in_background(self):
+        try:
+            self.load()
+        except Exception as e:
+            # Keep serving the last good configuration until the file changes again
+            self._mtime = self._config_mtime()
+            print(f"⚠️ Config reload failed, keeping v{self.version}: {e}")
+        finally:
+            self._reloading = False
+
+    def maybe_reload(self):
+        """Start a background reload if agents.yaml changed since the last load"""
+        now = time.monotonic()
+        if self._reloading or now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        mtime = self._config_mtime()
+        if mtime is None or mtime == self._mtime:
+            return
+
+        self._reloading = True
+        print(f"🔄 {self.config_path} changed - reloading agent configuration")
+        threading.Thread(target=self._reload_in_background, name="agent-config-reload", daemon=True).start()
+
+    def acquire(self) -> Tuple[AgentProfile, ModelManager]:
+        """Get the current profile and a per-request view of the model manager"""
+        if self.profile is None:
+            self.load()
+        else:
+            self.maybe_reload()
+        profile, model_manager = self.profile, self.model_manager
+        return profile, model_manager.for_request()
+
+
+_registry: Optional[AgentRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_agent_registry() -> AgentRegistry:
+    """Get the process-wide agent registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AgentRegistry()
+    return _registry
+
+
+def set_agent_registry(registry: AgentRegistry):
+    """Replace the process-wide agent registry (e.g. one built from another config directory)"""
+    global _registry
+    with _registry_lock:
+        _registry = registry
@@ -4,6 +4,7 @@ import asyncio
 import subprocess
 import json
 import time
+import itertools
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 import sys
@@ -20,15 +21,25 @@ if sys.platform == "win32":
 class MCPServerProcess:
     """Manages individual MCP server processes"""
     
+    # asyncio's default 64KB line limit is too small for full financial statements
+    STREAM_LIMIT = 16 * 1024 * 1024
+    # Seconds to wait for a tool call (or a whole batch) before giving up on the server
+    REQUEST_TIMEOUT = 120.0
+    
     def __init__(self, server_config: Dict[str, Any]):
         self.id = server_config["id"]
         self.script = server_config["script"]
         self.cwd = server_config.get("cwd", ".")
         self.description = server_config.get("description", "")
         self.capabilities = server_config.get("capabilities", [])
+        self.startup_timeout = server_config.get("startup_timeout", 30.0)
+        self.request_timeout = server_config.get("request_timeout", self.REQUEST_TIMEOUT)
         self.process = None
         self.tools = {}
-        self.log_forwarding_task = None
+        self._request_ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_tasks: List[asyncio.Task] = []
+        self._closed = False
         
     async def start(self):
         """Start the MCP server process"""
@@ -59,7 +70,8 @@ class MCPServerProcess:
                     cwd=str(cwd_path),
                     stdout=asyncio.subprocess.PIPE,
                     stderr=asyncio.subprocess.PIPE,
-                    stdin=asyncio.subprocess.PIPE
+                    stdin=asyncio.subprocess.PIPE,
+                    limit=self.STREAM_LIMIT
                 )
                 print(f"✅ Subprocess created successfully for {self.id}")
                 
@@ -69,31 +81,24 @@ class MCPServerProcess:
                 print(f"💡 Try restarting the server - the event loop policy should now be correctly set")
                 return False
             
-            # Start log forwarding task
-            self.log_forwarding_task = asyncio.create_task(self._forward_logs())
+            # One reader per stream for the lifetime of the process
+            self._closed = False
+            self._reader_tasks = [
+                asyncio.create_task(self._read_stdout()),
+                asyncio.create_task(self._read_stderr())
+            ]
             
-            # Wait a bit for server to start
-            await asyncio.sleep(3)
+            # tools/list doubles as the readiness check: the request waits in
+            # stdin until the server's main loop picks it up
+            await self._list_tools()
             
             # Check if process is still running
-            if self.process.returncode is not None:
-                print(f"❌ Server process {self.id} exited with code: {self.process.returncode}")
-                
-                # Read stderr to see what went wrong
-                stderr_output = await self.process.stderr.read()
-                if stderr_output:
-                    print(f"📋 Server stderr:\n{stderr_output.decode()}")
-                
-                # Read stdout too
-                stdout_output = await self.process.stdout.read()
-                if stdout_output:
-                    print(f"📋 Server stdout:\n{stdout_output.decode()}")
-                
+            if self._closed:
+                returncode = await self.process.wait()
+                print(f"❌ Server process {self.id} exited with code: {returncode}")
+                await self._stop_readers()
                 return False
             
-            # List available tools
-            await self._list_tools()
-            
             print(f"✅ Started MCP server: {self.id}")
             return True
             
@@ -103,115 +108,134 @@ class MCPServerProcess:
             print(f"📋 Traceback:\n{traceback.format_exc()}")
             return False
     
-    async def _forward_logs(self):
-        """Forward subprocess logs to console"""
-        if not self.process:
-            return
-            
+    async def _read_stdout(self):
+        """Route JSON-RPC responses to waiting requests and log everything else"""
         try:
-            while self.process.returncode is None:
-                # Check for stderr logs (this is where most logs go)
-                try:
-                    stderr_line = await asyncio.wait_for(
-                        self.process.stderr.readline(), 
-                        timeout=0.5  # Increased timeout
-                    )
-                    if stderr_line:
-                        log_message = stderr_line.decode().strip()
-                        if log_message:
-                            print(f"[{self.id}] {log_message}")
-                except asyncio.TimeoutError:
-                    pass
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
                 
-                # For stdout, be more careful about JSON-RPC messages
-                try:
-                    # Use a non-blocking read for stdout
-                    if self.process.stdout:
-                        stdout_line = await asyncio.wait_for(
-                            self.process.stdout.readline(), 
-                            timeout=0.1
-                        )
-                        if stdout_line:
-                            log_message = stdout_line.decode().strip()
-                            # Only forward if it's not a JSON-RPC message
-                            if log_message and not self._is_jsonrpc_message(log_message):
-                                print(f"[{self.id}] {log_message}")
-                except asyncio.TimeoutError:
-                    pass
+                message = line.decode(errors="replace").strip()
+                if not message:
+                    continue
                 
-                # Small delay to prevent CPU spinning
-                await asyncio.sleep(0.01)
+                try:
+                    frame = json.loads(message)
+                except ValueError:
+                    print(f"[{self.id}] {message}")
+                    continue
                 
+                # Batch replies arrive as a single JSON array line
+                frames = frame if isinstance(frame, list) else [frame]
+                for item in frames:
+                    # A bad frame must not strand the other responses in the batch
+                    if not self._resolve(item):
+                        print(f"[{self.id}] {json.dumps(item) if isinstance(frame, list) else message}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ stdout reader error for {self.id}: {e}")
+        finally:
+            self._closed = True
+            self._fail_pending(ConnectionError(f"Server {self.id} closed its output"))
+    
+    async def _read_stderr(self):
+        """Forward server logs (stderr) to the console"""
+        try:
+            while True:
+                line = await self.process.stderr.readline()
+                if not line:
+                    break
+                log_message = line.decode(errors="replace").strip()
+                if log_message:
+                    print(f"[{self.id}] {log_message}")
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             print(f"⚠️ Log forwarding error for {self.id}: {e}")
     
-    def _is_jsonrpc_message(self, message: str) -> bool:
-        """Check if a message is a JSON-RPC message"""
+    def _resolve(self, frame: Any) -> bool:
+        """Complete the pending request a response frame belongs to"""
+        if not isinstance(frame, dict) or "id" not in frame:
+            return False
+        if "result" not in frame and "error" not in frame:
+            return False
+        
+        future = self._pending.pop(frame["id"], None)
+        if future is None:
+            # Late reply to a request that already timed out
+            print(f"⚠️ Discarding response for unknown request {frame['id']} from {self.id}")
+        elif not future.done():
+            future.set_result(frame)
+        return True
+    
+    def _fail_pending(self, error: Exception):
+        """Fail every request still waiting for a response"""
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+    
+    def _new_request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build a request and register a future for its response"""
+        request = {
+            "jsonrpc": "2.0",
+            "id": next(self._request_ids),
+            "method": method,
+            "params": params or {}
+        }
+        self._pending[request["id"]] = asyncio.get_running_loop().create_future()
+        return request
+    
+    async def _send(self, payload: Any):
+        """Write one JSON line to the server"""
+        if self._closed or not (self.process and self.process.stdin):
+            raise ConnectionError(f"Server {self.id} not running")
+        self.process.stdin.write(json.dumps(payload).encode() + b'\n')
+        await self.process.stdin.drain()
+    
+    async def _wait(self, request_ids: List[int], timeout: Optional[float]) -> List[Dict[str, Any]]:
+        """Wait for the responses to the given requests"""
+        futures = [self._pending[request_id] for request_id in request_ids]
+        try:
+            return await asyncio.wait_for(asyncio.gather(*futures), timeout=timeout)
+        finally:
+            for request_id in request_ids:
+                self._pending.pop(request_id, None)
+    
+    async def _request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                       timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send a request and wait for its response frame"""
+        request = self._new_request(method, params)
         try:
-            if message.startswith('{') and message.endswith('}'):
-                data = json.loads(message)
-                return "jsonrpc" in data or "id" in data or "method" in data
-        except:
-            pass
-        return False
+            await self._send(request)
+        except Exception:
+            self._pending.pop(request["id"], None)
+            raise
+        responses = await self._wait([request["id"]], timeout)
+        return responses[0]
     
     async def _list_tools(self):
         """List available tools from the server"""
         try:
-            # Temporarily pause log forwarding to avoid stdout conflicts
-            log_task = self.log_forwarding_task
-            if log_task:
-                log_task.cancel()
-                try:
-                    await log_task
-                except asyncio.CancelledError:
-                    pass
-            
-            # Send tools/list request
-            request = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "tools/list",
-                "params": {}
-            }
-            
-            if self.process and self.process.stdin:
-                self.process.stdin.write(json.dumps(request).encode() + b'\n')
-                await self.process.stdin.drain()
+            response = await self._request("tools/list", timeout=self.startup_timeout)
+            if "result" in response and "tools" in response["result"]:
+                for tool in response["result"]["tools"]:
+                    self.tools[tool["name"]] = tool
+                print(f"📊 Server {self.id} has {len(self.tools)} tools: {list(self.tools.keys())}")
+            else:
+                print(f"⚠️  Server {self.id} response missing tools: {response}")
                 
-                # Read response with timeout
-                try:
-                    response_data = await asyncio.wait_for(
-                        self.process.stdout.readline(), 
-                        timeout=5.0
-                    )
-                    if response_data:
-                        response = json.loads(response_data.decode())
-                        if "result" in response and "tools" in response["result"]:
-                            for tool in response["result"]["tools"]:
-                                self.tools[tool["name"]] = tool
-                            print(f"📊 Server {self.id} has {len(self.tools)} tools: {list(self.tools.keys())}")
-                        else:
-                            print(f"⚠️  Server {self.id} response missing tools: {response}")
-                    else:
-                        print(f"⚠️  No response from server {self.id}")
-                except asyncio.TimeoutError:
-                    print(f"⚠️  Timeout waiting for tools list from server {self.id}")
-                    # Even if we can't list tools, assume server is working
-                    # and populate with expected tools
-                    self._populate_default_tools()
-            
-            # Restart log forwarding
-            self.log_forwarding_task = asyncio.create_task(self._forward_logs())
-                    
+        except asyncio.TimeoutError:
+            print(f"⚠️  Timeout waiting for tools list from server {self.id}")
+            # Even if we can't list tools, assume server is working
+            # and populate with expected tools
+            self._populate_default_tools()
         except Exception as e:
             print(f"⚠️ Could not list tools for {self.id}: {e}")
             # Populate with default tools so the server can still be used
             self._populate_default_tools()
-            
-            # Restart log forwarding even if there was an error
-            if not self.log_forwarding_task:
-                self.log_forwarding_task = asyncio.create_task(self._forward_logs())
     
     def _populate_default_tools(self):
         """Populate default tools when tool listing fails"""
@@ -232,43 +256,85 @@ class MCPServerProcess:
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Call a specific tool"""
         try:
-            request = {
-                "jsonrpc": "2.0",
-                "id": int(time.time()),
-                "method": "tools/call",
-                "params": {
-                    "name": tool_name,
-                    "arguments": arguments
-                }
-            }
+            response = await self._request(
+                "tools/call",
+                {"name": tool_name, "arguments": arguments},
+                timeout=self.request_timeout
+            )
+            if "result" in response:
+                return response["result"]
+            return {"error": response.get("error")}
             
-            if self.process and self.process.stdin:
-                self.process.stdin.write(json.dumps(request).encode() + b'\n')
-                await self.process.stdin.drain()
-                
-                # Read response
-                response_data = await self.process.stdout.readline()
-                if response_data:
-                    response = json.loads(response_data.decode())
-                    if "result" in response:
-                        return response["result"]
-                    elif "error" in response:
-                        return {"error": response["error"]}
-                        
+        except asyncio.TimeoutError:
+            return {"error": f"Timeout waiting for {tool_name} on server {self.id}"}
         except Exception as e:
             return {"error": str(e)}
     
-    async def stop(self):
-        """Stop the MCP server process"""
-        # Cancel log forwarding task first
-        if self.log_forwarding_task:
-            self.log_forwarding_task.cancel()
+    async def call_tools_batch(self, calls: List[Dict[str, Any]]) -> List[Any]:
+        """Call several tools in one JSON-RPC batch round-trip.
+        
+        Args:
+            calls: List of {"name": tool_name, "arguments": {...}} dicts
+        
+        Returns:
+            Results in the same order as ``calls``; failed entries are {"error": ...}
+        """
+        if not calls:
+            return []
+        
+        requests = [
+            self._new_request("tools/call", {
+                "name": call.get("name"),
+                "arguments": call.get("arguments", {})
+            })
+            for call in calls
+        ]
+        request_ids = [request["id"] for request in requests]
+        
+        try:
+            await self._send(requests)
+            # Responses are routed by id, so each call completes independently
+            responses = await self._wait(request_ids, self.request_timeout)
+        except asyncio.TimeoutError:
+            return [{"error": f"Timeout waiting for batch on server {self.id}"} for _ in calls]
+        except Exception as e:
+            return [{"error": str(e)} for _ in calls]
+        finally:
+            for request_id in request_ids:
+                self._pending.pop(request_id, None)
+        
+        return [
+            response["result"] if "result" in response else {"error": response.get("error")}
+            for response in responses
+        ]
+    
+    async def get_metrics(self) -> Dict[str, Any]:
+        """Fetch per-tool instrumentation from the server (metrics/get)"""
+        try:
+            response = await self._request("metrics/get", timeout=self.request_timeout)
+            if "result" in response:
+                return json.loads(response["result"]["content"][0]["text"])
+            return {"error": response.get("error")}
+            
+        except asyncio.TimeoutError:
+            return {"error": f"Timeout waiting for metrics from server {self.id}"}
+        except Exception as e:
+            return {"error": str(e)}
+    
+    async def _stop_readers(self):
+        """Cancel the stream reader tasks"""
+        for task in self._reader_tasks:
+            task.cancel()
+        for task in self._reader_tasks:
             try:
-                await self.log_forwarding_task
+                await task
             except asyncio.CancelledError:
                 pass
-            self.log_forwarding_task = None
-        
+        self._reader_tasks = []
+        self._fail_pending(ConnectionError(f"Server {self.id} stopped"))
+    
+    async def stop(self):
+        """Stop the MCP server process"""
         if self.process:
             try:
                 if self.process.returncode is None:
@@ -281,6 +347,9 @@ class MCPServerProcess:
                 print(f"⚠️ MCP server {self.id} process already terminated")
             except Exception as e:
                 print(f"⚠️ Error stopping MCP server {self.id}: {e}")
+        
+        # Readers finish on their own at EOF; cancel whatever is left
+        await self._stop_readers()
 
 
 class MultiMCP:
@@ -334,6 +403,28 @@ class MultiMCP:
         else:
             return {"error": f"Server {server_id} not found"}
     
+    async def call_tools_batch(self, server_id: str, calls: List[Dict[str, Any]]) -> List[Any]:
+        """Call several independent tools on a server in a single round-trip.
+        
+        Example:
+            results = await dispatcher.call_tools_batch("data_acquisition_server", [
+                {"name": "get_basic_stock_info", "arguments": {"ticker": "HAL.NS"}},
+                {"name": "get_eps_data", "arguments": {"ticker_symbol": "HAL.NS"}},
+            ])
+        """
+        server = self.get_server(server_id)
+        if server:
+            return await server.call_tools_batch(calls)
+        else:
+            return [{"error": f"Server {server_id} not found"} for _ in calls]
+    
+    async def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get instrumentation snapshots from all servers, keyed by server id"""
+        metrics = {}
+        for server_id, server in self.servers.items():
+            metrics[server_id] = await server.get_metrics()
+        return metrics
+    
     def get_server_capabilities(self) -> Dict[str, List[str]]:
         """Get capabilities of all servers"""
         capabilities = {}
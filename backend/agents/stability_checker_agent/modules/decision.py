@@ -1,47 +1,29 @@
 # modules/decision.py - Decision Making for Stock Stability Analysis
 
+import json
+import time
 from typing import List, Dict, Any, Optional
 from .memory import MemoryItem
+from .prompt_builder import PromptBuilder
 
-async def generate_plan(
-    user_input: str,
-    perception: Any,
-    memory_items: List[MemoryItem],
-    tool_descriptions: str,  # String, not Dict - follows S9 pattern
-    prompt_path: str,
-    step_num: int,
-    max_steps: int,
-    context: Any = None,
-    model_manager: Any = None  # Accept ModelManager instance
-) -> str:
-    """Generate execution plan for stock stability analysis"""
-    
-    # Use the passed ModelManager instance or create a new one
-    if model_manager is None:
-        from agents.stability_checker_agent.core.model_manager import ModelManager
-        model_manager = ModelManager()
-    
-    # Format memory context for the prompt
-    memory_text = format_memory_context(memory_items)
-    
-    # Create stock analysis specific prompt with correct MCP tool usage
-    stock_analysis_prompt = f"""
+# Static prompt segments - identical for every plan, so their token counts are cached
+PLAN_PROMPT_HEADER = """
 You are a stock stability analysis expert. Create a Python function called `solve()` that performs stock stability analysis.
+"""
 
-User Request: {user_input}
-
-Available Tools:
-{tool_descriptions}
-
-Analysis Stage: {perception.analysis_stage}
-Selected Servers: {perception.selected_servers}
-
-Memory Context: {format_memory_context(memory_items)}
+PLAN_PROMPT_INSTRUCTIONS = """IMPORTANT: Tools must be called through the MCP dispatcher using this syntax:
+```python
+result = await dispatcher.call_tool("data_acquisition_server", "tool_name", {"arg1": "value1"})
+```
 
-IMPORTANT: Tools must be called through the MCP dispatcher using this syntax:
+Independent calls that do not depend on each other's results can be sent in one round-trip:
 ```python
-result = await dispatcher.call_tool("data_acquisition_server", "tool_name", {{"arg1": "value1"}})
+results = await dispatcher.call_tools_batch("data_acquisition_server", [
+    {"name": "get_eps_data", "arguments": {"ticker_symbol": "HAL.NS"}},
+    {"name": "get_sector_info", "arguments": {"stock_symbol": "HAL"}},
+])
 ```
+Each entry of `results` has the same format as a single call_tool result, in the same order.
 
 CRITICAL: Your solve() function must NOT take any parameters. The dispatcher is available as a global variable.
 
@@ -49,19 +31,19 @@ Function signature should be:
 ```python
 async def solve():  # NO PARAMETERS!
     # Your code here
-    # Use: await dispatcher.call_tool("data_acquisition_server", "tool_name", {{"args": "values"}})
+    # Use: await dispatcher.call_tool("data_acquisition_server", "tool_name", {"args": "values"})
 ```
 
 RESPONSE PARSING: MCP tools return responses in this format:
 ```python
-{{
+{
   "content": [
-    {{
+    {
       "type": "text", 
-      "text": "{{\"result\": {{\"success\": true, \"ticker_symbol\": \"HAL.NS\", ...}}}}"
-    }}
+      "text": "{\"result\": {\"success\": true, \"ticker_symbol\": \"HAL.NS\", ...}}"
+    }
   ]
-}}
+}
 ```
 
 Parse responses using this pattern:
@@ -73,16 +55,16 @@ if isinstance(result, dict) and "content" in result:
         try:
             import json
             parsed_result = json.loads(text_content)
-            actual_result = parsed_result.get("result", {{}})
+            actual_result = parsed_result.get("result", {})
             if actual_result.get("success"):
                 # For get_ticker_symbol: use ticker_symbol field
                 ticker_symbol = actual_result.get("ticker_symbol")
                 # For get_eps_data: use eps_data field  
-                eps_data = actual_result.get("eps_data", {{}})
+                eps_data = actual_result.get("eps_data", {})
             else:
                 error = actual_result.get("error", "Unknown error")
         except json.JSONDecodeError as e:
-            print(f"Failed to parse JSON: {{e}}")
+            print(f"Failed to parse JSON: {e}")
 ```
 
 Your task is to create a solve() function that:
@@ -107,18 +89,92 @@ IMPORTANT PARAMETER NAMES:
 Generate a solve() function that handles the specific user request and returns a clear recommendation with detailed reasoning for both accepted and rejected stocks. In the reasoning, include the yearly EPS data and the EPS growth rate.
 """
 
+PLAN_PROMPT_TEMPLATE = """{header}
+User Request: {user_input}
+
+Available Tools:
+{tool_descriptions}
+
+Analysis Stage: {analysis_stage}
+Selected Servers: {selected_servers}
+
+Memory Context: {memory_context}
+
+Related Prior Analyses: {related_analyses}
+
+{instructions}"""
+
+async def generate_plan(
+    user_input: str,
+    perception: Any,
+    memory_items: List[MemoryItem],
+    tool_descriptions: Optional[str],  # String, not Dict - follows S9 pattern
+    prompt_path: str,
+    step_num: int,
+    max_steps: int,
+    context: Any = None,
+    model_manager: Any = None,  # Accept ModelManager instance
+    tools: Optional[Dict[str, Any]] = None  # Ranked tools; described within the token budget
+) -> str:
+    """Generate execution plan for stock stability analysis"""
+    
+    # Use the passed ModelManager instance or create a new one
+    if model_manager is None:
+        from agents.stability_checker_agent.core.model_manager import ModelManager
+        model_manager = ModelManager()
+    
+    # Create stock analysis specific prompt with correct MCP tool usage, within the token budget
+    prompt_config = getattr(getattr(context, "agent_profile", None), "prompt_config", None)
+    stock_analysis_prompt, prompt_stats = PromptBuilder(prompt_config).build(
+        PLAN_PROMPT_TEMPLATE,
+        static_segments={"header": PLAN_PROMPT_HEADER, "instructions": PLAN_PROMPT_INSTRUCTIONS},
+        fixed={
+            "user_input": user_input,
+            "analysis_stage": str(perception.analysis_stage),
+            "selected_servers": str(perception.selected_servers)
+        },
+        tools=tools if tools is not None else tool_descriptions,
+        memory_lines=memory_context_lines(memory_items),
+        related_lines=related_analysis_lines(getattr(context, "related_memories", None))
+    )
+    
+    print(f"🧾 Planning prompt: {prompt_stats['prompt_tokens']} tokens (budget {prompt_stats['max_tokens']}) | "
+          f"tools {prompt_stats['tools']}/{prompt_stats['tools_available']} | "
+          f"memory {prompt_stats['memory_items']} | related {prompt_stats['related_analyses']}")
+    if context is not None and hasattr(context, "prompt_usage"):
+        context.prompt_usage.append(dict(prompt_stats, step=step_num, timestamp=time.time()))
+
     # Get response from the model - use correct method name
     response = await model_manager.generate_text(stock_analysis_prompt)
     
     return response
 
+def memory_context_lines(memory_items: List[MemoryItem]) -> List[str]:
+    """Prompt lines for the most recent memory items, oldest first"""
+    return [f"- {item.timestamp}: {item.text[:200]}..." for item in (memory_items or [])[-5:]]  # Last 5 items
+
+def related_analysis_lines(related: Optional[List[Dict[str, Any]]]) -> List[str]:
+    """Prompt lines for analyses and tool outputs recalled from the cross-session memory index"""
+    lines = []
+    for entry in related or []:
+        if entry.get("type") == "tool_output":
+            metadata = entry.get("metadata", {})
+            lines.append(f"- [{entry.get('subject') or 'unknown'}, earlier {metadata.get('tool')}"
+                         f"({json.dumps(metadata.get('arguments', {}), default=str)})] {entry['text'][:300]}...")
+        else:
+            lines.append(f"- [{entry.get('subject') or 'unknown'}, similarity {entry['score']:.2f}] {entry['text'][:300]}...")
+    return lines
+
 def format_memory_context(memory_items: List[MemoryItem]) -> str:
     """Format memory items for inclusion in prompts"""
     if not memory_items:
         return "No previous context available."
     
-    formatted = []
-    for item in memory_items[-5:]:  # Last 5 items
-        formatted.append(f"- {item.timestamp}: {item.text[:200]}...")
+    return "\n".join(memory_context_lines(memory_items))
+
+def format_related_analyses(related: Optional[List[Dict[str, Any]]]) -> str:
+    """Format analyses recalled from the cross-session memory index"""
+    if not related:
+        return "None found."
     
-    return "\n".join(formatted)
\ No newline at end of file
+    return "\n".join(related_analysis_lines(related))
@@ -1,12 +1,23 @@
 # modules/memory.py - Memory Management for Stock Stability Analysis
 
+import os
+import re
 import json
 import time
-from typing import Dict, List, Any, Optional
+import queue
+import atexit
+import bisect
+import threading
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 from pydantic import BaseModel
 
+# On-disk session format: JSONL journal, first line is a header
+JOURNAL_FORMAT = "vyasaquant-memory-journal"
+JOURNAL_VERSION = 1
+
 class MemoryItem(BaseModel):
     """Individual memory item for stock analysis"""
     timestamp: float
@@ -17,25 +28,304 @@ class MemoryItem(BaseModel):
     user_query: str
     metadata: Dict[str, Any] = {}
 
+
+class _JournalWriter:
+    """Background thread that applies journal writes in order and fsyncs them in batches.
+    
+    Shared by every MemoryManager in the process so that adding a memory item
+    never blocks the event loop on disk I/O.
+    """
+    
+    def __init__(self, batch_window: float = 0.05):
+        self.batch_window = batch_window
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # Queued-but-unapplied operations per file, so one session can wait for its own writes
+        self._pending: Dict[Path, int] = defaultdict(int)
+        self._pending_changed = threading.Condition()
+    
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="memory-journal", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+    
+    def _put(self, op: str, path: Path, lines: Optional[List[str]]):
+        self._ensure_started()
+        with self._pending_changed:
+            self._pending[path] += 1
+        self._queue.put((op, path, lines))
+    
+    def append(self, path: Path, lines: List[str]):
+        """Append lines to a journal file"""
+        self._put("append", path, lines)
+    
+    def rewrite(self, path: Path, lines: List[str]):
+        """Atomically replace a journal file with the given lines"""
+        self._put("rewrite", path, lines)
+    
+    def delete(self, path: Path):
+        """Remove a journal file"""
+        self._put("delete", path, None)
+    
+    def flush(self, paths: Optional[List[Path]] = None):
+        """Block until queued writes are on disk - every write, or only those to the given files"""
+        if self._thread is None:
+            return
+        if paths is None:
+            self._queue.join()
+            return
+        with self._pending_changed:
+            self._pending_changed.wait_for(lambda: not any(self._pending.get(path) for path in paths))
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Collect whatever else arrives within the window into the same fsync
+            deadline = time.monotonic() + self.batch_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                self._apply(batch)
+            except Exception as e:
+                print(f"⚠️ Memory journal write failed: {e}")
+            finally:
+                with self._pending_changed:
+                    for _, path, _ in batch:
+                        self._pending[path] -= 1
+                        if not self._pending[path]:
+                            del self._pending[path]
+                    self._pending_changed.notify_all()
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _apply(self, batch):
+        handles = {}
+        try:
+            for op, path, lines in batch:
+                if op == "append":
+                    handle = handles.get(path)
+                    if handle is None:
+                        handle = handles[path] = open(path, "a", encoding="utf-8")
+                    handle.write("".join(line + "\n" for line in lines))
+                    continue
+                
+                # Rewrites and deletes must see earlier appends in this batch
+                handle = handles.pop(path, None)
+                if handle is not None:
+                    handle.close()
+                if op == "rewrite":
+                    tmp_path = path.with_suffix(path.suffix + ".tmp")
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        f.write("".join(line + "\n" for line in lines))
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, path)
+                elif op == "delete" and path.exists():
+                    path.unlink()
+        finally:
+            for handle in handles.values():
+                try:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                finally:
+                    handle.close()
+
+
+_journal_writer = _JournalWriter()
+
+
+def flush_journals():
+    """Wait until every session's queued journal writes are on disk"""
+    _journal_writer.flush()
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_PIECE_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _contains(item: "MemoryItem", query_lower: str) -> bool:
+    """Whether the item's text, user query or a tag contains the (lowercased) query"""
+    return (query_lower in item.text.lower() or
+            query_lower in item.user_query.lower() or
+            any(query_lower in tag.lower() for tag in item.tags))
+
+
+def _tokenize(text: str) -> set:
+    """Words plus their alphanumeric pieces, so "eps" also finds "eps_data" """
+    text = text.lower()
+    return set(_TOKEN_PATTERN.findall(text)) | set(_PIECE_PATTERN.findall(text))
+
+
+class _IndexedItemStore:
+    """Bounded memory item store with type, tag, token and time indexes.
+    
+    Items are kept in insertion order as a ring buffer of at most max_items;
+    adding past the bound evicts the oldest item and returns it.
+    """
+    
+    def __init__(self, max_items: int):
+        self.max_items = max(1, int(max_items))
+        self._items: Dict[int, MemoryItem] = {}
+        self._next_seq = 0
+        # Dicts used as insertion-ordered sets of sequence numbers
+        self._by_type: Dict[str, Dict[int, None]] = defaultdict(dict)
+        self._by_tag: Dict[str, Dict[int, None]] = defaultdict(dict)
+        self._by_token: Dict[str, Dict[int, None]] = defaultdict(dict)
+        self._by_time: List[Tuple[float, int]] = []
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    @staticmethod
+    def _tokens(item: MemoryItem) -> set:
+        tokens = _tokenize(item.text) | _tokenize(item.user_query)
+        for tag in item.tags:
+            tokens |= _tokenize(tag)
+        return tokens
+    
+    def add(self, item: MemoryItem) -> Optional[MemoryItem]:
+        seq = self._next_seq
+        self._next_seq += 1
+        
+        self._items[seq] = item
+        self._by_type[item.type][seq] = None
+        for tag in item.tags:
+            self._by_tag[tag][seq] = None
+        for token in self._tokens(item):
+            self._by_token[token][seq] = None
+        bisect.insort(self._by_time, (item.timestamp, seq))
+        
+        if len(self._items) > self.max_items:
+            return self._remove(next(iter(self._items)))
+        return None
+    
+    def _remove(self, seq: int) -> MemoryItem:
+        item = self._items.pop(seq)
+        
+        def discard(index: Dict[str, Dict[int, None]], key: str):
+            members = index.get(key)
+            if members is not None:
+                members.pop(seq, None)
+                if not members:
+                    del index[key]
+        
+        discard(self._by_type, item.type)
+        for tag in item.tags:
+            discard(self._by_tag, tag)
+        for token in self._tokens(item):
+            discard(self._by_token, token)
+        
+        position = bisect.bisect_left(self._by_time, (item.timestamp, seq))
+        if position < len(self._by_time) and self._by_time[position][1] == seq:
+            del self._by_time[position]
+        return item
+    
+    def clear(self):
+        self._items.clear()
+        self._by_type.clear()
+        self._by_tag.clear()
+        self._by_token.clear()
+        self._by_time.clear()
+    
+    def items(self) -> List[MemoryItem]:
+        return list(self._items.values())
+    
+    def by_type(self, item_type: str) -> List[MemoryItem]:
+        return [self._items[seq] for seq in self._by_type.get(item_type, ())]
+    
+    def by_tag(self, tag: str) -> List[MemoryItem]:
+        return [self._items[seq] for seq in self._by_tag.get(tag, ())]
+    
+    def tags(self) -> List[str]:
+        return list(self._by_tag)
+    
+    def search(self, query: str) -> List[MemoryItem]:
+        query = query.lower()
+        pieces = _PIECE_PATTERN.findall(query)
+        if not pieces:
+            return [item for item in self._items.values() if _contains(item, query)]
+        # Every piece of a matching query lies inside one of the item's words, so
+        # items holding a word that contains the longest piece are the candidates
+        piece = max(pieces, key=len)
+        candidates = set()
+        for token, members in self._by_token.items():
+            if piece in token:
+                candidates.update(members)
+        return [self._items[seq] for seq in sorted(candidates) if _contains(self._items[seq], query)]
+    
+    def recent(self, count: int) -> List[MemoryItem]:
+        if count <= 0:
+            return []
+        return [self._items[seq] for _, seq in reversed(self._by_time[-count:])]
+    
+    def time_range(self) -> Tuple[Optional[float], Optional[float]]:
+        if not self._by_time:
+            return None, None
+        return self._by_time[0][0], self._by_time[-1][0]
+
+
+
 class MemoryManager:
     """Manages memory for stock stability analysis sessions"""
     
-    def __init__(self, session_id: str):
+    def __init__(self, session_id: str, config: Optional[Dict[str, Any]] = None, memory_dir: Optional[str] = None):
         self.session_id = session_id
-        self.memory_dir = Path("agents/stability_checker_agent/memory")
+        self.config = config or {}
+        # Absolute, because the journal writer opens files later and the working directory may change
+        self.memory_dir = Path(memory_dir or "agents/stability_checker_agent/memory").resolve()
         self.memory_dir.mkdir(parents=True, exist_ok=True)
         
-        # Session-specific memory file
-        self.session_file = self.memory_dir / f"{session_id.replace('/', '_')}.json"
+        # Session-specific journal (append-only JSONL), items evicted from the
+        # in-memory window, and the pre-journal JSON file
+        session_name = session_id.replace('/', '_')
+        self.session_file = self.memory_dir / f"{session_name}.jsonl"
+        self.spill_file = self.memory_dir / f"{session_name}.spill.jsonl"
+        self.legacy_session_file = self.memory_dir / f"{session_name}.json"
+        
+        # Rewrite the journal once it holds this many records and at least
+        # twice as many records as live items
+        journal_config = self.config.get("journal", {})
+        self.compact_min_records = journal_config.get("compact_min_records", 200)
         
-        # In-memory storage for current session
-        self.items: List[MemoryItem] = []
+        # In-memory storage for current session, bounded by max_memory_items.
+        # Evicted items are written to the spill file at the next compaction.
+        self.max_items = self.config.get("max_memory_items", 100)
+        self._store = _IndexedItemStore(self.max_items)
+        self._pending_spill: List[MemoryItem] = []
+        self._journal_records = 0
+        self._journal_exists = False
         self.load_session()
     
+    @property
+    def items(self) -> List[MemoryItem]:
+        """Items in the in-memory window, oldest first"""
+        return self._store.items()
+    
+    @items.setter
+    def items(self, items: List[MemoryItem]):
+        self._store.clear()
+        for item in items:
+            evicted = self._store.add(item)
+            if evicted is not None:
+                self._pending_spill.append(evicted)
+    
     def add(self, item: MemoryItem):
         """Add a memory item"""
-        self.items.append(item)
-        self.save_session()
+        evicted = self._store.add(item)
+        if evicted is not None:
+            self._pending_spill.append(evicted)
+        self._append_records([{"op": "add", "item": item.dict()}])
     
     def add_tool_output(
         self, 
@@ -94,11 +384,11 @@ class MemoryManager:
     
     def get_items_by_type(self, item_type: str) -> List[MemoryItem]:
         """Get items by type"""
-        return [item for item in self.items if item.type == item_type]
+        return self._store.by_type(item_type)
     
     def get_items_by_tag(self, tag: str) -> List[MemoryItem]:
         """Get items by tag"""
-        return [item for item in self.items if tag in item.tags]
+        return self._store.by_tag(tag)
     
     def get_tool_outputs(self) -> List[MemoryItem]:
         """Get all tool outputs"""
@@ -117,25 +407,37 @@ class MemoryManager:
             "session_id": self.session_id,
             "analysis_items": [item.dict() for item in analysis_items],
             "tool_outputs": [item.dict() for item in tool_outputs],
-            "total_items": len(self.items)
+            "total_items": len(self._store)
         }
     
     def search_memory(self, query: str) -> List[MemoryItem]:
-        """Search memory items by text content"""
-        query_lower = query.lower()
-        results = []
+        """Search memory items by text content
         
-        for item in self.items:
-            if (query_lower in item.text.lower() or 
-                query_lower in item.user_query.lower() or
-                any(query_lower in tag.lower() for tag in item.tags)):
-                results.append(item)
-        
-        return results
+        Matches items whose text, user query or a tag contains the query
+        (case-insensitive), including items spilled out of the in-memory window.
+        """
+        query_lower = query.lower()
+        spilled = [item for item in self.get_spilled_items() if _contains(item, query_lower)]
+        return spilled + self._store.search(query)
     
     def get_recent_items(self, count: int = 10) -> List[MemoryItem]:
         """Get most recent memory items"""
-        return sorted(self.items, key=lambda x: x.timestamp, reverse=True)[:count]
+        return self._store.recent(count)
+    
+    def get_spilled_items(self) -> List[MemoryItem]:
+        """Get items evicted from the in-memory window, oldest first"""
+        self.flush()
+        items: List[MemoryItem] = []
+        if self.spill_file.exists():
+            with open(self.spill_file, 'r', encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("op") == "add":
+                        items.append(MemoryItem(**record["item"]))
+        return items + list(self._pending_spill)
     
     def get_eps_data_history(self) -> List[Dict[str, Any]]:
         """Get EPS data collection history"""
@@ -152,30 +454,73 @@ class MemoryManager:
         stability_items = self.get_items_by_tag("stability_assessment")
         return [item.metadata for item in stability_items if "stability_result" in item.metadata]
     
+    def _journal_header(self) -> Dict[str, Any]:
+        return {
+            "format": JOURNAL_FORMAT,
+            "version": JOURNAL_VERSION,
+            "session_id": self.session_id,
+            "created_at": datetime.now().isoformat()
+        }
+    
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> str:
+        # Tool results may hold values json can't encode natively (dates, numpy scalars)
+        return json.dumps(record, default=str, separators=(",", ":"))
+    
+    def _append_records(self, records: List[Dict[str, Any]]):
+        """Queue records for the background journal writer"""
+        lines = [self._encode(record) for record in records]
+        if not self._journal_exists:
+            lines.insert(0, self._encode(self._journal_header()))
+            self._journal_exists = True
+        _journal_writer.append(self.session_file, lines)
+        self._journal_records += len(records)
+        
+        if (self._journal_records >= self.compact_min_records and
+                self._journal_records >= 2 * max(len(self._store), 1)):
+            self.compact()
+    
+    def compact(self):
+        """Rewrite the journal as one record per live item, spilling evicted items"""
+        if self._pending_spill:
+            _journal_writer.append(self.spill_file, [
+                self._encode({"op": "add", "item": item.dict()}) for item in self._pending_spill
+            ])
+            self._pending_spill = []
+        
+        records = [{"op": "add", "item": item.dict()} for item in self.items]
+        lines = [self._encode(self._journal_header())] + [self._encode(record) for record in records]
+        _journal_writer.rewrite(self.session_file, lines)
+        self._journal_records = len(records)
+        self._journal_exists = True
+    
     def save_session(self):
-        """Save current session to disk"""
+        """Save current session to disk (compacted) and wait for it to be durable"""
         try:
-            session_data = {
-                "session_id": self.session_id,
-                "items": [item.dict() for item in self.items],
-                "last_updated": datetime.now().isoformat()
-            }
-            
-            with open(self.session_file, 'w') as f:
-                json.dump(session_data, f, indent=2)
-                
+            self.compact()
+            self.flush()
         except Exception as e:
             print(f"⚠️ Failed to save session: {e}")
     
+    def flush(self):
+        """Wait until this session's queued journal writes are on disk"""
+        _journal_writer.flush([self.session_file, self.spill_file])
+    
     def load_session(self):
-        """Load session from disk"""
+        """Load session from disk by replaying its journal"""
         try:
+            # Another manager may still have writes queued for this session (other sessions' are not waited on)
+            self.flush()
+            
             if self.session_file.exists():
-                with open(self.session_file, 'r') as f:
-                    session_data = json.load(f)
-                
-                self.items = [MemoryItem(**item) for item in session_data.get("items", [])]
+                self.items, self._journal_records, skipped = self._replay_journal()
+                self._journal_exists = True
                 print(f"📚 Loaded {len(self.items)} memory items for session {self.session_id}")
+                # Rewrite so new appends never land after a torn line
+                if skipped or self._journal_records > len(self._store):
+                    self.compact()
+            elif self.legacy_session_file.exists():
+                self._migrate_legacy_session()
             else:
                 self.items = []
                 print(f"📚 Starting new session: {self.session_id}")
@@ -184,11 +529,59 @@ class MemoryManager:
             print(f"⚠️ Failed to load session: {e}")
             self.items = []
     
+    def _replay_journal(self):
+        """Rebuild items from the journal; returns (items, record_count, skipped_lines)"""
+        items: List[MemoryItem] = []
+        records = 0
+        skipped = 0
+        
+        with open(self.session_file, 'r', encoding="utf-8") as f:
+            for line_number, line in enumerate(f):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line after a crash - everything before it is intact
+                    skipped += 1
+                    continue
+                
+                if line_number == 0 and record.get("format") == JOURNAL_FORMAT:
+                    if record.get("version", 0) > JOURNAL_VERSION:
+                        print(f"⚠️ Session journal {self.session_file.name} has newer version "
+                              f"{record.get('version')} (supported: {JOURNAL_VERSION}); replaying known records only")
+                    continue
+                
+                records += 1
+                if record.get("op") == "add":
+                    items.append(MemoryItem(**record["item"]))
+        
+        if skipped:
+            print(f"⚠️ Skipped {skipped} unreadable journal lines in {self.session_file.name}")
+        return items, records, skipped
+    
+    def _migrate_legacy_session(self):
+        """Convert a pre-journal JSON session file into a journal"""
+        with open(self.legacy_session_file, 'r') as f:
+            session_data = json.load(f)
+        
+        self.items = [MemoryItem(**item) for item in session_data.get("items", [])]
+        self.compact()
+        self.flush()
+        self.legacy_session_file.unlink()
+        print(f"📚 Migrated {len(self.items)} memory items for session {self.session_id} to journal format")
+    
     def clear_session(self):
         """Clear current session memory"""
         self.items = []
-        if self.session_file.exists():
-            self.session_file.unlink()
+        self._pending_spill = []
+        _journal_writer.delete(self.session_file)
+        _journal_writer.delete(self.spill_file)
+        self._journal_records = 0
+        self._journal_exists = False
+        if self.legacy_session_file.exists():
+            self.legacy_session_file.unlink()
         print(f"🧹 Cleared session memory: {self.session_id}")
     
     def get_session_summary(self) -> Dict[str, Any]:
@@ -198,10 +591,10 @@ class MemoryManager:
         
         return {
             "session_id": self.session_id,
-            "total_items": len(self.items),
+            "total_items": len(self._store),
             "tool_outputs": len(tool_outputs),
             "analysis_updates": len(analysis_updates),
-            "start_time": min(item.timestamp for item in self.items) if self.items else None,
-            "last_activity": max(item.timestamp for item in self.items) if self.items else None,
-            "tags": list(set(tag for item in self.items for tag in item.tags))
+            "start_time": self._store.time_range()[0],
+            "last_activity": self._store.time_range()[1],
+            "tags": self._store.tags()
         } 
\ No newline at end of file
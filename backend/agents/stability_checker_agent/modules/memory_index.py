@@ -0,0 +1,382 @@
+# modules/memory_index.py - Cross-session vector memory for Stock Stability Analysis
+
+import re
+import json
+import asyncio
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Ollama embeddings (optional)
+try:
+    import ollama
+    OLLAMA_AVAILABLE = True
+except ImportError:
+    OLLAMA_AVAILABLE = False
+
+INDEX_VERSION = 1
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """Local embedder: hashed words, word bigrams and character trigrams, L2 normalized.
+
+    Needs no model server, and is well suited to finding earlier analyses of
+    the same company or ticker (trigrams tolerate suffixes like "Ltd").
+    Every feature is hashed into two signed buckets so that a single
+    collision cannot make two different tickers look identical.
+    """
+
+    HASHES_PER_FEATURE = 2
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    @staticmethod
+    def _features(text: str) -> List[str]:
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        features = [f"w:{token}" for token in tokens]
+        features += [f"b:{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for token in tokens:
+            padded = f"#{token}#"
+            features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode(), digest_size=8 * self.HASHES_PER_FEATURE).digest()
+            for i in range(self.HASHES_PER_FEATURE):
+                value = int.from_bytes(digest[8 * i:8 * (i + 1)], "little")
+                sign = 1.0 if value & 1 else -1.0
+                vector[(value >> 1) % self.dim] += sign
+        return vector
+
+
+class OllamaEmbedder:
+    """Embedder backed by an Ollama embedding model"""
+
+    def __init__(self, model: str = "nomic-embed-text", base_url: str = "http://localhost:11434"):
+        self.client = ollama.Client(host=base_url)
+        self.model = model
+        self.name = f"ollama-{model}"
+
+    def embed(self, text: str) -> np.ndarray:
+        response = self.client.embeddings(model=self.model, prompt=text)
+        return np.asarray(response["embedding"], dtype=np.float32)
+
+
+def create_embedder(config: Dict[str, Any]):
+    """Create the embedder configured under memory.embedding"""
+    provider = config.get("provider", "hashing")
+    if provider == "ollama":
+        if not OLLAMA_AVAILABLE:
+            print("⚠️ ollama package not available - using hashing embedder for memory index")
+        else:
+            return OllamaEmbedder(
+                model=config.get("model", "nomic-embed-text"),
+                base_url=config.get("base_url", "http://localhost:11434")
+            )
+    return HashingEmbedder(dim=config.get("dim", 1024))
+
+
+class MemoryVectorIndex:
+    """Persistent brute-force cosine index over past analyses and tool outputs.
+
+    Files in index_dir:
+        meta.json      - format version, embedder name and dimension
+        vectors.f32    - row-major float32 unit vectors, appended per entry
+        entries.jsonl  - one JSON entry per vector row
+    """
+
+    def __init__(self, index_dir: str, embedder=None, similarity_threshold: float = 0.7):
+        self.index_dir = Path(index_dir)
+        self.embedder = embedder or HashingEmbedder()
+        self.similarity_threshold = similarity_threshold
+        self.enabled = True
+
+        self.meta_file = self.index_dir / "meta.json"
+        self.vectors_file = self.index_dir / "vectors.f32"
+        self.entries_file = self.index_dir / "entries.jsonl"
+
+        self._lock = threading.Lock()
+        self._entries: List[Dict[str, Any]] = []
+        self._vectors: Optional[np.ndarray] = None  # capacity-doubling buffer
+        self._dim: Optional[int] = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        if not self.meta_file.exists():
+            return
+
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version", 0) > INDEX_VERSION or meta.get("embedder") != self.embedder.name:
+                print(f"⚠️ Memory index {self.index_dir} was built with {meta.get('embedder')} "
+                      f"(v{meta.get('version')}); configured {self.embedder.name} - index disabled")
+                self.enabled = False
+                return
+
+            self._dim = meta["dim"]
+            entries = []
+            if self.entries_file.exists():
+                with open(self.entries_file, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entries.append(json.loads(line))
+                        except ValueError:
+                            break  # torn last line
+            vectors = np.fromfile(self.vectors_file, dtype=np.float32) if self.vectors_file.exists() else np.zeros(0, np.float32)
+            rows = min(len(entries), vectors.size // self._dim)
+
+            # Drop any half-written tail so both files line up again
+            if rows != len(entries) or rows * self._dim != vectors.size:
+                self._truncate(entries[:rows], vectors[:rows * self._dim])
+
+            self._entries = entries[:rows]
+            self._vectors = vectors[:rows * self._dim].reshape(rows, self._dim).copy()
+            print(f"🧠 Loaded memory index with {rows} entries from {self.index_dir}")
+        except Exception as e:
+            print(f"⚠️ Failed to load memory index {self.index_dir}: {e}")
+            self.enabled = False
+
+    def _truncate(self, entries: List[Dict[str, Any]], vectors: np.ndarray):
+        with open(self.entries_file, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry, default=str) + "\n" for entry in entries))
+        vectors.astype(np.float32).tofile(self.vectors_file)
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        vector = self.embedder.embed(text).astype(np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
+
+    def add(self, text: str, session_id: str, item_type: str, subject: Optional[str] = None,
+            key: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Embed and append one entry; returns False if it could not be indexed
+
+        Args:
+            text: Entry payload (e.g. the final analysis)
+            session_id: Session that produced the entry
+            item_type: Entry type, e.g. "final_analysis"
+            subject: Company/ticker the entry is about
+            key: Text to embed for retrieval (defaults to text)
+            metadata: Extra JSON-serializable data kept with the entry
+        """
+        if not self.enabled or not text.strip():
+            return False
+
+        vector = self._embed(key or text)
+        if vector is None:
+            return False
+
+        entry = {
+            "session_id": session_id,
+            "type": item_type,
+            "subject": subject,
+            "text": text,
+            "key": key,
+            "timestamp": time.time(),
+            "metadata": metadata or {}
+        }
+
+        with self._lock:
+            if self._dim is None:
+                self._dim = vector.shape[0]
+                with open(self.meta_file, "w", encoding="utf-8") as f:
+                    json.dump({"version": INDEX_VERSION, "embedder": self.embedder.name, "dim": self._dim}, f)
+            if vector.shape[0] != self._dim:
+                print(f"⚠️ Embedding dimension {vector.shape[0]} does not match index dimension {self._dim}")
+                return False
+
+            count = len(self._entries)
+            if self._vectors is None or count >= self._vectors.shape[0]:
+                capacity = max(64, count * 2)
+                grown = np.zeros((capacity, self._dim), dtype=np.float32)
+                if count:
+                    grown[:count] = self._vectors[:count]
+                self._vectors = grown
+            self._vectors[count] = vector
+            self._entries.append(entry)
+
+            # Vector first: a crash in between leaves a row that load() drops
+            with open(self.vectors_file, "ab") as f:
+                vector.tofile(f)
+            with open(self.entries_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+        return True
+
+    def search(self, query: str, top_k: int = 5, subject: Optional[str] = None,
+               item_types: Optional[List[str]] = None,
+               min_score: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Top-k entries with cosine similarity at or above the threshold
+
+        Args:
+            query: Text to match
+            top_k: Maximum number of results
+            subject: Only return entries about this company/ticker (case-insensitive)
+            item_types: Only return entries of these types
+            min_score: Override the configured similarity threshold
+
+        Returns:
+            Entries (newest data first among equal scores) with an added "score"
+        """
+        if not self.enabled or not self._entries or top_k <= 0:
+            return []
+
+        vector = self._embed(query)
+        if vector is None:
+            return []
+        threshold = self.similarity_threshold if min_score is None else min_score
+
+        with self._lock:
+            count = len(self._entries)
+            scores = self._vectors[:count] @ vector
+            candidates = np.nonzero(scores >= threshold)[0]
+            if subject or item_types:
+                subject_key = subject.lower() if subject else None
+                candidates = [
+                    i for i in candidates
+                    if (subject_key is None or (self._entries[i].get("subject") or "").lower() == subject_key)
+                    and (not item_types or self._entries[i].get("type") in item_types)
+                ]
+            candidates = np.asarray(candidates, dtype=np.int64)
+            if candidates.size == 0:
+                return []
+
+            if candidates.size > top_k:
+                best = np.argpartition(-scores[candidates], top_k - 1)[:top_k]
+                candidates = candidates[best]
+            order = sorted(candidates, key=lambda i: (-scores[i], -self._entries[i]["timestamp"]))
+            return [dict(self._entries[i], score=float(scores[i])) for i in order]
+
+
+def tool_output_key(subject: Optional[str], tool_name: str, arguments: Optional[Dict[str, Any]]) -> str:
+    """Text a tool output is indexed and looked up by"""
+    return f"{subject or ''} {tool_name} {json.dumps(arguments or {}, sort_keys=True, default=str)}".strip()
+
+
+def _is_successful(result: Any) -> bool:
+    """Whether a tool result is worth keeping: no error at the RPC, wrapper or tool level"""
+    if result is None or (isinstance(result, dict) and ("error" in result or result.get("success") is False)):
+        return False
+    contents = result.get("content") if isinstance(result, dict) else None
+    for part in contents if isinstance(contents, list) else []:
+        try:
+            payload = json.loads(part.get("text", ""))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if isinstance(payload, dict):
+            inner = payload.get("result")
+            if payload.get("success") is False or "error" in payload or (
+                    isinstance(inner, dict) and inner.get("success") is False):
+                return False
+    return True
+
+
+class ToolOutputDispatcher:
+    """Wraps MultiMCP so successful tool results are kept in the memory index.
+
+    Entries have type "tool_output" and are keyed by subject, tool name and
+    arguments. A call matching an entry younger than max_age seconds (from any
+    session) is answered from the index instead of refetching; max_age 0 only
+    records. Anything other than call_tool/call_tools_batch is passed through.
+
+    Args:
+        dispatcher: The MultiMCP instance tool calls are forwarded to
+        index: MemoryVectorIndex the outputs are stored in
+        session_id: Session recorded with new entries
+        subject: Company/ticker the calls are about
+        max_age: Seconds a stored output may be reused for
+    """
+
+    def __init__(self, dispatcher, index: MemoryVectorIndex, session_id: str,
+                 subject: Optional[str], max_age: float = 0):
+        self._dispatcher = dispatcher
+        self._index = index
+        self._session_id = session_id
+        self._subject = subject
+        self._max_age = max_age
+
+    def __getattr__(self, name):
+        return getattr(self._dispatcher, name)
+
+    def _lookup(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Newest reusable entry for exactly this tool call, if any"""
+        if self._max_age <= 0:
+            return None
+        key = tool_output_key(self._subject, tool_name, arguments)
+        for entry in self._index.search(key, top_k=5, subject=self._subject,
+                                        item_types=["tool_output"], min_score=0.0):
+            if entry.get("key") == key and time.time() - entry["timestamp"] <= self._max_age:
+                return entry
+        return None
+
+    def _remember(self, server_id: str, tool_name: str, arguments: Dict[str, Any], result: Any):
+        if _is_successful(result):
+            self._index.add(
+                json.dumps(result, default=str),
+                session_id=self._session_id,
+                item_type="tool_output",
+                subject=self._subject,
+                key=tool_output_key(self._subject, tool_name, arguments),
+                metadata={"server": server_id, "tool": tool_name, "arguments": arguments}
+            )
+
+    async def call_tool(self, server_id: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        entry = await asyncio.to_thread(self._lookup, tool_name, arguments)
+        if entry is not None:
+            print(f"🧠 Reusing {tool_name} result for {self._subject} from session {entry['session_id']}")
+            return json.loads(entry["text"])
+        result = await self._dispatcher.call_tool(server_id, tool_name, arguments)
+        await asyncio.to_thread(self._remember, server_id, tool_name, arguments, result)
+        return result
+
+    async def call_tools_batch(self, server_id: str, calls: List[Dict[str, Any]]) -> List[Any]:
+        entries = [await asyncio.to_thread(self._lookup, call.get("name"), call.get("arguments", {}))
+                   for call in calls]
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+        results = [None if entry is None else json.loads(entry["text"]) for entry in entries]
+        if len(missing) < len(calls):
+            print(f"🧠 Reusing {len(calls) - len(missing)} of {len(calls)} batched results for {self._subject}")
+        if missing:
+            fetched = await self._dispatcher.call_tools_batch(server_id, [calls[i] for i in missing])
+            for i, result in zip(missing, fetched):
+                results[i] = result
+                await asyncio.to_thread(self._remember, server_id, calls[i].get("name"),
+                                        calls[i].get("arguments", {}), result)
+        return results
+
+
+_memory_index: Optional[MemoryVectorIndex] = None
+_memory_index_lock = threading.Lock()
+
+
+def get_memory_index(memory_config: Optional[Dict[str, Any]] = None) -> Optional[MemoryVectorIndex]:
+    """Get the process-wide memory index configured by the memory section, or None"""
+    global _memory_index
+    memory_config = memory_config or {}
+    if not memory_config.get("index_dir"):
+        return None
+
+    with _memory_index_lock:
+        if _memory_index is None:
+            try:
+                _memory_index = MemoryVectorIndex(
+                    index_dir=memory_config["index_dir"],
+                    embedder=create_embedder(memory_config.get("embedding", {})),
+                    similarity_threshold=memory_config.get("similarity_threshold", 0.7)
+                )
+            except Exception as e:
+                print(f"⚠️ Memory index unavailable: {e}")
+                return None
+    return _memory_index if _memory_index.enabled else None
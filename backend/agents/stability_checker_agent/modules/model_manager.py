@@ -1,10 +1,14 @@
 # modules/model_manager.py - AI Model Management for Stock Stability Analysis
 
 import os
+import copy
+import time
 import asyncio
+import weakref
+import threading
 import aiohttp
 import json
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Tuple, Union
 
 # Google GenAI imports
 try:
@@ -21,14 +25,51 @@ try:
 except ImportError:
     OLLAMA_AVAILABLE = False
 
+from .stub_llm import StubLLMClient
+
+# Defaults used when a provider section does not set max_concurrent_requests / timeout
+DEFAULT_MAX_CONCURRENT_REQUESTS = {"google": 8, "ollama": 2, "stub": 64}
+DEFAULT_TIMEOUTS = {"google": 60, "ollama": 30, "stub": 30}
+
+# Shared by every ModelManager in the process, since each agent run creates its own.
+# Kept per event loop (asyncio primitives bind to the loop that first waits on them)
+# and keyed by limit, so a changed max_concurrent_requests applies to new calls.
+_provider_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, int], asyncio.Semaphore]]" = \
+    weakref.WeakKeyDictionary()
+_provider_semaphores_lock = threading.Lock()
+
+
+def _get_provider_semaphore(provider: str, limit: int) -> asyncio.Semaphore:
+    """Get the shared semaphore for a provider's current limit on the running event loop"""
+    limit = max(1, int(limit))
+    loop = asyncio.get_running_loop()
+    with _provider_semaphores_lock:
+        semaphores = _provider_semaphores.setdefault(loop, {})
+        semaphore = semaphores.get((provider, limit))
+        if semaphore is None:
+            # Calls holding the previous limit's semaphore release it when they finish
+            for key in [key for key in semaphores if key[0] == provider]:
+                del semaphores[key]
+            semaphore = semaphores[(provider, limit)] = asyncio.Semaphore(limit)
+    return semaphore
+
+
 class ModelManager:
-    """Manages AI models for stock stability analysis - supports Google GenAI and Ollama"""
+    """Manages AI models for stock stability analysis - supports Google GenAI and Ollama
+    
+    The "stub" provider returns canned solve() plans (see stub_llm.py) for
+    benchmarks and offline runs.
+    """
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.google_client = None
         self.ollama_client = None
+        self.ollama_async_client = None
+        self.stub_client = None
         self.current_provider = None
+        self.usage: Dict[str, Dict[str, Any]] = {}
+        self.last_call: Optional[Dict[str, Any]] = None
         self.initialize_models()
     
     def initialize_models(self):
@@ -45,6 +86,11 @@ class ModelManager:
         if provider == "ollama" or self.config.get("fallback", {}).get("enable_fallback", False):
             self._initialize_ollama()
         
+        # Initialize the canned-plan stub (never used as a fallback)
+        if provider == "stub":
+            self.stub_client = StubLLMClient(self.config.get("stub", {}))
+            print("🧪 Using stub LLM provider (canned solve() plans)")
+        
         # Set current provider
         self.current_provider = provider
         
@@ -112,8 +158,9 @@ class ModelManager:
             ollama_config = self.config.get("ollama", {})
             base_url = ollama_config.get("base_url", "http://localhost:11434")
             
-            # Create Ollama client
+            # Create Ollama clients (sync for setup checks, async for generation)
             self.ollama_client = ollama.Client(host=base_url)
+            self.ollama_async_client = ollama.AsyncClient(host=base_url)
             
             # Test connection
             try:
@@ -148,6 +195,8 @@ class ModelManager:
             return self.google_client is not None
         elif provider == "ollama":
             return self.ollama_client is not None
+        elif provider == "stub":
+            return self.stub_client is not None
         return False
     
     async def generate_text(self, prompt: str) -> str:
@@ -156,9 +205,91 @@ class ModelManager:
             return await self._generate_with_google(prompt)
         elif self.current_provider == "ollama":
             return await self._generate_with_ollama(prompt)
+        elif self.current_provider == "stub":
+            return await self._generate_with_stub(prompt)
         else:
             return "ERROR: No available AI provider"
     
+    def _provider_limits(self, provider: str):
+        """Get (semaphore, timeout) for a provider from its config section"""
+        provider_config = self.config.get(provider, {})
+        limit = provider_config.get("max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS.get(provider, 4))
+        timeout = provider_config.get("timeout", DEFAULT_TIMEOUTS.get(provider, 60))
+        return _get_provider_semaphore(provider, limit), timeout
+    
+    def _record_call(self, provider: str, model: str, queued: float, latency: float,
+                     prompt_tokens: Optional[int], output_tokens: Optional[int], status: str):
+        """Record token and latency accounting for one generation call"""
+        stats = self.usage.setdefault(provider, {
+            "calls": 0, "errors": 0, "timeouts": 0,
+            "prompt_tokens": 0, "output_tokens": 0,
+            "latency_seconds": 0.0, "queued_seconds": 0.0
+        })
+        stats["calls"] += 1
+        if status == "error":
+            stats["errors"] += 1
+        elif status == "timeout":
+            stats["timeouts"] += 1
+        stats["prompt_tokens"] += prompt_tokens or 0
+        stats["output_tokens"] += output_tokens or 0
+        stats["latency_seconds"] += latency
+        stats["queued_seconds"] += queued
+        
+        self.last_call = {
+            "provider": provider,
+            "model": model,
+            "status": status,
+            "prompt_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "latency_seconds": latency,
+            "queued_seconds": queued
+        }
+        print(f"🧮 {provider}/{model}: {status} | tokens {prompt_tokens or '?'} → {output_tokens or '?'} | "
+              f"{latency:.2f}s (queued {queued:.2f}s)")
+    
+    async def _call_provider(self, provider: str, model: str, request):
+        """Run one generation request under the provider's concurrency limit and timeout
+        
+        Args:
+            provider: Provider name used for limits and accounting
+            model: Model name (for accounting only)
+            request: Zero-argument callable returning the awaitable to run
+        
+        Returns:
+            The provider response object
+        """
+        semaphore, timeout = self._provider_limits(provider)
+        queued_at = time.perf_counter()
+        async with semaphore:
+            started_at = time.perf_counter()
+            queued = started_at - queued_at
+            try:
+                response = await asyncio.wait_for(request(), timeout=timeout)
+            except asyncio.TimeoutError:
+                self._record_call(provider, model, queued, time.perf_counter() - started_at, None, None, "timeout")
+                raise TimeoutError(f"{provider} request timed out after {timeout}s")
+            except Exception:
+                self._record_call(provider, model, queued, time.perf_counter() - started_at, None, None, "error")
+                raise
+        
+        prompt_tokens, output_tokens = self._extract_token_counts(provider, response)
+        self._record_call(provider, model, queued, time.perf_counter() - started_at, prompt_tokens, output_tokens, "ok")
+        return response
+    
+    @staticmethod
+    def _extract_token_counts(provider: str, response: Any):
+        """Pull (prompt_tokens, output_tokens) out of a provider response"""
+        try:
+            if provider == "google":
+                usage = getattr(response, "usage_metadata", None)
+                if usage is not None:
+                    return usage.prompt_token_count, usage.candidates_token_count
+            elif provider in ("ollama", "stub"):
+                return response.get("prompt_eval_count"), response.get("eval_count")
+        except Exception:
+            pass
+        return None, None
+    
     async def _generate_with_google(self, prompt: str) -> str:
         """Generate text using Google GenAI"""
         if not self.google_client:
@@ -168,15 +299,15 @@ class ModelManager:
             google_config = self.config.get("google", {})
             model_name = google_config.get("model", "gemini-2.0-flash-001")
             
-            # Use the official Google GenAI SDK API
-            response = self.google_client.models.generate_content(
+            # Use the async surface of the official SDK so the event loop stays free
+            response = await self._call_provider("google", model_name, lambda: self.google_client.aio.models.generate_content(
                 model=model_name,
                 contents=prompt,
                 config=types.GenerateContentConfig(
                     temperature=google_config.get("temperature", 0.1),
                     max_output_tokens=google_config.get("max_tokens", 4000),
                 ),
-            )
+            ))
             
             return response.text.strip() if response.text else "No response generated"
             
@@ -187,7 +318,7 @@ class ModelManager:
             # Try fallback if enabled
             if self.config.get("fallback", {}).get("enable_fallback", False):
                 fallback_provider = self.config.get("fallback", {}).get("provider")
-                if fallback_provider == "ollama" and self.ollama_client:
+                if fallback_provider == "ollama" and self.ollama_async_client:
                     print("🔄 Falling back to Ollama...")
                     return await self._generate_with_ollama(prompt)
             
@@ -195,7 +326,7 @@ class ModelManager:
     
     async def _generate_with_ollama(self, prompt: str) -> str:
         """Generate text using Ollama"""
-        if not self.ollama_client:
+        if not self.ollama_async_client:
             return "ERROR: Ollama client not available"
         
         try:
@@ -203,14 +334,14 @@ class ModelManager:
             model_name = ollama_config.get("model", "gemma3:1b")
             
             # Use Ollama generate API
-            response = self.ollama_client.generate(
+            response = await self._call_provider("ollama", model_name, lambda: self.ollama_async_client.generate(
                 model=model_name,
                 prompt=prompt,
                 options={
                     "temperature": ollama_config.get("temperature", 0.1),
                     "num_predict": ollama_config.get("max_tokens", 4000),
                 },
-            )
+            ))
             
             return response.get("response", "No response generated").strip()
             
@@ -227,6 +358,16 @@ class ModelManager:
             
             return error_msg
     
+    async def _generate_with_stub(self, prompt: str) -> str:
+        """Generate a canned plan with the stub provider"""
+        try:
+            response = await self._call_provider("stub", "stub", lambda: self.stub_client.generate(prompt))
+            return response["response"]
+        except Exception as e:
+            error_msg = f"ERROR: Stub generation failed: {str(e)}"
+            print(error_msg)
+            return error_msg
+    
     def is_available(self) -> bool:
         """Check if any AI model is available"""
         return self.is_provider_available(self.current_provider)
@@ -239,4 +380,22 @@ class ModelManager:
             "model": provider_config.get("model", "unknown"),
             "available": self.is_available(),
             "fallback_enabled": self.config.get("fallback", {}).get("enable_fallback", False),
-        } 
\ No newline at end of file
+        }
+    
+    def for_request(self) -> "ModelManager":
+        """Get a per-request view that shares this manager's clients
+        
+        The view reuses the already-initialized Google/Ollama clients (and the
+        process-wide provider limits) but keeps its own usage accounting.
+        """
+        view = copy.copy(self)
+        view.usage = {}
+        view.last_call = None
+        return view
+    
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """Get token and latency totals for calls made through this manager"""
+        return {
+            "providers": {provider: dict(stats) for provider, stats in self.usage.items()},
+            "last_call": self.last_call,
+        }
@@ -0,0 +1,241 @@
+# modules/plan_cache.py - Reusable solve() plans for Stock Stability Analysis
+
+import io
+import re
+import ast
+import json
+import time
+import hashlib
+import tokenize
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Marker that stands in for the analysed company/ticker inside a cached plan
+SUBJECT_PLACEHOLDER = "__VQ_PLAN_SUBJECT__"
+
+# Subjects are spliced into string literals, so only accept plain names/tickers
+_SAFE_SUBJECT = re.compile(r"^[A-Za-z0-9][A-Za-z0-9 &.\-]{1,63}$")
+
+# Tool arguments naming the company; in a reusable plan they come from the subject
+_SUBJECT_ARGUMENTS = {"ticker", "ticker_symbol", "symbol", "company_name", "company"}
+# Exchange-qualified tickers such as "HAL.NS" or "500002.BO"
+_TICKER_LITERAL = re.compile(r"(?<![A-Za-z0-9_])[A-Z0-9][A-Z0-9&\-]*\.(?:NS|BO)\b")
+# Figures printed as strings, e.g. "12.45" or "1,234"
+_FIGURE_LITERAL = re.compile(r"^\s*-?\d[\d,]*\.\d+\s*$|^\s*-?\d{1,3}(?:,\d{2,3})+\s*$")
+
+_STRING_TOKENS = {tokenize.STRING}
+if hasattr(tokenize, "FSTRING_MIDDLE"):  # Python 3.12+ splits f-strings into parts
+    _STRING_TOKENS.add(tokenize.FSTRING_MIDDLE)
+
+
+def _subject_pattern(subject: str) -> re.Pattern:
+    return re.compile(rf"(?<![A-Za-z0-9]){re.escape(subject)}(?![A-Za-z0-9])")
+
+
+def _is_number(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool)
+
+
+def _resolved_literal(template: str) -> Optional[str]:
+    """First literal in a template that looks resolved for one company
+
+    The LLM sometimes hard-codes what it looked up: a ticker resolved from a
+    company name, or fetched EPS figures. Such plans would analyse the old
+    company (or old data) for every new subject.
+    """
+    try:
+        tree = ast.parse(template)
+    except SyntaxError:
+        return "unparseable plan"
+
+    for node in ast.walk(tree):
+        # {"ticker_symbol": "HAL.NS"} / call_tool(..., ticker="HAL")
+        pairs = []
+        if isinstance(node, ast.Dict):
+            pairs = [(key.value, value) for key, value in zip(node.keys, node.values)
+                     if isinstance(key, ast.Constant) and isinstance(key.value, str)]
+        elif isinstance(node, ast.keyword) and node.arg:
+            pairs = [(node.arg, node.value)]
+        for name, value in pairs:
+            if name in _SUBJECT_ARGUMENTS and isinstance(value, ast.Constant) and isinstance(value.value, str) \
+                    and SUBJECT_PLACEHOLDER not in value.value:
+                return f"{name}={value.value!r}"
+
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            ticker = _TICKER_LITERAL.search(node.value)
+            if ticker:
+                return ticker.group(0)
+            if _FIGURE_LITERAL.match(node.value):
+                return repr(node.value)
+        elif _is_number(node):
+            if isinstance(node.value, float) and not node.value.is_integer():
+                return repr(node.value)
+            if 1900 <= node.value <= 2100:  # a fiscal year
+                return repr(node.value)
+        elif isinstance(node, (ast.List, ast.Tuple, ast.Set, ast.Dict)):
+            elements = node.values if isinstance(node, ast.Dict) else node.elts
+            if sum(_is_number(element) for element in elements) >= 2:
+                return "hard-coded figures"
+    return None
+
+
+def templatize_plan(plan: str, subject: str) -> Optional[str]:
+    """Replace the subject inside the plan's string literals with a placeholder
+
+    Returns:
+        The template, or None if the plan cannot be safely parameterized
+        (unparseable code, the subject never appears in a string literal, or
+        another ticker or fetched figure is hard-coded)
+    """
+    if not subject or not _SAFE_SUBJECT.match(subject):
+        return None
+
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(plan).readline))
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return None
+
+    line_offsets = [0]
+    for line in plan.splitlines(keepends=True):
+        line_offsets.append(line_offsets[-1] + len(line))
+
+    pattern = _subject_pattern(subject)
+    edits: List[Tuple[int, int, str]] = []
+    for token in tokens:
+        if token.type not in _STRING_TOKENS or not pattern.search(token.string):
+            continue
+        start = line_offsets[token.start[0] - 1] + token.start[1]
+        end = line_offsets[token.end[0] - 1] + token.end[1]
+        edits.append((start, end, pattern.sub(SUBJECT_PLACEHOLDER, token.string)))
+
+    if not edits:
+        return None
+
+    template = plan
+    for start, end, replacement in reversed(edits):
+        template = template[:start] + replacement + template[end:]
+    if _resolved_literal(template):
+        return None
+    return template
+
+
+def render_plan(template: str, subject: str) -> Optional[str]:
+    """Substitute a new subject into a cached template"""
+    if not subject or not _SAFE_SUBJECT.match(subject):
+        return None
+    return template.replace(SUBJECT_PLACEHOLDER, subject)
+
+
+def normalize_workflow(user_input: str, subject: str) -> str:
+    """Reduce the user request to its subject-independent workflow text"""
+    workflow = _subject_pattern(subject).sub(SUBJECT_PLACEHOLDER, user_input) if subject else user_input
+    return " ".join(workflow.split())
+
+
+class PlanCache:
+    """Cache of solve() plans that produced a FINAL_ANSWER, keyed by
+    (prompt_path, tool set, workflow) and parameterized on the analysed subject.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 64):
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+        self._load()
+
+    @staticmethod
+    def make_key(prompt_path: str, tool_names: Iterable[str], workflow: str) -> str:
+        """Build the cache key for a planning request"""
+        raw = json.dumps([str(prompt_path), sorted(tool_names), workflow])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def lookup(self, key: str, subject: str) -> Optional[str]:
+        """Get a ready-to-run plan for the subject, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            plan = render_plan(entry["template"], subject)
+            if plan is None:
+                self.stats["misses"] += 1
+                return None
+            entry["hits"] += 1
+            entry["last_used"] = time.time()
+            self.stats["hits"] += 1
+            return plan
+
+    def store(self, key: str, plan: str, subject: str) -> bool:
+        """Store a plan that ended in FINAL_ANSWER; returns False if it can't be parameterized"""
+        template = templatize_plan(plan, subject)
+        if template is None:
+            return False
+
+        with self._lock:
+            now = time.time()
+            self._entries[key] = {
+                "template": template,
+                "source_subject": subject,
+                "created_at": now,
+                "last_used": now,
+                "hits": 0
+            }
+            if len(self._entries) > self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k]["last_used"])
+                del self._entries[oldest]
+            self.stats["stores"] += 1
+            self._save()
+        return True
+
+    def invalidate(self, key: str):
+        """Drop a cached plan after it failed to execute"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.stats["invalidations"] += 1
+                self._save()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+            print(f"♻️ Loaded {len(self._entries)} cached plans from {self.path}")
+        except Exception as e:
+            print(f"⚠️ Could not load plan cache {self.path}: {e}")
+            self._entries = {}
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2)
+            tmp_path.replace(self.path)
+        except Exception as e:
+            print(f"⚠️ Could not save plan cache {self.path}: {e}")
+
+
+_plan_cache: Optional[PlanCache] = None
+
+
+def get_plan_cache(config: Optional[Dict[str, Any]] = None) -> Optional[PlanCache]:
+    """Get the process-wide plan cache, or None when disabled in config"""
+    global _plan_cache
+    config = config or {}
+    if not config.get("enabled", True):
+        return None
+    if _plan_cache is None:
+        _plan_cache = PlanCache(
+            path=config.get("path"),
+            max_entries=config.get("max_entries", 64)
+        )
+    return _plan_cache
@@ -0,0 +1,163 @@
+# modules/prompt_builder.py - Token-budgeted planning prompts for Stock Stability Analysis
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .tools import summarize_tools, get_recommended_tools_for_stage
+from ..core.strategy import is_tool_relevant, get_analysis_workflow
+
+# tiktoken for token counting (optional - falls back to a character estimate)
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+DEFAULT_MAX_PROMPT_TOKENS = 3000
+DEFAULT_ENCODING = "cl100k_base"
+# Tools named in the planning instructions are always offered
+DEFAULT_PINNED_TOOLS = ["get_ticker_symbol", "get_eps_data", "get_income_statement"]
+
+# Workflow stages in order; a solve() plan runs from the current stage to the end
+STAGE_ORDER = [step["stage"] for step in get_analysis_workflow("eps_stability")]
+
+
+@lru_cache(maxsize=4)
+def _get_encoding(name: str):
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        print(f"⚠️ tiktoken encoding {name} unavailable ({e}) - estimating prompt tokens")
+        return None
+
+
+def count_tokens(text: str, encoding: str = DEFAULT_ENCODING) -> int:
+    """Count tokens in text with tiktoken (about 4 characters per token without it)"""
+    enc = _get_encoding(encoding) if TIKTOKEN_AVAILABLE else None
+    if enc is None:
+        return (len(text) + 3) // 4
+    return len(enc.encode(text, disallowed_special=()))
+
+
+# Static segments and tool lines repeat on every plan, so their counts are cached
+_count_segment = lru_cache(maxsize=2048)(count_tokens)
+
+
+class PromptBuilder:
+    """Assembles planning prompts within a token budget.
+
+    Only tools relevant to the remaining workflow stages are described. Optional
+    segments (memory context, related analyses) are trimmed once the budget runs
+    out; static instruction segments are counted once and cached.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.max_tokens = config.get("max_tokens", DEFAULT_MAX_PROMPT_TOKENS)
+        self.encoding = config.get("encoding", DEFAULT_ENCODING)
+        self.pinned_tools = config.get("pinned_tools", DEFAULT_PINNED_TOOLS)
+        self.stage_filtering = config.get("stage_filtering", True)
+
+    def count(self, text: str) -> int:
+        return _count_segment(text, self.encoding)
+
+    def select_tools(self, tools: Dict[str, Any], stage: str) -> Dict[str, Any]:
+        """Tools relevant to this stage or a later one, most relevant first
+
+        Order: pinned tools, recommended tools for the stage, then tools whose
+        names match the patterns of the stage or a following stage.
+        """
+        if not self.stage_filtering or not tools:
+            return dict(tools)
+
+        stages = STAGE_ORDER[STAGE_ORDER.index(stage):] if stage in STAGE_ORDER else STAGE_ORDER
+        ranked = [name for name in self.pinned_tools if name in tools]
+        for remaining_stage in stages:
+            ranked += get_recommended_tools_for_stage(remaining_stage, tools)
+        for remaining_stage in stages:
+            ranked += [name for name in tools if is_tool_relevant(name, remaining_stage)]
+
+        ranked = list(dict.fromkeys(ranked))
+        if not ranked:
+            return dict(tools)
+        return {name: tools[name] for name in ranked}
+
+    def _fit_tools(self, tools: Dict[str, Any], budget: int) -> Tuple[str, int]:
+        """Describe as many (ranked) tools as fit in the budget; pinned tools always go in"""
+        chosen = {}
+        used = 0
+        for name, info in tools.items():
+            line_tokens = self.count(summarize_tools({name: info}))
+            if used + line_tokens > budget and chosen and name not in self.pinned_tools:
+                continue
+            chosen[name] = info
+            used += line_tokens
+        return summarize_tools(chosen), len(chosen)
+
+    def _fit_lines(self, lines: List[str], budget: int, empty: str, keep_last: bool = False) -> Tuple[str, int]:
+        """Keep the lines that fit in the budget, from the front (or the back with keep_last)"""
+        kept: List[str] = []
+        used = 0
+        for line in (reversed(lines) if keep_last else lines):
+            line_tokens = self.count(line) + 1
+            if used + line_tokens > budget:
+                break
+            kept.append(line)
+            used += line_tokens
+        if keep_last:
+            kept.reverse()
+        return ("\n".join(kept) if kept else empty), len(kept)
+
+    def build(self, template: str, static_segments: Dict[str, str], fixed: Dict[str, str],
+              tools: Union[Dict[str, Any], str], memory_lines: List[str], related_lines: List[str]) -> Tuple[str, Dict[str, Any]]:
+        """Fill template within the token budget
+
+        Args:
+            template: str.format template with {tool_descriptions}, {memory_context},
+                {related_analyses} and the keys of static_segments and fixed
+            static_segments: Instruction text identical across prompts
+            fixed: Per-request text that is always included (user request, stage, ...)
+            tools: Selected tools, most relevant first (or preformatted descriptions, used as is)
+            memory_lines: Memory context lines, oldest first
+            related_lines: Related analysis lines, most similar first
+
+        Returns:
+            (prompt, stats) where stats has token counts and what was kept
+        """
+        skeleton = template.format(tool_descriptions="", memory_context="", related_analyses="",
+                                   **{key: "" for key in static_segments}, **{key: "" for key in fixed})
+        used = self.count(skeleton)
+        used += sum(self.count(segment) for segment in static_segments.values())
+        used += sum(self.count(value) for value in fixed.values())
+
+        remaining = max(self.max_tokens - used, 0)
+        if isinstance(tools, str):
+            tool_descriptions, tools_kept = tools, None
+        else:
+            tool_descriptions, tools_kept = self._fit_tools(tools, remaining)
+        remaining = max(remaining - self.count(tool_descriptions), 0)
+
+        # Most similar related analyses and most recent memory items win
+        related_analyses, related_kept = self._fit_lines(related_lines, remaining // 2, "None found.")
+        remaining = max(remaining - self.count(related_analyses), 0)
+        memory_context, memory_kept = self._fit_lines(memory_lines, remaining, "No previous context available.",
+                                                      keep_last=True)
+
+        prompt = template.format(
+            tool_descriptions=tool_descriptions,
+            memory_context=memory_context,
+            related_analyses=related_analyses,
+            **static_segments,
+            **fixed
+        )
+        stats = {
+            "prompt_tokens": count_tokens(prompt, self.encoding),
+            "max_tokens": self.max_tokens,
+            "tools": tools_kept,
+            "tools_available": None if isinstance(tools, str) else len(tools),
+            "memory_items": memory_kept,
+            "related_analyses": related_kept
+        }
+        if stats["prompt_tokens"] > self.max_tokens:
+            print(f"⚠️ Planning prompt is {stats['prompt_tokens']} tokens, over the {self.max_tokens} token budget")
+        return prompt, stats
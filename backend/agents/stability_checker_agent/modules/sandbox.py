@@ -0,0 +1,593 @@
+# modules/sandbox.py - Isolated plan execution for Stock Stability Analysis
+
+import os
+import ast
+import sys
+import json
+import time
+import asyncio
+import itertools
+import contextvars
+from io import StringIO
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_WALL_TIMEOUT = 120      # seconds per plan
+DEFAULT_CPU_TIME_LIMIT = 30     # CPU seconds spent running plan code
+KILL_GRACE = 5                  # extra seconds before a subprocess worker is killed
+STREAM_LIMIT = 16 * 1024 * 1024 # tool results can be large JSON lines
+
+PLAN_FILENAME = "<plan>"
+_CHECK_NAME = "__sandbox_check__"
+
+# Output buffer of the plan running in the current asyncio task (None outside plans)
+_capture: contextvars.ContextVar[Optional[StringIO]] = contextvars.ContextVar("sandbox_capture", default=None)
+
+
+class SandboxError(Exception):
+    """Plan could not be executed in the sandbox"""
+
+
+class SandboxTimeout(SandboxError):
+    """Plan exceeded its wall-clock or CPU time limit"""
+
+
+class SandboxUnavailable(SandboxError):
+    """The subprocess pool has no workers left (all died and could not be restarted)"""
+
+
+class _TaskLocalStdout:
+    """sys.stdout replacement that sends writes to the current task's capture buffer.
+
+    Unlike swapping sys.stdout for the duration of a plan, concurrent plans
+    (and unrelated code running while a plan awaits) never see each other's output.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        buffer = _capture.get()
+        return (buffer if buffer is not None else self._stream).write(text)
+
+    def flush(self):
+        buffer = _capture.get()
+        if buffer is None:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def install_stdout_router():
+    """Route sys.stdout through the per-task capture (idempotent)"""
+    if not isinstance(sys.stdout, _TaskLocalStdout):
+        sys.stdout = _TaskLocalStdout(sys.stdout)
+
+
+class _Budget:
+    """Wall-clock deadline and CPU allowance of one plan"""
+
+    def __init__(self, wall_timeout: Optional[float], cpu_time_limit: Optional[float]):
+        self.wall_timeout = wall_timeout
+        self.cpu_time_limit = cpu_time_limit
+        self.deadline = time.monotonic() + wall_timeout if wall_timeout else None
+        self.cpu_used = 0.0
+        self._step_started: Optional[float] = None
+
+    def start_step(self):
+        self._step_started = time.thread_time()
+
+    def end_step(self):
+        if self._step_started is not None:
+            self.cpu_used += time.thread_time() - self._step_started
+            self._step_started = None
+
+    def check(self) -> bool:
+        """Called from instrumented plan code; raises once a limit is exceeded"""
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise SandboxTimeout(f"plan exceeded wall-clock limit of {self.wall_timeout}s")
+        if self.cpu_time_limit and self._step_started is not None:
+            if self.cpu_used + time.thread_time() - self._step_started > self.cpu_time_limit:
+                raise SandboxTimeout(f"plan exceeded CPU time limit of {self.cpu_time_limit}s")
+        return True
+
+
+class _BudgetInstrumenter(ast.NodeTransformer):
+    """Insert budget checks at every function entry, loop iteration and comprehension step"""
+
+    @staticmethod
+    def _check_call() -> ast.Call:
+        return ast.Call(func=ast.Name(id=_CHECK_NAME, ctx=ast.Load()), args=[], keywords=[])
+
+    def _instrument_body(self, node):
+        self.generic_visit(node)
+        node.body.insert(0, ast.Expr(value=self._check_call()))
+        return node
+
+    def _instrument_comprehension(self, node):
+        self.generic_visit(node)
+        for generator in node.generators:
+            generator.ifs.insert(0, self._check_call())
+        return node
+
+    visit_FunctionDef = visit_AsyncFunctionDef = _instrument_body
+    visit_For = visit_AsyncFor = visit_While = _instrument_body
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = _instrument_comprehension
+
+
+def compile_plan(code: str):
+    """Compile plan code with budget checks (raises SyntaxError like exec would)"""
+    tree = _BudgetInstrumenter().visit(ast.parse(code, filename=PLAN_FILENAME))
+    return compile(ast.fix_missing_locations(tree), PLAN_FILENAME, "exec")
+
+
+class _MeteredCoroutine:
+    """Drive a coroutine step by step, charging only its own steps to the budget.
+
+    Several plans share the event loop thread, so process or thread CPU time
+    can't be attributed to a plan; the time spent inside its steps can.
+    """
+
+    def __init__(self, coro, budget: _Budget):
+        self._coro = coro
+        self._budget = budget
+
+    def __await__(self):
+        send_value, error = None, None
+        while True:
+            self._budget.start_step()
+            try:
+                if error is not None:
+                    yielded = self._coro.throw(error)
+                else:
+                    yielded = self._coro.send(send_value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self._budget.end_step()
+
+            try:
+                send_value, error = (yield yielded), None
+            except BaseException as e:  # cancellation is forwarded into the plan
+                send_value, error = None, e
+
+
+def format_plan_output(result: Any, captured_output: str) -> str:
+    """Result of solve(), falling back to whatever the plan printed"""
+    if result:
+        return str(result)
+    elif captured_output:
+        return captured_output
+    else:
+        return "FINAL_ANSWER: Plan executed but no result returned"
+
+
+async def _run_solve(code: str, dispatcher: Any, budget: _Budget) -> Any:
+    compiled = compile_plan(code)
+
+    # Prepare execution environment
+    allowed_globals = {
+        "__builtins__": __builtins__,
+        "asyncio": asyncio,
+        "dispatcher": dispatcher,
+        "print": print,
+        _CHECK_NAME: budget.check
+    }
+    local_vars = {}
+
+    budget.start_step()
+    try:
+        exec(compiled, allowed_globals, local_vars)
+    finally:
+        budget.end_step()
+
+    # Get the solve function
+    solve_func = local_vars.get("solve")
+    if not solve_func:
+        result = "ERROR: No solve() function found in plan"
+        print(f"❌ {result}")
+        return result
+
+    print(f"🎯 Found solve() function, executing...")
+    if asyncio.iscoroutinefunction(solve_func):
+        result = await _MeteredCoroutine(solve_func(), budget)
+    else:
+        budget.start_step()
+        try:
+            result = solve_func()
+        finally:
+            budget.end_step()
+    print(f"✅ Solve function returned: {result}")
+    return result
+
+
+async def execute_plan(code: str, dispatcher: Any,
+                       wall_timeout: Optional[float] = DEFAULT_WALL_TIMEOUT,
+                       cpu_time_limit: Optional[float] = DEFAULT_CPU_TIME_LIMIT) -> str:
+    """Run a plan in this process with its own output capture and time limits
+
+    Limits are checked at function entries, loop iterations and awaits, so a
+    single long-running builtin call can't be interrupted here; use the
+    subprocess pool when plans must be hard-killable.
+
+    Raises:
+        SandboxTimeout: A limit was exceeded
+        Exception: Whatever the plan raised
+    """
+    install_stdout_router()
+    budget = _Budget(wall_timeout, cpu_time_limit)
+    buffer = StringIO()
+    token = _capture.set(buffer)
+    try:
+        try:
+            result = await asyncio.wait_for(_run_solve(code, dispatcher, budget), timeout=wall_timeout or None)
+        except asyncio.TimeoutError:
+            raise SandboxTimeout(f"plan exceeded wall-clock limit of {wall_timeout}s")
+    finally:
+        _capture.reset(token)
+
+    return format_plan_output(result, buffer.getvalue())
+
+
+# ---------------------------------------------------------------------------
+# Subprocess pool: plans run in pre-started worker processes and reach the MCP
+# servers through the parent's dispatcher over JSON lines on stdin/stdout.
+# ---------------------------------------------------------------------------
+
+class _SandboxWorker:
+    """Parent-side handle of one worker process"""
+
+    def __init__(self, worker_id: int):
+        self.name = f"sandbox-{worker_id}"
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.tasks_run = 0
+        self.alive = False
+        self._ready: Optional[asyncio.Future] = None
+        self._result: Optional[asyncio.Future] = None
+        self._dispatcher: Any = None
+        self._tasks = set()
+
+    async def start(self, startup_timeout: float):
+        loop = asyncio.get_running_loop()
+        self._ready = loop.create_future()
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, "-u", str(Path(__file__).resolve()),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT
+        )
+        self.alive = True
+        self._spawn(self._read_stdout())
+        self._spawn(self._read_stderr())
+        await asyncio.wait_for(self._ready, timeout=startup_timeout)
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, message: Dict[str, Any]):
+        self.process.stdin.write((json.dumps(message, default=str) + "\n").encode())
+        await self.process.stdin.drain()
+
+    async def run(self, plan: str, dispatcher: Any, wall_timeout: Optional[float],
+                  cpu_time_limit: Optional[float]) -> Dict[str, Any]:
+        """Run one plan and return the worker's result message"""
+        self._dispatcher = dispatcher
+        self._result = asyncio.get_running_loop().create_future()
+        await self._send({
+            "type": "run",
+            "plan": plan,
+            "wall_timeout": wall_timeout,
+            "cpu_time_limit": cpu_time_limit
+        })
+        try:
+            return await self._result
+        finally:
+            self.tasks_run += 1
+            self._dispatcher = None
+
+    async def _proxy_call(self, message: Dict[str, Any]):
+        reply = {"type": "tool_result", "call_id": message["call_id"]}
+        try:
+            method = getattr(self._dispatcher, message["type"])
+            reply["result"] = await method(*message["args"])
+        except Exception as e:
+            reply["error"] = str(e)
+        try:
+            await self._send(reply)
+        except Exception:
+            pass  # worker went away; the run fails through _read_stdout
+
+    async def _read_stdout(self):
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break
+            try:
+                message = json.loads(line)
+            except ValueError:
+                print(f"[{self.name}] {line.decode(errors='replace').rstrip()}")
+                continue
+
+            kind = message.get("type")
+            if kind == "ready" and not self._ready.done():
+                self._ready.set_result(message)
+            elif kind in ("call_tool", "call_tools_batch") and self._dispatcher is not None:
+                self._spawn(self._proxy_call(message))
+            elif kind == "result" and self._result is not None and not self._result.done():
+                self._result.set_result(message)
+
+        self.alive = False
+        for future in (self._ready, self._result):
+            if future is not None and not future.done():
+                future.set_exception(SandboxError(f"{self.name} exited unexpectedly"))
+
+    async def _read_stderr(self):
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                break
+            print(f"[{self.name}] {line.decode(errors='replace').rstrip()}")
+
+    async def kill(self):
+        self.alive = False
+        if self.process and self.process.returncode is None:
+            try:
+                self.process.kill()
+                await self.process.wait()
+            except ProcessLookupError:
+                pass
+        for task in list(self._tasks):
+            task.cancel()
+
+
+class SandboxPool:
+    """Pool of pre-started worker processes, one plan per worker at a time.
+
+    A worker that times out, crashes or is abandoned mid-plan is killed and
+    replaced; workers are also recycled after max_tasks_per_worker plans.
+    """
+
+    def __init__(self, size: int = 4, max_tasks_per_worker: int = 100, startup_timeout: float = 30,
+                 kill_grace: float = KILL_GRACE):
+        self.size = size
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.startup_timeout = startup_timeout
+        self.kill_grace = kill_grace
+        self._ids = itertools.count(1)
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._workers = set()
+        self._replacements = set()
+        self._spawning = 0
+        self._closed = False
+
+    async def start(self):
+        """Start all workers (pre-warm)"""
+        results = await asyncio.gather(*(self._spawn_worker() for _ in range(self.size)), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors and not self._workers:
+            raise SandboxError(f"no sandbox workers could be started: {errors[0]}")
+        print(f"🧪 Sandbox pool ready with {len(self._workers)} workers")
+
+    async def _spawn_worker(self):
+        worker = _SandboxWorker(next(self._ids))
+        try:
+            await worker.start(self.startup_timeout)
+        except BaseException:
+            await worker.kill()
+            raise
+        self._workers.add(worker)
+        self._idle.put_nowait(worker)
+
+    @property
+    def available(self) -> bool:
+        """Whether a worker is, or may become, idle"""
+        return not self._closed and bool(self._workers or self._spawning)
+
+    def _wake_waiters(self):
+        """Wake run() calls waiting for an idle worker that will never come"""
+        # Each woken waiter passes the marker on before raising
+        self._idle.put_nowait(None)
+
+    async def _replace(self, worker: _SandboxWorker):
+        self._workers.discard(worker)
+        self._spawning += 1
+        try:
+            await worker.kill()
+            if self._closed:
+                return
+            try:
+                await self._spawn_worker()
+            except Exception as e:
+                print(f"⚠️ Could not restart sandbox worker: {e} ({len(self._workers)} left)")
+        finally:
+            self._spawning -= 1
+            if not self.available:
+                self._wake_waiters()
+
+    async def _acquire(self) -> _SandboxWorker:
+        while True:
+            if not self.available:
+                raise SandboxUnavailable("no sandbox workers available")
+            worker = await self._idle.get()
+            if worker is None:
+                if not self.available:
+                    self._wake_waiters()
+                    raise SandboxUnavailable("no sandbox workers available")
+                continue
+            return worker
+
+    async def run(self, plan: str, dispatcher: Any,
+                  wall_timeout: Optional[float] = DEFAULT_WALL_TIMEOUT,
+                  cpu_time_limit: Optional[float] = DEFAULT_CPU_TIME_LIMIT) -> str:
+        """Run a plan in an idle worker; raises like execute_plan, or SandboxUnavailable"""
+        worker = await self._acquire()
+        message = None
+        try:
+            timeout = wall_timeout + self.kill_grace if wall_timeout else None
+            message = await asyncio.wait_for(worker.run(plan, dispatcher, wall_timeout, cpu_time_limit), timeout)
+        except asyncio.TimeoutError:
+            raise SandboxTimeout(f"plan exceeded wall-clock limit of {wall_timeout}s (worker killed)")
+        finally:
+            if message is not None and worker.alive and worker.tasks_run < self.max_tasks_per_worker:
+                self._idle.put_nowait(worker)
+            else:
+                # Replace in the background so a cancelled request still gets its worker replaced
+                task = asyncio.ensure_future(self._replace(worker))
+                self._replacements.add(task)
+                task.add_done_callback(self._replacements.discard)
+
+        if message.get("timeout"):
+            raise SandboxTimeout(message["error"])
+        if "error" in message:
+            raise SandboxError(message["error"])
+        return message["output"]
+
+    async def close(self):
+        self._closed = True
+        workers, self._workers = list(self._workers), set()
+        self._wake_waiters()
+        await asyncio.gather(*(worker.kill() for worker in workers), return_exceptions=True)
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock: Optional[asyncio.Lock] = None
+
+
+async def get_sandbox_pool(config: Optional[Dict[str, Any]] = None) -> Optional[SandboxPool]:
+    """Get the process-wide subprocess pool, starting it on first use; None if it can't start"""
+    global _pool, _pool_lock
+    config = config or {}
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None:
+            pool = SandboxPool(
+                size=config.get("pool_size", 4),
+                max_tasks_per_worker=config.get("max_tasks_per_worker", 100),
+                startup_timeout=config.get("startup_timeout", 30),
+                kill_grace=config.get("kill_grace", KILL_GRACE)
+            )
+            try:
+                await pool.start()
+            except Exception as e:
+                print(f"⚠️ Sandbox pool unavailable, running plans in-process: {e}")
+                await pool.close()
+                return None
+            _pool = pool
+    return _pool
+
+
+async def close_sandbox_pool():
+    """Stop the subprocess pool, if one was started"""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+
+
+async def run_sandboxed(code: str, dispatcher: Any, config: Optional[Dict[str, Any]] = None) -> str:
+    """Run a plan in-process or in the subprocess pool, as configured by the sandbox section"""
+    config = config or {}
+    wall_timeout = config.get("wall_timeout", DEFAULT_WALL_TIMEOUT)
+    cpu_time_limit = config.get("cpu_time_limit", DEFAULT_CPU_TIME_LIMIT)
+
+    if config.get("mode", "inline") == "subprocess":
+        pool = await get_sandbox_pool(config)
+        if pool is not None:
+            try:
+                return await pool.run(code, dispatcher, wall_timeout, cpu_time_limit)
+            except SandboxUnavailable:
+                # Every worker died; the next plan starts a fresh pool
+                print("⚠️ Sandbox pool lost all workers, running plan in-process")
+                if _pool is pool:
+                    await close_sandbox_pool()
+    return await execute_plan(code, dispatcher, wall_timeout, cpu_time_limit)
+
+
+# ---------------------------------------------------------------------------
+# Worker process side
+# ---------------------------------------------------------------------------
+
+class _DispatcherProxy:
+    """Stands in for MultiMCP inside a worker, forwarding calls to the parent"""
+
+    def __init__(self, send):
+        self._send = send
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+
+    async def _call(self, kind: str, *args) -> Any:
+        call_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[call_id] = future
+        try:
+            self._send({"type": kind, "call_id": call_id, "args": list(args)})
+            return await future
+        finally:
+            self._pending.pop(call_id, None)
+
+    async def call_tool(self, server_id: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        return await self._call("call_tool", server_id, tool_name, arguments)
+
+    async def call_tools_batch(self, server_id: str, calls: List[Dict[str, Any]]) -> List[Any]:
+        return await self._call("call_tools_batch", server_id, calls)
+
+    def resolve(self, message: Dict[str, Any]):
+        future = self._pending.get(message.get("call_id"))
+        if future is None or future.done():
+            return
+        if "error" in message:
+            future.set_exception(RuntimeError(message["error"]))
+        else:
+            future.set_result(message.get("result"))
+
+
+async def _worker_main():
+    # stdout carries the protocol; anything printed outside a plan goes to stderr
+    protocol = sys.stdout
+    sys.stdout = _TaskLocalStdout(sys.stderr)
+
+    def send(message: Dict[str, Any]):
+        protocol.write(json.dumps(message, default=str) + "\n")
+        protocol.flush()
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=STREAM_LIMIT)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    dispatcher = _DispatcherProxy(send)
+    tasks = set()
+
+    async def run(message: Dict[str, Any]):
+        try:
+            output = await execute_plan(message["plan"], dispatcher,
+                                        message.get("wall_timeout"), message.get("cpu_time_limit"))
+            send({"type": "result", "output": output})
+        except SandboxTimeout as e:
+            send({"type": "result", "error": str(e), "timeout": True})
+        except Exception as e:
+            send({"type": "result", "error": str(e)})
+
+    send({"type": "ready", "pid": os.getpid()})
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        message = json.loads(line)
+        if message.get("type") == "run":
+            task = asyncio.create_task(run(message))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        elif message.get("type") == "tool_result":
+            dispatcher.resolve(message)
+
+
+if __name__ == "__main__":
+    # Don't let sibling modules shadow the standard library for plan code
+    if sys.path and Path(sys.path[0]).resolve() == Path(__file__).resolve().parent:
+        sys.path.pop(0)
+    asyncio.run(_worker_main())
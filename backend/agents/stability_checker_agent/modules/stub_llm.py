@@ -0,0 +1,86 @@
+# modules/stub_llm.py - Canned-plan LLM provider for benchmarks and offline runs
+
+import re
+import random
+import asyncio
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, Optional
+
+# Same workflow an LLM is asked for: ticker -> EPS -> trend + CAGR -> decision.
+# $subject is replaced with the company/symbol from the planning prompt.
+DEFAULT_PLAN_TEMPLATE = '''```python
+async def solve():
+    import json
+
+    def parse(result):
+        if isinstance(result, dict) and result.get("content"):
+            try:
+                return json.loads(result["content"][0].get("text", "{}")).get("result", {})
+            except json.JSONDecodeError:
+                return {}
+        return {}
+
+    subject = "$subject"
+    ticker = parse(await dispatcher.call_tool("data_acquisition_server", "get_ticker_symbol", {"company_name": subject}))
+    if not ticker.get("success"):
+        return f"FINAL_ANSWER: REJECT {subject} - ticker symbol not found"
+    symbol = ticker["ticker_symbol"]
+
+    eps = parse(await dispatcher.call_tool("data_acquisition_server", "get_eps_data", {"ticker_symbol": f"{symbol}.NS", "years": 4}))
+    eps_data = {year: eps["eps_data"][year] for year in sorted(eps.get("eps_data", {}))}
+    if len(eps_data) < 2:
+        return f"FINAL_ANSWER: REJECT {subject} ({symbol}) - insufficient EPS data: {eps_data}"
+
+    values = list(eps_data.values())
+    increasing = all(later > earlier for earlier, later in zip(values, values[1:]))
+    cagr = ((values[-1] / values[0]) ** (1 / (len(values) - 1)) - 1) * 100 if values[0] > 0 and values[-1] > 0 else 0.0
+    trend = "EPS is consistently increasing" if increasing else "EPS is decreasing in at least one year"
+    if increasing and cagr > 10:
+        decision = "ACCEPT - passes to Round 2"
+    else:
+        decision = "REJECT - does not meet the stability criteria"
+    return f"FINAL_ANSWER: {subject} ({symbol}) EPS data: {json.dumps(eps_data)}. {trend}. EPS Growth Rate: {cagr:.2f}%. {decision}"
+```'''
+
+# Subject line of the analysis request embedded in the planning prompt
+_SUBJECT_PATTERN = re.compile(r"Analyze the stock stability for:\s*(.+)")
+
+
+class StubLLMClient:
+    """Returns canned solve() plans instead of calling a model.
+
+    Configured by the ai_model.stub section:
+        latency_ms: simulated generation time (default 0)
+        jitter_ms: uniform random extra time added to each call
+        plan_file: optional template file ($subject is substituted)
+        seed: random seed for the jitter
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.latency = config.get("latency_ms", 0) / 1000
+        self.jitter = config.get("jitter_ms", 0) / 1000
+        self._random = random.Random(config.get("seed"))
+        plan_file = config.get("plan_file")
+        self.template = Template(Path(plan_file).read_text(encoding="utf-8") if plan_file else DEFAULT_PLAN_TEMPLATE)
+
+    @staticmethod
+    def subject_from_prompt(prompt: str) -> str:
+        match = _SUBJECT_PATTERN.search(prompt)
+        return match.group(1).strip() if match else "UNKNOWN"
+
+    def render_plan(self, subject: str) -> str:
+        return self.template.safe_substitute(subject=subject.replace('"', "").replace("\\", ""))
+
+    async def generate(self, prompt: str) -> Dict[str, Any]:
+        """Ollama-shaped response dict for the prompt (token counts are estimates)"""
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        plan = self.render_plan(self.subject_from_prompt(prompt))
+        return {
+            "response": plan,
+            "prompt_eval_count": len(prompt) // 4,
+            "eval_count": len(plan) // 4,
+        }
@@ -0,0 +1,476 @@
+"""
+VyasaQuant Job Queue
+
+Durable local queue for long-running work (stock analyses, document ingestion).
+Jobs are rows in a SQLite database, so they outlive the HTTP request that
+submitted them and survive server restarts; worker coroutines claim them by
+priority and record attempts, errors, results and timing.
+"""
+
+import os
+import sys
+import asyncio
+import json
+import logging
+import multiprocessing
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (COMPLETED, FAILED, CANCELLED)
+
+DEFAULT_POLL_INTERVAL = 1.0  # seconds between queue checks and cancel checks
+PROCESS_TERMINATE_GRACE = 5.0  # seconds a child process gets to exit before it is killed
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 1,
+    timeout_seconds REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    owner_pid INTEGER,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, kind, priority DESC, created_at);
+"""
+
+
+class JobCancelled(Exception):
+    """Job was cancelled while running"""
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process with this id is running on this machine"""
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """
+    SQLite-backed job store.
+
+    Every method opens its own connection, so the queue can be used from worker
+    threads (asyncio.to_thread) and by several processes sharing the database.
+    Higher priority jobs are claimed first, then oldest first.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the job queue.
+
+        Args:
+            db_path: SQLite database file (created if missing)
+        """
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "owner_pid" not in columns:  # databases created before owners were recorded
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner_pid INTEGER")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def submit(self, kind: str, payload: Dict[str, Any], priority: int = 0,
+               max_attempts: int = 1, timeout_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Add a job to the queue.
+
+        Args:
+            kind: Job type, selects the worker pool (e.g. "analysis", "ingestion")
+            payload: JSON-serializable job arguments
+            priority: Higher runs first
+            max_attempts: Runs allowed before the job is marked failed
+            timeout_seconds: Wall-clock limit per attempt (None for no limit)
+
+        Returns:
+            The stored job
+        """
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, payload, status, priority, max_attempts, timeout_seconds, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload, default=str), QUEUED, priority,
+                 max(1, max_attempts), timeout_seconds, time.time())
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job by id (payload and result decoded), or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, status: Optional[str] = None, kind: Optional[str] = None,
+             limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent jobs, optionally filtered by status and kind"""
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def claim(self, kind: str) -> Optional[Dict[str, Any]]:
+        """Atomically move the next queued job of this kind to running, owned by this process"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT job_id FROM jobs WHERE status = ? AND kind = ? "
+                    "ORDER BY priority DESC, created_at LIMIT 1",
+                    (QUEUED, kind)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ?, finished_at = NULL, "
+                    "owner_pid = ? WHERE job_id = ?",
+                    (RUNNING, time.time(), os.getpid(), row["job_id"])
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return self.get(row["job_id"])
+
+    def complete(self, job_id: str, result: Any):
+        """Store the result of a running job"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, finished_at = ? WHERE job_id = ? AND status = ?",
+                (COMPLETED, json.dumps(result, default=str), time.time(), job_id, RUNNING)
+            )
+
+    def fail(self, job_id: str, error: str) -> str:
+        """
+        Record a failed attempt. The job is queued again while attempts remain.
+
+        Returns:
+            The job's new status (queued or failed)
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts < max_attempts AND cancel_requested = 0 "
+                "THEN ? ELSE ? END, error = ?, finished_at = ? WHERE job_id = ? AND status = ?",
+                (QUEUED, FAILED, error, time.time(), job_id, RUNNING)
+            )
+            row = conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row["status"] if row else FAILED
+
+    def mark_cancelled(self, job_id: str):
+        """Finish a running job that stopped because it was cancelled"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE job_id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, RUNNING)
+            )
+
+    def release(self, job_id: str):
+        """Return an interrupted running job to the queue without counting the attempt"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), started_at = NULL, owner_pid = NULL "
+                "WHERE job_id = ? AND status = ?",
+                (QUEUED, job_id, RUNNING)
+            )
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job. Queued jobs are cancelled immediately; running jobs are
+        flagged and stopped by their worker at its next check.
+
+        Returns:
+            The updated job, or None if it does not exist
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, cancel_requested = 1, finished_at = ? WHERE job_id = ? AND status = ?",
+                (CANCELLED, now, job_id, QUEUED)
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE job_id = ? AND status = ?",
+                (job_id, RUNNING)
+            )
+        return self.get(job_id)
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def recover(self) -> int:
+        """
+        Requeue jobs left running by a process that exited (call before
+        starting workers). Jobs owned by another live process sharing the
+        database are left alone; jobs with no attempts left are marked failed.
+
+        Returns:
+            Number of interrupted jobs found
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute("SELECT job_id, owner_pid FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+                # Our own pid can only be a previous server's (e.g. a restarted container)
+                interrupted = [
+                    row["job_id"] for row in rows
+                    if not row["owner_pid"] or row["owner_pid"] == os.getpid() or not _process_alive(row["owner_pid"])
+                ]
+                conn.executemany(
+                    "UPDATE jobs SET status = CASE WHEN cancel_requested = 1 THEN ? WHEN attempts < max_attempts THEN ? ELSE ? END, "
+                    "error = COALESCE(error, 'Interrupted by server restart'), finished_at = ?, owner_pid = NULL "
+                    "WHERE job_id = ? AND status = ?",
+                    [(CANCELLED, QUEUED, FAILED, now, job_id, RUNNING) for job_id in interrupted]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return len(interrupted)
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+
+        # Timing: waiting time until the last attempt started, and its run time
+        started, finished = job["started_at"], job["finished_at"]
+        job["queue_seconds"] = round(started - job["created_at"], 3) if started else None
+        if started:
+            end = finished if finished and finished >= started and job["status"] in FINISHED_STATUSES else time.time()
+            job["run_seconds"] = round(end - started, 3)
+        else:
+            job["run_seconds"] = None
+        return job
+
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class JobWorkerPool:
+    """
+    Worker coroutines running one kind of job from a JobQueue.
+
+    Each worker claims a job, runs handler(payload) as a task and watches it for
+    cancel requests and its timeout. Failed or timed-out attempts are retried
+    until max_attempts; stopping the pool puts running jobs back in the queue.
+    """
+
+    def __init__(self, queue: JobQueue, kind: str, handler: JobHandler, concurrency: int = 1,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.queue = queue
+        self.kind = kind
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._stopping = False
+
+    def start(self):
+        """Start the worker coroutines (on the running event loop)"""
+        self._stopping = False
+        self._workers = [
+            asyncio.create_task(self._worker(n), name=f"{self.kind}-worker-{n}")
+            for n in range(self.concurrency)
+        ]
+        logger.info(f"👷 Started {self.concurrency} {self.kind} worker(s)")
+
+    def notify(self):
+        """Wake idle workers after a submit (they also poll the database)"""
+        self._wakeup.set()
+
+    async def stop(self):
+        """Stop the workers; jobs they were running are returned to the queue"""
+        self._stopping = True
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self, n: int):
+        while not self._stopping:
+            try:
+                job = await asyncio.to_thread(self.queue.claim, self.kind)
+            except Exception as e:
+                # e.g. "database is locked"; the worker must survive to claim later jobs
+                logger.error(f"❌ {self.kind} worker {n} could not claim a job: {e}")
+                await asyncio.sleep(self.poll_interval)
+                continue
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run_job(job)
+
+    async def _run_job(self, job: Dict[str, Any]):
+        job_id = job["job_id"]
+        logger.info(f"▶️ Running {self.kind} job {job_id} (attempt {job['attempts']}/{job['max_attempts']})")
+        task = asyncio.create_task(self.handler(job["payload"]))
+        deadline = time.monotonic() + job["timeout_seconds"] if job["timeout_seconds"] else None
+
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=self.poll_interval)
+                if task.done():
+                    break
+                if await asyncio.to_thread(self.queue.is_cancel_requested, job_id):
+                    await self._stop_handler(task)
+                    raise JobCancelled()
+                if deadline and time.monotonic() > deadline:
+                    await self._stop_handler(task)
+                    raise asyncio.TimeoutError()
+
+            result = task.result()
+            await asyncio.to_thread(self.queue.complete, job_id, result)
+            logger.info(f"✅ {self.kind} job {job_id} completed")
+
+        except JobCancelled:
+            await asyncio.to_thread(self.queue.mark_cancelled, job_id)
+            logger.info(f"🛑 {self.kind} job {job_id} cancelled")
+
+        except asyncio.CancelledError:
+            # Pool is stopping: let the next server run pick the job up again
+            await self._stop_handler(task)
+            await asyncio.to_thread(self.queue.release, job_id)
+            raise
+
+        except asyncio.TimeoutError:
+            status = await asyncio.to_thread(
+                self.queue.fail, job_id, f"Timed out after {job['timeout_seconds']}s"
+            )
+            logger.error(f"⏱️ {self.kind} job {job_id} timed out ({status})")
+
+        except Exception as e:
+            status = await asyncio.to_thread(self.queue.fail, job_id, str(e))
+            logger.error(f"❌ {self.kind} job {job_id} failed ({status}): {e}")
+
+    @staticmethod
+    async def _stop_handler(task: asyncio.Task):
+        """Cancel a handler and wait for it to clean up (e.g. kill its child process),
+        so a retry never runs next to the attempt it replaces"""
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def _child_entry(connection, func: Callable[..., Any], args: tuple):
+    try:
+        try:
+            outcome = (True, func(*args))
+        except BaseException as e:
+            outcome = (False, e)
+        try:
+            connection.send(outcome)
+        except Exception as e:  # unpicklable result or exception
+            connection.send((False, RuntimeError(f"{outcome[1]!r} ({e})")))
+    finally:
+        connection.close()
+
+
+def _receive(connection, process) -> Any:
+    try:
+        ok, value = connection.recv()
+    except EOFError:
+        process.join()
+        raise RuntimeError(f"Worker process exited with code {process.exitcode}") from None
+    finally:
+        connection.close()
+    process.join()
+    if not ok:
+        raise value
+    return value
+
+
+async def run_in_child_process(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run func(*args) in a new process and return its result.
+
+    Unlike a ProcessPoolExecutor task, the work is stopped when the awaiting
+    task is cancelled (job timeout, cancel request or shutdown): the process is
+    terminated, and killed if it has not exited after PROCESS_TERMINATE_GRACE.
+    The child is spawned, not forked: the server has threads (to_thread
+    workers, the memory journal writer) that may hold locks at fork time, so
+    func and args must be picklable.
+    """
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_child_entry, args=(sender, func, args), name=f"job-{func.__name__}")
+    process.start()
+    sender.close()
+    try:
+        return await asyncio.to_thread(_receive, receiver, process)
+    except asyncio.CancelledError:
+        if process.is_alive():
+            process.terminate()
+            await asyncio.to_thread(process.join, PROCESS_TERMINATE_GRACE)
+            if process.is_alive():
+                process.kill()
+                await asyncio.to_thread(process.join)
+        raise
+
+
+def run_document_ingestion(documents: List[Dict[str, Any]], strategy: str = "contents_based") -> Dict[str, Any]:
+    """
+    Ingestion job body: process_multiple_documents in the calling process.
+
+    Meant to run in a child process (run_in_child_process) so parsing and
+    embedding never block the API server's event loop.
+    """
+    from data_processing.processors.financial_processor import FinancialDocumentProcessor
+
+    processor = FinancialDocumentProcessor()
+    return processor.process_multiple_documents(documents, strategy=strategy)
@@ -10,12 +10,15 @@ import logging
 import os
 import sys
 import json
+import time
+import uuid
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 # Add project root to path
@@ -27,7 +30,10 @@ from agents.stability_checker_agent.core.loop import AgentLoop
 # Use original session manager that actually works with real MCP servers
 from agents.stability_checker_agent.core.session import MultiMCP
 from agents.stability_checker_agent.core.context import AgentContext
-from config.config_loader import get_stability_checker_config
+from agents.stability_checker_agent.core.registry import AgentRegistry, get_agent_registry
+from agents.stability_checker_agent.modules.sandbox import close_sandbox_pool, get_sandbox_pool
+from utils.metrics import render_prometheus
+from api.job_queue import JobQueue, JobWorkerPool, FINISHED_STATUSES, COMPLETED, run_document_ingestion, run_in_child_process
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -74,24 +80,96 @@ class StockAnalysisResponse(BaseModel):
     stability_analysis: StabilityAnalysis = Field(description="Detailed stability analysis results")
     raw_agent_response: Optional[str] = Field(default=None, description="Full agent response for debugging")
 
+class BatchAnalysisRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, description="Stock symbols or company names to analyze")
+    max_concurrency: Optional[int] = Field(default=None, ge=1, description="Analyses to run at once (capped by server config)")
+    wait: bool = Field(default=True, description="Wait for all results; if false, poll /api/analyze/batch/{batch_id}")
+
+class BatchItemResult(BaseModel):
+    symbol: str = Field(description="Requested symbol or company name")
+    status: str = Field(description="pending, running, completed or failed")
+    result: Optional[StockAnalysisResponse] = Field(default=None, description="Analysis result when completed")
+    error: Optional[str] = Field(default=None, description="Error message when failed")
+    duration_seconds: Optional[float] = Field(default=None, description="Wall time for this symbol")
+
+class BatchAnalysisResponse(BaseModel):
+    batch_id: str = Field(description="Batch identifier")
+    status: str = Field(description="running or completed")
+    total: int = Field(description="Number of symbols in the batch")
+    completed: int = Field(description="Symbols analyzed successfully")
+    failed: int = Field(description="Symbols that failed")
+    max_concurrency: int = Field(description="Concurrency limit applied")
+    started_at: str = Field(description="Batch start time")
+    elapsed_seconds: float = Field(description="Wall time since the batch started (total time once completed)")
+    sum_item_seconds: float = Field(description="Sum of per-symbol durations (sequential equivalent)")
+    max_item_seconds: Optional[float] = Field(default=None, description="Slowest symbol duration")
+    results: List[BatchItemResult] = Field(description="Per-symbol results in request order")
+
+class AnalysisJobRequest(BaseModel):
+    symbol: str = Field(..., description="Stock symbol or company name to analyze")
+    priority: int = Field(default=0, description="Higher priority jobs run first")
+    max_attempts: Optional[int] = Field(default=None, ge=1, description="Runs allowed before the job fails (server default if omitted)")
+
+class IngestionDocument(BaseModel):
+    pdf_path: str = Field(..., description="Path to the PDF on the server")
+    company_name: Optional[str] = Field(default=None, description="Company name")
+    financial_year: Optional[str] = Field(default=None, description="Financial year, e.g. 2023-24")
+
+class IngestionJobRequest(BaseModel):
+    documents: List[IngestionDocument] = Field(..., min_length=1, description="Documents to process")
+    strategy: str = Field(default="contents_based", description="Chunking strategy")
+    priority: int = Field(default=0, description="Higher priority jobs run first")
+    max_attempts: Optional[int] = Field(default=None, ge=1, description="Runs allowed before the job fails (server default if omitted)")
+
+class JobResponse(BaseModel):
+    job_id: str = Field(description="Job identifier")
+    kind: str = Field(description="analysis or ingestion")
+    status: str = Field(description="queued, running, completed, failed or cancelled")
+    priority: int = Field(description="Job priority")
+    attempts: int = Field(description="Runs started so far")
+    max_attempts: int = Field(description="Runs allowed before the job fails")
+    cancel_requested: bool = Field(description="Whether cancellation was requested")
+    error: Optional[str] = Field(default=None, description="Error of the last failed attempt")
+    payload: Dict[str, Any] = Field(description="Submitted job arguments")
+    created_at: str = Field(description="Submission time")
+    started_at: Optional[str] = Field(default=None, description="Start of the last attempt")
+    finished_at: Optional[str] = Field(default=None, description="Finish time")
+    queue_seconds: Optional[float] = Field(default=None, description="Wait before the last attempt started")
+    run_seconds: Optional[float] = Field(default=None, description="Run time of the last attempt (so far, if running)")
+
+class JobResultResponse(JobResponse):
+    result: Optional[Any] = Field(default=None, description="Job result (StockAnalysisResponse or ingestion summary)")
+
 # Global variables for agent management
 multi_mcp: Optional[MultiMCP] = None
-agent_config = None
+agent_registry: Optional[AgentRegistry] = None
+
+# Background jobs (analyses and ingestion runs) that outlive their requests
+job_queue: Optional[JobQueue] = None
+job_pools: Dict[str, JobWorkerPool] = {}
+
+# Batch analyses kept for polling (oldest finished batches are dropped first)
+batch_jobs: Dict[str, Dict[str, Any]] = {}
+MAX_STORED_BATCHES = 100
+
+# Seconds between SSE heartbeat comments while an analysis is running
+SSE_HEARTBEAT_SECONDS = 15
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the stability checker agent on startup"""
-    global multi_mcp, agent_config
+    global multi_mcp, agent_registry
     
     logger.info("🚀 Starting VyasaQuant API Server")
     logger.info("💡 Using direct MCP server connections")
     
     try:
-        # Load agent configuration
-        agent_config = get_stability_checker_config()
+        # Load agent configuration and AI model clients once for all requests
+        agent_registry = get_agent_registry()
+        await asyncio.to_thread(agent_registry.load)
         
         # Extract MCP server configurations
-        mcp_servers_config = agent_config.get("servers", {})
+        mcp_servers_config = agent_registry.config.get("servers", {})
         mcp_servers_list = []
         
         for server_id, server_config in mcp_servers_config.items():
@@ -104,6 +182,13 @@ async def startup_event():
         multi_mcp = MultiMCP(server_configs=mcp_servers_list)
         await multi_mcp.initialize()
         
+        # Pre-warm the plan sandbox workers if plans run out of process
+        sandbox_config = agent_registry.config.get("sandbox", {})
+        if sandbox_config.get("mode") == "subprocess":
+            await get_sandbox_pool(sandbox_config)
+        
+        await start_job_workers(agent_registry.config.get("job_queue", {}))
+        
         if not multi_mcp.servers:
             logger.warning("⚠️ No MCP servers connected")
             logger.warning("💡 Please start MCP servers first: python mcp_server_manager.py")
@@ -120,7 +205,8 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("🛑 Shutting down VyasaQuant API Server")
-    # Add cleanup code here if needed
+    await stop_job_workers()
+    await close_sandbox_pool()
 
 @app.get("/")
 async def root():
@@ -131,7 +217,10 @@ async def root():
         "status": "running",
         "endpoints": {
             "analyze": "/api/analyze",
-            "health": "/health"
+            "analyze_batch": "/api/analyze/batch",
+            "jobs": "/api/jobs",
+            "health": "/health",
+            "metrics": "/metrics"
         }
     }
 
@@ -141,9 +230,29 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": asyncio.get_event_loop().time(),
-        "agent_initialized": multi_mcp is not None
+        "agent_initialized": multi_mcp is not None,
+        "config_version": agent_registry.version if agent_registry else None
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-tool MCP server metrics in Prometheus text format"""
+    if not multi_mcp:
+        raise HTTPException(status_code=503, detail="MCP servers not initialized")
+    
+    snapshots = await multi_mcp.get_metrics()
+    
+    # Skip servers that could not report rather than failing the scrape
+    healthy = {server_id: snapshot for server_id, snapshot in snapshots.items() if "error" not in snapshot}
+    for server_id, snapshot in snapshots.items():
+        if "error" in snapshot:
+            logger.warning(f"⚠️ Could not collect metrics from {server_id}: {snapshot['error']}")
+    
+    return PlainTextResponse(
+        render_prometheus(healthy),
+        media_type="text/plain; version=0.0.4"
+    )
+
 @app.post("/api/analyze", response_model=StockAnalysisResponse)
 async def analyze_stock(request: StockAnalysisRequest):
     """
@@ -163,14 +272,39 @@ async def analyze_stock(request: StockAnalysisRequest):
         )
     
     try:
-        logger.info(f"📊 Starting analysis for: {request.symbol}")
+        return await run_stock_analysis(request.symbol)
         
-        # Format analysis request
-        eps_years = agent_config['stability_analysis']['criteria']['eps_years']
-        growth_threshold = agent_config['stability_analysis']['criteria']['eps_growth_threshold']
-        
-        formatted_input = f"""
-        Analyze the stock stability for: {request.symbol}
+    except Exception as e:
+        logger.error(f"❌ Analysis failed for {request.symbol}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Analysis failed: {str(e)}"
+        )
+
+async def run_stock_analysis(symbol: str,
+                             event_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> StockAnalysisResponse:
+    """
+    Run the stability checker agent for one symbol.
+    
+    Args:
+        symbol: Stock symbol or company name
+        event_callback: Optional (event, data) callback receiving agent progress events
+    
+    Returns:
+        StockAnalysisResponse with structured data
+    """
+    logger.info(f"📊 Starting analysis for: {symbol}")
+    
+    # Per-request view of the shared configuration and model clients
+    agent_profile, model_manager = agent_registry.acquire()
+    agent_config = agent_profile.config
+    
+    # Format analysis request
+    eps_years = agent_config['stability_analysis']['criteria']['eps_years']
+    growth_threshold = agent_config['stability_analysis']['criteria']['eps_growth_threshold']
+    
+    formatted_input = f"""
+        Analyze the stock stability for: {symbol}
         
         Please follow this exact workflow:
         1. Get the ticker symbol if not provided
@@ -182,31 +316,371 @@ async def analyze_stock(request: StockAnalysisRequest):
         
         Return FINAL_ANSWER with clear recommendation and reasoning.
         """
-        
-        # Create agent context
-        context = AgentContext(
-            user_input=formatted_input,
-            session_id=None,
-            dispatcher=multi_mcp,
-            mcp_server_descriptions={server["id"]: server for server in agent_config.get("servers", {}).values()}
+    
+    # Create agent context
+    context = AgentContext(
+        user_input=formatted_input,
+        session_id=None,
+        dispatcher=multi_mcp,
+        mcp_server_descriptions={server["id"]: server for server in agent_config.get("servers", {}).values()},
+        subject=symbol,
+        agent_profile=agent_profile,
+        event_callback=event_callback
+    )
+    
+    # Run analysis
+    agent = AgentLoop(context, model_manager=model_manager)
+    result = await agent.run()
+    
+    # Parse result
+    analysis_result = await parse_analysis_result(result, symbol)
+    
+    logger.info(f"✅ Analysis completed for: {symbol}")
+    return analysis_result
+
+def _sse_message(event: str, data: Dict[str, Any], event_id: int) -> str:
+    """Format one server-sent event"""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.get("/api/analyze/stream")
+async def analyze_stock_stream(symbol: str):
+    """
+    Analyze stock stability, streaming progress as server-sent events.
+    
+    Events: start, step, perception, plan, sandbox_start, tool_start, tool_end
+    (with duration_ms and the tool result, e.g. EPS data as soon as it is fetched),
+    sandbox_end, retry, further_processing, memory_reuse, then result (the
+    StockAnalysisResponse) or error. A comment line is sent as a heartbeat while
+    the agent is busy. Disconnecting cancels the analysis.
+    """
+    
+    if not multi_mcp:
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis service not available. Please try again later."
         )
-        
-        # Run analysis
-        agent = AgentLoop(context)
-        result = await agent.run()
-        
-        # Parse result
-        analysis_result = await parse_analysis_result(result, request.symbol)
-        
-        logger.info(f"✅ Analysis completed for: {request.symbol}")
-        return analysis_result
-        
-    except Exception as e:
-        logger.error(f"❌ Analysis failed for {request.symbol}: {e}")
+    
+    symbol = symbol.strip()
+    if not symbol:
+        raise HTTPException(status_code=400, detail="No symbol provided")
+    
+    heartbeat_seconds = agent_registry.config.get("streaming", {}).get("heartbeat_seconds", SSE_HEARTBEAT_SECONDS)
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def emit(event: str, data: Dict[str, Any]):
+        events.put_nowait((event, data))
+    
+    async def run_analysis():
+        try:
+            result = await run_stock_analysis(symbol, event_callback=emit)
+            emit("result", result.model_dump())
+        except Exception as e:
+            logger.error(f"❌ Streaming analysis failed for {symbol}: {e}")
+            emit("error", {"symbol": symbol, "message": f"Analysis failed: {str(e)}"})
+        finally:
+            events.put_nowait(None)
+    
+    async def event_stream():
+        task = asyncio.create_task(run_analysis())
+        event_id = 0
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(events.get(), timeout=heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    break
+                event_id += 1
+                yield _sse_message(item[0], item[1], event_id)
+        finally:
+            if not task.done():
+                logger.info(f"🔌 Client disconnected - cancelling analysis for {symbol}")
+                task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_stock_batch(request: BatchAnalysisRequest):
+    """
+    Analyze a watchlist of stocks concurrently.
+    
+    Symbols are analyzed with a bounded number of concurrent agent runs sharing
+    the MCP servers and the LLM provider limits. With wait=false the batch runs
+    in the background and partial results can be polled by batch_id.
+    """
+    
+    if not multi_mcp:
         raise HTTPException(
-            status_code=500,
-            detail=f"Analysis failed: {str(e)}"
+            status_code=503,
+            detail="Analysis service not available. Please try again later."
         )
+    
+    batch_config = agent_registry.config.get("batch_analysis", {})
+    max_symbols = batch_config.get("max_symbols", 50)
+    
+    # Drop blanks and duplicates but keep the requested order
+    symbols = list(dict.fromkeys(symbol.strip() for symbol in request.symbols if symbol.strip()))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="No symbols provided")
+    if len(symbols) > max_symbols:
+        raise HTTPException(status_code=400, detail=f"Too many symbols ({len(symbols)}); limit is {max_symbols}")
+    
+    server_limit = batch_config.get("max_concurrency", 4)
+    concurrency = min(request.max_concurrency or server_limit, server_limit)
+    
+    batch = {
+        "batch_id": uuid.uuid4().hex,
+        "status": "running",
+        "max_concurrency": concurrency,
+        "started_at": datetime.now().isoformat(),
+        "start_time": time.perf_counter(),
+        "end_time": None,
+        "items": [{"symbol": symbol, "status": "pending"} for symbol in symbols],
+    }
+    _store_batch(batch)
+    
+    logger.info(f"📊 Starting batch {batch['batch_id']}: {len(symbols)} symbols, concurrency {concurrency}")
+    task = asyncio.create_task(_run_batch(batch))
+    batch["task"] = task
+    
+    if request.wait:
+        await task
+    
+    return _batch_response(batch)
+
+@app.get("/api/analyze/batch/{batch_id}", response_model=BatchAnalysisResponse)
+async def get_batch_analysis(batch_id: str):
+    """Get the current (possibly partial) results of a batch analysis"""
+    batch = batch_jobs.get(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail=f"Batch not found: {batch_id}")
+    return _batch_response(batch)
+
+async def _run_batch(batch: Dict[str, Any]):
+    """Analyze every symbol in a batch under its concurrency limit"""
+    semaphore = asyncio.Semaphore(batch["max_concurrency"])
+    
+    async def analyze_item(item: Dict[str, Any]):
+        async with semaphore:
+            item["status"] = "running"
+            start = time.perf_counter()
+            try:
+                item["result"] = await run_stock_analysis(item["symbol"])
+                item["status"] = "completed"
+            except Exception as e:
+                logger.error(f"❌ Analysis failed for {item['symbol']}: {e}")
+                item["status"] = "failed"
+                item["error"] = str(e)
+            finally:
+                item["duration_seconds"] = time.perf_counter() - start
+    
+    try:
+        await asyncio.gather(*(analyze_item(item) for item in batch["items"]))
+    finally:
+        batch["end_time"] = time.perf_counter()
+        batch["status"] = "completed"
+        batch.pop("task", None)
+        logger.info(f"✅ Batch {batch['batch_id']} finished in {batch['end_time'] - batch['start_time']:.2f}s")
+
+def _store_batch(batch: Dict[str, Any]):
+    """Register a batch, evicting the oldest finished ones beyond the limit"""
+    batch_jobs[batch["batch_id"]] = batch
+    for batch_id in list(batch_jobs):
+        if len(batch_jobs) <= MAX_STORED_BATCHES:
+            break
+        if batch_jobs[batch_id]["status"] != "running":
+            del batch_jobs[batch_id]
+
+def _batch_response(batch: Dict[str, Any]) -> BatchAnalysisResponse:
+    """Build the API view of a batch"""
+    items = batch["items"]
+    durations = [item["duration_seconds"] for item in items if item.get("duration_seconds") is not None]
+    end_time = batch["end_time"] or time.perf_counter()
+    
+    return BatchAnalysisResponse(
+        batch_id=batch["batch_id"],
+        status=batch["status"],
+        total=len(items),
+        completed=sum(1 for item in items if item["status"] == "completed"),
+        failed=sum(1 for item in items if item["status"] == "failed"),
+        max_concurrency=batch["max_concurrency"],
+        started_at=batch["started_at"],
+        elapsed_seconds=end_time - batch["start_time"],
+        sum_item_seconds=sum(durations),
+        max_item_seconds=max(durations) if durations else None,
+        results=[
+            BatchItemResult(
+                symbol=item["symbol"],
+                status=item["status"],
+                result=item.get("result"),
+                error=item.get("error"),
+                duration_seconds=item.get("duration_seconds")
+            )
+            for item in items
+        ]
+    )
+
+async def start_job_workers(config: Dict[str, Any]):
+    """Open the job queue, requeue jobs interrupted by a restart and start the workers"""
+    global job_queue
+    
+    db_path = Path(config.get("db_path", "data/jobs.db"))
+    if not db_path.is_absolute():
+        db_path = project_root / db_path
+    job_queue = await asyncio.to_thread(JobQueue, str(db_path))
+    
+    interrupted = await asyncio.to_thread(job_queue.recover)
+    if interrupted:
+        logger.info(f"♻️ Recovered {interrupted} interrupted job(s)")
+    
+    poll_interval = config.get("poll_interval", 1.0)
+    
+    handlers = {"analysis": _run_analysis_job, "ingestion": _run_ingestion_job}
+    for kind, handler in handlers.items():
+        pool = JobWorkerPool(
+            job_queue, kind, handler,
+            concurrency=config.get(kind, {}).get("workers", 1),
+            poll_interval=poll_interval
+        )
+        pool.start()
+        job_pools[kind] = pool
+
+async def stop_job_workers():
+    """Stop the workers; running jobs go back to the queue for the next start"""
+    for pool in job_pools.values():
+        await pool.stop()
+    job_pools.clear()
+
+async def _run_analysis_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    if not multi_mcp:
+        raise RuntimeError("Analysis service not available")
+    result = await run_stock_analysis(payload["symbol"])
+    return result.model_dump()
+
+async def _run_ingestion_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # Ingestion is CPU-bound and synchronous, so each attempt runs in its own process,
+    # which is terminated if the job times out or is cancelled
+    return await run_in_child_process(
+        run_document_ingestion, payload["documents"], payload.get("strategy", "contents_based")
+    )
+
+def _job_defaults(kind: str) -> Dict[str, Any]:
+    config = (agent_registry.config.get("job_queue", {}) if agent_registry else {}).get(kind, {})
+    return {"max_attempts": config.get("max_attempts", 1), "timeout_seconds": config.get("timeout")}
+
+async def _submit_job(kind: str, payload: Dict[str, Any], priority: int, max_attempts: Optional[int]) -> JobResponse:
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+    
+    options = _job_defaults(kind)
+    if max_attempts:
+        options["max_attempts"] = max_attempts
+    job = await asyncio.to_thread(job_queue.submit, kind, payload, priority, **options)
+    job_pools[kind].notify()
+    
+    logger.info(f"📥 Queued {kind} job {job['job_id']} (priority {priority})")
+    return _job_response(job)
+
+def _timestamp(value: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(value).isoformat() if value else None
+
+def _job_response(job: Dict[str, Any], model=JobResponse, **extra) -> JobResponse:
+    """Build the API view of a job"""
+    return model(
+        job_id=job["job_id"],
+        kind=job["kind"],
+        status=job["status"],
+        priority=job["priority"],
+        attempts=job["attempts"],
+        max_attempts=job["max_attempts"],
+        cancel_requested=job["cancel_requested"],
+        error=job["error"],
+        payload=job["payload"],
+        created_at=_timestamp(job["created_at"]),
+        started_at=_timestamp(job["started_at"]),
+        finished_at=_timestamp(job["finished_at"]),
+        queue_seconds=job["queue_seconds"],
+        run_seconds=job["run_seconds"],
+        **extra
+    )
+
+async def _get_job_or_404(job_id: str) -> Dict[str, Any]:
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+@app.post("/api/jobs/analysis", response_model=JobResponse, status_code=202)
+async def submit_analysis_job(request: AnalysisJobRequest):
+    """
+    Queue a stock analysis.
+    
+    The analysis runs on a background worker, not in this request, so it
+    continues if the client disconnects. Poll /api/jobs/{job_id} for status and
+    /api/jobs/{job_id}/result for the StockAnalysisResponse.
+    """
+    symbol = request.symbol.strip()
+    if not symbol:
+        raise HTTPException(status_code=400, detail="No symbol provided")
+    return await _submit_job("analysis", {"symbol": symbol}, request.priority, request.max_attempts)
+
+@app.post("/api/jobs/ingestion", response_model=JobResponse, status_code=202)
+async def submit_ingestion_job(request: IngestionJobRequest):
+    """
+    Queue a document ingestion run (process_multiple_documents).
+    
+    Documents are parsed, chunked and stored in a worker process; the result
+    is the processing summary.
+    """
+    missing = [document.pdf_path for document in request.documents if not Path(document.pdf_path).exists()]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"PDF not found: {', '.join(missing)}")
+    
+    payload = {
+        "documents": [document.model_dump() for document in request.documents],
+        "strategy": request.strategy
+    }
+    return await _submit_job("ingestion", payload, request.priority, request.max_attempts)
+
+@app.get("/api/jobs", response_model=List[JobResponse])
+async def list_jobs(status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50):
+    """List recent jobs, optionally filtered by status and kind"""
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+    jobs = await asyncio.to_thread(job_queue.list, status, kind, min(max(limit, 1), 500))
+    return [_job_response(job) for job in jobs]
+
+@app.get("/api/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Get job status, attempts and timing"""
+    return _job_response(await _get_job_or_404(job_id))
+
+@app.get("/api/jobs/{job_id}/result", response_model=JobResultResponse)
+async def get_job_result(job_id: str):
+    """Get the result of a finished job (409 while it is queued or running)"""
+    job = await _get_job_or_404(job_id)
+    if job["status"] not in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return _job_response(job, JobResultResponse, result=job["result"] if job["status"] == COMPLETED else None)
+
+@app.post("/api/jobs/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """
+    Cancel a job. Queued jobs are cancelled at once; running jobs stop at the
+    worker's next check. A running ingestion's current document may still finish
+    in its worker process, but its result is discarded.
+    """
+    await _get_job_or_404(job_id)
+    job = await asyncio.to_thread(job_queue.cancel, job_id)
+    return _job_response(job)
 
 async def parse_analysis_result(result: Any, symbol: str) -> StockAnalysisResponse:
     """
@@ -0,0 +1,7 @@
+"""
+VyasaQuant Benchmarks
+
+Performance harnesses that run against local stand-ins (stub LLM provider,
+fixture-backed MCP server) so results are reproducible without network
+services. Results are written as JSON under benchmarks/results/.
+"""
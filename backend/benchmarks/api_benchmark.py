@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Load test for the analysis API.
+
+Drives POST /api/analyze with a fixed number of requests at one or more
+concurrency levels and reports p50/p95/p99 latency, throughput and error rate. A 200 response counts
+as an error when it carries no EPS data or the agent reports a failure (e.g. a
+tool call failed and the plan answered REJECT).
+
+By default the API runs in this process against local stand-ins - the stub LLM
+provider (canned solve() plans) and benchmarks/fake_mcp_server.py (fixture
+data) - with plan cache, memory and job queue state in a temporary directory,
+so no LLM provider, yfinance or PostgreSQL is needed. --url targets a running
+server instead.
+
+Usage (from backend/):
+    python -m benchmarks.api_benchmark --requests 200 --concurrency 1,8,32
+    python -m benchmarks.api_benchmark --llm-latency-ms 800 --mcp-latency-ms 50
+    python -m benchmarks.api_benchmark --baseline benchmarks/results/previous.json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+DEFAULT_SYMBOLS = ["HAL", "TCS", "HDFCBANK", "INFY", "ICICIBANK"]
+# Final answers of analyses that could not be completed (tool failures end in a 200 REJECT)
+FAILURE_MARKERS = ("not found", "insufficient", "failed", "unable to")
+
+Sender = Callable[[str], Awaitable[None]]
+
+
+def percentile(sorted_samples: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of pre-sorted samples"""
+    if not sorted_samples:
+        return None
+    index = min(len(sorted_samples) - 1, max(0, math.ceil(q * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def analysis_failure(body: Dict[str, Any]) -> Optional[str]:
+    """Why a 200 /api/analyze response is not a completed analysis, or None"""
+    analysis = body.get("stability_analysis") or {}
+    answer = str(body.get("raw_agent_response") or analysis.get("reasoning") or "")
+    for marker in FAILURE_MARKERS:
+        if marker in answer.lower():
+            return f"Agent reported failure: {answer[:200]}"
+    if not (analysis.get("eps_data") or {}).get("total_years"):
+        return "No EPS data in response"
+    return None
+
+
+def tool_errors(mcp_metrics: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Failed tool calls per tool from MultiMCP.get_metrics()"""
+    errors: Dict[str, int] = {}
+    for server_metrics in (mcp_metrics or {}).values():
+        for tool_name, stats in (server_metrics.get("tools") or {}).items():
+            if stats.get("errors"):
+                errors[tool_name] = errors.get(tool_name, 0) + stats["errors"]
+    return errors
+
+
+def summarize(samples: List[Tuple[float, bool]], wall_seconds: float) -> Dict[str, Any]:
+    """Latency percentiles (ms, successful requests), throughput and error rate"""
+    latencies = sorted(latency * 1000 for latency, ok in samples if ok)
+    errors = sum(1 for _, ok in samples if not ok)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value, 2) if value is not None else None
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(samples) / wall_seconds, 3) if wall_seconds > 0 else None,
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 0.50)),
+            "p95": ms(percentile(latencies, 0.95)),
+            "p99": ms(percentile(latencies, 0.99)),
+            "mean": ms(sum(latencies) / len(latencies)) if latencies else None,
+            "max": ms(latencies[-1]) if latencies else None,
+        },
+    }
+
+
+async def run_load(send: Sender, symbols: List[str], total_requests: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Send total_requests analyses (cycling through symbols) with at most
+    concurrency in flight, and summarize them.
+    """
+    samples: List[Tuple[float, bool]] = []
+    errors: Dict[str, int] = {}
+    next_request = iter(range(total_requests))
+
+    async def client():
+        for n in next_request:
+            symbol = symbols[n % len(symbols)]
+            start = time.perf_counter()
+            try:
+                await send(symbol)
+                samples.append((time.perf_counter() - start, True))
+            except Exception as e:
+                samples.append((time.perf_counter() - start, False))
+                key = str(e)[:200]
+                errors[key] = errors.get(key, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(min(concurrency, total_requests))))
+    summary = summarize(samples, time.perf_counter() - started)
+    summary["concurrency"] = concurrency
+    summary["error_messages"] = errors
+    return summary
+
+
+def build_benchmark_config(workdir: Path, args: argparse.Namespace) -> Path:
+    """Write agents.yaml for the in-process run: stub LLM, fake MCP server, state under workdir"""
+    with open(PROJECT_ROOT / "config" / "agents.yaml", "r") as f:
+        all_configs = yaml.safe_load(f)
+
+    agent = all_configs["stability_checker_agent"]
+    agent["ai_model"] = {
+        "provider": "stub",
+        "stub": {"latency_ms": args.llm_latency_ms, "jitter_ms": args.llm_jitter_ms, "seed": args.seed,
+                 "max_concurrent_requests": args.llm_max_concurrency},
+        "fallback": {"enable_fallback": False},
+    }
+    agent["servers"] = {
+        "data_acquisition_server": {
+            "id": "data_acquisition_server",
+            "script": "fake_mcp_server.py",
+            "cwd": str(BENCHMARKS_DIR),
+            "description": "Fixture-backed data acquisition server (benchmark stand-in)",
+            "capabilities": ["stock_analysis", "financial_data", "eps_analysis"],
+        }
+    }
+    agent["plan_cache"] = {"enabled": args.plan_cache, "path": str(workdir / "plan_cache.json")}
+    agent["memory"] = dict(agent.get("memory", {}), index_dir=str(workdir / "memory_index"),
+                           reuse_max_age_hours=0, embedding={"provider": "hashing"})
+    agent["job_queue"] = dict(agent.get("job_queue", {}), db_path=str(workdir / "jobs.db"))
+
+    config_dir = workdir / "config"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    with open(config_dir / "agents.yaml", "w") as f:
+        yaml.safe_dump(all_configs, f, sort_keys=False)
+    return config_dir
+
+
+@asynccontextmanager
+async def in_process_api(args: argparse.Namespace):
+    """Start the API app in this process against the stub LLM and fake MCP server"""
+    workdir = Path(tempfile.mkdtemp(prefix="vyasaquant-bench-"))
+    config_dir = build_benchmark_config(workdir, args)
+    os.environ.update({
+        "FAKE_MCP_LATENCY_MS": str(args.mcp_latency_ms),
+        "FAKE_MCP_JITTER_MS": str(args.mcp_jitter_ms),
+        "FAKE_MCP_ERROR_RATE": str(args.mcp_error_rate),
+        "FAKE_MCP_SEED": str(args.seed),
+    })
+
+    from config.config_loader import ConfigLoader
+    from agents.stability_checker_agent.core.registry import AgentRegistry, set_agent_registry
+    from agents.stability_checker_agent.modules.memory import flush_journals
+    import api.server as server
+
+    # Session journals are written relative to the working directory
+    original_cwd = os.getcwd()
+    os.chdir(workdir)
+    set_agent_registry(AgentRegistry(loader=ConfigLoader(str(config_dir))))
+    await server.startup_event()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app),
+                                     base_url="http://benchmark", timeout=args.timeout) as client:
+            yield client, server
+    finally:
+        await server.shutdown_event()
+        if server.multi_mcp:
+            await server.multi_mcp.cleanup()
+        # Journal writes still queued would land after the work directory is gone
+        flush_journals()
+        os.chdir(original_cwd)
+        if args.keep_workdir:
+            print(f"📁 Benchmark state kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare_runs(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Lines comparing p95 latency, throughput and error rate per concurrency level"""
+    previous = {run["concurrency"]: run for run in baseline.get("runs", [])}
+    lines = [f"Compared with {baseline.get('git_commit') or 'baseline'} ({baseline.get('timestamp')}):"]
+    for run in current["runs"]:
+        old = previous.get(run["concurrency"])
+        if not old:
+            continue
+
+        def delta(new_value, old_value):
+            if new_value is None or not old_value:
+                return "n/a"
+            return f"{(new_value - old_value) / old_value * 100:+.1f}%"
+
+        lines.append(
+            f"  c={run['concurrency']:<4} p95 {run['latency_ms']['p95']} ms "
+            f"({delta(run['latency_ms']['p95'], old['latency_ms']['p95'])}) | "
+            f"{run['throughput_rps']} req/s ({delta(run['throughput_rps'], old['throughput_rps'])}) | "
+            f"errors {run['error_rate']:.2%} (was {old['error_rate']:.2%})"
+        )
+    return lines
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    symbols = [symbol.strip() for symbol in args.symbols.split(",") if symbol.strip()]
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    if args.url:
+        target = None
+        client_context = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        target = in_process_api(args)
+        client_context = None
+
+    async def benchmark(client) -> List[Dict[str, Any]]:
+        async def send(symbol: str):
+            response = await client.post(args.path, json={"symbol": symbol})
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+            if args.path == "/api/analyze":
+                failure = analysis_failure(response.json())
+                if failure:
+                    raise RuntimeError(failure)
+
+        if args.warmup:
+            await run_load(send, symbols, args.warmup, 1)
+
+        runs = []
+        for level in levels:
+            summary = await run_load(send, symbols, args.requests, level)
+            latency = summary["latency_ms"]
+            print(f"📈 c={level}: {summary['throughput_rps']} req/s | p50 {latency['p50']} ms | "
+                  f"p95 {latency['p95']} ms | p99 {latency['p99']} ms | errors {summary['error_rate']:.2%}")
+            runs.append(summary)
+        return runs
+
+    mcp_metrics = None
+    if target is not None:
+        async with target as (client, server):
+            runs = await benchmark(client)
+            mcp_metrics = await server.multi_mcp.get_metrics() if server.multi_mcp else None
+        errors = tool_errors(mcp_metrics)
+        if errors:
+            print(f"⚠️ Fake MCP server tool errors (all levels): {errors}")
+    else:
+        async with client_context as client:
+            runs = await benchmark(client)
+
+    return {
+        "benchmark": "api_analyze",
+        "git_commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "mode": "remote" if args.url else "in_process",
+            "url": args.url,
+            "path": args.path,
+            "symbols": symbols,
+            "requests_per_level": args.requests,
+            "warmup": args.warmup,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_jitter_ms": args.llm_jitter_ms,
+            "mcp_latency_ms": args.mcp_latency_ms,
+            "mcp_jitter_ms": args.mcp_jitter_ms,
+            "mcp_error_rate": args.mcp_error_rate,
+            "plan_cache": args.plan_cache,
+        },
+        "runs": runs,
+        "mcp_tool_errors": tool_errors(mcp_metrics),
+        "mcp_metrics": mcp_metrics,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test POST /api/analyze")
+    parser.add_argument("--url", help="Benchmark a running server (default: in-process with stand-ins)")
+    parser.add_argument("--path", default="/api/analyze", help="Endpoint to POST {'symbol': ...} to")
+    parser.add_argument("--symbols", default=",".join(DEFAULT_SYMBOLS), help="Comma-separated symbols, cycled")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--warmup", type=int, default=2, help="Sequential requests before measuring")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout (seconds)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Stub LLM time per plan")
+    parser.add_argument("--llm-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--llm-max-concurrency", type=int, default=64, help="Stub provider concurrency limit")
+    parser.add_argument("--mcp-latency-ms", type=float, default=0.0, help="Fake MCP server time per tool call")
+    parser.add_argument("--mcp-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--mcp-error-rate", type=float, default=0.0, help="Fraction of tool calls that fail")
+    parser.add_argument("--plan-cache", action="store_true", help="Keep the solve() plan cache enabled")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep-workdir", action="store_true", help="Keep the temporary config/state directory")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/api_analyze-<commit>-<time>.json)")
+    parser.add_argument("--baseline", help="Earlier result JSON to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if not HTTPX_AVAILABLE:
+        print("❌ httpx package not available")
+        print("💡 Run: pip install httpx")
+        sys.exit(1)
+
+    result = asyncio.run(run_benchmark(args))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"api_analyze-{result['git_commit'] or 'nogit'}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, default=str), encoding="utf-8")
+    print(f"💾 Results written to {output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        print("\n".join(compare_runs(result, baseline)))
+
+
+if __name__ == "__main__":
+    main()
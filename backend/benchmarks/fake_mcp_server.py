@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Fake data acquisition MCP server for benchmarks.
+
+Speaks the same line-delimited JSON-RPC protocol as
+mcp_servers/data_acquisition_server/server.py (tools/list, tools/call,
+batches, metrics/get) but answers from tests/fixtures/sample_data instead of
+yfinance and PostgreSQL. Symbols without fixture data get deterministic
+synthetic figures, so any watchlist can be replayed.
+
+Environment:
+    FAKE_MCP_LATENCY_MS   simulated time per tool call (default 0)
+    FAKE_MCP_JITTER_MS    uniform random extra time per call (default 0)
+    FAKE_MCP_ERROR_RATE   fraction of tool calls that fail (default 0)
+    FAKE_MCP_FIXTURES     fixture directory (default tests/fixtures/sample_data)
+    FAKE_MCP_SEED         random seed for jitter and injected errors
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from utils.metrics import ToolMetrics
+
+FIXTURES_DIR = Path(os.getenv("FAKE_MCP_FIXTURES", PROJECT_ROOT / "tests" / "fixtures" / "sample_data"))
+LATENCY = float(os.getenv("FAKE_MCP_LATENCY_MS", "0")) / 1000
+JITTER = float(os.getenv("FAKE_MCP_JITTER_MS", "0")) / 1000
+ERROR_RATE = float(os.getenv("FAKE_MCP_ERROR_RATE", "0"))
+
+
+def _string_param(description: str) -> Dict[str, Any]:
+    return {"type": "string", "description": description}
+
+
+TOOL_METADATA = {
+    "get_ticker_symbol": {
+        "name": "get_ticker_symbol",
+        "description": "Get ticker symbol by company name from Indian equities database",
+        "parameters": {"type": "object", "properties": {"company_name": _string_param("Name of the company")},
+                       "required": ["company_name"]}
+    },
+    "search_companies": {
+        "name": "search_companies",
+        "description": "Search for companies by name or ticker symbol",
+        "parameters": {"type": "object", "properties": {"search_term": _string_param("Term to search for"),
+                                                        "limit": {"type": "integer", "default": 10}},
+                       "required": ["search_term"]}
+    },
+    "get_eps_data": {
+        "name": "get_eps_data",
+        "description": "Get EPS data for a stock by extracting from financial statements",
+        "parameters": {"type": "object", "properties": {"ticker_symbol": _string_param("Stock ticker symbol"),
+                                                        "years": {"type": "integer", "default": 4}},
+                       "required": ["ticker_symbol"]}
+    },
+    "get_basic_stock_info": {
+        "name": "get_basic_stock_info",
+        "description": "Get basic stock information including EPS",
+        "parameters": {"type": "object", "properties": {"ticker": _string_param("Stock ticker symbol")},
+                       "required": ["ticker"]}
+    },
+    "get_income_statement": {
+        "name": "get_income_statement",
+        "description": "Get income statement data (contains EPS)",
+        "parameters": {"type": "object", "properties": {"ticker": _string_param("Stock ticker symbol")},
+                       "required": ["ticker"]}
+    },
+}
+
+
+class FixtureData:
+    """Ticker and financial fixtures, with synthetic fallbacks"""
+
+    def __init__(self, fixtures_dir: Path):
+        tickers = json.loads((fixtures_dir / "sample_ticker_data.json").read_text(encoding="utf-8"))
+        self.companies = [
+            {"symbol": row["Symbol"], "name": row["Company_Name"]} for row in tickers.get("ticker_data", [])
+        ]
+        self.financials = json.loads((fixtures_dir / "sample_financial_data.json").read_text(encoding="utf-8"))
+        self.fixture_symbol = self.financials["stock_info"]["symbol"].split(".")[0]
+
+    @staticmethod
+    def base_symbol(ticker: str) -> str:
+        return ticker.strip().upper().split(".")[0]
+
+    def find_company(self, name: str) -> Optional[Dict[str, str]]:
+        query = name.strip().lower()
+        for company in self.companies:
+            if query in (company["symbol"].lower(), company["name"].lower()):
+                return company
+        for company in self.companies:
+            if query in company["name"].lower():
+                return company
+        return None
+
+    def eps_series(self, symbol: str, years: int) -> Dict[str, float]:
+        if symbol == self.fixture_symbol:
+            statements = self.financials["financial_statements"]
+            series = dict(zip(statements["columns"], statements["data"]["EPS"]))
+        else:
+            # Deterministic per symbol: base EPS and growth from a hash of the symbol
+            digest = hashlib.sha256(symbol.encode()).digest()
+            eps = 10 + digest[0]
+            growth = (digest[1] % 40 - 10) / 100
+            series = {}
+            for year in range(2021, 2025):
+                series[str(year)] = round(eps, 2)
+                eps *= 1 + growth
+        return {year: series[year] for year in sorted(series)[-years:]}
+
+
+class FakeDataAcquisitionServer:
+    """Fixture-backed stand-in for the data acquisition MCP server"""
+
+    def __init__(self, data: FixtureData, seed: Optional[int] = None):
+        self.data = data
+        self.metrics = ToolMetrics()
+        self._random = random.Random(seed)
+        self.tools = {
+            "get_ticker_symbol": self.get_ticker_symbol,
+            "search_companies": self.search_companies,
+            "get_eps_data": self.get_eps_data,
+            "get_basic_stock_info": self.get_basic_stock_info,
+            "get_income_statement": self.get_income_statement,
+        }
+
+    def get_ticker_symbol(self, company_name: str) -> Dict[str, Any]:
+        company = self.data.find_company(company_name)
+        if company is None:
+            return {"success": False, "error": f"No ticker symbol found for '{company_name}'",
+                    "ticker_symbol": None, "company_info": None}
+        return {"success": True, "ticker_symbol": company["symbol"], "company_info": company,
+                "search_term": company_name}
+
+    def search_companies(self, search_term: str, limit: int = 10) -> Dict[str, Any]:
+        term = search_term.strip().lower()
+        results = [c for c in self.data.companies if term in c["name"].lower() or term in c["symbol"].lower()]
+        return {"success": True, "search_term": search_term, "results": results[:limit], "count": len(results[:limit])}
+
+    def get_eps_data(self, ticker_symbol: str, years: int = 4) -> Dict[str, Any]:
+        eps_data = self.data.eps_series(self.data.base_symbol(ticker_symbol), years)
+        return {"success": True, "ticker_symbol": ticker_symbol, "years_requested": years,
+                "years_found": len(eps_data), "eps_data": eps_data,
+                "message": f"Successfully extracted EPS data for {len(eps_data)} years"}
+
+    def get_basic_stock_info(self, ticker: str) -> Dict[str, Any]:
+        symbol = self.data.base_symbol(ticker)
+        if symbol == self.data.fixture_symbol:
+            info = dict(self.data.financials["stock_info"])
+        else:
+            company = self.data.find_company(symbol) or {"name": symbol}
+            info = {"symbol": f"{symbol}.NS", "longName": company["name"]}
+        return {"success": True, "data": info}
+
+    def get_income_statement(self, ticker: str) -> Dict[str, Any]:
+        symbol = self.data.base_symbol(ticker)
+        eps = self.data.eps_series(symbol, 4)
+        records = [{"Date": f"{year}-03-31", "Basic EPS": value} for year, value in eps.items()]
+        return {"success": True, "data": records}
+
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        start = time.perf_counter()
+        delay = LATENCY + (self._random.uniform(0, JITTER) if JITTER else 0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if tool_name not in self.tools:
+            result = {"error": f"Tool '{tool_name}' not found", "available_tools": list(self.tools)}
+        elif ERROR_RATE and self._random.random() < ERROR_RATE:
+            result = {"success": False, "error": f"Injected failure for '{tool_name}'", "tool_name": tool_name}
+        else:
+            try:
+                result = {"success": True, "tool_name": tool_name, "result": self.tools[tool_name](**arguments)}
+            except Exception as e:
+                result = {"success": False, "error": f"Error calling tool '{tool_name}': {e}", "tool_name": tool_name}
+
+        text = json.dumps(result)
+        self.metrics.record(tool_name=str(tool_name), latency=time.perf_counter() - start,
+                            response_bytes=len(text.encode("utf-8")), error=not result.get("success", False))
+        return text
+
+    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        method = request.get("method")
+        params = request.get("params", {})
+        response: Dict[str, Any] = {"jsonrpc": "2.0", "id": request.get("id")}
+
+        if method == "tools/list":
+            response["result"] = {"tools": list(TOOL_METADATA.values())}
+        elif method == "tools/call":
+            text = await self.execute_tool(params.get("name"), params.get("arguments", {}))
+            response["result"] = {"content": [{"type": "text", "text": text}]}
+        elif method == "metrics/get":
+            snapshot = self.metrics.snapshot()
+            if params.get("reset"):
+                self.metrics = ToolMetrics()
+            response["result"] = {"content": [{"type": "text", "text": json.dumps(snapshot)}]}
+        elif method in ("ping", "initialize"):
+            response["result"] = {}
+        else:
+            response["error"] = {"code": -32601, "message": f"Method not found: {method}"}
+        return response
+
+    async def handle_message(self, message: Any) -> Any:
+        if isinstance(message, list):
+            responses = await asyncio.gather(*(self.handle_request(entry) for entry in message))
+            return [response for entry, response in zip(message, responses) if "id" in entry]
+        return await self.handle_request(message)
+
+    async def run_stdio(self):
+        # Like the real server: one message at a time, batch entries concurrently
+        loop = asyncio.get_running_loop()
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            response = await self.handle_message(message)
+            if response == []:
+                continue
+            sys.stdout.write(json.dumps(response) + "\n")
+            sys.stdout.flush()
+
+
+def main():
+    seed = os.getenv("FAKE_MCP_SEED")
+    server = FakeDataAcquisitionServer(FixtureData(FIXTURES_DIR), seed=int(seed) if seed else None)
+    try:
+        asyncio.run(server.run_stdio())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Ingestion benchmark for data_processing.
+
+Replays parsed LlamaParse page JSON through FinancialDocumentProcessor and
+times each ingestion stage separately, with its peak Python memory:
+
+    contents_based_chunking, semantic_chunking, generate_embeddings,
+    store_chunks, get_chunks_by_strategy
+
+Documents are synthetic annual reports of the requested page counts, built
+from the recorded chunks in outputs/contents_based_chunks.json, plus any
+cached parses passed with --pages (file_cache/*.jsonl or LlamaParse JSON).
+Embeddings come from a deterministic hash-seeded function instead of
+Ollama, and each document is stored in its own temporary ChromaDB
+directory, so no LlamaParse, Ollama or PostgreSQL service is needed.
+
+Usage (from backend/):
+    python -m benchmarks.ingestion_benchmark
+    python -m benchmarks.ingestion_benchmark --synthetic-pages 100,500,1000
+    python -m benchmarks.ingestion_benchmark --pages file_cache/HAL_2023-24.jsonl
+    python -m benchmarks.ingestion_benchmark --baseline benchmarks/results/previous.json
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from benchmarks.api_benchmark import RESULTS_DIR, git_commit
+
+RECORDED_CHUNKS = PROJECT_ROOT / "outputs" / "contents_based_chunks.json"
+
+# Synthetic layout: pages per contents section, and text per continuation page
+SECTION_PAGES = 4
+PAGE_CHARS = 3000
+
+
+def _table_item(rows: List[List[Any]]) -> Dict[str, Any]:
+    lines = ["| " + " | ".join(str(cell) for cell in row) + " |" for row in rows]
+    if lines:
+        lines.insert(1, "|" + "---|" * len(rows[0]))
+    return {"type": "table", "rows": rows, "md": "\n".join(lines)}
+
+
+def _markdown_items(markdown: str, heading_level: Optional[int] = None) -> List[Dict[str, Any]]:
+    """LlamaParse-style heading/text items for recorded chunk markdown"""
+    items, paragraph = [], []
+
+    def flush():
+        if paragraph:
+            items.append({"type": "text", "value": "\n".join(paragraph)})
+            paragraph.clear()
+
+    for line in markdown.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            flush()
+            level = len(stripped) - len(stripped.lstrip("#"))
+            items.append({"type": "heading", "lvl": heading_level or level, "value": stripped.lstrip("#").strip()})
+        elif not stripped or stripped.startswith("[Table:"):
+            # Table summaries are re-added by the processor from the table items
+            flush()
+        else:
+            paragraph.append(stripped)
+    flush()
+    return items
+
+
+def _page(number: int, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    text = "\n\n".join(item.get("value") or item.get("md", "") for item in items)
+    return {"page": number, "text": text, "md": text, "items": items}
+
+
+def synthetic_pages(num_pages: int, recorded_path: Path = RECORDED_CHUNKS) -> List[Dict[str, Any]]:
+    """
+    Build a num_pages annual report in LlamaParse page JSON from recorded chunks.
+
+    Keeps the recorded pre-contents pages, then a contents page listing the
+    recorded sections (cycled, each spanning SECTION_PAGES pages) with their
+    tables. Continuation pages repeat recorded paragraphs up to PAGE_CHARS
+    and carry no level 1-2 headings, so each stays inside its section.
+    """
+    chunks = json.loads(Path(recorded_path).read_text(encoding="utf-8"))["chunks"]
+    pre_contents = [chunk for chunk in chunks if chunk["metadata"].get("chunk_type") == "pre_contents_page"]
+    recorded_sections = [chunk for chunk in chunks if chunk["metadata"].get("chunk_type") == "contents_based_section"]
+
+    pages = [_page(number, _markdown_items(chunk["content"])) for number, chunk in enumerate(pre_contents, start=1)]
+    contents_page_num = len(pages) + 1
+    body_pages = max(1, num_pages - contents_page_num)
+
+    paragraphs = [item for chunk in recorded_sections
+                  for item in _markdown_items(chunk["content"], heading_level=3) if item["type"] == "text"]
+    section_count = min(body_pages, max(len(recorded_sections), body_pages // SECTION_PAGES))
+    span, extra = divmod(body_pages, section_count)
+
+    sections, body, paragraph_index = [], [], 0
+    for index in range(section_count):
+        recorded = recorded_sections[index % len(recorded_sections)]
+        category = recorded["metadata"].get("category", "")
+        title = recorded["section"].removeprefix(f"{category} - ")
+        round_number = index // len(recorded_sections)
+        if round_number:
+            title = f"{title} {round_number + 1}"
+
+        start_page = contents_page_num + 1 + len(body)
+        sections.append((category, title, start_page))
+
+        first_items = [{"type": "heading", "lvl": 1, "value": title}]
+        first_items += [item for item in _markdown_items(recorded["content"]) if item.get("value") != title]
+        first_items += [_table_item(table["raw_data"]) for table in recorded.get("tables", []) if table.get("raw_data")]
+        body.append(first_items)
+
+        for _ in range(span + (1 if index < extra else 0) - 1):
+            items, size = [], 0
+            while size < PAGE_CHARS:
+                paragraph = paragraphs[paragraph_index % len(paragraphs)]
+                paragraph_index += 1
+                items.append(paragraph)
+                size += len(paragraph["value"])
+            body.append(items)
+
+    # Contents page numbers are printed relative to the contents page
+    contents_items = [{"type": "heading", "lvl": 1, "value": "Contents"}]
+    current_category, lines = None, []
+    for category, title, start_page in sections:
+        if category != current_category:
+            if lines:
+                contents_items.append({"type": "text", "value": "\n".join(lines)})
+            contents_items.append({"type": "heading", "lvl": 1, "value": category})
+            current_category, lines = category, []
+        lines.append(f"{start_page - contents_page_num + 1:02d}  {title}")
+    if lines:
+        contents_items.append({"type": "text", "value": "\n".join(lines)})
+
+    pages.append(_page(contents_page_num, contents_items))
+    pages += [_page(number, items) for number, items in enumerate(body, start=contents_page_num + 1)]
+    return pages
+
+
+def load_pages(path: Path) -> List[Dict[str, Any]]:
+    """Pages from a file_cache .jsonl (one page per line) or LlamaParse JSON result"""
+    text = Path(path).read_text(encoding="utf-8")
+    if path.suffix == ".jsonl":
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    data = json.loads(text)
+    if isinstance(data, list) and data and "pages" in data[0]:
+        return data[0]["pages"]
+    return data["pages"] if isinstance(data, dict) else data
+
+
+class DeterministicEmbedding:
+    """Unit vectors seeded from a hash of the text - same text, same vector"""
+
+    def __init__(self, dim: int = 768, latency_ms: float = 0.0):
+        self.dim = dim
+        self.latency = latency_ms / 1000
+        self.calls = 0
+
+    def __call__(self, text: str) -> List[float]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+def create_processor(chroma_dir: Path, embedding: DeterministicEmbedding):
+    """FinancialDocumentProcessor on a private ChromaDB directory, with the fake embedding and no LLM/PostgreSQL"""
+    from data_processing.processors.financial_processor import FinancialDocumentProcessor
+
+    class BenchmarkProcessor(FinancialDocumentProcessor):
+        def embed_text(self, text: str) -> List[float]:
+            return embedding(text)
+
+        def generate_llm_response(self, prompt: str, max_tokens: int = 1000) -> str:
+            # Only asked for break points in _split_large_section, which aren't used
+            return ""
+
+    # The processor reads its settings from the environment (and .env, loaded on
+    # import) while it is built; keep the run off any configured PostgreSQL
+    saved_environ = dict(os.environ)
+    try:
+        for key in ("POSTGRES_HOST", "POSTGRES_PORT", "POSTGRES_DB", "POSTGRES_USER", "POSTGRES_PASSWORD"):
+            os.environ.pop(key, None)
+        os.environ.setdefault("LLAMA_CLOUD_API_KEY", "benchmark-unused")
+        os.environ["ANONYMIZED_TELEMETRY"] = "False"
+        os.environ["CHROMA_DB_PATH"] = str(chroma_dir)
+        os.environ["FILE_CACHE_DIR"] = str(chroma_dir.parent / "file_cache")
+        return BenchmarkProcessor()
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_environ)
+
+
+def measure(func: Callable, *args, track_memory: bool = True) -> Tuple[Any, Dict[str, Any]]:
+    """Run func(*args); wall seconds and peak Python allocation above the starting point"""
+    gc.collect()
+    if track_memory:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = func(*args)
+    stats = {"seconds": round(time.perf_counter() - start, 4)}
+    if track_memory:
+        stats["peak_mb"] = round((tracemalloc.get_traced_memory()[1] - baseline) / 2 ** 20, 2)
+    return result, stats
+
+
+def run_document(name: str, pages: List[Dict[str, Any]], workdir: Path, args: argparse.Namespace) -> Dict[str, Any]:
+    """Time every ingestion stage for one document"""
+    embedding = DeterministicEmbedding(dim=args.embedding_dim, latency_ms=args.embedding_latency_ms)
+    processor = create_processor(workdir / name / "chroma", embedding)
+    track = not args.no_memory
+    if track and not tracemalloc.is_tracing():
+        # Started after the first processor is built: tracing the ChromaDB/LlamaParse imports is slow
+        tracemalloc.start()
+    pdf_path = str(workdir / name / f"{name}.pdf")
+    company_name, financial_year = "Benchmark Ltd", "2023-24"
+
+    stages = {}
+    chunks, stages["contents_based_chunking"] = measure(processor.contents_based_chunking, pages, track_memory=track)
+    semantic_chunks, stages["semantic_chunking"] = measure(processor.semantic_chunking, pages, track_memory=track)
+
+    # Same per-chunk metadata process_document adds before embedding
+    for chunk in chunks:
+        chunk.metadata.update({"company_name": company_name, "financial_year": financial_year})
+    chunks, stages["generate_embeddings"] = measure(processor.generate_embeddings, chunks, track_memory=track)
+
+    document_metadata = {
+        "file_path": str(Path(pdf_path).absolute()),
+        "file_name": Path(pdf_path).name,
+        "total_pages": len(pages),
+        "company_name": company_name,
+        "financial_year": financial_year,
+    }
+    _, stages["store_chunks"] = measure(processor.store_chunks, chunks, document_metadata, "contents_based",
+                                        track_memory=track)
+    retrieved, stages["get_chunks_by_strategy"] = measure(processor.get_chunks_by_strategy, pdf_path,
+                                                          "contents_based", company_name, financial_year,
+                                                          track_memory=track)
+
+    return {
+        "name": name,
+        "pages": len(pages),
+        "chunks": {"contents_based": len(chunks), "semantic": len(semantic_chunks), "retrieved": len(retrieved)},
+        "tables": sum(len(chunk.tables) for chunk in chunks),
+        "embedding_calls": embedding.calls,
+        "stages": stages,
+        "total_seconds": round(sum(stage["seconds"] for stage in stages.values()), 4),
+    }
+
+
+def compare_runs(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Lines comparing stage time and peak memory per document"""
+    previous = {document["name"]: document for document in baseline.get("documents", [])}
+    lines = [f"Compared with {baseline.get('git_commit') or 'baseline'} ({baseline.get('timestamp')}):"]
+    for document in current["documents"]:
+        old = previous.get(document["name"])
+        if not old:
+            continue
+        lines.append(f"  {document['name']}:")
+        for stage, stats in document["stages"].items():
+            old_stats = old["stages"].get(stage)
+            if not old_stats or not old_stats["seconds"]:
+                continue
+            change = (stats["seconds"] - old_stats["seconds"]) / old_stats["seconds"] * 100
+            memory = ""
+            if "peak_mb" in stats and "peak_mb" in old_stats:
+                memory = f" | peak {stats['peak_mb']} MB (was {old_stats['peak_mb']} MB)"
+            lines.append(f"    {stage:<24} {stats['seconds']:.3f}s ({change:+.1f}%){memory}")
+    return lines
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    documents = [(f"synthetic-{count}p", synthetic_pages(count)) for count in
+                 (int(value) for value in args.synthetic_pages.split(",") if value.strip())]
+    documents += [(Path(path).stem, load_pages(Path(path))) for path in args.pages]
+
+    workdir = Path(tempfile.mkdtemp(prefix="vyasaquant-ingest-"))
+    results = []
+    try:
+        for name, pages in documents:
+            print(f"📄 {name}: {len(pages)} pages")
+            result = run_document(name, pages, workdir, args)
+            for stage, stats in result["stages"].items():
+                memory = f" | peak {stats['peak_mb']} MB" if "peak_mb" in stats else ""
+                print(f"   ⏱️ {stage:<24} {stats['seconds']:.3f}s{memory}")
+            print(f"   ✅ {result['chunks']['contents_based']} chunks, {result['tables']} tables, "
+                  f"{result['chunks']['retrieved']} retrieved, total {result['total_seconds']:.3f}s")
+            results.append(result)
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if args.keep_workdir:
+            print(f"📁 Benchmark state kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    # ru_maxrss is KiB on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if RESOURCE_AVAILABLE else None
+    return {
+        "benchmark": "ingestion",
+        "git_commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "synthetic_pages": args.synthetic_pages,
+            "pages_files": args.pages,
+            "embedding_dim": args.embedding_dim,
+            "embedding_latency_ms": args.embedding_latency_ms,
+            "memory_tracking": not args.no_memory,
+        },
+        "documents": results,
+        "process_peak_rss_mb": round(peak_rss, 1) if peak_rss else None,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the document ingestion stages")
+    parser.add_argument("--synthetic-pages", default="50,500",
+                        help="Comma-separated page counts of synthetic documents ('' for none)")
+    parser.add_argument("--pages", action="append", default=[],
+                        help="Cached parse to replay (file_cache .jsonl or LlamaParse JSON); repeatable")
+    parser.add_argument("--embedding-dim", type=int, default=768, help="Fake embedding size (nomic-embed-text: 768)")
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0, help="Simulated time per embedding")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc (it slows the stages down)")
+    parser.add_argument("--keep-workdir", action="store_true", help="Keep the temporary ChromaDB directories")
+    parser.add_argument("--verbose", action="store_true", help="Show processor INFO logs")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/ingestion-<commit>-<time>.json)")
+    parser.add_argument("--baseline", help="Earlier result JSON to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    result = run_benchmark(args)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"ingestion-{result['git_commit'] or 'nogit'}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"💾 Results written to {output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        print("\n".join(compare_runs(result, baseline)))
+
+
+if __name__ == "__main__":
+    main()
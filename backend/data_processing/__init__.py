@@ -128,6 +128,61 @@ class FinancialDataAPI:
             top_k=top_k
         )
     
+    def search_many(self, queries, company_name=None, financial_years=None, top_k=5):
+        """
+        Search several related questions of the same filings in one round-trip.
+        
+        Args:
+            queries (List[str]): Search query texts (e.g. "revenue", "EPS", "debt")
+            company_name (str, optional): Filter by company name or ticker
+            financial_years (List[str], optional): Filter by financial years
+            top_k (int): Number of results per query
+        
+        Returns:
+            Dict: Per-query ranked chunk ids under 'results' and the deduplicated
+                chunk content and metadata under 'chunks'
+        
+        Example:
+            >>> results = api.search_many(["revenue", "diluted EPS", "total debt"], company_name="HAL")
+            >>> for chunk_id in results['results']['diluted EPS']['ids']:
+            ...     print(results['chunks'][chunk_id]['content'][:200])
+        """
+        return self.processor.search_many(
+            queries,
+            filters={"company_name": company_name, "financial_years": financial_years},
+            top_k=top_k
+        )
+    
+    def get_line_items(self, company_name, line_item=None, statement=None, financial_years=None):
+        """
+        Get figures from the structured line item store (no semantic search or LLM needed).
+        
+        Args:
+            company_name (str): Company name or ticker
+            line_item (str, optional): Line item name or alias such as "eps", "diluted eps" or "revenue"
+            statement (str, optional): "consolidated_balance_sheet", "consolidated_profit_and_loss"
+                or "consolidated_cash_flow"
+            financial_years (List[str], optional): Financial years to include
+        
+        Returns:
+            List[Dict]: Rows with line_item, period, period_end, value (absolute rupees,
+                per-share figures unscaled), raw_value and unit
+        
+        Example:
+            >>> api.get_line_items("HAL", "diluted eps", financial_years=["FY2022", "FY2024"])
+        """
+        return self.processor.get_line_items(company_name, line_item, statement, financial_years)
+    
+    def backfill_normalized_metadata(self):
+        """
+        Add the canonical ticker and integer fy_end fields to chunks processed
+        before they were recorded, so filtered search finds them.
+        
+        Returns:
+            Dict: Counts of scanned, updated and unresolved chunks
+        """
+        return self.processor.backfill_normalized_metadata()
+    
     def get_processed_companies(self):
         """
         Get list of all companies that have been processed.
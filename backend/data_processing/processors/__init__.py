@@ -5,7 +5,15 @@ This module contains specialized processors for financial document processing ta
 """
 
 from .financial_processor import FinancialDocumentProcessor
+from .pdf_parsers import PDFParserBackend, LlamaParseBackend, LocalPDFParser, create_parser_backend
+from .parse_scheduler import ParseScheduler, ParseOutcome
 
 __all__ = [
-    "FinancialDocumentProcessor"
+    "FinancialDocumentProcessor",
+    "PDFParserBackend",
+    "LlamaParseBackend",
+    "LocalPDFParser",
+    "create_parser_backend",
+    "ParseScheduler",
+    "ParseOutcome"
 ] 
\ No newline at end of file
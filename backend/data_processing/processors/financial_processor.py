@@ -11,8 +11,10 @@ import logging
 import time
 import uuid
 import re
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 from datetime import datetime
 
 # Load environment variables from .env file
@@ -21,7 +23,6 @@ load_dotenv()
 
 # External dependencies
 import tiktoken
-from llama_parse import LlamaParse
 from google import genai
 import ollama
 import pandas as pd
@@ -40,6 +41,12 @@ from sklearn.metrics.pairwise import cosine_similarity
 # Internal imports
 from ..schemas.document_chunk import DocumentChunk
 from ..schemas.financial_data import ProcessingResult
+from ..storage.lexical_index import get_lexical_index, reciprocal_rank_fusion
+from ..storage.search_cache import get_search_cache
+from ..storage.line_item_store import LineItemStore, table_to_line_items, detect_unit
+from .metadata_normalizer import normalize_chunk_metadata, canonical_ticker, fiscal_year_filter, parse_fy_end
+from .pdf_parsers import create_parser_backend
+from .parse_scheduler import ParseScheduler, ParseOutcome
 
 # Unicode normalization function from original
 import unicodedata
@@ -74,22 +81,26 @@ class FinancialDocumentProcessor:
         self.logger.info("Financial Document Processor initialization completed")
     
     def setup_apis(self):
-        """Initialize API connections for LlamaParse, Gemini, and Ollama"""
+        """Initialize the PDF parser backend and API connections for Gemini and Ollama"""
         self.logger.info("Setting up API connections")
         
-        # LlamaParse setup - exact same as original
+        # PDF parser: LlamaParse service (default) or the offline local parser
         self.llama_api_key = os.getenv("LLAMA_CLOUD_API_KEY")
-        if not self.llama_api_key:
-            self.logger.error("LLAMA_CLOUD_API_KEY not found in environment variables")
-            raise ValueError("LLAMA_CLOUD_API_KEY not found in environment variables")
-        
-        self.parser = LlamaParse(
-            api_key=self.llama_api_key,
-            result_type="markdown",
-            verbose=True,
-            language="en"
-        )
-        self.logger.info("LlamaParse initialized successfully")
+        self.parser_backend_name = os.getenv("PDF_PARSER_BACKEND", "llamaparse").lower()
+        workers = os.getenv("PDF_PARSER_WORKERS")
+        try:
+            self.parser_backend = create_parser_backend(
+                self.parser_backend_name,
+                llama_api_key=self.llama_api_key,
+                max_workers=int(workers) if workers else None,
+                pages_per_task=int(os.getenv("PDF_PARSER_PAGES_PER_TASK", "8"))
+            )
+        except (ValueError, ImportError) as e:
+            self.logger.error(str(e))
+            raise
+        self.logger.info(f"PDF parser backend initialized: {self.parser_backend.name}")
+        # PDFs parsed at once by process_multiple_documents
+        self.parse_max_concurrency = int(os.getenv("PARSE_MAX_CONCURRENCY", "4"))
         
         # Google Gemini setup - exact same as original
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
@@ -135,6 +146,27 @@ class FinancialDocumentProcessor:
         
         self.logger.info(f"ChromaDB initialized at: {chroma_path}")
         
+        # BM25 index over chunk content, kept next to the Chroma DB
+        self.lexical_index = get_lexical_index(os.path.join(chroma_path, "lexical_index"))
+        self.hybrid_rrf_k = int(os.getenv("HYBRID_RRF_K", "60"))
+        self.lexical_skip_embedding = os.getenv("LEXICAL_SKIP_EMBEDDING", "true").lower() == "true"
+        
+        # Search results are cached until chunks are written again
+        self.search_cache = get_search_cache(chroma_path, int(os.getenv("SEARCH_CACHE_SIZE", "256")))
+        
+        # Numeric line items from the consolidated statements (SQLite next to the Chroma DB by default)
+        line_item_db_url = os.getenv("LINE_ITEM_DB_URL", f"sqlite:///{os.path.join(chroma_path, 'line_items.db')}")
+        try:
+            self.line_item_store = LineItemStore(line_item_db_url)
+        except Exception as e:
+            self.logger.warning(f"Line item store unavailable: {e}. Financial tables won't be stored.")
+            self.line_item_store = None
+        try:
+            if len(self.lexical_index) != self.chunks_collection.count():
+                self.lexical_index.sync_with_collection(self.chunks_collection)
+        except Exception as e:
+            self.logger.warning(f"Could not sync lexical index with ChromaDB: {e}")
+        
         # PostgreSQL setup
         try:
             self.pg_engine = create_engine(
@@ -171,9 +203,12 @@ class FinancialDocumentProcessor:
         self.logger.info(f"File cache directory: {self.file_cache_dir}")
     
     def get_file_cache_path(self, pdf_path: str) -> Path:
-        """Get cache file path for PDF - exact same as original"""
+        """Get cache file path for PDF; parses from other backends than LlamaParse are cached separately"""
         pdf_file = Path(pdf_path)
-        cache_filename = f"{pdf_file.stem}.jsonl"
+        if self.parser_backend_name == "llamaparse":
+            cache_filename = f"{pdf_file.stem}.jsonl"
+        else:
+            cache_filename = f"{pdf_file.stem}.{self.parser_backend_name}.jsonl"
         return self.file_cache_dir / cache_filename
     
     def is_file_cached(self, pdf_path: str) -> bool:
@@ -235,17 +270,10 @@ class FinancialDocumentProcessor:
             return []
     
     def parse_pdf(self, pdf_path: str) -> List[Dict[str, Any]]:
-        """Parse PDF using LlamaParse and return structured JSON content - exact same as original"""
+        """Parse PDF with the configured backend and return LlamaParse-style JSON pages"""
         try:
-            self.logger.info(f"Parsing PDF: {pdf_path}")
-            documents = self.parser.get_json_result(pdf_path)  # This is the key difference - using get_json_result
-            
-            if not documents:
-                self.logger.error("No content extracted from PDF")
-                raise ValueError("No content extracted from PDF")
-                
-            # Return the pages from the first document
-            content = documents[0]["pages"]
+            self.logger.info(f"Parsing PDF with {self.parser_backend.name}: {pdf_path}")
+            content = self.parser_backend.parse(pdf_path)
             self.logger.info(f"Successfully parsed PDF. Content length: {len(content)} pages")
             
             return content
@@ -331,6 +359,77 @@ class FinancialDocumentProcessor:
                         ft_pg_num['consolidated_cash_flow'].append(page["page"])
         return tables, ft_pg_num
     
+    def store_financial_line_items(self, pages: List[Dict[str, Any]], financial_tables: Dict[str, List[pd.DataFrame]],
+                                   financial_tables_pg_num: Dict[str, List[int]], company_name: str = None,
+                                   financial_year: str = None, source_file: str = None) -> int:
+        """
+        Normalize the consolidated statements from extract_financial_tables into the
+        line item store, with values parsed from the units declared on each page.
+        
+        Returns:
+            Number of line item values stored
+        """
+        if not self.line_item_store or not any(financial_tables.values()):
+            return 0
+        
+        ticker = canonical_ticker(company_name) if company_name else None
+        fiscal_year = parse_fy_end(financial_year)
+        if not ticker or fiscal_year is None:
+            self.logger.warning("Skipping line item storage: company name and financial year are required")
+            return 0
+        
+        page_units = {}
+        for page in pages:
+            page_text = page.get("text") or page.get("md") or " ".join(
+                str(item.get("value", "")) for item in page.get("items", [])
+            )
+            page_units[page.get("page")] = detect_unit(page_text)
+        
+        total = 0
+        try:
+            for statement, tables in financial_tables.items():
+                if not tables:
+                    continue
+                rows = []
+                for df, page_number in zip(tables, financial_tables_pg_num.get(statement, [])):
+                    for row in table_to_line_items(df, page_units.get(page_number)):
+                        row["page_number"] = page_number
+                        rows.append(row)
+                total += self.line_item_store.replace_statement(
+                    ticker, fiscal_year, statement, rows, company_name=company_name, source_file=source_file
+                )
+        except Exception as e:
+            self.logger.error(f"Error storing financial line items: {e}")
+        
+        self.logger.info(f"Stored {total} financial line items for {ticker} FY{fiscal_year}")
+        return total
+    
+    def get_line_items(self, company_name: str, line_item: str = None, statement: str = None,
+                       financial_years: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        Read figures straight from the line item store (e.g. line_item="eps" or "revenue").
+        
+        Args:
+            company_name: Company name or ticker
+            line_item: Line item name or alias
+            statement: Restrict to one statement, e.g. "consolidated_profit_and_loss"
+            financial_years: Restrict to the periods ending in these financial years
+            
+        Returns:
+            Line item rows, newest period first
+        """
+        if not self.line_item_store:
+            return []
+        
+        years = [year for year in (parse_fy_end(fy) for fy in financial_years or []) if year is not None]
+        return self.line_item_store.get_line_items(
+            canonical_ticker(company_name),
+            line_item=line_item,
+            statement=statement,
+            start_year=min(years) if years else None,
+            end_year=max(years) if years else None
+        )
+    
     def generate_llm_response(self, prompt: str, max_tokens: int = 1000) -> str:
         """Generate response using either Gemini or Ollama - exact same as original"""
         self.logger.debug(f"Generating LLM response using {self.llm_provider}")
@@ -367,6 +466,11 @@ class FinancialDocumentProcessor:
         self.logger.info(f"Split content into {len(sections)} sections")
         
         for section in sections:
+            # Headings directly followed by another level-1 heading have no text
+            if not section['content'].strip():
+                self.logger.warning(f"No content found for section: {section['title']}")
+                continue
+
             # Create semantic chunks for this section
             section_chunks = self._create_section_chunks(section)
             self.logger.debug(f"Section '{section['title']}': {len(section['tables'])} tables found")
@@ -540,11 +644,7 @@ class FinancialDocumentProcessor:
                             embed_text += f"\n[Table data present but could not be processed for embedding]"
                 
                 # Generate embedding using Ollama
-                response = ollama.embeddings(
-                    model=self.ollama_embed_model,
-                    prompt=embed_text
-                )
-                chunk.embeddings = response['embedding']
+                chunk.embeddings = self.embed_text(embed_text)
                 
             except Exception as e:
                 self.logger.error(f"Error generating embedding for chunk {chunk.id}: {e}")
@@ -553,6 +653,10 @@ class FinancialDocumentProcessor:
         self.logger.info("Embedding generation completed")
         return chunks
     
+    def embed_text(self, text: str) -> List[float]:
+        """Embed one chunk or table text with the Ollama embedding model"""
+        return ollama.embeddings(model=self.ollama_embed_model, prompt=text)['embedding']
+    
     def find_contents_page(self, pages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """Find the contents/table of contents page in the document - exact same as original"""
         self.logger.info("Searching for contents page")
@@ -878,7 +982,8 @@ class FinancialDocumentProcessor:
         return chunks
     
     def process_document(self, pdf_path: str, strategy: str = "contents_based", 
-                        company_name: str = None, financial_year: str = None) -> ProcessingResult:
+                        company_name: str = None, financial_year: str = None,
+                        parsed_pages: Optional[List[Dict[str, Any]]] = None) -> ProcessingResult:
         """
         Process a PDF document with the specified strategy.
         
@@ -887,6 +992,8 @@ class FinancialDocumentProcessor:
             strategy: Processing strategy ('semantic' or 'contents_based')
             company_name: Name of the company (for filtering and search)
             financial_year: Financial year (e.g., "FY2023", "2022-23")
+            parsed_pages: Pages just parsed for this PDF (e.g. by aparse_documents);
+                          loaded from cache or parsed when not given
             
         Returns:
             ProcessingResult containing processing outcome and metadata
@@ -953,8 +1060,12 @@ class FinancialDocumentProcessor:
                 result.reused_existing = True
                 return result
             
-            # Get content (from cache or parse)
-            content = self.get_or_parse_file(pdf_path)
+            # Get content (freshly parsed by the caller, from cache, or parse)
+            if parsed_pages:
+                content, was_cached = parsed_pages, False
+            else:
+                was_cached = self.is_file_cached(pdf_path)
+                content = self.get_or_parse_file(pdf_path)
             
             # Use appropriate chunking strategy
             if strategy == "semantic":
@@ -966,16 +1077,25 @@ class FinancialDocumentProcessor:
                 result.add_error(f"Unknown processing strategy: {strategy}")
                 return result
 
-            # Add company and financial year metadata to each chunk
+            # Add company and financial year metadata to each chunk, plus the
+            # canonical ticker and integer fy_end used by filtered search
+            normalized_metadata = normalize_chunk_metadata({
+                "company_name": company_name,
+                "financial_year": financial_year
+            })
             for chunk in chunks:
                 if company_name:
                     chunk.metadata["company_name"] = company_name
                 if financial_year:
                     chunk.metadata["financial_year"] = financial_year
+                chunk.metadata.update(normalized_metadata)
 
             # Extract financial tables
             financial_tables, financial_tables_pg_num = self.extract_financial_tables(content)
-            self.logger.info(f"Extracted {len(financial_tables)} financial tables")
+            self.logger.info(f"Extracted {sum(len(tables) for tables in financial_tables.values())} financial tables")
+            line_items_stored = self.store_financial_line_items(
+                content, financial_tables, financial_tables_pg_num, company_name, financial_year, Path(pdf_path).name
+            )
 
             # Generate embeddings
             chunks = self.generate_embeddings(chunks)
@@ -989,10 +1109,11 @@ class FinancialDocumentProcessor:
                 "processing_date": self._get_current_timestamp(),
                 "total_pages": len(content),
                 "content_length": len(content),
-                "was_cached": self.is_file_cached(pdf_path),
+                "was_cached": was_cached,
                 "chunking_strategy": strategy,
                 "company_name": company_name,
-                "financial_year": financial_year
+                "financial_year": financial_year,
+                "line_items_stored": line_items_stored
             }
             
             # Store results using direct database methods
@@ -1036,56 +1157,132 @@ class FinancialDocumentProcessor:
         
         return result
     
+    async def aparse_documents(self, pdf_paths: List[str]) -> AsyncIterator[ParseOutcome]:
+        """
+        Parse PDFs concurrently, at most parse_max_concurrency at a time.
+        
+        Each successful parse is written to the file cache as soon as it
+        arrives; outcomes are yielded in completion order.
+        """
+        scheduler = ParseScheduler(self.parser_backend.aparse, self.parse_max_concurrency,
+                                   on_parsed=self.save_file_to_cache)
+        async for outcome in scheduler.run(pdf_paths):
+            yield outcome
+    
     def process_multiple_documents(self, documents_info: List[Dict[str, str]], 
                                  strategy: str = "contents_based") -> Dict[str, Any]:
         """
         Process multiple PDF documents with company and financial year metadata.
         
+        PDFs that are neither cached nor processed yet are parsed concurrently
+        (see aparse_documents); each document is chunked and stored as soon as
+        its parse completes, one document at a time.
+        
         Args:
             documents_info: List of dictionaries with keys:
                            - pdf_path: Path to PDF file
                            - company_name: Company name (optional)
                            - financial_year: Financial year (optional)
+                           (plain PDF paths are accepted too)
             strategy: Processing strategy to use
             
         Returns:
             Summary of processing results
         """
+        coroutine = self.aprocess_multiple_documents(documents_info, strategy)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        # Called from async code (e.g. the interactive main): run on a loop of our own
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
+    
+    async def aprocess_multiple_documents(self, documents_info: List[Dict[str, str]],
+                                          strategy: str = "contents_based") -> Dict[str, Any]:
+        """Async process_multiple_documents"""
         self.logger.info(f"Processing {len(documents_info)} documents with {strategy} strategy")
         
         all_results = []
         successful_count = 0
         failed_count = 0
         
+        documents = []
         for doc_info in documents_info:
-            pdf_path = doc_info.get('pdf_path')
-            company_name = doc_info.get('company_name')
-            financial_year = doc_info.get('financial_year')
-            
-            if not pdf_path:
+            if isinstance(doc_info, (str, Path)):
+                doc_info = {'pdf_path': str(doc_info)}
+            if not doc_info.get('pdf_path'):
                 self.logger.error("Missing pdf_path in document info")
                 failed_count += 1
                 continue
-            
-            self.logger.info(f"Processing: {Path(pdf_path).name} | Company: {company_name or 'Unknown'} | Year: {financial_year or 'Unknown'}")
-            
-            result = self.process_document(pdf_path, strategy, company_name, financial_year)
-            all_results.append(result)
-            
-            if result.is_successful:
-                successful_count += 1
-                # Determine status message
-                if result.reused_existing:
-                    status_msg = "reused"
-                elif result.document_metadata.get('was_cached'):
-                    status_msg = "from cache"
+            documents.append(doc_info)
+        
+        # Documents needing a parse go to the scheduler; the rest are processed while it runs
+        to_parse: Dict[str, List[Dict[str, str]]] = {}
+        ready = []
+        for doc_info in documents:
+            pdf_path = doc_info['pdf_path']
+            if pdf_path in to_parse:
+                to_parse[pdf_path].append(doc_info)
+            elif self.is_file_cached(pdf_path) or self.is_file_processed_with_strategy(
+                    pdf_path, strategy, doc_info.get('company_name'), doc_info.get('financial_year')):
+                ready.append(doc_info)
+            else:
+                to_parse[pdf_path] = [doc_info]
+        
+        parsed: asyncio.Queue = asyncio.Queue()
+        
+        async def collect_parses():
+            async for outcome in self.aparse_documents(list(to_parse)):
+                await parsed.put(outcome)
+        
+        collector = asyncio.create_task(collect_parses()) if to_parse else None
+        
+        async def ready_documents():
+            for doc_info in ready:
+                yield doc_info, None
+            for _ in range(len(to_parse)):
+                outcome = await parsed.get()
+                for doc_info in to_parse[outcome.pdf_path]:
+                    yield doc_info, outcome
+        
+        try:
+            async for doc_info, outcome in ready_documents():
+                pdf_path = doc_info['pdf_path']
+                company_name = doc_info.get('company_name')
+                financial_year = doc_info.get('financial_year')
+                
+                self.logger.info(f"Processing: {Path(pdf_path).name} | Company: {company_name or 'Unknown'} | Year: {financial_year or 'Unknown'}")
+                
+                if outcome is not None and not outcome.is_successful:
+                    result = ProcessingResult(status="error", document_path=pdf_path, processing_strategy=strategy)
+                    result.add_error(f"Processing failed: {outcome.error or 'No content extracted from PDF'}")
+                    result.processing_time = outcome.seconds
                 else:
-                    status_msg = "freshly parsed"
+                    # Chunking and storage run in a thread so parse jobs keep progressing
+                    result = await asyncio.to_thread(self.process_document, pdf_path, strategy,
+                                                     company_name, financial_year,
+                                                     outcome.pages if outcome is not None else None)
+                all_results.append(result)
                 
-                self.logger.info(f"✅ Success ({status_msg}): {result.total_chunks} chunks, {result.total_tables} tables")
-            else:
-                failed_count += 1
-                self.logger.error(f"❌ Failed: {result.errors[0] if result.errors else 'Unknown error'}")
+                if result.is_successful:
+                    successful_count += 1
+                    # Determine status message
+                    if result.reused_existing:
+                        status_msg = "reused"
+                    elif result.document_metadata.get('was_cached'):
+                        status_msg = "from cache"
+                    else:
+                        status_msg = "freshly parsed"
+                    
+                    self.logger.info(f"✅ Success ({status_msg}): {result.total_chunks} chunks, {result.total_tables} tables")
+                else:
+                    failed_count += 1
+                    self.logger.error(f"❌ Failed: {result.errors[0] if result.errors else 'Unknown error'}")
+        finally:
+            if collector:
+                collector.cancel()
+                await asyncio.gather(collector, return_exceptions=True)
         
         # Combine results
         summary = {
@@ -1119,18 +1316,7 @@ class FinancialDocumentProcessor:
     
     def search_documents(self, query: str, top_k: int = 5) -> Dict[str, Any]:
         """Search processed documents"""
-        # Generate query embedding using Ollama directly (same as original)
-        try:
-            response = ollama.embeddings(
-                model=self.ollama_embed_model,
-                prompt=query
-            )
-            query_embedding = response['embedding']
-        except Exception as e:
-            self.logger.error(f"Error generating query embedding: {e}")
-            return {"chunks": [], "total_results": 0}
-        
-        # Search using direct ChromaDB method like original
+        # search_chunks embeds the query (when needed) and caches results
         results = self.search_chunks(query, top_k)
         
         # Convert to expected format
@@ -1170,7 +1356,8 @@ class FinancialDocumentProcessor:
                 },
                 "postgresql_stats": {
                     "available": self.pg_engine is not None
-                }
+                },
+                "search_cache_stats": self.search_cache.stats()
             }
             
             if self.pg_engine:
@@ -1196,7 +1383,10 @@ class FinancialDocumentProcessor:
         document_metadata["chunking_strategy"] = strategy
         
         # Store in ChromaDB
-        self._store_in_chromadb(chunks, document_metadata)
+        try:
+            self._store_in_chromadb(chunks, document_metadata)
+        finally:
+            self.search_cache.invalidate()
         
         # Store in PostgreSQL if available
         if self.pg_engine:
@@ -1215,6 +1405,18 @@ class FinancialDocumentProcessor:
                 # Convert complex types to strings
                 flattened_doc_metadata[f"doc_{key}"] = str(value)
         
+        lexical_entries = []
+        try:
+            self._store_chunks_in_collections(chunks, flattened_doc_metadata, lexical_entries)
+        finally:
+            # Index whatever reached ChromaDB, even if a later chunk failed
+            self.lexical_index.add(lexical_entries)
+        
+        self.logger.info("Successfully stored all chunks in ChromaDB")
+    
+    def _store_chunks_in_collections(self, chunks: List[DocumentChunk], flattened_doc_metadata: Dict[str, Any],
+                                     lexical_entries: List[tuple]):
+        """Add chunks and their tables to the ChromaDB collections"""
         for chunk in chunks:
             if chunk.embeddings:
                 # Prepare chunk metadata (ensure all values are simple types)
@@ -1237,6 +1439,7 @@ class FinancialDocumentProcessor:
                     metadatas=[chunk_metadata],
                     ids=[chunk.id]
                 )
+                lexical_entries.append((chunk.id, chunk.content, chunk_metadata))
                 self.logger.debug(f"Stored chunk {chunk.id} in ChromaDB")
                 
                 # Store tables separately
@@ -1301,10 +1504,7 @@ class FinancialDocumentProcessor:
                             column_count = 0
                         
                         # Generate embedding for table
-                        table_embedding = ollama.embeddings(
-                            model=self.ollama_embed_model,
-                            prompt=table_text
-                        )['embedding']
+                        table_embedding = self.embed_text(table_text)
                         
                         table_metadata = {
                             "chunk_id": chunk.id,
@@ -1327,8 +1527,6 @@ class FinancialDocumentProcessor:
                     except Exception as e:
                         self.logger.error(f"Error storing table in chunk {chunk.id}: {e}")
                         # Continue with next table instead of failing completely
-        
-        self.logger.info("Successfully stored all chunks in ChromaDB")
     
     def _store_in_postgresql(self, chunks: List[DocumentChunk], document_metadata: Dict[str, Any]):
         """Store chunks in PostgreSQL"""
@@ -1394,24 +1592,14 @@ class FinancialDocumentProcessor:
             raise
     
     def search_chunks(self, query: str, top_k: int = 5) -> Dict[str, Any]:
-        """Search for relevant chunks using semantic similarity"""
+        """Search for relevant chunks using BM25 and semantic similarity (fused with RRF)"""
         self.logger.info(f"Searching for chunks with query: '{query}' (top_k={top_k})")
         try:
-            # Generate query embedding
-            query_embedding = ollama.embeddings(
-                model=self.ollama_embed_model,
-                prompt=query
-            )['embedding']
-            
-            # Search in ChromaDB
-            results = self.chunks_collection.query(
-                query_embeddings=[query_embedding],
-                n_results=top_k
-            )
+            results = self._hybrid_query(query, top_k)
             
             # Log search results
             if results and 'documents' in results and results['documents']:
-                self.logger.info(f"Found {len(results['documents'])} relevant chunks")
+                self.logger.info(f"Found {len(results['documents'][0])} relevant chunks ({results['retrieval']})")
             else:
                 self.logger.info("No relevant chunks found")
             
@@ -1431,6 +1619,136 @@ class FinancialDocumentProcessor:
                 "included": []
             }
     
+    def _is_exact_match_query(self, query: str) -> bool:
+        """Queries with figures, years or quoted phrases may be answered from the lexical index alone"""
+        return bool(re.search(r'[\d"]', query))
+    
+    def _hybrid_query(self, query: str, top_k: int, where: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Lexical + vector search fused with reciprocal rank fusion.
+        
+        Exact-match queries skip the Ollama embedding when at least top_k chunks
+        contain every query term. Results keep the ChromaDB query format, plus
+        'scores' and 'retrieval' ("lexical", "vector" or "hybrid").
+        """
+        return self._hybrid_query_many([query], top_k, where)[0]
+    
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed several queries in one Ollama request"""
+        try:
+            return ollama.embed(model=self.ollama_embed_model, input=queries)['embeddings']
+        except Exception as e:
+            # Older Ollama servers only have the single-prompt embeddings endpoint
+            self.logger.warning(f"Batch embedding failed ({e}), embedding queries one at a time")
+            return [ollama.embeddings(model=self.ollama_embed_model, prompt=query)['embedding'] for query in queries]
+    
+    def _hybrid_query_many(self, queries: List[str], top_k: int,
+                           where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Run _hybrid_query for several queries with one embedding request and one
+        ChromaDB query for all of those that need vector search and aren't cached.
+        """
+        keys = [self.search_cache.key(query, where, top_k) for query in queries]
+        results = [self.search_cache.get(key) for key in keys]
+        
+        uncached = [i for i, result in enumerate(results) if result is None]
+        if uncached:
+            fresh, cacheable = self._run_hybrid_queries([queries[i] for i in uncached], top_k, where)
+            for i, result, complete in zip(uncached, fresh, cacheable):
+                results[i] = result
+                if complete:
+                    self.search_cache.put(keys[i], result)
+        
+        if len(uncached) < len(queries):
+            self.logger.info(f"Search cache: {len(queries) - len(uncached)} of {len(queries)} queries cached")
+        return results
+    
+    def _run_hybrid_queries(self, queries: List[str], top_k: int,
+                            where: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], List[bool]]:
+        """Uncached _hybrid_query_many; also says which results are complete enough to cache"""
+        candidates = max(top_k * 3, 20)
+        lexical_hits = [self.lexical_index.search(query, candidates, where=where) for query in queries]
+        
+        rankings: List[Optional[tuple]] = [None] * len(queries)
+        to_embed = []
+        for i, (query, hits) in enumerate(zip(queries, lexical_hits)):
+            full_matches = [hit for hit in hits if hit["matched_terms"] == hit["query_terms"]]
+            if self.lexical_skip_embedding and self._is_exact_match_query(query) and len(full_matches) >= top_k:
+                self.logger.info(f"Answering exact-match query '{query}' from the lexical index")
+                rankings[i] = ([(hit["id"], hit["score"]) for hit in full_matches[:top_k]], "lexical")
+            else:
+                to_embed.append(i)
+        
+        vector_results = None
+        if to_embed:
+            try:
+                query_args = {
+                    "query_embeddings": self._embed_queries([queries[i] for i in to_embed]),
+                    "n_results": candidates
+                }
+                if where:
+                    query_args["where"] = where
+                vector_results = self.chunks_collection.query(**query_args)
+            except Exception as e:
+                if not any(lexical_hits[i] for i in to_embed):
+                    raise
+                self.logger.warning(f"Vector search failed ({e}), using lexical results only")
+        
+        found = {}
+        distances = [{} for _ in queries]
+        for row, i in enumerate(to_embed):
+            hits = lexical_hits[i]
+            if vector_results is None:
+                rankings[i] = ([(hit["id"], hit["score"]) for hit in hits[:top_k]], "lexical")
+                continue
+            
+            vector_ids = vector_results['ids'][row]
+            for j, chunk_id in enumerate(vector_ids):
+                found[chunk_id] = (vector_results['documents'][row][j], vector_results['metadatas'][row][j])
+                distances[i][chunk_id] = vector_results['distances'][row][j]
+            
+            if hits:
+                fused = reciprocal_rank_fusion([vector_ids, [hit["id"] for hit in hits]], k=self.hybrid_rrf_k)
+                rankings[i] = (fused[:top_k], "hybrid")
+            else:
+                fused = [(chunk_id, 1.0 / (self.hybrid_rrf_k + rank)) for rank, chunk_id in enumerate(vector_ids, start=1)]
+                rankings[i] = (fused[:top_k], "vector")
+        
+        # Chunks only found lexically are fetched once, however many queries hit them
+        missing = list(dict.fromkeys(
+            chunk_id for ranked, _ in rankings for chunk_id, _ in ranked if chunk_id not in found
+        ))
+        if missing:
+            stored = self.chunks_collection.get(ids=missing, include=["documents", "metadatas"])
+            for chunk_id, document, metadata in zip(stored['ids'], stored['documents'], stored['metadatas']):
+                found[chunk_id] = (document, metadata)
+        
+        results = [
+            self._format_ranked_chunks(ranked, found, query_distances, retrieval)
+            for (ranked, retrieval), query_distances in zip(rankings, distances)
+        ]
+        # Lexical fallbacks for a failed vector search aren't cached
+        cacheable = [vector_results is not None or i not in to_embed for i in range(len(queries))]
+        return results, cacheable
+    
+    def _format_ranked_chunks(self, ranked: List[tuple], found: Dict[str, tuple],
+                              distances: Dict[str, float], retrieval: str) -> Dict[str, Any]:
+        """Build a ChromaDB-style result for ranked (chunk_id, score) pairs"""
+        ranked = [(chunk_id, score) for chunk_id, score in ranked if chunk_id in found]
+        return {
+            "ids": [[chunk_id for chunk_id, _ in ranked]],
+            "documents": [[found[chunk_id][0] for chunk_id, _ in ranked]],
+            "metadatas": [[found[chunk_id][1] for chunk_id, _ in ranked]],
+            # Lexical-only hits have no vector distance
+            "distances": [[distances.get(chunk_id, 1.0) for chunk_id, _ in ranked]],
+            "scores": [[score for _, score in ranked]],
+            "retrieval": retrieval,
+            "embeddings": None,
+            "uris": None,
+            "data": None,
+            "included": ["documents", "metadatas", "distances"]
+        }
+    
     def is_file_processed_with_strategy(self, pdf_path: str, strategy: str, company_name: str = None, financial_year: str = None) -> bool:
         """Check if a file has been processed with a specific chunking strategy"""
         try:
@@ -1499,6 +1817,7 @@ class FinancialDocumentProcessor:
                 documents=[f"Processed {file_path.name} with {strategy} chunking for {company_name or 'Unknown'} {financial_year or 'Unknown'}"],
                 metadatas=[flattened_metadata]
             )
+            self.search_cache.invalidate()
             
             self.logger.info(f"Marked file {file_path.name} as processed with {strategy} strategy for {company_name or 'Unknown'} {financial_year or 'Unknown'}")
             
@@ -1619,6 +1938,42 @@ class FinancialDocumentProcessor:
             self.logger.error(f"Error retrieving chunks by strategy: {e}")
             return []
     
+    def backfill_normalized_metadata(self, batch_size: int = 500) -> Dict[str, int]:
+        """
+        Add the normalized ticker and fy_end fields to chunks stored before they existed.
+        
+        Args:
+            batch_size: Number of chunks read and updated per ChromaDB call
+            
+        Returns:
+            Counts of scanned, updated and unresolved (no ticker or year found) chunks
+        """
+        total = self.chunks_collection.count()
+        self.logger.info(f"Backfilling normalized metadata for {total} chunks")
+        
+        stats = {"scanned": 0, "updated": 0, "unresolved": 0}
+        for offset in range(0, total, batch_size):
+            batch = self.chunks_collection.get(offset=offset, limit=batch_size, include=["metadatas"])
+            updates = {}
+            for chunk_id, metadata in zip(batch['ids'], batch['metadatas']):
+                metadata = metadata or {}
+                normalized = normalize_chunk_metadata(metadata)
+                if len(normalized) < 2:
+                    stats["unresolved"] += 1
+                if any(metadata.get(key) != value for key, value in normalized.items()):
+                    updates[chunk_id] = {**metadata, **normalized}
+            stats["scanned"] += len(batch['ids'])
+            
+            if updates:
+                self.chunks_collection.update(ids=list(updates), metadatas=list(updates.values()))
+                self.lexical_index.update_metadata(updates)
+                self.search_cache.invalidate()
+                stats["updated"] += len(updates)
+        
+        self.logger.info(f"Backfill complete: {stats['updated']} of {stats['scanned']} chunks updated, "
+                         f"{stats['unresolved']} without a ticker or financial year")
+        return stats
+    
     def create_tables(self):
         """Create PostgreSQL tables for storing processed documents and chunks"""
         if not self.pg_engine:
@@ -1672,6 +2027,75 @@ class FinancialDocumentProcessor:
             self.logger.error(f"Error creating PostgreSQL tables: {e}")
             raise
 
+    def _build_search_filter(self, company_name: str = None, financial_years: List[str] = None,
+                             default_years: bool = False) -> Optional[Dict[str, Any]]:
+        """Where clause on the normalized ticker and fy_end fields (default_years: last 10 years when none given)"""
+        where_conditions = []
+        
+        if company_name:
+            ticker = canonical_ticker(company_name)
+            if ticker:
+                where_conditions.append({"ticker": {"$eq": ticker}})
+            else:
+                where_conditions.append({"company_name": {"$eq": company_name}})
+        
+        if financial_years or default_years:
+            where_conditions.append(fiscal_year_filter(financial_years))
+        
+        if not where_conditions:
+            return None
+        return where_conditions[0] if len(where_conditions) == 1 else {"$and": where_conditions}
+    
+    def search_many(self, queries: List[str], filters: Optional[Dict[str, Any]] = None, top_k: int = 5) -> Dict[str, Any]:
+        """
+        Search several related questions at once (e.g. profiling one filing).
+        
+        All queries that need vector search are embedded in one batch and sent
+        as a single ChromaDB query; chunks hit by several queries are returned once.
+        
+        Args:
+            queries: Search query texts
+            filters: Optional {"company_name": ..., "financial_years": [...]} applied to every query
+            top_k: Number of results per query
+            
+        Returns:
+            Dictionary with per-query ranked chunk ids, scores and distances under
+            'results', and the content and metadata of every hit chunk under 'chunks'
+        """
+        filters = filters or {}
+        queries = list(dict.fromkeys(queries))
+        self.logger.info(f"Searching {len(queries)} queries | Filters: {filters or 'None'} (top_k={top_k})")
+        
+        search_metadata = {
+            "queries": len(queries),
+            "company_name": filters.get("company_name"),
+            "financial_years": filters.get("financial_years"),
+            "search_timestamp": self._get_current_timestamp()
+        }
+        
+        try:
+            where_clause = self._build_search_filter(filters.get("company_name"), filters.get("financial_years"))
+            query_results = self._hybrid_query_many(queries, top_k, where=where_clause) if queries else []
+        except Exception as e:
+            self.logger.error(f"Error in multi-query search: {e}")
+            return {"results": {}, "chunks": {}, "total_results": 0, "error": str(e), "search_metadata": search_metadata}
+        
+        results = {}
+        chunks = {}
+        for query, result in zip(queries, query_results):
+            ids = result['ids'][0]
+            results[query] = {
+                "ids": ids,
+                "scores": result['scores'][0],
+                "distances": result['distances'][0],
+                "retrieval": result['retrieval']
+            }
+            for chunk_id, document, metadata in zip(ids, result['documents'][0], result['metadatas'][0]):
+                chunks[chunk_id] = {"content": document, "metadata": metadata}
+        
+        self.logger.info(f"Found {len(chunks)} unique chunks for {len(queries)} queries")
+        return {"results": results, "chunks": chunks, "total_results": len(chunks), "search_metadata": search_metadata}
+    
     def search_by_company_and_year(self, query: str, company_name: str = None, 
                                   financial_years: List[str] = None, top_k: int = 5) -> Dict[str, Any]:
         """
@@ -1679,8 +2103,9 @@ class FinancialDocumentProcessor:
         
         Args:
             query: Search query text
-            company_name: Company name to filter by (optional)
-            financial_years: List of financial years to search in (optional)
+            company_name: Company name or ticker to filter by (optional)
+            financial_years: List of financial years to search in, in any spelling
+                such as "FY2023" or "2022-23" (optional, defaults to the last 10 years)
             top_k: Number of results to return
             
         Returns:
@@ -1689,69 +2114,18 @@ class FinancialDocumentProcessor:
         self.logger.info(f"Searching for query: '{query}' | Company: {company_name or 'Any'} | Years: {financial_years or 'Last 10 years'}")
         
         try:
-            # Generate query embedding using Ollama
-            response = ollama.embeddings(
-                model=self.ollama_embed_model,
-                prompt=query
-            )
-            query_embedding = response['embedding']
-            
-            # Build filter conditions
-            where_conditions = []
-            
-            if company_name:
-                where_conditions.append({"company_name": {"$eq": company_name}})
-            
-            if financial_years:
-                # Filter by specific financial years
-                year_conditions = [{"financial_year": {"$eq": year}} for year in financial_years]
-                if len(year_conditions) == 1:
-                    where_conditions.extend(year_conditions)
-                else:
-                    where_conditions.append({"$or": year_conditions})
-            else:
-                # Default: search last 10 years (generate common financial year patterns)
-                current_year = datetime.now().year
-                default_years = []
-                for i in range(10):
-                    year = current_year - i
-                    # Add common financial year formats
-                    default_years.extend([
-                        f"FY{year}",
-                        f"FY{str(year)[-2:]}",
-                        f"{year-1}-{str(year)[-2:]}",
-                        f"{year-1}-{year}",
-                        str(year)
-                    ])
-                
-                year_conditions = [{"financial_year": {"$eq": year}} for year in default_years]
-                if year_conditions:
-                    where_conditions.append({"$or": year_conditions})
+            # Default: search last 10 years
+            where_clause = self._build_search_filter(company_name, financial_years, default_years=True)
             
             # Perform the search
-            if where_conditions:
-                if len(where_conditions) == 1:
-                    where_clause = where_conditions[0]
-                else:
-                    where_clause = {"$and": where_conditions}
-                
-                results = self.chunks_collection.query(
-                    query_embeddings=[query_embedding],
-                    n_results=top_k,
-                    where=where_clause
-                )
-            else:
-                # No filters, search all
-                results = self.chunks_collection.query(
-                    query_embeddings=[query_embedding],
-                    n_results=top_k
-                )
+            results = self._hybrid_query(query, top_k, where=where_clause)
             
             # Format results
             formatted_results = {"chunks": [], "total_results": 0, "search_metadata": {
                 "query": query,
                 "company_name": company_name,
                 "financial_years": financial_years,
+                "retrieval": results['retrieval'],
                 "search_timestamp": self._get_current_timestamp()
             }}
             
@@ -1760,6 +2134,7 @@ class FinancialDocumentProcessor:
                 metadatas = results['metadatas'][0] if results['metadatas'] else []
                 distances = results['distances'][0] if results['distances'] else []
                 ids = results['ids'][0] if results['ids'] else []
+                scores = results['scores'][0] if results.get('scores') else []
                 
                 formatted_results["total_results"] = len(documents)
                 for i, doc in enumerate(documents):
@@ -1768,9 +2143,12 @@ class FinancialDocumentProcessor:
                         'content': doc,
                         'metadata': metadata,
                         'distance': distances[i] if i < len(distances) else 1.0,
+                        'score': scores[i] if i < len(scores) else 0.0,
                         'id': ids[i] if i < len(ids) else f"chunk_{i}",
                         'company_name': metadata.get('company_name', 'Unknown'),
                         'financial_year': metadata.get('financial_year', 'Unknown'),
+                        'ticker': metadata.get('ticker'),
+                        'fy_end': metadata.get('fy_end'),
                         'section': metadata.get('section', 'Unknown'),
                         'doc_file_name': metadata.get('doc_file_name', 'Unknown')
                     }
@@ -0,0 +1,149 @@
+"""
+Metadata Normalizer
+
+Canonical company tickers and integer fiscal-year ends for chunk metadata, so
+filtered search can use equality and range predicates instead of matching every
+spelling of a company name or financial year.
+"""
+
+import re
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+_EXCHANGE_SUFFIXES = (".NS", ".BO")
+# "2023-24", "2023-2024", "2023/24"
+_FY_RANGE_PATTERN = re.compile(r"(\d{4})\s*[-/–]\s*(\d{4}|\d{2})(?!\d)")
+# "FY2024", "FY24", "2024"
+_FY_SINGLE_PATTERN = re.compile(r"(?<!\d)(\d{4}|\d{2})(?!\d)")
+
+DEFAULT_YEARS_BACK = 10
+
+
+def parse_fy_end(financial_year: Union[str, int, None]) -> Optional[int]:
+    """
+    Year in which a financial year ends.
+
+    "FY2024", "FY24", "FY 2023-24", "2023-24", "2023-2024", "2023/24" and "2024"
+    all give 2024. Returns None when no year can be found.
+    """
+    if financial_year is None or isinstance(financial_year, bool):
+        return None
+    if isinstance(financial_year, int):
+        year = financial_year
+    else:
+        text = str(financial_year).strip()
+        match = _FY_RANGE_PATTERN.search(text)
+        if match:
+            start, end = int(match.group(1)), match.group(2)
+            if len(end) == 2:
+                # "1999-00" ends in 2000
+                year = start // 100 * 100 + int(end)
+                if year <= start:
+                    year += 100
+            else:
+                year = int(end)
+        else:
+            match = _FY_SINGLE_PATTERN.search(text)
+            if not match:
+                return None
+            year = int(match.group(1))
+            if year < 100:
+                year += 2000
+
+    return year if 1900 <= year <= 2100 else None
+
+
+@lru_cache(maxsize=1)
+def _get_ticker_manager():
+    try:
+        from utils.ticker_utils import ticker_manager
+        return ticker_manager
+    except ImportError as e:
+        logger.warning(f"Ticker database unavailable, using normalized company names as tickers: {e}")
+        return None
+
+
+@lru_cache(maxsize=1024)
+def canonical_ticker(company: Optional[str]) -> Optional[str]:
+    """
+    Canonical ticker for a company name or symbol.
+
+    Symbols ("HAL", "HAL.NS") and company names are resolved through the ticker
+    database. Names that can't be resolved fall back to an uppercase alphanumeric
+    key, so the same spelling still maps to the same value at ingest and search.
+    """
+    if not company or not str(company).strip():
+        return None
+
+    name = str(company).strip()
+    symbol = name.upper()
+    for suffix in _EXCHANGE_SUFFIXES:
+        if symbol.endswith(suffix):
+            symbol = symbol[:-len(suffix)]
+
+    manager = _get_ticker_manager()
+    if manager is not None:
+        if manager.get_company_info(symbol):
+            return symbol
+        resolved = manager.get_symbol_by_name(name)
+        if resolved:
+            return str(resolved).upper()
+
+    return re.sub(r"[^A-Z0-9]+", "", symbol) or None
+
+
+def normalize_chunk_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalized 'ticker' and 'fy_end' fields for chunk metadata.
+
+    Uses company_name/financial_year, falling back to the doc_-prefixed document
+    metadata. Fields that can't be derived are left out.
+    """
+    normalized = {}
+
+    company = metadata.get("company_name") or metadata.get("doc_company_name")
+    ticker = canonical_ticker(company) if company and company != "Unknown" else None
+    if ticker:
+        normalized["ticker"] = ticker
+
+    fy_end = parse_fy_end(metadata.get("financial_year") or metadata.get("doc_financial_year"))
+    if fy_end is not None:
+        normalized["fy_end"] = fy_end
+
+    return normalized
+
+
+def fiscal_year_filter(financial_years: Optional[List[Union[str, int]]] = None,
+                       years_back: int = DEFAULT_YEARS_BACK) -> Dict[str, Any]:
+    """
+    ChromaDB where clause on fy_end.
+
+    No years gives the last years_back financial years; contiguous years become
+    a $gte/$lte range and anything else an $in list. Unrecognized spellings are
+    matched against the stored financial_year text.
+    """
+    if not financial_years:
+        return {"fy_end": {"$gte": datetime.now().year - years_back + 1}}
+
+    years = []
+    clauses = []
+    for financial_year in financial_years:
+        fy_end = parse_fy_end(financial_year)
+        if fy_end is None:
+            clauses.append({"financial_year": {"$eq": str(financial_year)}})
+        else:
+            years.append(fy_end)
+
+    years = sorted(set(years))
+    if len(years) == 1:
+        clauses.insert(0, {"fy_end": {"$eq": years[0]}})
+    elif years and years[-1] - years[0] == len(years) - 1:
+        clauses.insert(0, {"$and": [{"fy_end": {"$gte": years[0]}}, {"fy_end": {"$lte": years[-1]}}]})
+    elif years:
+        clauses.insert(0, {"fy_end": {"$in": years}})
+
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
@@ -0,0 +1,84 @@
+"""
+Parse Scheduler
+
+Parses many PDFs concurrently with a bounded number of parse jobs in flight,
+and yields each document as soon as its parse completes, so callers can chunk
+and embed early documents while later ones are still being parsed.
+"""
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
+
+Pages = List[Dict[str, Any]]
+
+
+@dataclass
+class ParseOutcome:
+    """Result of parsing one PDF"""
+
+    pdf_path: str
+    pages: Pages = field(default_factory=list)
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def is_successful(self) -> bool:
+        return self.error is None and bool(self.pages)
+
+
+class ParseScheduler:
+    """
+    Runs parse(pdf_path) for many PDFs, at most max_concurrency at a time.
+
+    on_parsed(pdf_path, pages) is called for every successful parse as soon as
+    it completes (e.g. to write the parse cache), independently of how fast
+    the consumer iterates over the outcomes.
+    """
+
+    def __init__(self, parse: Callable[[str], Awaitable[Pages]], max_concurrency: int = 4,
+                 on_parsed: Optional[Callable[[str, Pages], None]] = None):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.parse = parse
+        self.max_concurrency = max(1, max_concurrency)
+        self.on_parsed = on_parsed
+
+    async def _parse_one(self, pdf_path: str, semaphore: asyncio.Semaphore) -> ParseOutcome:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                pages = await self.parse(pdf_path)
+                if not pages:
+                    raise ValueError("No content extracted from PDF")
+            except Exception as e:
+                self.logger.error(f"Error parsing PDF {pdf_path}: {e}")
+                return ParseOutcome(pdf_path, error=str(e), seconds=time.perf_counter() - start)
+
+            outcome = ParseOutcome(pdf_path, pages=pages, seconds=time.perf_counter() - start)
+            if self.on_parsed:
+                try:
+                    self.on_parsed(pdf_path, pages)
+                except Exception as e:
+                    self.logger.error(f"Error handling parsed PDF {pdf_path}: {e}")
+            self.logger.info(f"Parsed {pdf_path}: {len(pages)} pages in {outcome.seconds:.1f}s")
+            return outcome
+
+    async def run(self, pdf_paths: Iterable[str]) -> AsyncIterator[ParseOutcome]:
+        """Yield a ParseOutcome per PDF in completion order"""
+        pdf_paths = list(dict.fromkeys(pdf_paths))
+        if not pdf_paths:
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.logger.info(f"Parsing {len(pdf_paths)} PDFs, up to {self.max_concurrency} at a time")
+        tasks = [asyncio.create_task(self._parse_one(pdf_path, semaphore)) for pdf_path in pdf_paths]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Consumer stopped early: don't leave parse jobs running
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,299 @@
+"""
+PDF Parser Backends
+
+Turn a PDF into the LlamaParse JSON page schema the chunkers work on:
+
+    {"page": 1, "text": "...", "md": "...", "items": [
+        {"type": "heading", "lvl": 1, "value": "Balance Sheet", "md": "# Balance Sheet"},
+        {"type": "text", "value": "...", "md": "..."},
+        {"type": "table", "rows": [["Particulars", "2024"], ...], "md": "| Particulars | 2024 |\\n..."}
+    ]}
+
+LlamaParseBackend calls the LlamaParse service. LocalPDFParser runs offline on
+pdfplumber: headings from font size, tables from ruling lines, pages parsed in
+parallel across a process pool. aparse() lets ParseScheduler run several
+documents at once.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import statistics
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+try:
+    import pdfplumber
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    PDFPLUMBER_AVAILABLE = False
+
+# Line size relative to the document's body text size for heading levels 1 and 2
+HEADING_RATIOS = (1.6, 1.15)
+# Short all-bold lines in body size are level-3 headings
+BOLD_HEADING_MAX_CHARS = 80
+# Word gaps relative to font size; the fixed default glues words in PDFs without space characters
+TEXT_SETTINGS = {"x_tolerance_ratio": 0.15}
+
+
+class PDFParserBackend:
+    """Base class for PDF parsers producing LlamaParse-style page JSON"""
+
+    name = "base"
+
+    def parse(self, pdf_path: str) -> List[Dict[str, Any]]:
+        """Parse a PDF into a list of page dicts"""
+        raise NotImplementedError
+
+    async def aparse(self, pdf_path: str) -> List[Dict[str, Any]]:
+        """Async parse; runs parse() in a thread unless the backend has a native async API"""
+        return await asyncio.to_thread(self.parse, pdf_path)
+
+    def close(self):
+        """Release any workers held by the backend"""
+
+
+class LlamaParseBackend(PDFParserBackend):
+    """LlamaParse service (network, billed per page)"""
+
+    name = "llamaparse"
+
+    def __init__(self, api_key: str, language: str = "en"):
+        from llama_parse import LlamaParse
+
+        self.parser = LlamaParse(
+            api_key=api_key,
+            result_type="markdown",
+            verbose=True,
+            language=language
+        )
+
+    @staticmethod
+    def _pages(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not documents:
+            raise ValueError("No content extracted from PDF")
+        # Pages of the first (only) document
+        return documents[0]["pages"]
+
+    def parse(self, pdf_path: str) -> List[Dict[str, Any]]:
+        return self._pages(self.parser.get_json_result(pdf_path))
+
+    async def aparse(self, pdf_path: str) -> List[Dict[str, Any]]:
+        # Submits the job and polls it on the event loop; no thread held while waiting
+        return self._pages(await self.parser.aget_json(pdf_path))
+
+
+def _clean_cell(value: Any) -> str:
+    return " ".join(str(value).split()) if value is not None else ""
+
+
+def table_markdown(rows: List[List[str]]) -> str:
+    """Markdown table for extracted rows (first row is the header)"""
+    if not rows:
+        return ""
+    width = max(len(row) for row in rows)
+    lines = ["| " + " | ".join(row + [""] * (width - len(row))) + " |" for row in rows]
+    lines.insert(1, "|" + "---|" * width)
+    return "\n".join(lines)
+
+
+def body_text_size(pages: List[Dict[str, Any]]) -> float:
+    """Most common font size over all characters of the extracted pages"""
+    sizes = Counter()
+    for page in pages:
+        for line in page["lines"]:
+            sizes[round(line["size"], 1)] += len(line["text"])
+    return sizes.most_common(1)[0][0] if sizes else 0.0
+
+
+def build_page_items(lines: List[Dict[str, Any]], tables: List[Dict[str, Any]],
+                     body_size: float) -> List[Dict[str, Any]]:
+    """
+    Page items from text lines and tables in reading order.
+
+    Args:
+        lines: {"text", "top", "bottom", "size", "bold"} per text line (outside tables)
+        tables: {"top", "rows"} per table
+        body_size: Body text font size of the document
+
+    Returns:
+        heading/text/table items; consecutive lines of the same heading level or
+        of one paragraph are merged
+    """
+    def heading_level(line: Dict[str, Any]) -> Optional[int]:
+        if not body_size:
+            return None
+        if line["size"] >= body_size * HEADING_RATIOS[0]:
+            return 1
+        if line["size"] >= body_size * HEADING_RATIOS[1]:
+            return 2
+        text = line["text"].strip()
+        if line.get("bold") and len(text) <= BOLD_HEADING_MAX_CHARS and not text.endswith("."):
+            return 3
+        return None
+
+    blocks = [("table", table["top"], table) for table in tables]
+    blocks += [("line", line["top"], line) for line in lines]
+    blocks.sort(key=lambda block: block[1])
+
+    items: List[Dict[str, Any]] = []
+    previous = None  # (level, bottom) of the last line merged into items[-1]
+    for kind, top, block in blocks:
+        if kind == "table":
+            items.append({"type": "table", "rows": block["rows"], "md": table_markdown(block["rows"])})
+            previous = None
+            continue
+
+        text = block["text"].strip()
+        if not text:
+            continue
+        level = heading_level(block)
+        # A paragraph ends at a vertical gap of more than one line
+        gap = top - previous[1] if previous else None
+        same_block = previous is not None and previous[0] == level and gap is not None and gap < block["size"] * 1.2
+
+        if same_block:
+            separator = " " if level else "\n"
+            items[-1]["value"] += separator + text
+        elif level:
+            items.append({"type": "heading", "lvl": level, "value": text})
+        else:
+            items.append({"type": "text", "value": text})
+        previous = (level, block.get("bottom", top + block["size"]))
+
+    for item in items:
+        if item["type"] == "heading":
+            item["md"] = f"{'#' * item['lvl']} {item['value']}"
+        elif item["type"] == "text":
+            item["md"] = item["value"]
+    return items
+
+
+def _within(bbox: tuple, top: float, x0: float) -> bool:
+    return bbox[1] - 1 <= top <= bbox[3] + 1 and bbox[0] - 1 <= x0 <= bbox[2] + 1
+
+
+def _extract_page(page) -> Dict[str, Any]:
+    """Text lines (with font size) and tables of one pdfplumber page"""
+    tables = []
+    for table in page.find_tables():
+        rows = [[_clean_cell(cell) for cell in row] for row in table.extract()]
+        rows = [row for row in rows if any(row)]
+        if rows:
+            tables.append({"top": table.bbox[1], "bbox": list(table.bbox), "rows": rows})
+
+    lines = []
+    for line in page.extract_text_lines(return_chars=True, **TEXT_SETTINGS):
+        if any(_within(table["bbox"], line["top"], line["x0"]) for table in tables):
+            continue
+        chars = line.get("chars") or []
+        lines.append({
+            "text": line["text"],
+            "top": line["top"],
+            "bottom": line["bottom"],
+            "size": statistics.median(char["size"] for char in chars) if chars else 0.0,
+            "bold": bool(chars) and all("Bold" in char.get("fontname", "") for char in chars if char["text"].strip()),
+        })
+
+    return {
+        "page": page.page_number,
+        "text": page.extract_text(**TEXT_SETTINGS) or "",
+        "width": float(page.width),
+        "height": float(page.height),
+        "lines": lines,
+        "tables": tables,
+    }
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[Dict[str, Any]]:
+    """Extract pages [start, end) (0-based); runs in a worker process"""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [_extract_page(pdf.pages[index]) for index in range(start, end)]
+
+
+def assemble_pages(extracted: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """LlamaParse-style pages from extracted pages, with headings sized against the whole document"""
+    body_size = body_text_size(extracted)
+    pages = []
+    for page in extracted:
+        items = build_page_items(page["lines"], page["tables"], body_size)
+        pages.append({
+            "page": page["page"],
+            "text": page["text"],
+            "md": "\n\n".join(item["md"] for item in items),
+            "items": items,
+            "width": page["width"],
+            "height": page["height"],
+        })
+    return pages
+
+
+class LocalPDFParser(PDFParserBackend):
+    """
+    Offline parser on pdfplumber.
+
+    Pages are split into ranges of pages_per_task and parsed across a process
+    pool of max_workers (kept for later documents until close()); with one
+    worker, or a document of one range, pages are parsed in this process.
+    """
+
+    name = "local"
+
+    def __init__(self, max_workers: Optional[int] = None, pages_per_task: int = 8):
+        if not PDFPLUMBER_AVAILABLE:
+            raise ImportError("pdfplumber is required for the local PDF parser: pip install pdfplumber")
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_task = max(1, pages_per_task)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def parse(self, pdf_path: str) -> List[Dict[str, Any]]:
+        with pdfplumber.open(pdf_path) as pdf:
+            page_count = len(pdf.pages)
+        if not page_count:
+            raise ValueError("No content extracted from PDF")
+
+        ranges = [(start, min(start + self.pages_per_task, page_count))
+                  for start in range(0, page_count, self.pages_per_task)]
+        if self.max_workers == 1 or len(ranges) == 1:
+            return assemble_pages(_extract_page_range(pdf_path, 0, page_count))
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self.logger.info(f"Parsing {page_count} pages in {len(ranges)} ranges across {self.max_workers} processes")
+        futures = [self._executor.submit(_extract_page_range, pdf_path, start, end) for start, end in ranges]
+        return assemble_pages([page for future in futures for page in future.result()])
+
+    def close(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+PARSER_BACKENDS = ("llamaparse", "local")
+
+
+def create_parser_backend(name: str, llama_api_key: Optional[str] = None, max_workers: Optional[int] = None,
+                          pages_per_task: int = 8) -> PDFParserBackend:
+    """
+    Create a parser backend by name.
+
+    Args:
+        name: "llamaparse" (needs llama_api_key) or "local"
+        llama_api_key: LlamaParse API key
+        max_workers: Local parser processes (default: CPU count)
+        pages_per_task: Pages per local parser task
+    """
+    name = (name or "llamaparse").lower()
+    if name == "llamaparse":
+        if not llama_api_key:
+            raise ValueError("LLAMA_CLOUD_API_KEY not found in environment variables")
+        return LlamaParseBackend(llama_api_key)
+    if name == "local":
+        return LocalPDFParser(max_workers=max_workers, pages_per_task=pages_per_task)
+    raise ValueError(f"Unknown PDF parser backend: {name} (expected one of {', '.join(PARSER_BACKENDS)})")
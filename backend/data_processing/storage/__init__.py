@@ -8,9 +8,17 @@ including ChromaDB for vector storage and PostgreSQL for structured data.
 from .chroma_manager import ChromaManager
 from .postgres_manager import PostgresManager
 from .data_layer import DataLayer
+from .lexical_index import LexicalIndex, get_lexical_index
+from .search_cache import SearchCache, get_search_cache
+from .line_item_store import LineItemStore
 
 __all__ = [
     "ChromaManager",
     "PostgresManager",
-    "DataLayer"
-] 
\ No newline at end of file
+    "DataLayer",
+    "LexicalIndex",
+    "get_lexical_index",
+    "SearchCache",
+    "get_search_cache",
+    "LineItemStore"
+]
\ No newline at end of file
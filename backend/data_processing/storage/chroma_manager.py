@@ -12,6 +12,8 @@ import chromadb
 import uuid
 
 from ..schemas.document_chunk import DocumentChunk
+from .lexical_index import get_lexical_index
+from .search_cache import get_search_cache
 
 
 class ChromaManager:
@@ -52,6 +54,10 @@ class ChromaManager:
             metadata={"hnsw:space": "cosine"}
         )
         
+        # BM25 index over the same chunks (see FinancialDocumentProcessor.search_chunks)
+        self.lexical_index = get_lexical_index(os.path.join(self.db_path, "lexical_index"))
+        self.search_cache = get_search_cache(self.db_path)
+        
         self.logger.info(f"ChromaDB initialized at: {self.db_path}")
     
     def store_chunks(self, chunks: List[DocumentChunk], document_metadata: Dict[str, Any]) -> bool:
@@ -104,6 +110,8 @@ class ChromaManager:
                     embeddings=chunk_embeddings,
                     metadatas=chunk_metadatas
                 )
+                self.lexical_index.add(list(zip(chunk_ids, chunk_documents, chunk_metadatas)))
+                self.search_cache.invalidate()
                 
                 self.logger.info(f"Stored {len(chunk_ids)} chunks in ChromaDB")
                 
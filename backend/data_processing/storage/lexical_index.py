@@ -0,0 +1,382 @@
+"""
+Lexical Index
+
+In-process BM25 inverted index over document chunk content, persisted next to
+the ChromaDB directory and fused with vector search via reciprocal rank fusion.
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import logging
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+INDEX_VERSION = 1
+TOKENIZER_VERSION = 1
+
+# Words and numbers; thousands separators are dropped so "1,23,456.7" == "123456.7"
+_TOKEN_PATTERN = re.compile(r"[a-z]+|\d+(?:[.,]\d+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+# Long metadata strings aren't useful as filters and would bloat the index
+_MAX_METADATA_VALUE_LENGTH = 200
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word and number tokens without stopwords"""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if token[0].isdigit():
+            token = token.replace(",", "")
+        elif token in _STOPWORDS:
+            continue
+        tokens.append(token)
+    return tokens
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a ChromaDB-style where clause ($eq, $ne, $in, $nin, $gt, $gte, $lt, $lte, $and, $or)"""
+    if not where:
+        return True
+
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+            continue
+
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, expected in condition.items():
+            try:
+                if op == "$eq":
+                    ok = value == expected
+                elif op == "$ne":
+                    ok = value != expected
+                elif op == "$in":
+                    ok = value in expected
+                elif op == "$nin":
+                    ok = value not in expected
+                elif op == "$gt":
+                    ok = value is not None and value > expected
+                elif op == "$gte":
+                    ok = value is not None and value >= expected
+                elif op == "$lt":
+                    ok = value is not None and value < expected
+                elif op == "$lte":
+                    ok = value is not None and value <= expected
+                else:
+                    raise ValueError(f"Unsupported where operator: {op}")
+            except TypeError:
+                ok = False
+            if not ok:
+                return False
+    return True
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists; each list contributes 1 / (k + rank) per id"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over chunk content.
+
+    Chunks are added incrementally and appended to docs.jsonl in the index
+    directory; loading replays the journal. Re-adding a chunk id replaces it.
+    """
+
+    def __init__(self, index_dir: str, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize the lexical index.
+
+        Args:
+            index_dir: Directory holding meta.json and docs.jsonl
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.index_dir = Path(index_dir)
+        self.k1 = k1
+        self.b = b
+
+        self.meta_file = self.index_dir / "meta.json"
+        self.docs_file = self.index_dir / "docs.jsonl"
+
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_ids: List[Optional[str]] = []
+        self._doc_lengths: List[int] = []
+        self._doc_terms: List[Optional[Dict[str, int]]] = []
+        self._doc_metadata: List[Optional[Dict[str, Any]]] = []
+        self._id_to_doc: Dict[str, int] = {}
+        self._total_length = 0
+        self._journal_records = 0
+
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._id_to_doc)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._id_to_doc
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+
+        if self.meta_file.exists():
+            try:
+                with open(self.meta_file, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+            except Exception as e:
+                self.logger.warning(f"Unreadable lexical index metadata, rebuilding: {e}")
+                meta = {}
+            if meta.get("version") != INDEX_VERSION or meta.get("tokenizer") != TOKENIZER_VERSION:
+                self.logger.info("Lexical index format changed - starting a new index")
+                self.docs_file.unlink(missing_ok=True)
+
+        with open(self.meta_file, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "tokenizer": TOKENIZER_VERSION}, f)
+
+        if not self.docs_file.exists():
+            return
+
+        torn = False
+        with open(self.docs_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    torn = True  # partially written last batch
+                    break
+                self._journal_records += 1
+                if record.get("op") == "delete":
+                    self._remove(record["id"])
+                else:
+                    self._insert(record["id"], record["tf"], record["len"], record.get("meta", {}))
+
+        if torn or self._journal_records > 2 * max(len(self), 1000):
+            self.compact()
+        self.logger.info(f"Lexical index loaded with {len(self)} chunks from {self.index_dir}")
+
+    def _append(self, records: List[Dict[str, Any]]):
+        with open(self.docs_file, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_records += len(records)
+
+    def compact(self):
+        """Rewrite the journal with only the live chunks"""
+        with self._lock:
+            tmp_file = self.docs_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                for doc in self._id_to_doc.values():
+                    f.write(json.dumps(self._record(doc)) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            tmp_file.replace(self.docs_file)
+            self._journal_records = len(self)
+
+    def _record(self, doc: int) -> Dict[str, Any]:
+        return {
+            "id": self._doc_ids[doc],
+            "tf": self._doc_terms[doc],
+            "len": self._doc_lengths[doc],
+            "meta": self._doc_metadata[doc]
+        }
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def _insert(self, chunk_id: str, term_counts: Dict[str, int], length: int, metadata: Dict[str, Any]):
+        self._remove(chunk_id)
+        doc = len(self._doc_ids)
+        self._doc_ids.append(chunk_id)
+        self._doc_lengths.append(length)
+        self._doc_terms.append(term_counts)
+        self._doc_metadata.append(metadata)
+        self._id_to_doc[chunk_id] = doc
+        self._total_length += length
+        for term, count in term_counts.items():
+            self._postings.setdefault(term, {})[doc] = count
+
+    def _remove(self, chunk_id: str):
+        doc = self._id_to_doc.pop(chunk_id, None)
+        if doc is None:
+            return
+        for term in self._doc_terms[doc]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths[doc]
+        self._doc_ids[doc] = None
+        self._doc_terms[doc] = None
+        self._doc_metadata[doc] = None
+
+    @staticmethod
+    def _filterable_metadata(metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            key: value for key, value in (metadata or {}).items()
+            if isinstance(value, (int, float, bool))
+            or (isinstance(value, str) and len(value) <= _MAX_METADATA_VALUE_LENGTH)
+        }
+
+    def add(self, chunks: List[Tuple[str, str, Optional[Dict[str, Any]]]]):
+        """
+        Index (chunk_id, content, metadata) entries and persist them as one batch.
+
+        Args:
+            chunks: Chunks to add; an existing chunk id is replaced
+        """
+        records = []
+        for chunk_id, content, metadata in chunks:
+            tokens = tokenize(content or "")
+            term_counts: Dict[str, int] = {}
+            for token in tokens:
+                term_counts[token] = term_counts.get(token, 0) + 1
+            records.append({
+                "id": chunk_id,
+                "tf": term_counts,
+                "len": len(tokens),
+                "meta": self._filterable_metadata(metadata)
+            })
+
+        if not records:
+            return
+        with self._lock:
+            for record in records:
+                self._insert(record["id"], record["tf"], record["len"], record["meta"])
+            self._append(records)
+        self.logger.info(f"Lexical index: added {len(records)} chunks ({len(self)} total)")
+
+    def delete(self, chunk_ids: List[str]):
+        """Remove chunks from the index"""
+        with self._lock:
+            present = [chunk_id for chunk_id in chunk_ids if chunk_id in self._id_to_doc]
+            for chunk_id in present:
+                self._remove(chunk_id)
+            if present:
+                self._append([{"op": "delete", "id": chunk_id} for chunk_id in present])
+
+    def update_metadata(self, updates: Dict[str, Dict[str, Any]]):
+        """Merge metadata fields into already indexed chunks"""
+        with self._lock:
+            records = []
+            for chunk_id, fields in updates.items():
+                doc = self._id_to_doc.get(chunk_id)
+                if doc is None:
+                    continue
+                self._doc_metadata[doc].update(self._filterable_metadata(fields))
+                records.append(self._record(doc))
+            if records:
+                self._append(records)
+
+    def sync_with_collection(self, collection, batch_size: int = 500):
+        """
+        Bring the index in line with a ChromaDB collection.
+
+        Chunks missing from the index are added (backfill for databases built
+        before the index existed) and chunks no longer in the collection are removed.
+        """
+        stored_ids = set(collection.get(include=[])["ids"])
+        missing = [chunk_id for chunk_id in stored_ids if chunk_id not in self._id_to_doc]
+        stale = [chunk_id for chunk_id in self._id_to_doc if chunk_id not in stored_ids]
+        self.logger.info(f"Syncing lexical index: {len(missing)} chunks to add, {len(stale)} to remove")
+
+        for start in range(0, len(missing), batch_size):
+            batch = collection.get(ids=missing[start:start + batch_size], include=["documents", "metadatas"])
+            self.add(list(zip(batch["ids"], batch["documents"], batch["metadatas"])))
+        self.delete(stale)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, query: str, top_k: int = 10,
+               where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        BM25 search.
+
+        Args:
+            query: Query text
+            top_k: Maximum number of results
+            where: Optional ChromaDB-style metadata filter
+
+        Returns:
+            Hits ordered by score: {"id", "score", "matched_terms", "query_terms", "metadata"}
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or top_k <= 0:
+            return []
+
+        with self._lock:
+            doc_count = len(self)
+            if doc_count == 0:
+                return []
+            avg_length = self._total_length / doc_count
+
+            scores: Dict[int, float] = {}
+            matched: Dict[int, int] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc] / avg_length)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+                    matched[doc] = matched.get(doc, 0) + 1
+
+            if where:
+                candidates = ((doc, score) for doc, score in scores.items()
+                              if matches_where(self._doc_metadata[doc], where))
+            else:
+                candidates = scores.items()
+            best = heapq.nlargest(top_k, candidates, key=lambda item: item[1])
+
+            return [
+                {
+                    "id": self._doc_ids[doc],
+                    "score": score,
+                    "matched_terms": matched[doc],
+                    "query_terms": len(terms),
+                    "metadata": dict(self._doc_metadata[doc])
+                }
+                for doc, score in best
+            ]
+
+
+_indexes: Dict[str, LexicalIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_lexical_index(index_dir: str) -> LexicalIndex:
+    """Get the shared lexical index for a directory (one instance per process)"""
+    key = str(Path(index_dir).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = LexicalIndex(index_dir)
+        return _indexes[key]
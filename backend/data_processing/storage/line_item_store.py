@@ -0,0 +1,321 @@
+"""
+Line Item Store
+
+Long-format numeric store of financial statement line items extracted from
+filings, keyed by (ticker, fiscal_year, statement, line_item, period) and
+indexed for direct lookup of figures such as EPS or revenue.
+"""
+
+import re
+import logging
+from typing import List, Dict, Any, Optional, Iterable
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+# Multipliers for amounts stated in Indian (and international) units
+UNIT_MULTIPLIERS = {
+    "crore": 1e7,
+    "crores": 1e7,
+    "cr": 1e7,
+    "lakh": 1e5,
+    "lakhs": 1e5,
+    "lac": 1e5,
+    "lacs": 1e5,
+    "million": 1e6,
+    "millions": 1e6,
+    "mn": 1e6,
+    "billion": 1e9,
+    "thousand": 1e3,
+    "thousands": 1e3
+}
+
+_UNIT_WORDS = "|".join(sorted(UNIT_MULTIPLIERS, key=len, reverse=True))
+# "(₹ in Crores)", "Rs. in lakhs", "All amounts in INR million"
+_STATEMENT_UNIT_PATTERN = re.compile(rf"(?:₹|rs\.?|inr|rupees)[^a-z0-9]{{0,3}}(?:in\s+)?({_UNIT_WORDS})\b"
+                                     rf"|in\s+(?:₹|rs\.?|inr|rupees)?\s*({_UNIT_WORDS})\b", re.IGNORECASE)
+# "1,23,456.78", "(1,234)", "-12.5", "12.5 Cr"
+_NUMBER_PATTERN = re.compile(rf"^(\()?\s*(-|−|–)?\s*(?:₹|rs\.?|inr)?\s*(\d[\d,]*(?:\.\d+)?)\s*({_UNIT_WORDS})?\.?\s*(\))?$",
+                             re.IGNORECASE)
+_NIL_VALUES = {"", "-", "--", "—", "–", "nil", "na", "n/a", "none"}
+# Per-share figures are never stated in lakhs/crores
+_PER_SHARE_PATTERN = re.compile(r"per\s+(?:equity\s+)?share|\beps\b", re.IGNORECASE)
+_NOTE_COLUMN_PATTERN = re.compile(r"^\s*notes?(?:\s*no\.?)?\s*$", re.IGNORECASE)
+_YEAR_PATTERN = re.compile(r"(?<!\d)(\d{4})(?:\s*[-/–]\s*(\d{2,4}))?(?!\d)")
+
+# Common questions mapped to LIKE patterns over line item keys as named in Indian filings
+LINE_ITEM_ALIASES = {
+    "eps": ["earnings per%share%"],
+    "basic eps": ["earnings per%share%basic%"],
+    "diluted eps": ["earnings per%share%diluted%"],
+    "revenue": ["revenue from operations%"],
+    "net profit": ["profit for the year%", "profit for the period%", "profit after tax%"],
+}
+_PER_SHARE_SUBITEM_PATTERN = re.compile(r"^\s*(?:\(?[a-z0-9]{1,3}[.)]\s*)?(basic|diluted)\b", re.IGNORECASE)
+
+
+def normalize_line_item(name: str) -> str:
+    """Lowercase alphanumeric key for a line item name"""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", str(name).lower()).split())
+
+
+def detect_unit(text_value: str) -> Optional[str]:
+    """Unit declared in a statement heading, e.g. "(₹ in crores)" gives "crore" """
+    match = _STATEMENT_UNIT_PATTERN.search(text_value or "")
+    if not match:
+        return None
+    unit = (match.group(1) or match.group(2)).lower()
+    return {"crores": "crore", "cr": "crore", "lakhs": "lakh", "lac": "lakh", "lacs": "lakh",
+            "millions": "million", "mn": "million", "thousands": "thousand"}.get(unit, unit)
+
+
+def parse_indian_number(value: Any, unit: Optional[str] = None) -> Optional[float]:
+    """
+    Parse a figure as printed in an Indian financial statement.
+
+    Handles lakh/crore digit grouping ("1,23,456.78"), bracketed or dashed
+    negatives ("(1,234)"), inline units ("12.5 Cr") and the statement unit.
+
+    Args:
+        value: Cell value
+        unit: Statement unit ("crore", "lakh", ...) applied when the cell has none
+
+    Returns:
+        The value in absolute terms, or None for blanks, dashes and non-numbers
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+        return None if number != number else number * UNIT_MULTIPLIERS.get(unit or "", 1)
+
+    cell = str(value).strip().replace("\u00a0", " ")
+    if cell.lower() in _NIL_VALUES:
+        return None
+
+    match = _NUMBER_PATTERN.match(cell)
+    if not match:
+        return None
+    open_bracket, minus, digits, inline_unit, close_bracket = match.groups()
+    if bool(open_bracket) != bool(close_bracket):
+        return None
+
+    number = float(digits.replace(",", ""))
+    if open_bracket or minus:
+        number = -number
+    multiplier_unit = (inline_unit or unit or "").lower()
+    return number * UNIT_MULTIPLIERS.get(multiplier_unit, 1)
+
+
+def period_end_year(period: str) -> Optional[int]:
+    """Year a column period ends in: "As at 31 March 2024" and "2023-24" both give 2024"""
+    years = []
+    for start, end in _YEAR_PATTERN.findall(period or ""):
+        if end:
+            end_year = int(end) if len(end) == 4 else int(start) // 100 * 100 + int(end)
+            years.append(end_year if end_year > int(start) else end_year + 100)
+        else:
+            years.append(int(start))
+    years = [year for year in years if 1900 <= year <= 2100]
+    return max(years) if years else None
+
+
+def table_to_line_items(df: pd.DataFrame, unit: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Convert one statement table to long-format rows.
+
+    The first column holds the line item names; note-number columns are skipped
+    and every other column is treated as a period.
+    """
+    if df is None or df.empty or len(df.columns) < 2:
+        return []
+
+    columns = [str(column) for column in df.columns]
+    period_columns = [i for i in range(1, len(columns)) if not _NOTE_COLUMN_PATTERN.match(columns[i])]
+
+    rows = []
+    per_share_heading = None
+    for record in df.itertuples(index=False):
+        line_item = str(record[0] or "").strip()
+        if not normalize_line_item(line_item):
+            continue
+
+        # "Basic" / "Diluted" rows under an EPS heading are per-share figures too
+        if _PER_SHARE_PATTERN.search(line_item):
+            per_share = True
+            per_share_heading = line_item
+        elif per_share_heading and _PER_SHARE_SUBITEM_PATTERN.match(line_item):
+            per_share = True
+            line_item = f"{per_share_heading} - {line_item}"
+        else:
+            per_share = False
+            per_share_heading = None
+        row_unit = None if per_share else unit
+        for i in period_columns:
+            raw_value = record[i]
+            value = parse_indian_number(raw_value, row_unit)
+            if value is None:
+                continue
+            rows.append({
+                "line_item": line_item,
+                "period": columns[i].strip(),
+                "period_end": period_end_year(columns[i]),
+                "value": value,
+                "raw_value": str(raw_value).strip(),
+                "unit": row_unit
+            })
+    return rows
+
+
+class LineItemStore:
+    """
+    SQL store of financial line items (SQLite by default, any SQLAlchemy URL works).
+
+    Rows are replaced per (ticker, fiscal_year, statement) when a filing is
+    re-processed; lookups hit the (ticker, line_item_key, period_end) index.
+    """
+
+    def __init__(self, db_url: str):
+        """
+        Initialize the line item store.
+
+        Args:
+            db_url: SQLAlchemy database URL, e.g. sqlite:///./chroma_db/line_items.db
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.db_url = db_url
+        self.engine = create_engine(db_url)
+        self.create_tables()
+
+    def create_tables(self):
+        """Create the line item table and its lookup index"""
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS financial_line_items (
+                    ticker VARCHAR(64) NOT NULL,
+                    company_name VARCHAR(255),
+                    fiscal_year INTEGER NOT NULL,
+                    statement VARCHAR(64) NOT NULL,
+                    line_item VARCHAR(500) NOT NULL,
+                    line_item_key VARCHAR(500) NOT NULL,
+                    period VARCHAR(255) NOT NULL,
+                    period_end INTEGER,
+                    value DOUBLE PRECISION NOT NULL,
+                    raw_value VARCHAR(64),
+                    unit VARCHAR(16),
+                    source_file VARCHAR(500),
+                    page_number INTEGER,
+                    PRIMARY KEY (ticker, fiscal_year, statement, line_item_key, period)
+                )
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_financial_line_items_lookup
+                ON financial_line_items (ticker, line_item_key, period_end)
+            """))
+
+    def replace_statement(self, ticker: str, fiscal_year: int, statement: str, rows: Iterable[Dict[str, Any]],
+                          company_name: str = None, source_file: str = None) -> int:
+        """
+        Store the line items of one statement, replacing any earlier extraction.
+
+        Args:
+            ticker: Canonical ticker of the company
+            fiscal_year: Fiscal year end of the filing
+            statement: Statement name, e.g. "consolidated_profit_and_loss"
+            rows: Rows from table_to_line_items (may carry a "page_number")
+            company_name: Company name as given at ingestion
+            source_file: File the statement was extracted from
+
+        Returns:
+            Number of rows stored
+        """
+        records = []
+        seen = {}
+        for row in rows:
+            key = normalize_line_item(row["line_item"])
+            # The same caption ("Others", "Total") can appear under several headings
+            occurrence = seen.get((key, row["period"]), 0) + 1
+            seen[(key, row["period"])] = occurrence
+            if occurrence > 1:
+                key = f"{key} {occurrence}"
+            records.append({
+                "ticker": ticker,
+                "company_name": company_name,
+                "fiscal_year": fiscal_year,
+                "statement": statement,
+                "line_item": row["line_item"][:500],
+                "line_item_key": key[:500],
+                "period": row["period"][:255],
+                "period_end": row.get("period_end"),
+                "value": row["value"],
+                "raw_value": (row.get("raw_value") or "")[:64],
+                "unit": row.get("unit"),
+                "source_file": source_file,
+                "page_number": row.get("page_number")
+            })
+
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("DELETE FROM financial_line_items WHERE ticker = :ticker AND fiscal_year = :fiscal_year "
+                     "AND statement = :statement"),
+                {"ticker": ticker, "fiscal_year": fiscal_year, "statement": statement}
+            )
+            if records:
+                conn.execute(text("""
+                    INSERT INTO financial_line_items
+                        (ticker, company_name, fiscal_year, statement, line_item, line_item_key, period,
+                         period_end, value, raw_value, unit, source_file, page_number)
+                    VALUES
+                        (:ticker, :company_name, :fiscal_year, :statement, :line_item, :line_item_key, :period,
+                         :period_end, :value, :raw_value, :unit, :source_file, :page_number)
+                """), records)
+
+        self.logger.info(f"Stored {len(records)} {statement} line items for {ticker} FY{fiscal_year}")
+        return len(records)
+
+    def get_line_items(self, ticker: str, line_item: str = None, statement: str = None,
+                       start_year: int = None, end_year: int = None) -> List[Dict[str, Any]]:
+        """
+        Look up line items for a company.
+
+        Args:
+            ticker: Canonical ticker
+            line_item: Line item name or alias ("eps", "diluted eps", "revenue", ...);
+                names match the start of the normalized line item name
+            statement: Restrict to one statement
+            start_year: Earliest period_end to return
+            end_year: Latest period_end to return
+
+        Returns:
+            Rows ordered by period_end (newest first), then statement and line item
+        """
+        conditions = ["ticker = :ticker"]
+        params: Dict[str, Any] = {"ticker": ticker}
+
+        if line_item:
+            key = normalize_line_item(line_item)
+            patterns = LINE_ITEM_ALIASES.get(key, []) + [f"{key}%"]
+            matches = []
+            for i, pattern in enumerate(patterns):
+                matches.append(f"line_item_key LIKE :item_{i}")
+                params[f"item_{i}"] = pattern
+            conditions.append(f"({' OR '.join(matches)})")
+        if statement:
+            conditions.append("statement = :statement")
+            params["statement"] = statement
+        if start_year is not None:
+            conditions.append("period_end >= :start_year")
+            params["start_year"] = start_year
+        if end_year is not None:
+            conditions.append("period_end <= :end_year")
+            params["end_year"] = end_year
+
+        query = text(f"""
+            SELECT ticker, company_name, fiscal_year, statement, line_item, period, period_end,
+                   value, raw_value, unit, source_file, page_number
+            FROM financial_line_items
+            WHERE {' AND '.join(conditions)}
+            ORDER BY period_end DESC, fiscal_year DESC, statement, line_item_key
+        """)
+        with self.engine.connect() as conn:
+            return [dict(row._mapping) for row in conn.execute(query, params)]
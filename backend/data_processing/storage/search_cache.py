@@ -0,0 +1,102 @@
+"""
+Search Cache
+
+LRU cache of document search results, keyed by normalized query, filters,
+top_k and a collection version that is bumped whenever chunks are written.
+"""
+
+import copy
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_CACHE_SIZE = 256
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query"""
+    return " ".join(query.lower().split())
+
+
+class SearchCache:
+    """
+    LRU cache of search results for one ChromaDB database.
+
+    Writers call invalidate() after storing chunks; that bumps the collection
+    version so every earlier entry stops matching. Versions are per process, so
+    a database written by another process is only picked up after a restart.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialize the search cache.
+
+        Args:
+            max_entries: Number of results kept before the least recently used is evicted
+        """
+        self.max_entries = max_entries
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, query: str, filters: Optional[Dict[str, Any]], top_k: int) -> Tuple:
+        """Cache key for a search at the current collection version"""
+        return (normalize_query(query), json.dumps(filters, sort_keys=True, default=str), top_k, self.version)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Cached result (a copy, safe to modify) or None"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            result = self._entries[key]
+        return copy.deepcopy(result)
+
+    def put(self, key: Tuple, result: Any):
+        """Store a result computed for key"""
+        if self.max_entries <= 0:
+            return
+        result = copy.deepcopy(result)
+        with self._lock:
+            if key[-1] != self.version:
+                return  # computed before the last write
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Bump the collection version after chunks are stored or changed"""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+_caches: Dict[str, SearchCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_search_cache(db_path: str, max_entries: int = DEFAULT_CACHE_SIZE) -> SearchCache:
+    """Get the shared search cache for a ChromaDB directory (one instance per process)"""
+    key = str(Path(db_path).resolve())
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = SearchCache(max_entries)
+        return _caches[key]
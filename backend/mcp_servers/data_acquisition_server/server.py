@@ -10,6 +10,7 @@ import json
 import asyncio
 import logging
 import math
+import time
 from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 
@@ -18,6 +19,10 @@ load_dotenv()
 
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Add project root to path for utils imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../")))
+
+from utils.metrics import ToolMetrics, collect_upstream_times
 
 # Import response models
 try:
@@ -351,6 +356,7 @@ class VyasaQuantMCPServer:
     
     def __init__(self):
         self.tools = AVAILABLE_TOOLS.copy()
+        self.metrics = ToolMetrics()
         logger.info(f"Server initialized with {len(self.tools)} tools")
     
     def get_server_info(self) -> Dict[str, Any]:
@@ -366,6 +372,7 @@ class VyasaQuantMCPServer:
                 "resources": False,
                 "prompts": False,
                 "logging": True,
+                "metrics": True,
                 "response_schemas": MODELS_AVAILABLE
             },
             "available_tools": list(self.tools.keys()),
@@ -458,6 +465,29 @@ class VyasaQuantMCPServer:
                 "tool_name": tool_name
             }
     
+    def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Call a tool, serialize its result and record latency/payload metrics"""
+        start = time.perf_counter()
+        with collect_upstream_times() as upstream:
+            result = self.call_tool(tool_name, arguments)
+        latency = time.perf_counter() - start
+        
+        text = safe_json_dumps(result)
+        
+        # Tools report failures either by raising (success=False here) or in their own payload
+        tool_result = result.get("result")
+        error = not result.get("success", False) or (
+            isinstance(tool_result, dict) and tool_result.get("success") is False
+        )
+        self.metrics.record(
+            tool_name=str(tool_name),
+            latency=latency,
+            response_bytes=len(text.encode("utf-8")),
+            error=error,
+            upstream=upstream
+        )
+        return text
+    
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle incoming MCP requests"""
         try:
@@ -494,7 +524,11 @@ class VyasaQuantMCPServer:
                 tool_name = params.get("name")
                 arguments = params.get("arguments", {})
                 
-                result = self.call_tool(tool_name, arguments)
+                # Tools are blocking (yfinance, DB) - run them off the event loop
+                # so that calls within a batch can execute concurrently
+                text = await asyncio.get_event_loop().run_in_executor(
+                    None, lambda: self.execute_tool(tool_name, arguments)
+                )
                 
                 response = {
                     "jsonrpc": "2.0",
@@ -503,7 +537,7 @@ class VyasaQuantMCPServer:
                         "content": [
                             {
                                 "type": "text",
-                                "text": safe_json_dumps(result)
+                                "text": text
                             }
                         ]
                     }
@@ -542,6 +576,24 @@ class VyasaQuantMCPServer:
                     }
                 }
                 
+            elif method == "metrics/get":
+                # Per-tool call counts, latency percentiles, payload sizes and upstream time
+                result = self.metrics.snapshot()
+                if params.get("reset"):
+                    self.metrics.reset()
+                response = {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "result": {
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": safe_json_dumps(result)
+                            }
+                        ]
+                    }
+                }
+                
             elif method == "ping":
                 response = {
                     "jsonrpc": "2.0",
@@ -572,6 +624,43 @@ class VyasaQuantMCPServer:
                 }
             }
     
+    async def handle_batch(self, requests: List[Any]) -> List[Dict[str, Any]]:
+        """Handle a JSON-RPC batch, executing the requests concurrently"""
+        async def handle_entry(entry: Any) -> Optional[Dict[str, Any]]:
+            if not isinstance(entry, dict):
+                return {
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {
+                        "code": -32600,
+                        "message": "Invalid Request: batch entries must be objects"
+                    }
+                }
+            response = await self.handle_request(entry)
+            # Notifications (no id) do not get a response
+            if "id" not in entry:
+                return None
+            return response
+        
+        logger.info(f"Executing batch of {len(requests)} requests")
+        responses = await asyncio.gather(*(handle_entry(entry) for entry in requests))
+        return [response for response in responses if response is not None]
+    
+    async def handle_message(self, message: Any) -> Optional[Any]:
+        """Handle a single request or a batch array"""
+        if isinstance(message, list):
+            if not message:
+                return {
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {
+                        "code": -32600,
+                        "message": "Invalid Request: empty batch"
+                    }
+                }
+            return await self.handle_batch(message)
+        return await self.handle_request(message)
+    
     async def run_stdio(self):
         """Run the server using stdio transport"""
         logger.info("Starting VyasaQuant MCP Server with stdio transport")
@@ -583,8 +672,12 @@ class VyasaQuantMCPServer:
                 if not line:
                     break
                 
-                request = json.loads(line.strip())
-                response = await self.handle_request(request)
+                message = json.loads(line.strip())
+                response = await self.handle_message(message)
+                
+                # A batch made only of notifications produces no output
+                if response == []:
+                    continue
                 
                 # Write response to stdout
                 print(json.dumps(response))
@@ -84,9 +84,9 @@ def get_ticker_symbol(company_name: str) -> Dict[str, Any]:
             }
         else:
             logger.warning(f"No ticker symbol found for: '{company_name}'")
-            # Try fuzzy search as fallback
+            # Ranked fuzzy candidates (with match_score) so the caller can pick one directly
             logger.info(f"Trying fuzzy search as fallback...")
-            search_results = ticker_manager.search_companies(company_name, limit=5)
+            search_results = ticker_manager.match_companies(company_name, limit=5)
             logger.info(f"Fuzzy search results: {search_results}")
             
             return {
@@ -0,0 +1,48 @@
+"""
+Unit tests for stability checker progress events.
+"""
+
+from agents.stability_checker_agent.core.events import EventedDispatcher
+
+
+class FakeDispatcher:
+    """Answers tool calls without any MCP server."""
+
+    servers = {"data_acquisition_server": object()}
+
+    async def call_tool(self, server_id, tool_name, arguments):
+        if tool_name == "missing":
+            return {"error": "unknown tool"}
+        return {"content": [{"type": "text", "text": "{}"}]}
+
+    async def call_tools_batch(self, server_id, calls):
+        return [await self.call_tool(server_id, call["name"], call.get("arguments", {})) for call in calls]
+
+
+class TestEventedDispatcher:
+    """Test suite for EventedDispatcher."""
+
+    def setup_method(self):
+        self.events = []
+        self.dispatcher = EventedDispatcher(FakeDispatcher(), lambda event, **data: self.events.append((event, data)))
+
+    async def test_tool_call_reports_start_and_end(self):
+        """A call emits tool_start then tool_end with timing and result."""
+        result = await self.dispatcher.call_tool("data_acquisition_server", "get_eps_data", {"ticker_symbol": "HAL.NS"})
+
+        assert [event for event, _ in self.events] == ["tool_start", "tool_end"]
+        end = self.events[1][1]
+        assert end["tool"] == "get_eps_data" and end["success"] is True
+        assert end["duration_ms"] >= 0 and end["result"] == result
+
+    async def test_batch_and_errors(self):
+        """Batched calls get one start/end pair each; error results are flagged."""
+        await self.dispatcher.call_tools_batch("data_acquisition_server", [{"name": "get_eps_data"}, {"name": "missing"}])
+
+        ends = [data for event, data in self.events if event == "tool_end"]
+        assert [end["success"] for end in ends] == [True, False]
+        assert len({data["call_id"] for _, data in self.events}) == 2
+
+    def test_other_attributes_pass_through(self):
+        """Non-tool attributes come from the wrapped dispatcher."""
+        assert "data_acquisition_server" in self.dispatcher.servers
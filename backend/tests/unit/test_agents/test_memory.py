@@ -0,0 +1,206 @@
+"""
+Unit tests for the stability checker MemoryManager journal and indexes.
+"""
+
+import json
+import time
+import threading
+
+import pytest
+
+from agents.stability_checker_agent.modules.memory import (
+    JOURNAL_FORMAT,
+    JOURNAL_VERSION,
+    MemoryItem,
+    MemoryManager,
+    _JournalWriter,
+)
+
+
+def _item(text, item_type="tool_output", tags=None):
+    return MemoryItem(
+        timestamp=time.time(),
+        text=text,
+        type=item_type,
+        session_id="test-session",
+        tags=tags or ["stock_analysis"],
+        user_query="",
+        metadata={},
+    )
+
+
+@pytest.fixture
+def memory_dir(tmp_path):
+    return str(tmp_path)
+
+
+class TestMemoryJournal:
+    """Test suite for the append-only session journal."""
+
+    def test_items_are_replayed_on_load(self, memory_dir):
+        """A new manager for the same session sees every added item."""
+        memory = MemoryManager("2025/01/01/session", memory_dir=memory_dir)
+        for i in range(5):
+            memory.add(_item(f"item {i}"))
+        memory.flush()
+
+        reloaded = MemoryManager("2025/01/01/session", memory_dir=memory_dir)
+
+        assert [item.text for item in reloaded.items] == [f"item {i}" for i in range(5)]
+
+    def test_journal_is_versioned_jsonl(self, memory_dir):
+        """The file starts with a header and holds one record per line."""
+        memory = MemoryManager("session", memory_dir=memory_dir)
+        memory.add(_item("first"))
+        memory.add(_item("second"))
+        memory.flush()
+
+        lines = memory.session_file.read_text().splitlines()
+        header = json.loads(lines[0])
+
+        assert header["format"] == JOURNAL_FORMAT
+        assert header["version"] == JOURNAL_VERSION
+        assert [json.loads(line)["op"] for line in lines[1:]] == ["add", "add"]
+
+    def test_torn_last_line_is_recovered(self, memory_dir):
+        """A partially written record is skipped and later appends stay readable."""
+        memory = MemoryManager("session", memory_dir=memory_dir)
+        memory.add(_item("kept"))
+        memory.flush()
+        with open(memory.session_file, "a") as f:
+            f.write('{"op": "add", "ite')
+
+        recovered = MemoryManager("session", memory_dir=memory_dir)
+        recovered.add(_item("after crash"))
+        recovered.flush()
+
+        reloaded = MemoryManager("session", memory_dir=memory_dir)
+        assert [item.text for item in reloaded.items] == ["kept", "after crash"]
+
+    def test_legacy_json_session_is_migrated(self, memory_dir, tmp_path):
+        """Sessions saved as a single JSON document are converted to a journal."""
+        legacy_file = tmp_path / "old-session.json"
+        legacy_file.write_text(json.dumps({
+            "session_id": "old-session",
+            "items": [_item("legacy").dict()],
+        }))
+
+        memory = MemoryManager("old-session", memory_dir=memory_dir)
+
+        assert [item.text for item in memory.items] == ["legacy"]
+        assert not legacy_file.exists()
+        assert memory.session_file.exists()
+
+    def test_clear_session_removes_journal(self, memory_dir):
+        """Clearing a session deletes its journal."""
+        memory = MemoryManager("session", memory_dir=memory_dir)
+        memory.add(_item("gone"))
+        memory.clear_session()
+        memory.flush()
+
+        assert not memory.session_file.exists()
+        assert MemoryManager("session", memory_dir=memory_dir).items == []
+
+    def test_relative_memory_dir_survives_chdir(self, tmp_path, monkeypatch):
+        """Writes applied after a chdir still land in the directory the manager was created with."""
+        monkeypatch.chdir(tmp_path)
+        memory = MemoryManager("session", memory_dir="memory")
+        elsewhere = tmp_path / "elsewhere"
+        elsewhere.mkdir()
+        monkeypatch.chdir(elsewhere)
+
+        memory.add(_item("written later"))
+        memory.flush()
+
+        assert (tmp_path / "memory" / "session.jsonl").exists()
+        assert not (elsewhere / "memory").exists()
+
+    def test_flush_waits_only_for_own_files(self, tmp_path):
+        """A session's flush is not held up by another session's pending writes."""
+        writer = _JournalWriter(batch_window=0)
+        release = threading.Event()
+        apply = writer._apply
+
+        def slow_apply(batch):
+            if any(path.name == "slow.jsonl" for _, path, _ in batch):
+                release.wait(5)
+            apply(batch)
+
+        writer._apply = slow_apply
+        writer.append(tmp_path / "own.jsonl", ["{}"])
+        writer.append(tmp_path / "slow.jsonl", ["{}"])
+        try:
+            started = time.perf_counter()
+            writer.flush([tmp_path / "own.jsonl"])
+            assert time.perf_counter() - started < 1
+            assert (tmp_path / "own.jsonl").exists() and not (tmp_path / "slow.jsonl").exists()
+        finally:
+            release.set()
+        writer.flush()
+        assert (tmp_path / "slow.jsonl").exists()
+
+
+class TestBoundedMemory:
+    """Test suite for the indexed, bounded in-memory window."""
+
+    @pytest.fixture
+    def memory(self, memory_dir):
+        return MemoryManager("session", config={"max_memory_items": 3}, memory_dir=memory_dir)
+
+    def test_max_memory_items_is_enforced(self, memory):
+        """Only the newest max_memory_items stay in memory."""
+        for i in range(5):
+            memory.add(_item(f"item {i}"))
+
+        assert [item.text for item in memory.items] == ["item 2", "item 3", "item 4"]
+
+    def test_evicted_items_are_spilled(self, memory, memory_dir):
+        """Evicted items are kept on disk and not replayed into the window."""
+        for i in range(5):
+            memory.add(_item(f"item {i}"))
+        memory.save_session()
+
+        assert [item.text for item in memory.get_spilled_items()] == ["item 0", "item 1"]
+
+        reloaded = MemoryManager("session", config={"max_memory_items": 3}, memory_dir=memory_dir)
+        assert [item.text for item in reloaded.items] == ["item 2", "item 3", "item 4"]
+        assert [item.text for item in reloaded.get_spilled_items()] == ["item 0", "item 1"]
+
+    def test_indexes_follow_evictions(self, memory):
+        """Type and tag lookups never return evicted items."""
+        memory.add(_item("eps fetched for HAL", item_type="analysis_update", tags=["eps_data"]))
+        for i in range(3):
+            memory.add(_item(f"tool call {i}"))
+
+        assert memory.get_items_by_type("analysis_update") == []
+        assert memory.get_items_by_tag("eps_data") == []
+        assert len(memory.get_items_by_type("tool_output")) == 3
+        # Text search still finds the evicted item, once, from the spill
+        assert [item.text for item in memory.search_memory("HAL")] == ["eps fetched for HAL"]
+        assert memory.search_memory("HAL") == memory.get_spilled_items()
+
+    def test_search_matches_substrings(self, memory):
+        """Partial words, punctuated phrases and spilled items are found, as with a full scan."""
+        memory.add(_item("Hindustan Aeronautics (HAL.NS) EPS fetched", tags=["eps_data"]))
+        for i in range(3):
+            memory.add(_item(f"tool call {i}", tags=["stock_analysis"]))
+
+        assert [item.text for item in memory.search_memory("aeronaut")] == ["Hindustan Aeronautics (HAL.NS) EPS fetched"]
+        assert len(memory.search_memory("HAL.N")) == 1
+        assert len(memory.search_memory("(hal.ns) eps")) == 1
+        assert [item.text for item in memory.search_memory("l ")] == ["tool call 0", "tool call 1", "tool call 2"]
+        assert len(memory.search_memory("k_ana")) == 3
+        assert memory.search_memory("hal eps") == []
+
+    def test_lookups(self, memory):
+        """Type, tag, word search and recency queries use the indexes."""
+        memory.add(_item("first", tags=["stock_analysis"]))
+        memory.add(_item("EPS data for TCS", item_type="analysis_update", tags=["eps_data"]))
+        memory.add(_item("last", tags=["stock_analysis"]))
+
+        assert [item.text for item in memory.get_items_by_tag("stock_analysis")] == ["first", "last"]
+        assert [item.text for item in memory.get_items_by_type("analysis_update")] == ["EPS data for TCS"]
+        assert [item.text for item in memory.search_memory("data for tcs")] == ["EPS data for TCS"]
+        assert [item.text for item in memory.search_memory("eps")] == ["EPS data for TCS"]
+        assert memory.search_memory("eps tcs") == []
+        assert [item.text for item in memory.get_recent_items(2)] == ["last", "EPS data for TCS"]
@@ -0,0 +1,137 @@
+"""
+Unit tests for the stability checker cross-session memory index.
+"""
+
+import json
+
+import pytest
+
+from agents.stability_checker_agent.modules.decision import related_analysis_lines
+from agents.stability_checker_agent.modules.memory_index import (
+    HashingEmbedder,
+    MemoryVectorIndex,
+    ToolOutputDispatcher,
+)
+
+SUBJECTS = ["HAL", "TCS", "INFY", "Tata Motors", "Tata Steel", "Bajaj Auto"]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = MemoryVectorIndex(str(tmp_path / "index"), similarity_threshold=0.7)
+    for subject in SUBJECTS:
+        index.add(
+            f"FINAL_ANSWER: {subject} passes the EPS stability check",
+            session_id=f"session-{subject}",
+            item_type="final_analysis",
+            subject=subject,
+            key=subject,
+        )
+    return index
+
+
+class TestMemoryVectorIndex:
+    """Test suite for MemoryVectorIndex."""
+
+    def test_same_company_is_retrieved(self, index):
+        """A lookup by company finds its earlier analysis above the threshold."""
+        results = index.search("Tata Motors")
+
+        assert [entry["subject"] for entry in results] == ["Tata Motors"]
+        assert results[0]["score"] >= 0.7
+
+    def test_name_variants_match(self, index):
+        """Small wording differences still clear the threshold."""
+        assert [entry["subject"] for entry in index.search("tata motors ltd")] == ["Tata Motors"]
+
+    def test_unrelated_queries_return_nothing(self, index):
+        """Nothing below the similarity threshold is returned."""
+        assert index.search("RELIANCE") == []
+
+    def test_top_k_and_filters(self, index):
+        """Results are capped at top_k and can be filtered by subject and type."""
+        assert len(index.search("Tata", top_k=1, min_score=0.0)) == 1
+        assert [e["subject"] for e in index.search("tata", subject="TATA STEEL", min_score=0.0)] == ["Tata Steel"]
+        assert index.search("HAL", item_types=["tool_output"]) == []
+
+    def test_entries_persist_and_grow_incrementally(self, index):
+        """A reopened index sees old entries and keeps appending."""
+        reopened = MemoryVectorIndex(str(index.index_dir))
+        reopened.add("FINAL_ANSWER: ITC rejected", session_id="s", item_type="final_analysis", subject="ITC", key="ITC")
+
+        assert len(reopened) == len(SUBJECTS) + 1
+        assert reopened.search("ITC")[0]["session_id"] == "s"
+        assert reopened.search("HAL")[0]["session_id"] == "session-HAL"
+
+    def test_embedder_change_disables_index(self, index):
+        """Vectors from a different embedder are never mixed in."""
+        other = MemoryVectorIndex(str(index.index_dir), embedder=HashingEmbedder(dim=64))
+
+        assert other.enabled is False
+        assert other.search("HAL") == []
+
+
+def eps_result(ticker):
+    payload = {"success": True, "tool_name": "get_eps_data",
+               "result": {"ticker": ticker, "eps_data": {"2024": 114.03, "2023": 87.63}}}
+    return {"content": [{"type": "text", "text": json.dumps(payload)}]}
+
+
+class FakeDispatcher:
+    """MultiMCP stand-in counting the tool calls that reach the servers"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def call_tool(self, server_id, tool_name, arguments):
+        self.calls.append((tool_name, arguments))
+        if tool_name == "get_stock_price":
+            return {"error": "upstream unavailable"}
+        return eps_result(arguments["ticker_symbol"])
+
+    async def call_tools_batch(self, server_id, calls):
+        return [await self.call_tool(server_id, call["name"], call.get("arguments", {})) for call in calls]
+
+
+class TestToolOutputDispatcher:
+    """Test suite for keeping tool outputs across sessions."""
+
+    async def test_tool_output_from_earlier_session_is_reused(self, tmp_path):
+        """Session B gets session A's EPS data from the index without a refetch."""
+        session_a = FakeDispatcher()
+        dispatcher = ToolOutputDispatcher(session_a, MemoryVectorIndex(str(tmp_path / "index")),
+                                          "session-a", "HAL.NS", max_age=3600)
+        fetched = await dispatcher.call_tool("data_acquisition", "get_eps_data", {"ticker_symbol": "HAL.NS"})
+        assert await dispatcher.call_tool("data_acquisition", "get_stock_price", {"ticker_symbol": "HAL.NS"}) == {
+            "error": "upstream unavailable"}
+
+        # A new process: the index is reopened from disk
+        index = MemoryVectorIndex(str(tmp_path / "index"))
+        session_b = FakeDispatcher()
+        dispatcher = ToolOutputDispatcher(session_b, index, "session-b", "HAL.NS", max_age=3600)
+
+        assert await dispatcher.call_tool("data_acquisition", "get_eps_data", {"ticker_symbol": "HAL.NS"}) == fetched
+        results = await dispatcher.call_tools_batch("data_acquisition", [
+            {"name": "get_eps_data", "arguments": {"ticker_symbol": "HAL.NS"}},
+            {"name": "get_stock_price", "arguments": {"ticker_symbol": "HAL.NS"}},
+        ])
+        assert results[0] == fetched
+        assert session_b.calls == [("get_stock_price", {"ticker_symbol": "HAL.NS"})]
+
+        # Recall for the subject surfaces the stored output for the planning prompt
+        recalled = index.search("HAL.NS", subject="HAL.NS", item_types=["tool_output"], min_score=0.0)
+        assert [(entry["session_id"], entry["metadata"]["tool"]) for entry in recalled] == [("session-a", "get_eps_data")]
+        assert "earlier get_eps_data" in related_analysis_lines(recalled)[0]
+
+    async def test_other_arguments_and_stale_outputs_are_fetched(self, tmp_path):
+        index = MemoryVectorIndex(str(tmp_path / "index"))
+        await ToolOutputDispatcher(FakeDispatcher(), index, "session-a", "HAL.NS").call_tool(
+            "data_acquisition", "get_eps_data", {"ticker_symbol": "HAL.NS"})
+
+        fresh = FakeDispatcher()
+        await ToolOutputDispatcher(fresh, index, "session-b", "HAL.NS", max_age=3600).call_tool(
+            "data_acquisition", "get_eps_data", {"ticker_symbol": "HAL.BO"})
+        await ToolOutputDispatcher(fresh, index, "session-b", "HAL.NS", max_age=0).call_tool(
+            "data_acquisition", "get_eps_data", {"ticker_symbol": "HAL.NS"})
+
+        assert len(fresh.calls) == 2
@@ -0,0 +1,76 @@
+"""
+Unit tests for ModelManager provider concurrency limits and timeouts.
+"""
+
+import asyncio
+
+import pytest
+
+from agents.stability_checker_agent.modules.model_manager import ModelManager
+
+
+def stub_manager(max_concurrent_requests=2, timeout=30):
+    return ModelManager({"provider": "stub",
+                         "stub": {"max_concurrent_requests": max_concurrent_requests, "timeout": timeout}})
+
+
+async def peak_concurrency(manager, calls=6, duration=0.02):
+    """Run calls generation requests at once and return the most in flight"""
+    in_flight = peak = 0
+
+    async def request():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(duration)
+        in_flight -= 1
+        return {"prompt_eval_count": 1, "eval_count": 1}
+
+    await asyncio.gather(*(manager._call_provider("stub", "stub", request) for _ in range(calls)))
+    return peak
+
+
+class TestProviderLimits:
+    """Test suite for per-provider concurrency caps and timeouts."""
+
+    async def test_concurrency_is_capped_across_views(self):
+        """Per-request views share the provider limit."""
+        manager = stub_manager(max_concurrent_requests=2)
+        views = [manager.for_request() for _ in range(3)]
+
+        in_flight = peak = 0
+
+        async def request():
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return {}
+
+        await asyncio.gather(*(view._call_provider("stub", "stub", request) for view in views for _ in range(2)))
+        assert peak == 2
+
+    async def test_changed_limit_applies(self):
+        """A new max_concurrent_requests (e.g. after a config reload) is used by later calls."""
+        manager = stub_manager(max_concurrent_requests=2)
+        assert await peak_concurrency(manager) == 2
+
+        manager.config["stub"]["max_concurrent_requests"] = 3
+        assert await peak_concurrency(manager) == 3
+
+    def test_limits_work_on_separate_event_loops(self):
+        """Semaphores are not bound to the first loop that used them."""
+        manager = stub_manager(max_concurrent_requests=1)
+        assert asyncio.run(peak_concurrency(manager)) == 1
+        assert asyncio.run(peak_concurrency(manager)) == 1
+
+    async def test_timeout(self):
+        manager = stub_manager(timeout=0.05)
+
+        async def request():
+            await asyncio.sleep(5)
+
+        with pytest.raises(TimeoutError, match="timed out after 0.05s"):
+            await manager._call_provider("stub", "stub", request)
+        assert manager.get_usage_stats()["providers"]["stub"]["timeouts"] == 1
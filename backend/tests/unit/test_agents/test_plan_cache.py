@@ -0,0 +1,102 @@
+"""
+Unit tests for the stability checker solve() plan cache.
+"""
+
+import pytest
+
+from agents.stability_checker_agent.modules.plan_cache import (
+    PlanCache,
+    SUBJECT_PLACEHOLDER,
+    normalize_workflow,
+    templatize_plan,
+)
+
+PLAN = '''async def solve():
+    """Check HAL stability"""
+    ticker = await dispatcher.call_tool("data_acquisition_server", "get_eps_data", {"ticker_symbol": "HAL"})
+    HALT = 1  # identifiers are never rewritten
+    return f"FINAL_ANSWER: HAL is stable ({ticker})"
+'''
+
+
+class TestPlanTemplates:
+    """Test suite for plan parameterization."""
+
+    def test_templatize_only_touches_string_literals(self):
+        """The subject is replaced in strings but not in identifiers."""
+        template = templatize_plan(PLAN, "HAL")
+
+        assert template is not None
+        assert '"ticker_symbol": "' + SUBJECT_PLACEHOLDER + '"' in template
+        assert "HALT = 1" in template
+        assert '"HAL"' not in template
+
+    def test_templatize_requires_subject_in_plan(self):
+        """Plans that never mention the subject can't be parameterized."""
+        assert templatize_plan(PLAN, "TCS") is None
+
+    def test_templatize_rejects_unsafe_subject(self):
+        """Subjects that could break out of a string literal are refused."""
+        assert templatize_plan(PLAN, 'HAL"); import os; ("') is None
+
+    def test_templatize_refuses_resolved_ticker(self):
+        """A ticker the LLM resolved from the company name would be reused for every subject."""
+        plan = '''async def solve():
+    eps = await dispatcher.call_tool("data_acquisition_server", "get_eps_data", {"ticker_symbol": "HAL.NS"})
+    return f"FINAL_ANSWER: Hindustan Aeronautics is stable ({eps})"
+'''
+        assert templatize_plan(plan, "Hindustan Aeronautics") is None
+        assert templatize_plan(plan.replace('"HAL.NS"', 'ticker'), "Hindustan Aeronautics") is not None
+
+    def test_templatize_refuses_fetched_figures(self):
+        """Hard-coded EPS values belong to the original subject."""
+        plan = PLAN.replace("HALT = 1", "eps = [12.5, 14.25, 16.0]")
+        assert templatize_plan(plan, "HAL") is None
+
+    def test_workflow_is_subject_independent(self):
+        """Requests for different symbols share a workflow key."""
+        assert normalize_workflow("Analyze the stock stability for: HAL\n  Fetch EPS", "HAL") == \
+            normalize_workflow("Analyze the stock stability for: TCS Fetch EPS", "TCS")
+
+
+class TestPlanCache:
+    """Test suite for PlanCache storage and reuse."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return PlanCache(path=str(tmp_path / "plan_cache.json"), max_entries=2)
+
+    def test_reuses_plan_for_new_subject(self, cache):
+        """A stored plan is rendered with the new subject."""
+        key = PlanCache.make_key("prompt.txt", ["get_eps_data"], "workflow")
+        assert cache.store(key, PLAN, "HAL")
+
+        plan = cache.lookup(key, "TCS")
+
+        assert '{"ticker_symbol": "TCS"}' in plan
+        assert "FINAL_ANSWER: TCS is stable" in plan
+        assert cache.stats["hits"] == 1
+
+    def test_key_depends_on_tool_set(self):
+        """Different tool sets never share a plan."""
+        assert PlanCache.make_key("p", ["a", "b"], "w") == PlanCache.make_key("p", ["b", "a"], "w")
+        assert PlanCache.make_key("p", ["a"], "w") != PlanCache.make_key("p", ["a", "b"], "w")
+
+    def test_invalidate_and_persistence(self, cache):
+        """Entries survive a reload and are dropped on invalidation."""
+        key = PlanCache.make_key("prompt.txt", ["get_eps_data"], "workflow")
+        cache.store(key, PLAN, "HAL")
+
+        reloaded = PlanCache(path=str(cache.path))
+        assert reloaded.lookup(key, "INFY") is not None
+
+        reloaded.invalidate(key)
+        assert reloaded.lookup(key, "INFY") is None
+        assert PlanCache(path=str(cache.path)).lookup(key, "INFY") is None
+
+    def test_evicts_least_recently_used(self, cache):
+        """The cache never grows past max_entries."""
+        for i in range(3):
+            cache.store(PlanCache.make_key("p", [], str(i)), PLAN, "HAL")
+
+        assert len(cache) == 2
@@ -0,0 +1,61 @@
+"""
+Unit tests for the stability checker planning prompt builder.
+"""
+
+from agents.stability_checker_agent.modules.prompt_builder import PromptBuilder
+
+TOOLS = {
+    "get_ticker_symbol": {"description": "Get ticker symbol by company name"},
+    "search_companies": {"description": "Search for companies by name or ticker symbol"},
+    "get_eps_data": {"description": "Get EPS data for a specific stock with growth analysis"},
+    "get_income_statement": {"description": "Get income statement data for a stock"},
+    "get_daily_price_history": {"description": "Get daily price history for a stock"},
+    "get_monthly_price_history": {"description": "Get monthly price history for a stock"},
+}
+
+TEMPLATE = "{header}\nRequest: {user_input}\nTools:\n{tool_descriptions}\nMemory: {memory_context}\nRelated: {related_analyses}\n{instructions}"
+
+
+def build(builder, tools=TOOLS, memory_lines=(), related_lines=()):
+    return builder.build(
+        TEMPLATE,
+        static_segments={"header": "You plan stock analyses.", "instructions": "Write solve()."},
+        fixed={"user_input": "Analyze HAL"},
+        tools=tools,
+        memory_lines=list(memory_lines),
+        related_lines=list(related_lines),
+    )
+
+
+class TestPromptBuilder:
+    """Test suite for PromptBuilder."""
+
+    def test_select_tools_keeps_remaining_workflow(self):
+        """Tools for the current and later stages are kept; unrelated ones are dropped."""
+        selected = PromptBuilder().select_tools(TOOLS, "ticker_lookup")
+
+        assert list(selected)[:3] == ["get_ticker_symbol", "get_eps_data", "get_income_statement"]
+        assert "search_companies" in selected
+        assert "get_daily_price_history" not in selected
+
+    def test_select_tools_can_be_disabled(self):
+        """With stage_filtering off every tool is described."""
+        assert PromptBuilder({"stage_filtering": False}).select_tools(TOOLS, "ticker_lookup") == TOOLS
+
+    def test_fits_within_budget(self):
+        """Optional segments are trimmed to the budget; pinned tools always stay."""
+        memory = [f"- memory item {i} " + "detail " * 40 for i in range(5)]
+        prompt, stats = build(PromptBuilder({"max_tokens": 200}), memory_lines=memory)
+
+        assert stats["prompt_tokens"] <= 200
+        assert "get_eps_data" in prompt
+        assert stats["memory_items"] < 5
+        assert "memory item 4" in prompt or stats["memory_items"] == 0
+
+    def test_everything_fits_in_large_budget(self):
+        """Nothing is dropped when the budget allows it."""
+        prompt, stats = build(PromptBuilder({"max_tokens": 10000}), memory_lines=["- a"], related_lines=["- b"])
+
+        assert stats["tools"] == len(TOOLS)
+        assert (stats["memory_items"], stats["related_analyses"]) == (1, 1)
+        assert "Memory: - a" in prompt and "Related: - b" in prompt
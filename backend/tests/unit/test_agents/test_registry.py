@@ -0,0 +1,107 @@
+"""
+Unit tests for the stability checker agent registry.
+"""
+
+import os
+import time
+
+import pytest
+import yaml
+
+from agents.stability_checker_agent.core import registry as registry_module
+from agents.stability_checker_agent.core.registry import AgentRegistry
+from config.config_loader import ConfigLoader
+
+AGENT_CONFIG = {
+    "agent": {"name": "Stock Stability Checker", "id": "stability_checker", "description": "test"},
+    "strategy": {
+        "planning_mode": "conservative",
+        "memory_fallback_enabled": False,
+        "max_steps": 3,
+        "max_lifelines_per_step": 1,
+    },
+    "memory": {},
+    "ai_model": {"provider": "google", "google": {"model": "gemini-2.0-flash"}},
+    "stability_analysis": {"criteria": {"eps_years": 4, "eps_growth_threshold": 10}},
+}
+
+
+class FakeModelManager:
+    """Stands in for ModelManager so no provider clients are created."""
+
+    instances = 0
+
+    def __init__(self, config):
+        FakeModelManager.instances += 1
+        self.config = config
+
+    def for_request(self):
+        return ("view", self)
+
+
+def write_config(config_dir, config):
+    path = config_dir / "agents.yaml"
+    path.write_text(yaml.safe_dump({"stability_checker_agent": config}))
+    # Make sure the change is visible even on coarse mtime filesystems
+    stamp = time.time() + FakeModelManager.instances
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry_module, "ModelManager", FakeModelManager)
+    FakeModelManager.instances = 0
+    write_config(tmp_path, AGENT_CONFIG)
+    return AgentRegistry(check_interval=0, loader=ConfigLoader(str(tmp_path)))
+
+
+def wait_for_version(registry, version, timeout=5.0):
+    deadline = time.time() + timeout
+    while registry.version < version and time.time() < deadline:
+        time.sleep(0.01)
+    return registry.version
+
+
+class TestAgentRegistry:
+    """Test suite for AgentRegistry."""
+
+    def test_builds_resources_once(self, registry):
+        """Repeated requests share one profile and one model manager."""
+        profile, view = registry.acquire()
+        again, _ = registry.acquire()
+
+        assert profile is again
+        assert view == ("view", registry.model_manager)
+        assert FakeModelManager.instances == 1
+        assert profile.config["stability_analysis"]["criteria"]["eps_years"] == 4
+
+    def test_hot_reload_keeps_model_manager(self, registry, tmp_path):
+        """A config edit outside ai_model swaps the profile but keeps the clients."""
+        registry.acquire()
+        write_config(tmp_path, dict(AGENT_CONFIG, stability_analysis={"criteria": {"eps_years": 5, "eps_growth_threshold": 10}}))
+
+        registry.acquire()
+        assert wait_for_version(registry, 2) == 2
+        assert registry.config["stability_analysis"]["criteria"]["eps_years"] == 5
+        assert FakeModelManager.instances == 1
+
+    def test_hot_reload_rebuilds_model_manager(self, registry, tmp_path):
+        """Changing the ai_model section rebuilds the model manager."""
+        registry.acquire()
+        write_config(tmp_path, dict(AGENT_CONFIG, ai_model={"provider": "ollama"}))
+
+        registry.acquire()
+        assert wait_for_version(registry, 2) == 2
+        assert registry.model_manager.config == {"provider": "ollama"}
+        assert FakeModelManager.instances == 2
+
+    def test_invalid_config_keeps_last_good(self, registry, tmp_path):
+        """A broken edit never replaces the working configuration."""
+        registry.acquire()
+        (tmp_path / "agents.yaml").write_text("other_agent: {}\n")
+        os.utime(tmp_path / "agents.yaml", (time.time() + 10, time.time() + 10))
+
+        registry.acquire()
+        time.sleep(0.2)
+        assert registry.version == 1
+        assert registry.config["agent"]["id"] == "stability_checker"
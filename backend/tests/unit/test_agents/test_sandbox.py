@@ -0,0 +1,146 @@
+"""
+Unit tests for the stability checker plan sandbox.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from agents.stability_checker_agent.modules.sandbox import (
+    SandboxError,
+    SandboxPool,
+    SandboxTimeout,
+    SandboxUnavailable,
+    execute_plan,
+)
+
+PRINTING_PLAN = '''
+async def solve():
+    for i in range(3):
+        print("{name}", i)
+        await asyncio.sleep(0.01)
+    return None
+'''
+
+TOOL_PLAN = '''
+async def solve():
+    single = await dispatcher.call_tool("data_acquisition_server", "get_eps_data", {"ticker_symbol": "HAL.NS"})
+    batch = await dispatcher.call_tools_batch("data_acquisition_server", [{"name": "a"}, {"name": "b"}])
+    return f"FINAL_ANSWER: {single['ticker']} {len(batch)}"
+'''
+
+RUNAWAY_PLAN = '''
+async def solve():
+    while True:
+        pass
+'''
+
+CRASHING_PLAN = '''
+async def solve():
+    import os
+    await asyncio.sleep(0.2)
+    os._exit(1)
+'''
+
+BLOCKING_PLAN = '''
+async def solve():
+    import time
+    time.sleep(30)
+'''
+
+
+class FakeDispatcher:
+    """Records tool calls and answers them without any MCP server."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def call_tool(self, server_id, tool_name, arguments):
+        self.calls.append((server_id, tool_name, arguments))
+        return {"ticker": arguments["ticker_symbol"]}
+
+    async def call_tools_batch(self, server_id, calls):
+        self.calls.append((server_id, "batch", calls))
+        return [{"ok": True} for _ in calls]
+
+
+class TestInlineSandbox:
+    """Test suite for in-process plan execution."""
+
+    async def test_concurrent_plans_capture_their_own_output(self):
+        """Output of interleaved plans never leaks between them."""
+        first, second = await asyncio.gather(
+            execute_plan(PRINTING_PLAN.replace("{name}", "first"), FakeDispatcher()),
+            execute_plan(PRINTING_PLAN.replace("{name}", "second"), FakeDispatcher()),
+        )
+
+        assert "first 2" in first and "second" not in first
+        assert "second 2" in second and "first" not in second
+
+    async def test_tool_calls_reach_dispatcher(self):
+        """The plan's dispatcher global is the one passed in."""
+        dispatcher = FakeDispatcher()
+
+        assert await execute_plan(TOOL_PLAN, dispatcher) == "FINAL_ANSWER: HAL.NS 2"
+        assert len(dispatcher.calls) == 2
+
+    async def test_cpu_limit_stops_busy_loop(self):
+        """A plan spinning without awaiting is stopped by its CPU budget."""
+        started = time.monotonic()
+        with pytest.raises(SandboxTimeout, match="CPU"):
+            await execute_plan(RUNAWAY_PLAN, FakeDispatcher(), wall_timeout=30, cpu_time_limit=0.2)
+        assert time.monotonic() - started < 5
+
+    async def test_wall_clock_limit(self):
+        """A plan waiting too long is cancelled."""
+        plan = "async def solve():\n    await asyncio.sleep(10)\n"
+        with pytest.raises(SandboxTimeout, match="wall-clock"):
+            await execute_plan(plan, FakeDispatcher(), wall_timeout=0.2, cpu_time_limit=None)
+
+
+class TestSandboxPool:
+    """Test suite for the subprocess worker pool."""
+
+    async def test_proxies_tool_calls_and_replaces_killed_worker(self):
+        """Plans run out of process; a runaway worker is killed and replaced."""
+        pool = SandboxPool(size=1, startup_timeout=30, kill_grace=0.5)
+        await pool.start()
+        dispatcher = FakeDispatcher()
+        try:
+            assert await pool.run(TOOL_PLAN, dispatcher) == "FINAL_ANSWER: HAL.NS 2"
+            assert dispatcher.calls[0][1] == "get_eps_data"
+
+            with pytest.raises(SandboxTimeout, match="CPU"):
+                await pool.run(RUNAWAY_PLAN, dispatcher, wall_timeout=30, cpu_time_limit=0.2)
+
+            with pytest.raises(SandboxTimeout, match="worker killed"):
+                await pool.run(BLOCKING_PLAN, dispatcher, wall_timeout=0.5)
+
+            output = await pool.run(PRINTING_PLAN.replace("{name}", "worker"), dispatcher)
+            assert "worker 2" in output
+        finally:
+            await pool.close()
+
+    async def test_waiters_fail_when_last_worker_cannot_be_replaced(self):
+        """A plan waiting for a worker is not stranded once the pool has none left."""
+        pool = SandboxPool(size=1, startup_timeout=30, kill_grace=0.5)
+        await pool.start()
+
+        async def cannot_start():
+            raise RuntimeError("no more processes")
+
+        pool._spawn_worker = cannot_start
+        try:
+            crashing = asyncio.create_task(pool.run(CRASHING_PLAN, FakeDispatcher()))
+            await asyncio.sleep(0.05)
+            waiting = asyncio.create_task(pool.run(TOOL_PLAN, FakeDispatcher()))
+
+            with pytest.raises(SandboxError, match="exited unexpectedly"):
+                await crashing
+            with pytest.raises(SandboxUnavailable):
+                await asyncio.wait_for(waiting, timeout=10)
+            with pytest.raises(SandboxUnavailable):
+                await pool.run(TOOL_PLAN, FakeDispatcher())
+        finally:
+            await pool.close()
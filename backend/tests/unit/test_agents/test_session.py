@@ -0,0 +1,97 @@
+"""
+Unit tests for MCP server process request routing.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from agents.stability_checker_agent.core.session import MCPServerProcess
+
+
+class FakeStdin:
+    """Collects the JSON lines written to the server"""
+
+    def __init__(self):
+        self.frames = []
+
+    def write(self, data):
+        self.frames.append(json.loads(data))
+
+    async def drain(self):
+        pass
+
+
+class FakeProcess:
+    def __init__(self):
+        self.stdin = FakeStdin()
+        self.stdout = asyncio.StreamReader()
+        self.stderr = asyncio.StreamReader()
+        self.returncode = None
+
+
+@pytest.fixture
+async def server():
+    server = MCPServerProcess({"id": "fake", "script": "server.py", "request_timeout": 0.2})
+    server.process = FakeProcess()
+    server._reader_tasks = [asyncio.create_task(server._read_stdout())]
+    yield server
+    await server._stop_readers()
+
+
+def reply(server, frames):
+    server.process.stdout.feed_data(json.dumps(frames).encode() + b"\n")
+
+
+async def wait_for_requests(server, count):
+    while len(server._pending) < count:
+        await asyncio.sleep(0)
+
+
+class TestRequestRouting:
+    """Test suite for routing JSON-RPC responses to waiting requests."""
+
+    async def test_batch_results_follow_call_order(self, server):
+        """Out-of-order batch replies are routed by id."""
+        call = asyncio.create_task(server.call_tools_batch([{"name": "a"}, {"name": "b"}]))
+        await wait_for_requests(server, 2)
+        first, second = server.process.stdin.frames[0]
+
+        reply(server, [{"jsonrpc": "2.0", "id": second["id"], "result": "b"},
+                       {"jsonrpc": "2.0", "id": first["id"], "result": "a"}])
+
+        assert await call == ["a", "b"]
+        assert server._pending == {}
+
+    async def test_bad_frame_does_not_strand_batch(self, server):
+        """Frames after an unroutable one in the same batch are still delivered."""
+        call = asyncio.create_task(server.call_tools_batch([{"name": "a"}, {"name": "b"}]))
+        await wait_for_requests(server, 2)
+        first, second = server.process.stdin.frames[0]
+
+        reply(server, [{"jsonrpc": "2.0", "id": first["id"], "result": "a"},
+                       "not a frame",
+                       {"jsonrpc": "2.0", "id": second["id"], "result": "b"}])
+
+        assert await call == ["a", "b"]
+
+    async def test_request_timeout(self, server):
+        """A server that never answers gives an error instead of waiting forever."""
+        result = await server.call_tool("get_eps_data", {"ticker_symbol": "HAL.NS"})
+
+        assert result == {"error": "Timeout waiting for get_eps_data on server fake"}
+        assert server._pending == {}
+
+    async def test_closed_output_fails_pending(self, server):
+        """Requests waiting when the server exits fail immediately."""
+        call = asyncio.create_task(server.call_tool("get_eps_data", {}))
+        await wait_for_requests(server, 1)
+
+        server.process.stdout.feed_eof()
+
+        assert await call == {"error": "Server fake closed its output"}
+
+    def test_default_request_timeout_is_finite(self):
+        server = MCPServerProcess({"id": "fake", "script": "server.py"})
+        assert server.request_timeout == MCPServerProcess.REQUEST_TIMEOUT
@@ -0,0 +1,127 @@
+"""
+Unit tests for the /api/analyze/batch endpoints.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from api import server
+
+
+def analysis(symbol):
+    return server.StockAnalysisResponse(
+        symbol=symbol,
+        company_name=symbol,
+        analysis_date="2024-06-01",
+        stability_analysis=server.StabilityAnalysis(
+            eps_data=server.EPSData(data={"2024": 2.0, "2023": 1.0}, years_available=["2024", "2023"], total_years=2),
+            eps_growth_rate=100.0,
+            is_eps_increasing=True,
+            passes_stability_criteria=True,
+            recommendation="FURTHER_ANALYSIS",
+            reasoning="EPS doubled"
+        )
+    )
+
+
+class FakeAnalyses:
+    """run_stock_analysis stand-in that tracks analyses in flight"""
+
+    def __init__(self, failing=(), delay=0.02):
+        self.failing = set(failing)
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, symbol, event_callback=None):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            await self.release.wait()
+            if symbol in self.failing:
+                raise RuntimeError(f"no EPS data for {symbol}")
+            return analysis(symbol)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def analyses(monkeypatch):
+    fake = FakeAnalyses()
+    monkeypatch.setattr(server, "multi_mcp", object())
+    monkeypatch.setattr(server, "agent_registry",
+                        SimpleNamespace(config={"batch_analysis": {"max_symbols": 10, "max_concurrency": 2}}))
+    monkeypatch.setattr(server, "run_stock_analysis", fake)
+    monkeypatch.setattr(server, "batch_jobs", {})
+    return fake
+
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as client:
+        yield client
+
+
+class TestBatchAnalysis:
+    """Test suite for concurrent watchlist analysis."""
+
+    async def test_concurrency_is_capped_by_server_config(self, analyses, client):
+        """Requests for more concurrency than configured get the server limit."""
+        symbols = ["HAL", "BEL", "TCS", "INFY", "WIPRO"]
+        response = await client.post("/api/analyze/batch", json={"symbols": symbols, "max_concurrency": 8})
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["max_concurrency"] == 2
+        assert analyses.peak == 2
+        assert body["status"] == "completed" and body["completed"] == 5
+        assert [item["symbol"] for item in body["results"]] == symbols
+
+    async def test_one_failure_keeps_other_results(self, analyses, client):
+        analyses.failing = {"BEL"}
+        response = await client.post("/api/analyze/batch", json={"symbols": ["HAL", "BEL", "TCS", "HAL", " "]})
+
+        body = response.json()
+        assert body["total"] == 3
+        assert (body["completed"], body["failed"]) == (2, 1)
+        hal, bel, tcs = body["results"]
+        assert hal["status"] == "completed" and hal["result"]["symbol"] == "HAL"
+        assert bel["status"] == "failed" and bel["result"] is None
+        assert "no EPS data for BEL" in bel["error"]
+        assert tcs["result"]["stability_analysis"]["eps_growth_rate"] == 100.0
+        assert all(item["duration_seconds"] is not None for item in body["results"])
+
+    async def test_poll_by_batch_id(self, analyses, client):
+        """With wait=false the batch runs in the background and can be polled for partial results."""
+        analyses.release.clear()
+        response = await client.post("/api/analyze/batch",
+                                     json={"symbols": ["HAL", "BEL", "TCS"], "max_concurrency": 1, "wait": False})
+        batch_id = response.json()["batch_id"]
+        assert response.json()["status"] == "running"
+
+        while analyses.in_flight == 0:
+            await asyncio.sleep(0.01)
+        running = (await client.get(f"/api/analyze/batch/{batch_id}")).json()
+        assert running["status"] == "running"
+        assert [item["status"] for item in running["results"]] == ["running", "pending", "pending"]
+
+        analyses.release.set()
+        finished = running
+        while finished["status"] == "running":
+            await asyncio.sleep(0.01)
+            finished = (await client.get(f"/api/analyze/batch/{batch_id}")).json()
+        assert finished["status"] == "completed" and finished["completed"] == 3
+
+        assert (await client.get("/api/analyze/batch/unknown")).status_code == 404
+
+    async def test_too_many_symbols(self, analyses, client):
+        response = await client.post("/api/analyze/batch", json={"symbols": [f"S{i}" for i in range(11)]})
+
+        assert response.status_code == 400
+        assert "limit is 10" in response.json()["detail"]
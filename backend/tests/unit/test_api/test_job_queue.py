@@ -0,0 +1,188 @@
+"""
+Unit tests for the SQLite job queue and its worker pool.
+"""
+
+import asyncio
+import multiprocessing
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+
+from api.job_queue import JobQueue, JobWorkerPool, run_in_child_process
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"))
+
+
+async def wait_for_status(queue, job_id, status, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        job = queue.get(job_id)
+        if job["status"] == status:
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"job {job_id} is {queue.get(job_id)['status']}, expected {status}")
+
+
+class TestJobQueue:
+    """Test suite for JobQueue bookkeeping."""
+
+    def test_priority_retry_and_recover(self, queue):
+        """Higher priority is claimed first; failures retry until max_attempts; restarts requeue."""
+        low = queue.submit("analysis", {"symbol": "HAL"})
+        high = queue.submit("analysis", {"symbol": "TCS"}, priority=5, max_attempts=2)
+        queue.submit("ingestion", {"documents": []})
+
+        job = queue.claim("analysis")
+        assert job["job_id"] == high["job_id"] and job["status"] == "running" and job["attempts"] == 1
+        assert queue.fail(job["job_id"], "boom") == "queued"
+        assert queue.claim("analysis")["job_id"] == high["job_id"]
+        assert queue.fail(high["job_id"], "boom again") == "failed"
+
+        job = queue.claim("analysis")
+        assert job["job_id"] == low["job_id"] and job["payload"] == {"symbol": "HAL"}
+        assert queue.recover() == 1
+        assert queue.get(low["job_id"])["status"] == "failed"  # its only attempt was used
+
+        queue.release(queue.claim("ingestion")["job_id"])
+        job = queue.claim("ingestion")
+        assert job["attempts"] == 1
+        queue.complete(job["job_id"], {"successful": 1})
+        job = queue.get(job["job_id"])
+        assert job["status"] == "completed" and job["result"] == {"successful": 1}
+        assert job["run_seconds"] is not None and job["queue_seconds"] is not None
+        assert [j["kind"] for j in queue.list(status="completed")] == ["ingestion"]
+
+    def test_recover_skips_jobs_of_live_owners(self, queue):
+        """Only jobs whose owning process has exited are requeued."""
+        live = queue.submit("analysis", {"symbol": "HAL"})
+        orphaned = queue.submit("analysis", {"symbol": "TCS"}, max_attempts=2)
+        queue.claim("analysis")
+        queue.claim("analysis")
+
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        other_server = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        try:
+            with queue._connect() as conn:
+                conn.execute("UPDATE jobs SET owner_pid = ? WHERE job_id = ?", (other_server.pid, live["job_id"]))
+                conn.execute("UPDATE jobs SET owner_pid = ? WHERE job_id = ?", (exited.pid, orphaned["job_id"]))
+
+            assert queue.recover() == 1
+            assert queue.get(live["job_id"])["status"] == "running"
+            assert queue.get(orphaned["job_id"])["status"] == "queued"
+        finally:
+            other_server.kill()
+            other_server.wait()
+
+    def test_cancel_queued(self, queue):
+        """Queued jobs are cancelled immediately and never claimed."""
+        job = queue.submit("analysis", {"symbol": "HAL"})
+        assert queue.cancel(job["job_id"])["status"] == "cancelled"
+        assert queue.claim("analysis") is None
+        assert queue.cancel("missing") is None
+
+
+class TestJobWorkerPool:
+    """Test suite for the worker coroutines."""
+
+    async def test_runs_retries_and_cancels(self, queue):
+        calls = []
+
+        async def handler(payload):
+            calls.append(payload["n"])
+            if payload.get("fail_first") and calls.count(payload["n"]) == 1:
+                raise ValueError("transient")
+            if payload.get("sleep"):
+                await asyncio.sleep(payload["sleep"])
+            return {"n": payload["n"]}
+
+        pool = JobWorkerPool(queue, "analysis", handler, concurrency=2, poll_interval=0.05)
+        pool.start()
+        try:
+            ok = queue.submit("analysis", {"n": 1, "fail_first": True}, max_attempts=2)
+            slow = queue.submit("analysis", {"n": 2, "sleep": 30})
+            timed_out = queue.submit("analysis", {"n": 3, "sleep": 30}, timeout_seconds=0.1)
+            pool.notify()
+
+            job = await wait_for_status(queue, ok["job_id"], "completed")
+            assert job["result"] == {"n": 1} and job["attempts"] == 2
+
+            await wait_for_status(queue, slow["job_id"], "running")
+            queue.cancel(slow["job_id"])
+            await wait_for_status(queue, slow["job_id"], "cancelled")
+
+            job = await wait_for_status(queue, timed_out["job_id"], "failed")
+            assert "Timed out" in job["error"]
+        finally:
+            await pool.stop()
+
+    async def test_worker_survives_claim_errors(self, queue, monkeypatch):
+        """A failing claim (e.g. a locked database) is retried instead of ending the worker."""
+        claim = queue.claim
+        failures = []
+
+        def flaky_claim(kind):
+            if len(failures) < 2:
+                failures.append(kind)
+                raise sqlite3.OperationalError("database is locked")
+            return claim(kind)
+
+        async def handler(payload):
+            return payload
+
+        monkeypatch.setattr(queue, "claim", flaky_claim)
+        pool = JobWorkerPool(queue, "analysis", handler, poll_interval=0.02)
+        pool.start()
+        try:
+            job = queue.submit("analysis", {"n": 1})
+            job = await wait_for_status(queue, job["job_id"], "completed")
+            assert job["result"] == {"n": 1} and len(failures) == 2
+        finally:
+            await pool.stop()
+
+    async def test_stop_returns_running_job_to_queue(self, queue):
+        async def handler(payload):
+            await asyncio.sleep(30)
+
+        pool = JobWorkerPool(queue, "ingestion", handler, poll_interval=0.05)
+        pool.start()
+        job = queue.submit("ingestion", {})
+        await wait_for_status(queue, job["job_id"], "running")
+        await pool.stop()
+
+        job = queue.get(job["job_id"])
+        assert job["status"] == "queued" and job["attempts"] == 0
+
+
+class TestChildProcess:
+    """Test suite for running job bodies in a killable child process."""
+
+    async def test_result_and_errors(self):
+        assert await run_in_child_process(divmod, 7, 2) == (3, 1)
+        with pytest.raises(ValueError):
+            await run_in_child_process(int, "not a number")
+
+    async def test_timed_out_job_kills_its_process(self, queue):
+        """A retry never queues behind the attempt it replaces."""
+        async def handler(payload):
+            return await run_in_child_process(time.sleep, 30)
+
+        pool = JobWorkerPool(queue, "ingestion", handler, poll_interval=0.05)
+        pool.start()
+        try:
+            job = queue.submit("ingestion", {}, max_attempts=2, timeout_seconds=0.2)
+            pool.notify()
+            await wait_for_status(queue, job["job_id"], "running")
+            while queue.get(job["job_id"])["attempts"] < 2:
+                assert len(multiprocessing.active_children()) <= 1
+                await asyncio.sleep(0.02)
+            await wait_for_status(queue, job["job_id"], "failed")
+            assert multiprocessing.active_children() == []
+        finally:
+            await pool.stop()
@@ -0,0 +1 @@
+# Benchmark harness tests package
@@ -0,0 +1,97 @@
+"""
+Unit tests for the API benchmark stand-ins and load driver.
+"""
+
+import asyncio
+import json
+
+from agents.stability_checker_agent.modules.model_manager import ModelManager
+from agents.stability_checker_agent.modules.sandbox import execute_plan
+from benchmarks.api_benchmark import analysis_failure, run_load, summarize
+from benchmarks.fake_mcp_server import FIXTURES_DIR, FakeDataAcquisitionServer, FixtureData
+
+
+class FakeDispatcher:
+    """Routes plan tool calls straight to the fake server"""
+
+    def __init__(self):
+        self.server = FakeDataAcquisitionServer(FixtureData(FIXTURES_DIR), seed=1)
+
+    async def call_tool(self, server_id, tool_name, arguments):
+        text = await self.server.execute_tool(tool_name, arguments)
+        return {"content": [{"type": "text", "text": text}]}
+
+
+class TestStandIns:
+    """Test suite for the stub LLM provider and the fake MCP server."""
+
+    async def test_stub_plan_runs_against_fake_server(self):
+        manager = ModelManager({"provider": "stub", "stub": {"latency_ms": 1}})
+        plan = await manager.generate_text("User Request: \n Analyze the stock stability for: HAL\n ...")
+        assert manager.get_usage_stats()["providers"]["stub"]["calls"] == 1
+
+        code = plan.strip().removeprefix("```python").removesuffix("```")
+        dispatcher = FakeDispatcher()
+        result = await execute_plan(code, dispatcher)
+        assert result.startswith("FINAL_ANSWER: HAL (HAL)")
+        assert '"2023": 631.2' in result and "EPS Growth Rate: 21.61%" in result and "ACCEPT" in result
+
+        unknown = await execute_plan(code.replace('"HAL"', '"NOPE"'), dispatcher)
+        assert unknown.startswith("FINAL_ANSWER: REJECT NOPE")
+
+    async def test_fake_server_protocol(self):
+        server = FakeDispatcher().server
+        listed = await server.handle_message({"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+        assert "get_eps_data" in [tool["name"] for tool in listed["result"]["tools"]]
+
+        batch = await server.handle_message([
+            {"jsonrpc": "2.0", "id": 2, "method": "tools/call",
+             "params": {"name": "get_eps_data", "arguments": {"ticker_symbol": "TCS.NS"}}},
+            {"jsonrpc": "2.0", "id": 3, "method": "tools/call", "params": {"name": "missing", "arguments": {}}},
+        ])
+        eps = json.loads(batch[0]["result"]["content"][0]["text"])["result"]["eps_data"]
+        assert list(eps) == ["2021", "2022", "2023", "2024"]
+
+        metrics = await server.handle_message({"jsonrpc": "2.0", "id": 4, "method": "metrics/get"})
+        tools = json.loads(metrics["result"]["content"][0]["text"])["tools"]
+        assert tools["get_eps_data"]["calls"] == 1 and tools["missing"]["errors"] == 1
+
+
+class TestLoadDriver:
+    """Test suite for the load driver statistics."""
+
+    def test_summarize(self):
+        samples = [(n / 1000, True) for n in range(1, 101)] + [(5.0, False)]
+        summary = summarize(samples, wall_seconds=2.0)
+        assert summary["requests"] == 101 and summary["errors"] == 1
+        assert summary["latency_ms"]["p50"] == 50.0 and summary["latency_ms"]["p99"] == 99.0
+        assert summary["throughput_rps"] == 50.5
+
+    def test_analysis_failure(self):
+        """A 200 whose agent answer reports a failed tool call is an error."""
+        completed = {"stability_analysis": {"eps_data": {"total_years": 4}},
+                     "raw_agent_response": "FINAL_ANSWER: HAL (HAL) ... ACCEPT - passes to Round 2"}
+        assert analysis_failure(completed) is None
+
+        rejected = {"stability_analysis": {"eps_data": {"total_years": 0}},
+                    "raw_agent_response": "FINAL_ANSWER: REJECT HAL - ticker symbol not found"}
+        assert analysis_failure(rejected).startswith("Agent reported failure")
+        assert analysis_failure({"stability_analysis": {"eps_data": {"total_years": 0}},
+                                 "raw_agent_response": "FINAL_ANSWER: HAL"}) == "No EPS data in response"
+
+    async def test_run_load_respects_concurrency(self):
+        in_flight = peak = 0
+
+        async def send(symbol):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if symbol == "BAD":
+                raise RuntimeError("HTTP 500")
+
+        summary = await run_load(send, ["HAL", "BAD"], total_requests=10, concurrency=3)
+        assert peak == 3
+        assert summary["requests"] == 10 and summary["errors"] == 5
+        assert summary["error_messages"] == {"HTTP 500": 5}
@@ -0,0 +1,37 @@
+"""
+Unit tests for the ingestion benchmark document replay.
+"""
+
+import numpy as np
+
+from benchmarks.ingestion_benchmark import DeterministicEmbedding, parse_args, run_document, synthetic_pages
+
+
+class TestSyntheticDocuments:
+    """Test suite for synthetic LlamaParse page JSON."""
+
+    def test_page_count_and_contents_page(self):
+        pages = synthetic_pages(500)
+        assert [page["page"] for page in pages] == list(range(1, 501))
+
+        contents = pages[2]
+        assert contents["items"][0] == {"type": "heading", "lvl": 1, "value": "Contents"}
+        listed = [line for item in contents["items"] if item["type"] == "text" for line in item["value"].splitlines()]
+        assert len(listed) == 124 and listed[0] == "02  Chairmans Statement"
+
+    def test_deterministic_embedding(self):
+        embed = DeterministicEmbedding(dim=16)
+        first = embed("Revenue from operations")
+        assert first == embed("Revenue from operations") != embed("Profit after tax")
+        assert np.isclose(np.linalg.norm(first), 1.0)
+        assert embed.calls == 3
+
+    def test_run_document_times_every_stage(self, tmp_path):
+        args = parse_args(["--synthetic-pages", "", "--embedding-dim", "8", "--no-memory"])
+        result = run_document("small", synthetic_pages(40), tmp_path, args)
+
+        assert list(result["stages"]) == ["contents_based_chunking", "semantic_chunking", "generate_embeddings",
+                                          "store_chunks", "get_chunks_by_strategy"]
+        assert result["chunks"]["contents_based"] == 29
+        assert 0 < result["chunks"]["retrieved"] <= result["chunks"]["contents_based"]
+        assert result["embedding_calls"] == result["chunks"]["contents_based"] + result["tables"]
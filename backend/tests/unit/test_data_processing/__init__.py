@@ -0,0 +1 @@
+# Data processing tests package
@@ -0,0 +1,54 @@
+"""
+Unit tests for the BM25 lexical index over document chunks.
+"""
+
+from data_processing.storage.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+CHUNKS = [
+    ("c1", "Diluted EPS for FY2023 was 12.45 per share", {"company_name": "HAL", "financial_year": "FY2023"}),
+    ("c2", "Revenue from operations rose to 1,23,456 crore", {"company_name": "HAL", "financial_year": "FY2023"}),
+    ("c3", "Diluted EPS for FY2022 was 10.10 per share", {"company_name": "BEL", "financial_year": "FY2022"}),
+]
+
+
+class TestLexicalIndex:
+    """Test suite for LexicalIndex."""
+
+    def test_tokenize_normalizes_numbers(self):
+        """Thousands separators are dropped and stopwords removed."""
+        assert tokenize("The revenue was 1,23,456.70") == ["revenue", "123456.70"]
+
+    def test_exact_terms_rank_first(self, tmp_path):
+        """The chunk containing every query term ranks first."""
+        index = LexicalIndex(str(tmp_path))
+        index.add(CHUNKS)
+
+        hits = index.search("diluted EPS 2023 fy2023", top_k=3)
+        assert hits[0]["id"] == "c1"
+        assert index.search("123456")[0]["id"] == "c2"
+
+    def test_where_filter(self, tmp_path):
+        """ChromaDB-style where clauses restrict results."""
+        index = LexicalIndex(str(tmp_path))
+        index.add(CHUNKS)
+
+        hits = index.search("diluted eps", where={"$and": [{"company_name": {"$eq": "BEL"}},
+                                                           {"financial_year": {"$in": ["FY2022"]}}]})
+        assert [hit["id"] for hit in hits] == ["c3"]
+
+    def test_persists_and_replaces(self, tmp_path):
+        """Reloading replays adds, replacements and deletes."""
+        index = LexicalIndex(str(tmp_path))
+        index.add(CHUNKS)
+        index.add([("c2", "Net profit of 500 crore", {})])
+        index.delete(["c3"])
+
+        reloaded = LexicalIndex(str(tmp_path))
+        assert len(reloaded) == 2
+        assert reloaded.search("revenue") == []
+        assert reloaded.search("profit")[0]["id"] == "c2"
+
+    def test_reciprocal_rank_fusion(self):
+        """Ids ranked well by both lists come first."""
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "a"]], k=60)
+        assert [doc_id for doc_id, _ in fused][0] == "b"
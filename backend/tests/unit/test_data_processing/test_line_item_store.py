@@ -0,0 +1,83 @@
+"""
+Unit tests for the structured financial line item store.
+"""
+
+import pandas as pd
+import pytest
+
+from data_processing.storage.line_item_store import (
+    LineItemStore, detect_unit, parse_indian_number, table_to_line_items
+)
+
+PROFIT_AND_LOSS = pd.DataFrame(
+    [
+        ["Revenue from operations", "23", "30,381.08", "26,927.82"],
+        ["Other expenses", "24", "(1,234.50)", "-"],
+        ["Earnings per equity share (Face value ₹ 5 each)", "", "", ""],
+        ["(a) Basic (₹)", "", "114.03", "87.63"],
+        ["(b) Diluted (₹)", "", "114.03", "87.63"],
+    ],
+    columns=["Particulars", "Note No.", "Year ended 31 March 2024", "Year ended 31 March 2023"],
+)
+
+
+class TestLineItemParsing:
+    """Test suite for number, unit and table parsing."""
+
+    @pytest.mark.parametrize("cell, unit, expected", [
+        ("1,23,456.78", None, 123456.78),
+        ("(1,234)", None, -1234.0),
+        ("12.5 Cr", None, 125000000.0),
+        ("2.5", "lakh", 250000.0),
+        ("-", "crore", None),
+        ("Note 5", None, None),
+    ])
+    def test_parse_indian_number(self, cell, unit, expected):
+        assert parse_indian_number(cell, unit) == expected
+
+    def test_detect_unit(self):
+        assert detect_unit("Consolidated Statement of Profit and Loss (₹ in Crores)") == "crore"
+        assert detect_unit("All amounts in Rs. lakhs unless stated otherwise") == "lakh"
+        assert detect_unit("Consolidated Balance Sheet") is None
+
+    def test_table_to_line_items(self):
+        """Amounts are scaled by the statement unit; per-share rows are not."""
+        rows = {(row["line_item"], row["period_end"]): row for row in table_to_line_items(PROFIT_AND_LOSS, "crore")}
+
+        assert rows[("Revenue from operations", 2024)]["value"] == pytest.approx(30381.08e7)
+        assert rows[("Other expenses", 2024)]["value"] == pytest.approx(-1234.5e7)
+        assert ("Other expenses", 2023) not in rows
+        diluted = rows[("Earnings per equity share (Face value ₹ 5 each) - (b) Diluted (₹)", 2024)]
+        assert diluted["value"] == 114.03 and diluted["unit"] is None
+
+    def test_face_value_row_is_scaled(self):
+        """Share capital rows mention a face value but are amounts, not per-share figures."""
+        balance_sheet = pd.DataFrame(
+            [
+                ["Equity share capital (Face value ₹10 each)", "15", "334.39", "334.39"],
+                ["Other equity", "16", "36,591.37", "30,014.46"],
+            ],
+            columns=["Particulars", "Note No.", "As at 31 March 2024", "As at 31 March 2023"],
+        )
+        rows = {(row["line_item"], row["period_end"]): row for row in table_to_line_items(balance_sheet, "crore")}
+
+        share_capital = rows[("Equity share capital (Face value ₹10 each)", 2024)]
+        assert share_capital["value"] == pytest.approx(334.39e7) and share_capital["unit"] == "crore"
+        assert rows[("Other equity", 2024)]["value"] == pytest.approx(36591.37e7)
+
+
+class TestLineItemStore:
+    """Test suite for LineItemStore."""
+
+    def test_store_and_lookup(self, tmp_path):
+        """Aliases find EPS and revenue; re-processing replaces a statement."""
+        store = LineItemStore(f"sqlite:///{tmp_path / 'line_items.db'}")
+        rows = table_to_line_items(PROFIT_AND_LOSS, "crore")
+        store.replace_statement("HAL", 2024, "consolidated_profit_and_loss", rows)
+        store.replace_statement("HAL", 2024, "consolidated_profit_and_loss", rows)
+
+        diluted = store.get_line_items("HAL", "diluted eps")
+        assert [(row["period_end"], row["value"]) for row in diluted] == [(2024, 114.03), (2023, 87.63)]
+        assert len(store.get_line_items("HAL", "eps", start_year=2024)) == 2
+        assert len(store.get_line_items("HAL", "revenue")) == 2
+        assert store.get_line_items("BEL", "revenue") == []
@@ -0,0 +1,61 @@
+"""
+Unit tests for chunk metadata normalization.
+"""
+
+import pytest
+
+from data_processing.processors import metadata_normalizer
+from data_processing.processors.metadata_normalizer import (
+    canonical_ticker, fiscal_year_filter, normalize_chunk_metadata, parse_fy_end
+)
+
+
+class FakeTickerManager:
+    """Ticker database with a single company."""
+
+    def get_company_info(self, symbol):
+        return {"symbol": "HAL"} if symbol == "HAL" else None
+
+    def get_symbol_by_name(self, name):
+        return "HAL" if "hindustan aeronautics" in name.lower() else None
+
+
+@pytest.fixture(autouse=True)
+def ticker_manager(monkeypatch):
+    monkeypatch.setattr(metadata_normalizer, "_get_ticker_manager", lambda: FakeTickerManager())
+    canonical_ticker.cache_clear()
+    yield
+    canonical_ticker.cache_clear()
+
+
+class TestMetadataNormalizer:
+    """Test suite for ticker and fiscal year normalization."""
+
+    @pytest.mark.parametrize("spelling", ["FY2024", "FY24", "FY 2023-24", "2023-24", "2023-2024", "2023/24", "2024", 2024])
+    def test_fiscal_year_spellings(self, spelling):
+        """Every common spelling maps to the same fiscal year end."""
+        assert parse_fy_end(spelling) == 2024
+
+    def test_unparseable_year(self):
+        assert parse_fy_end("Unknown") is None
+        assert parse_fy_end("1999-00") == 2000
+
+    def test_canonical_ticker(self):
+        """Names, symbols and exchange-suffixed symbols resolve to one ticker."""
+        assert canonical_ticker("Hindustan Aeronautics Limited") == "HAL"
+        assert canonical_ticker("hal.ns") == "HAL"
+        assert canonical_ticker("Some Unlisted Co.") == "SOMEUNLISTEDCO"
+
+    def test_normalize_chunk_metadata(self):
+        """Document-level metadata is used when chunk fields are missing."""
+        assert normalize_chunk_metadata({"doc_company_name": "HAL", "doc_financial_year": "2022-23"}) == \
+            {"ticker": "HAL", "fy_end": 2023}
+
+    def test_fiscal_year_filter(self):
+        """Contiguous years become a range; unknown spellings fall back to text."""
+        assert fiscal_year_filter(["FY2022", "2022-23", "FY24"]) == \
+            {"$and": [{"fy_end": {"$gte": 2022}}, {"fy_end": {"$lte": 2024}}]}
+        assert fiscal_year_filter(["FY2020", "FY2024"]) == {"fy_end": {"$in": [2020, 2024]}}
+        assert fiscal_year_filter(["FY2024", "H1"]) == \
+            {"$or": [{"fy_end": {"$eq": 2024}}, {"financial_year": {"$eq": "H1"}}]}
+        assert "$gte" in fiscal_year_filter()["fy_end"]
@@ -0,0 +1,96 @@
+"""
+Unit tests for the concurrent parse scheduler.
+"""
+
+import asyncio
+from contextlib import aclosing
+
+from data_processing.processors.parse_scheduler import ParseScheduler
+
+
+class FakeParser:
+    """Async parse that takes `delays[path]` seconds and tracks parses in flight"""
+
+    def __init__(self, delays, failing=()):
+        self.delays = delays
+        self.failing = set(failing)
+        self.in_flight = 0
+        self.peak = 0
+
+    async def parse(self, pdf_path):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays[pdf_path])
+            if pdf_path in self.failing:
+                raise RuntimeError("parse job failed")
+            return [{"page": 1, "text": pdf_path, "md": pdf_path, "items": []}]
+        finally:
+            self.in_flight -= 1
+
+
+async def test_parses_are_bounded_and_yielded_in_completion_order():
+    parser = FakeParser({"a.pdf": 0.2, "b.pdf": 0.02, "c.pdf": 0.05, "d.pdf": 0.02})
+    cached = []
+    scheduler = ParseScheduler(parser.parse, max_concurrency=2,
+                               on_parsed=lambda path, pages: cached.append(path))
+
+    outcomes = [outcome async for outcome in scheduler.run(["a.pdf", "b.pdf", "c.pdf", "d.pdf", "a.pdf"])]
+
+    assert parser.peak == 2
+    assert [outcome.pdf_path for outcome in outcomes] == ["b.pdf", "c.pdf", "d.pdf", "a.pdf"]
+    assert all(outcome.is_successful for outcome in outcomes)
+    assert cached == ["b.pdf", "c.pdf", "d.pdf", "a.pdf"]
+
+
+async def test_failed_parse_becomes_outcome_and_is_not_cached():
+    parser = FakeParser({"good.pdf": 0.01, "bad.pdf": 0.01}, failing=["bad.pdf"])
+    cached = []
+    scheduler = ParseScheduler(parser.parse, max_concurrency=4,
+                               on_parsed=lambda path, pages: cached.append(path))
+
+    outcomes = {outcome.pdf_path: outcome async for outcome in scheduler.run(["good.pdf", "bad.pdf"])}
+
+    assert outcomes["good.pdf"].is_successful
+    assert not outcomes["bad.pdf"].is_successful
+    assert "parse job failed" in outcomes["bad.pdf"].error
+    assert cached == ["good.pdf"]
+
+
+async def test_stopping_early_cancels_pending_parses():
+    parser = FakeParser({"fast.pdf": 0.01, "slow.pdf": 10})
+    scheduler = ParseScheduler(parser.parse, max_concurrency=2)
+
+    async with aclosing(scheduler.run(["fast.pdf", "slow.pdf"])) as outcomes:
+        async for outcome in outcomes:
+            assert outcome.pdf_path == "fast.pdf"
+            break
+
+    assert parser.in_flight == 0
+
+
+class FakeBackend:
+    name = "fake"
+
+    async def aparse(self, pdf_path):
+        await asyncio.sleep(0.01)
+        return [{"page": 1, "text": "Revenue from operations grew 12%", "md": "# Revenue\nRevenue grew 12%", "items": []}]
+
+
+def test_batch_parsed_documents_are_reported_freshly_parsed(tmp_path, caplog):
+    from benchmarks.ingestion_benchmark import DeterministicEmbedding, create_processor
+
+    processor = create_processor(tmp_path / "chroma", DeterministicEmbedding(8))
+    processor.parser_backend, processor.parser_backend_name = FakeBackend(), "fake"
+    documents = []
+    for name in ("HAL_2024.pdf", "BEL_2024.pdf"):
+        (tmp_path / name).write_bytes(b"%PDF-1.4")
+        documents.append({"pdf_path": str(tmp_path / name), "company_name": name[:3], "financial_year": "FY2024"})
+
+    with caplog.at_level("INFO"):
+        summary = processor.process_multiple_documents(documents)
+
+    assert summary["successful"] == 2
+    assert [result["document_metadata"]["was_cached"] for result in summary["files_processed"]] == [False, False]
+    assert "from cache" not in caplog.text
+    assert caplog.text.count("Success (freshly parsed)") == 2
@@ -0,0 +1,84 @@
+"""
+Unit tests for the PDF parser backends.
+"""
+
+import pytest
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+
+from data_processing.processors.pdf_parsers import LocalPDFParser, build_page_items, create_parser_backend
+
+
+def write_report(path, pages):
+    """A4 PDF with a title, two paragraphs and a ruled table per page"""
+    matplotlib.rcParams["pdf.fonttype"] = 42
+    with PdfPages(path) as pdf:
+        for title in pages:
+            fig = plt.figure(figsize=(8.27, 11.69))
+            fig.text(0.1, 0.9, title, fontsize=24)
+            fig.text(0.1, 0.85, "Revenue from operations grew during the year.", fontsize=11)
+            fig.text(0.1, 0.83, "Margins improved as input costs fell.", fontsize=11)
+            fig.text(0.1, 0.77, "All figures are in Rs crore unless stated otherwise.", fontsize=11)
+            ax = fig.add_axes([0.1, 0.4, 0.8, 0.25])
+            ax.axis("off")
+            ax.table(cellText=[["Particulars", "2024", "2023"], ["Revenue", "100", "90"]], loc="center")
+            pdf.savefig(fig)
+            plt.close(fig)
+
+
+class TestLocalPDFParser:
+    """Test suite for the offline pdfplumber backend."""
+
+    def test_llamaparse_schema(self, tmp_path):
+        """Pages carry heading/text/table items the chunkers read."""
+        pdf_path = tmp_path / "report.pdf"
+        write_report(pdf_path, ["Consolidated Balance Sheet"])
+
+        page = LocalPDFParser(max_workers=1).parse(str(pdf_path))[0]
+        assert page["page"] == 1 and "Consolidated Balance Sheet" in page["text"]
+        assert page["items"][0] == {"type": "heading", "lvl": 1, "value": "Consolidated Balance Sheet",
+                                    "md": "# Consolidated Balance Sheet"}
+        assert page["items"][1]["value"] == ("Revenue from operations grew during the year.\n"
+                                             "Margins improved as input costs fell.")
+        assert page["items"][2]["type"] == "text"
+        assert page["items"][3]["rows"] == [["Particulars", "2024", "2023"], ["Revenue", "100", "90"]]
+        assert page["items"][3]["md"].startswith("| Particulars | 2024 | 2023 |\n|---|---|---|")
+
+    def test_process_pool_matches_sequential(self, tmp_path):
+        """Page ranges parsed across processes come back complete and in order."""
+        pdf_path = tmp_path / "report.pdf"
+        write_report(pdf_path, [f"Section {n}" for n in range(1, 6)])
+
+        parser = LocalPDFParser(max_workers=2, pages_per_task=2)
+        try:
+            pages = parser.parse(str(pdf_path))
+        finally:
+            parser.close()
+        assert [page["page"] for page in pages] == [1, 2, 3, 4, 5]
+        assert pages == LocalPDFParser(max_workers=1).parse(str(pdf_path))
+
+
+class TestPageItems:
+    """Test suite for heading detection and backend selection."""
+
+    def test_heading_levels(self):
+        lines = [
+            {"text": "Directors Report", "top": 10, "bottom": 30, "size": 20, "bold": False},
+            {"text": "Financial Performance", "top": 40, "bottom": 53, "size": 13, "bold": False},
+            {"text": "Dividend", "top": 60, "bottom": 70, "size": 10, "bold": True},
+            {"text": "The Board recommends a final dividend.", "top": 75, "bottom": 85, "size": 10, "bold": True},
+        ]
+        items = build_page_items(lines, [], body_size=10)
+        assert [(item["type"], item.get("lvl")) for item in items] == [
+            ("heading", 1), ("heading", 2), ("heading", 3), ("text", None)
+        ]
+
+    def test_create_parser_backend(self):
+        assert create_parser_backend("LOCAL").name == "local"
+        with pytest.raises(ValueError, match="LLAMA_CLOUD_API_KEY"):
+            create_parser_backend("llamaparse")
+        with pytest.raises(ValueError, match="Unknown PDF parser backend"):
+            create_parser_backend("ocr")
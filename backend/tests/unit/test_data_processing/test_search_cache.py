@@ -0,0 +1,42 @@
+"""
+Unit tests for the document search result cache.
+"""
+
+from data_processing.storage.search_cache import SearchCache
+
+
+class TestSearchCache:
+    """Test suite for SearchCache."""
+
+    def test_normalized_hit_returns_copy(self):
+        """Queries differing only in case/whitespace share an entry; callers get copies."""
+        cache = SearchCache()
+        cache.put(cache.key("Diluted  EPS", {"ticker": "HAL"}, 5), {"ids": [["a"]]})
+
+        result = cache.get(cache.key("diluted eps", {"ticker": "HAL"}, 5))
+        assert result == {"ids": [["a"]]}
+        result["ids"][0].append("b")
+        assert cache.get(cache.key("diluted eps", {"ticker": "HAL"}, 5)) == {"ids": [["a"]]}
+        assert cache.get(cache.key("diluted eps", {"ticker": "BEL"}, 5)) is None
+
+    def test_invalidate_drops_stale_results(self):
+        """Bumping the version invalidates entries, including ones computed before the bump."""
+        cache = SearchCache()
+        key = cache.key("revenue", None, 5)
+        cache.put(key, {"ids": [["a"]]})
+        cache.invalidate()
+
+        assert cache.get(cache.key("revenue", None, 5)) is None
+        cache.put(key, {"ids": [["stale"]]})
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted first."""
+        cache = SearchCache(max_entries=2)
+        for query in ("a", "b"):
+            cache.put(cache.key(query, None, 5), query)
+        cache.get(cache.key("a", None, 5))
+        cache.put(cache.key("c", None, 5), "c")
+
+        assert cache.get(cache.key("b", None, 5)) is None
+        assert cache.get(cache.key("a", None, 5)) == "a"
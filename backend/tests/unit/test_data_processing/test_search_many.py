@@ -0,0 +1,140 @@
+"""
+Unit tests for multi-query hybrid search (search_many).
+"""
+
+import logging
+
+import pytest
+
+from data_processing.processors.financial_processor import FinancialDocumentProcessor
+from data_processing.storage.search_cache import SearchCache
+
+CHUNKS = {
+    "rev": ("Revenue from operations grew 12%", {"ticker": "HAL"}),
+    "debt": ("Borrowings were repaid in full", {"ticker": "HAL"}),
+    "eps": ("Diluted EPS for 2024 was 114.03", {"ticker": "HAL"}),
+    "eps_note": ("EPS 2024 is computed on weighted shares", {"ticker": "HAL"}),
+}
+
+QUERIES = ["revenue growth", "debt position", "EPS 2024"]
+
+# Chunk ids the vector search returns for each query, best first
+VECTOR_HITS = {
+    "revenue growth": ["rev", "debt"],
+    "debt position": ["debt", "rev"],
+}
+
+
+def lexical_hit(chunk_id, score, full_match=True):
+    return {"id": chunk_id, "score": score, "matched_terms": 2 if full_match else 1, "query_terms": 2,
+            "metadata": CHUNKS[chunk_id][1]}
+
+
+# Lexical results for each query; "EPS 2024" has top_k full matches and skips the embedding
+LEXICAL_HITS = {
+    "revenue growth": [lexical_hit("rev", 3.0, full_match=False)],
+    "debt position": [],
+    "EPS 2024": [lexical_hit("eps", 5.0), lexical_hit("eps_note", 4.0)],
+}
+
+
+class StubLexicalIndex:
+    def search(self, query, top_k, where=None):
+        return LEXICAL_HITS[query][:top_k]
+
+
+class StubCollection:
+    """ChromaDB collection answering queries from VECTOR_HITS"""
+
+    def __init__(self):
+        self.queries = []
+        self.failing = False
+
+    def query(self, query_embeddings, n_results, where=None):
+        self.queries.append({"embeddings": query_embeddings, "where": where})
+        if self.failing:
+            raise ConnectionError("chroma unavailable")
+        rows = [VECTOR_HITS[QUERIES[int(embedding[0])]][:n_results] for embedding in query_embeddings]
+        return {
+            "ids": rows,
+            "documents": [[CHUNKS[chunk_id][0] for chunk_id in row] for row in rows],
+            "metadatas": [[CHUNKS[chunk_id][1] for chunk_id in row] for row in rows],
+            "distances": [[0.1 * (rank + 1) for rank in range(len(row))] for row in rows],
+        }
+
+    def get(self, ids, include=None):
+        return {"ids": ids, "documents": [CHUNKS[chunk_id][0] for chunk_id in ids],
+                "metadatas": [CHUNKS[chunk_id][1] for chunk_id in ids]}
+
+
+@pytest.fixture
+def processor():
+    """Processor with only the search dependencies, stubbed (no Ollama, ChromaDB or LlamaParse)"""
+    processor = FinancialDocumentProcessor.__new__(FinancialDocumentProcessor)
+    processor.logger = logging.getLogger("test_search_many")
+    processor.lexical_index = StubLexicalIndex()
+    processor.chunks_collection = StubCollection()
+    processor.search_cache = SearchCache()
+    processor.hybrid_rrf_k = 60
+    processor.lexical_skip_embedding = True
+    processor.embedded = []
+
+    def embed_queries(queries):
+        processor.embedded.append(list(queries))
+        return [[float(QUERIES.index(query))] for query in queries]
+
+    processor._embed_queries = embed_queries
+    return processor
+
+
+class TestSearchMany:
+    """Test suite for batched hybrid search."""
+
+    def test_one_embedding_and_one_vector_query(self, processor):
+        """Queries needing vector search share one embedding call and one ChromaDB query."""
+        search = processor.search_many(QUERIES, filters={"company_name": "HAL"}, top_k=2)
+
+        assert processor.embedded == [["revenue growth", "debt position"]]
+        assert len(processor.chunks_collection.queries) == 1
+        assert processor.chunks_collection.queries[0]["where"] == {"ticker": {"$eq": "HAL"}}
+
+        results = search["results"]
+        assert list(results) == QUERIES
+        assert results["revenue growth"]["retrieval"] == "hybrid"
+        assert results["revenue growth"]["ids"][0] == "rev"
+        assert results["debt position"]["retrieval"] == "vector"
+        assert results["debt position"]["ids"] == ["debt", "rev"]
+        assert results["EPS 2024"] == {"ids": ["eps", "eps_note"], "scores": [5.0, 4.0],
+                                       "distances": [1.0, 1.0], "retrieval": "lexical"}
+
+    def test_shared_chunks_returned_once(self, processor):
+        search = processor.search_many(QUERIES, top_k=2)
+
+        assert sorted(search["chunks"]) == ["debt", "eps", "eps_note", "rev"]
+        assert search["total_results"] == 4
+        assert search["chunks"]["rev"] == {"content": CHUNKS["rev"][0], "metadata": CHUNKS["rev"][1]}
+
+    def test_failed_vector_search_falls_back_for_its_queries_only(self, processor):
+        """Queries that lost their vector search get lexical results that aren't cached."""
+        processor.chunks_collection.failing = True
+        search = processor.search_many(QUERIES, top_k=2)
+
+        results = search["results"]
+        assert results["revenue growth"] == {"ids": ["rev"], "scores": [3.0], "distances": [1.0], "retrieval": "lexical"}
+        assert results["debt position"]["ids"] == []
+        assert results["EPS 2024"]["ids"] == ["eps", "eps_note"]
+
+        # Once ChromaDB is back only the fallback queries are searched again
+        processor.chunks_collection.failing = False
+        processor.embedded.clear()
+        search = processor.search_many(QUERIES, top_k=2)
+
+        assert processor.embedded == [["revenue growth", "debt position"]]
+        assert search["results"]["revenue growth"]["retrieval"] == "hybrid"
+        assert search["results"]["debt position"]["retrieval"] == "vector"
+
+    def test_duplicate_queries_are_searched_once(self, processor):
+        search = processor.search_many(["debt position", "debt position"], top_k=2)
+
+        assert processor.embedded == [["debt position"]]
+        assert list(search["results"]) == ["debt position"]
@@ -0,0 +1,117 @@
+"""
+Unit tests for JSON-RPC batch handling in the Data Acquisition MCP Server.
+"""
+
+import pytest
+import sys
+import json
+import threading
+import time
+from pathlib import Path
+
+# Add the MCP server to path for testing
+project_root = Path(__file__).parent.parent.parent.parent
+server_path = project_root / "mcp_servers" / "data_acquisition_server"
+sys.path.append(str(server_path))
+
+
+@pytest.fixture
+def server():
+    """Server instance with lightweight fake tools."""
+    from server import VyasaQuantMCPServer
+
+    def slow_echo(value: str) -> dict:
+        time.sleep(0.2)
+        return {"value": value, "thread": threading.get_ident()}
+
+    def failing_tool() -> dict:
+        raise ValueError("boom")
+
+    instance = VyasaQuantMCPServer()
+    instance.tools = {
+        "slow_echo": {"function": slow_echo, "metadata": {"name": "slow_echo"}},
+        "failing_tool": {"function": failing_tool, "metadata": {"name": "failing_tool"}},
+    }
+    return instance
+
+
+def _tool_call(request_id, name, arguments=None):
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {"name": name, "arguments": arguments or {}},
+    }
+
+
+def _payload(response):
+    return json.loads(response["result"]["content"][0]["text"])
+
+
+class TestBatchRequests:
+    """Test suite for JSON-RPC batch arrays."""
+
+    @pytest.mark.asyncio
+    async def test_batch_returns_response_per_request(self, server):
+        """Every request with an id gets a matching response."""
+        responses = await server.handle_message([
+            _tool_call(1, "slow_echo", {"value": "a"}),
+            _tool_call(2, "slow_echo", {"value": "b"}),
+            {"jsonrpc": "2.0", "id": 3, "method": "ping"},
+        ])
+
+        by_id = {response["id"]: response for response in responses}
+        assert set(by_id) == {1, 2, 3}
+        assert _payload(by_id[1])["result"]["value"] == "a"
+        assert _payload(by_id[2])["result"]["value"] == "b"
+        assert by_id[3]["result"] == {}
+
+    @pytest.mark.asyncio
+    async def test_batch_executes_tools_concurrently(self, server):
+        """Independent tool calls overlap instead of running back to back."""
+        calls = [_tool_call(i, "slow_echo", {"value": str(i)}) for i in range(4)]
+
+        start = time.perf_counter()
+        responses = await server.handle_message(calls)
+        elapsed = time.perf_counter() - start
+
+        assert len(responses) == 4
+        assert elapsed < 0.2 * 4
+
+    @pytest.mark.asyncio
+    async def test_batch_isolates_failures(self, server):
+        """A failing tool does not affect the other entries."""
+        responses = await server.handle_message([
+            _tool_call(1, "failing_tool"),
+            _tool_call(2, "slow_echo", {"value": "ok"}),
+        ])
+
+        by_id = {response["id"]: response for response in responses}
+        assert _payload(by_id[1])["success"] is False
+        assert "boom" in _payload(by_id[1])["error"]
+        assert _payload(by_id[2])["success"] is True
+
+    @pytest.mark.asyncio
+    async def test_notifications_get_no_response(self, server):
+        """Entries without an id are executed but not answered."""
+        responses = await server.handle_message([
+            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            {"jsonrpc": "2.0", "id": 7, "method": "ping"},
+        ])
+
+        assert [response["id"] for response in responses] == [7]
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_is_invalid(self, server):
+        """An empty array is rejected with a single error object."""
+        response = await server.handle_message([])
+
+        assert isinstance(response, dict)
+        assert response["error"]["code"] == -32600
+
+    @pytest.mark.asyncio
+    async def test_non_object_entry_is_invalid(self, server):
+        """Non-object entries are answered with Invalid Request."""
+        responses = await server.handle_message([42])
+
+        assert responses[0]["error"]["code"] == -32600
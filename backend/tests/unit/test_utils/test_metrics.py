@@ -0,0 +1,178 @@
+"""
+Unit tests for MCP tool call instrumentation.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from utils.metrics import (
+    LATENCY_BUCKETS, ToolMetrics, _percentile, collect_upstream_times, render_prometheus,
+    upstream_timed, upstream_timer
+)
+
+# Add the MCP server to path for testing
+project_root = Path(__file__).parent.parent.parent.parent
+server_path = project_root / "mcp_servers" / "data_acquisition_server"
+sys.path.append(str(server_path))
+
+
+class TestPercentile:
+    """Test suite for nearest-rank percentiles."""
+
+    def test_empty(self):
+        assert _percentile([], 0.5) is None
+
+    @pytest.mark.parametrize("q, expected", [(0.0, 1), (0.5, 5), (0.95, 10), (0.99, 10), (1.0, 10)])
+    def test_nearest_rank(self, q, expected):
+        assert _percentile(list(range(1, 11)), q) == expected
+
+    def test_single_sample(self):
+        assert _percentile([0.3], 0.99) == 0.3
+
+
+class TestToolMetrics:
+    """Test suite for per-tool counters and histograms."""
+
+    def test_buckets_are_cumulative(self):
+        """Each call lands in the first bucket that fits; snapshots report cumulative counts."""
+        metrics = ToolMetrics()
+        for latency in (0.001, 0.005, 0.03, 0.7, 120.0):
+            metrics.record("get_eps_data", latency, response_bytes=100)
+
+        stats = metrics.snapshot()["tools"]["get_eps_data"]
+        buckets = dict(zip(LATENCY_BUCKETS, stats["latency"]["buckets"]))
+
+        assert buckets[0.005] == 2
+        assert buckets[0.025] == 2
+        assert buckets[0.05] == 3
+        assert buckets[1.0] == 4
+        # Slower than the largest bound: only counted in +Inf (the call count)
+        assert buckets[60.0] == 4 and stats["calls"] == 5
+        assert stats["latency"]["max"] == 120.0
+        assert stats["response_bytes"] == {"total": 500, "max": 100, "avg": 100}
+
+    def test_errors_upstream_and_reset(self):
+        metrics = ToolMetrics()
+        metrics.record("get_eps_data", 0.1, error=True, upstream={"yfinance": 0.05})
+        metrics.record("get_eps_data", 0.2, upstream={"yfinance": 0.1, "postgres": 0.01})
+
+        stats = metrics.snapshot()["tools"]["get_eps_data"]
+        assert stats["errors"] == 1
+        assert stats["upstream_seconds"] == pytest.approx({"yfinance": 0.15, "postgres": 0.01})
+
+        metrics.reset()
+        assert metrics.snapshot()["tools"] == {}
+
+
+class TestUpstreamTimes:
+    """Test suite for attributing time to upstream services."""
+
+    def test_timers_record_only_inside_collection(self):
+        @upstream_timed("yfinance")
+        def fetch():
+            time.sleep(0.01)
+            return "ok"
+
+        assert fetch() == "ok"
+
+        with collect_upstream_times() as times:
+            fetch()
+            with upstream_timer("postgres"):
+                pass
+
+        assert set(times) == {"yfinance", "postgres"}
+        assert times["yfinance"] >= 0.01
+
+    def test_nested_same_source_counted_once(self):
+        @upstream_timed("yfinance")
+        def inner():
+            time.sleep(0.01)
+
+        @upstream_timed("yfinance")
+        def outer():
+            inner()
+            inner()
+
+        with collect_upstream_times() as times:
+            start = time.perf_counter()
+            outer()
+            elapsed = time.perf_counter() - start
+
+        assert times["yfinance"] <= elapsed
+
+
+class TestRenderPrometheus:
+    """Test suite for the Prometheus text exposition."""
+
+    def test_render(self):
+        metrics = ToolMetrics()
+        metrics.record("get_eps_data", 0.02, response_bytes=2048, upstream={"yfinance": 0.015})
+        metrics.record("get_eps_data", 0.3, response_bytes=1024, error=True)
+
+        text = render_prometheus({"data_acquisition": metrics.snapshot()}, prefix="test")
+        lines = text.splitlines()
+        labels = 'server="data_acquisition",tool="get_eps_data"'
+
+        assert "# TYPE test_tool_latency_seconds histogram" in lines
+        assert f"test_tool_calls_total{{{labels}}} 2" in lines
+        assert f"test_tool_errors_total{{{labels}}} 1" in lines
+        assert f'test_tool_latency_seconds_bucket{{{labels},le="0.025"}} 1' in lines
+        assert f'test_tool_latency_seconds_bucket{{{labels},le="0.5"}} 2' in lines
+        assert f'test_tool_latency_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+        assert f"test_tool_latency_seconds_count{{{labels}}} 2" in lines
+        assert f'test_tool_latency_recent_seconds{{{labels},quantile="0.99"}} 0.3' in lines
+        assert f"test_tool_response_bytes_total{{{labels}}} 3072" in lines
+        assert f"test_tool_response_bytes_max{{{labels}}} 2048" in lines
+        assert f'test_tool_upstream_seconds_total{{{labels},upstream="yfinance"}} 0.015' in lines
+        assert text.endswith("\n")
+
+    def test_label_values_are_escaped(self):
+        metrics = ToolMetrics()
+        metrics.record('odd"tool\\name', 0.01)
+
+        text = render_prometheus({"srv": metrics.snapshot()})
+
+        assert 'tool="odd\\"tool\\\\name"' in text
+
+
+class TestMetricsMethod:
+    """Test suite for the metrics/get JSON-RPC method."""
+
+    @pytest.fixture
+    def server(self):
+        from server import VyasaQuantMCPServer
+
+        def failing_tool() -> dict:
+            raise ValueError("boom")
+
+        instance = VyasaQuantMCPServer()
+        instance.tools = {
+            "echo": {"function": lambda value: {"value": value}, "metadata": {"name": "echo"}},
+            "failing_tool": {"function": failing_tool, "metadata": {"name": "failing_tool"}},
+        }
+        return instance
+
+    @staticmethod
+    async def get_metrics(server, reset=False):
+        response = await server.handle_request({"jsonrpc": "2.0", "id": 9, "method": "metrics/get",
+                                                "params": {"reset": reset}})
+        return json.loads(response["result"]["content"][0]["text"])
+
+    async def test_reports_tool_calls_and_resets(self, server):
+        for request_id, name, arguments in ((1, "echo", {"value": "a"}), (2, "echo", {"value": "b"}),
+                                            (3, "failing_tool", {})):
+            await server.handle_request({"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+                                         "params": {"name": name, "arguments": arguments}})
+
+        snapshot = await self.get_metrics(server, reset=True)
+
+        assert snapshot["latency_buckets"] == list(LATENCY_BUCKETS)
+        assert snapshot["tools"]["echo"]["calls"] == 2
+        assert snapshot["tools"]["echo"]["errors"] == 0
+        assert snapshot["tools"]["echo"]["response_bytes"]["total"] > 0
+        assert snapshot["tools"]["failing_tool"]["errors"] == 1
+        assert (await self.get_metrics(server))["tools"] == {}
@@ -0,0 +1,65 @@
+"""
+Unit tests for TickerManager and its precomputed ticker index.
+"""
+
+import os
+
+import pytest
+
+from utils.ticker_utils import TickerManager
+
+CSV = """symbol,name,series
+HAL,Hindustan Aeronautics Limited,EQ
+TATAMOTORS,Tata Motors Limited,EQ
+TCS,Tata Consultancy Services Limited,EQ
+BEL,Bharat Electronics Limited,EQ
+"""
+
+
+@pytest.fixture
+def manager(tmp_path):
+    csv_path = tmp_path / "tickers.csv"
+    csv_path.write_text(CSV)
+    return TickerManager(str(csv_path))
+
+
+class TestTickerManager:
+    """Test suite for TickerManager lookups."""
+
+    def test_exact_and_partial_name(self, manager):
+        """Exact names win; otherwise the best-ranked company containing the input."""
+        assert manager.get_symbol_by_name("  bharat electronics LIMITED ") == "BEL"
+        assert manager.get_symbol_by_name("Tata") == "TATAMOTORS"
+        assert manager.get_symbol_by_name("Consultancy") == "TCS"
+        assert manager.get_symbol_by_name("Infosys") is None
+
+    def test_company_info_and_search(self, manager):
+        """Symbols resolve to full rows; search matches names and symbols in CSV order."""
+        assert manager.get_company_info("HAL")["name"] == "Hindustan Aeronautics Limited"
+        assert manager.get_company_info("XYZ") is None
+        assert [row["symbol"] for row in manager.search_companies("tata")] == ["TATAMOTORS", "TCS"]
+        assert [row["symbol"] for row in manager.search_companies("limited", limit=2)] == ["HAL", "TATAMOTORS"]
+        assert [row["symbol"] for row in manager.search_companies("be")] == ["BEL"]
+
+    def test_fuzzy_match(self, manager):
+        """Misspelt names resolve above the threshold; candidates come back ranked with scores."""
+        assert manager.get_symbol_by_name("Hindustan Aeronatics Ltd") == "HAL"
+        assert manager.get_symbol_by_name("tata consultancy") == "TCS"
+
+        matches = manager.match_companies("Tata Consultancy Servces", limit=2, min_score=0.1)
+        assert [row["symbol"] for row in matches] == ["TCS", "TATAMOTORS"]
+        assert 1.0 >= matches[0]["match_score"] > matches[1]["match_score"]
+        assert manager.match_companies("TCS")[0]["match_score"] == 1.0
+        assert manager.match_companies("Bharat", min_score=0.99) == []
+
+    def test_index_cache_follows_csv(self, manager, tmp_path):
+        """The cached index is reused until the CSV changes."""
+        manager.get_symbol_by_name("Tata")
+        assert os.path.exists(manager.cache_path)
+        # Generated caches stay out of the directory holding the CSV
+        assert not list(tmp_path.glob("*.pkl"))
+
+        csv_path = tmp_path / "tickers.csv"
+        csv_path.write_text(CSV + "INFY,Infosys Limited,EQ\n")
+        os.utime(csv_path, ns=(1, 1))
+        assert TickerManager(str(csv_path)).get_symbol_by_name("Infosys") == "INFY"
@@ -6,6 +6,8 @@ from typing import Optional, Dict, Any
 import logging
 from dotenv import load_dotenv
 
+from .metrics import upstream_timed
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -38,6 +40,7 @@ class DatabaseManager:
         """Get direct psycopg2 connection"""
         return psycopg2.connect(self.connection_string)
     
+    @upstream_timed("postgres")
     def insert_dataframe(self, df: pd.DataFrame, table_name: str, if_exists: str = 'append') -> bool:
         """Insert pandas DataFrame into PostgreSQL table"""
         try:
@@ -49,6 +52,7 @@ class DatabaseManager:
             logger.error(f"Error inserting data into {table_name}: {str(e)}")
             return False
     
+    @upstream_timed("postgres")
     def execute_query(self, query: str, params: tuple = None) -> Optional[pd.DataFrame]:
         """Execute a SELECT query and return results as DataFrame"""
         try:
@@ -58,6 +62,7 @@ class DatabaseManager:
             logger.error(f"Error executing query: {str(e)}")
             return None
     
+    @upstream_timed("postgres")
     def execute_update(self, query: str, params: tuple = None) -> bool:
         """Execute an UPDATE/INSERT/DELETE query"""
         try:
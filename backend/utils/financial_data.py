@@ -5,6 +5,8 @@ from datetime import datetime
 from typing import Optional, Dict, Any, Tuple
 import logging
 
+from .metrics import upstream_timed
+
 logger = logging.getLogger(__name__)
 
 class FinancialDataManager:
@@ -29,6 +31,7 @@ class FinancialDataManager:
             logger.error(f"Error getting ticker data for {ticker}: {str(e)}")
             return None
     
+    @upstream_timed("yfinance")
     def get_basic_stock_info(self, ticker: str) -> Optional[Dict[str, Any]]:
         """Get basic stock information including company name, EPS-TTM, and industry"""
         try:
@@ -56,6 +59,7 @@ class FinancialDataManager:
             logger.error(f"Error getting basic stock info for {ticker}: {str(e)}")
             return None
     
+    @upstream_timed("yfinance")
     def get_financial_statements(self, ticker: str) -> Optional[pd.DataFrame]:
         """Get financial statements data"""
         try:
@@ -74,6 +78,7 @@ class FinancialDataManager:
             logger.error(f"Error getting financial statements for {ticker}: {str(e)}")
             return None
     
+    @upstream_timed("yfinance")
     def get_balance_sheet(self, ticker: str) -> Optional[pd.DataFrame]:
         """Get balance sheet data"""
         try:
@@ -92,6 +97,7 @@ class FinancialDataManager:
             logger.error(f"Error getting balance sheet for {ticker}: {str(e)}")
             return None
     
+    @upstream_timed("yfinance")
     def get_income_statement(self, ticker: str) -> Optional[pd.DataFrame]:
         """Get income statement data"""
         try:
@@ -110,6 +116,7 @@ class FinancialDataManager:
             logger.error(f"Error getting income statement for {ticker}: {str(e)}")
             return None
     
+    @upstream_timed("yfinance")
     def get_cash_flow_statement(self, ticker: str) -> Optional[pd.DataFrame]:
         """Get cash flow statement data"""
         try:
@@ -128,6 +135,7 @@ class FinancialDataManager:
             logger.error(f"Error getting cash flow statement for {ticker}: {str(e)}")
             return None
     
+    @upstream_timed("yfinance")
     def get_daily_price_history(self, ticker: str) -> Optional[pd.DataFrame]:
         """Get 10 years daily price history"""
         try:
@@ -145,6 +153,7 @@ class FinancialDataManager:
             logger.error(f"Error getting daily price history for {ticker}: {str(e)}")
             return None
     
+    @upstream_timed("yfinance")
     def get_monthly_price_history(self, ticker: str) -> Optional[pd.DataFrame]:
         """Get monthly price history from daily data"""
         try:
@@ -174,6 +183,7 @@ class FinancialDataManager:
             logger.error(f"Error processing monthly price history for {ticker}: {str(e)}")
             return None
     
+    @upstream_timed("yfinance")
     def get_intrinsic_pe_data(self, ticker: str) -> Optional[pd.DataFrame]:
         """Calculate intrinsic PE ratio data"""
         try:
@@ -236,6 +246,7 @@ class FinancialDataManager:
             logger.error(f"Error calculating intrinsic PE data for {ticker}: {str(e)}")
             return None
     
+    @upstream_timed("moneycontrol")
     def get_sector_info_from_moneycontrol(self, stock_symbol: str) -> Optional[Dict[str, Any]]:
         """Get sector and sector PE from MoneyControl API"""
         try:
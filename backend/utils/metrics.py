@@ -0,0 +1,249 @@
+"""
+Tool call instrumentation for VyasaQuant MCP servers.
+
+Tracks per-tool call counts, error counts, latency histograms, serialized
+response sizes and the time spent in upstream services (yfinance,
+MoneyControl, PostgreSQL) so that slow or heavy tools can be identified.
+"""
+
+import math
+import time
+import threading
+import functools
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, List
+
+# Histogram bucket upper bounds in seconds (Prometheus style, cumulative)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Number of recent samples kept per tool for percentile calculation
+SAMPLE_WINDOW = 1024
+
+# Upstream time accumulated for the tool call running in the current context
+_upstream_times: ContextVar[Optional[Dict[str, float]]] = ContextVar("upstream_times", default=None)
+_active_upstreams: ContextVar[frozenset] = ContextVar("active_upstreams", default=frozenset())
+
+
+@contextmanager
+def collect_upstream_times():
+    """Collect upstream timings recorded while the block runs"""
+    times: Dict[str, float] = {}
+    token = _upstream_times.set(times)
+    try:
+        yield times
+    finally:
+        _upstream_times.reset(token)
+
+
+@contextmanager
+def upstream_timer(source: str):
+    """Attribute the time spent in the block to an upstream source.
+
+    Nested timers for the same source are ignored so that helpers calling
+    each other are not counted twice.
+    """
+    times = _upstream_times.get()
+    active = _active_upstreams.get()
+    if times is None or source in active:
+        yield
+        return
+
+    token = _active_upstreams.set(active | {source})
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        times[source] = times.get(source, 0.0) + (time.perf_counter() - start)
+        _active_upstreams.reset(token)
+
+
+def upstream_timed(source: str):
+    """Decorator form of upstream_timer"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with upstream_timer(source):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _percentile(sorted_samples: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of pre-sorted samples"""
+    if not sorted_samples:
+        return None
+    index = min(len(sorted_samples) - 1, max(0, math.ceil(q * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+class _ToolStats:
+    """Counters for a single tool"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+        self.response_bytes_total = 0
+        self.response_bytes_max = 0
+        self.upstream_seconds: Dict[str, float] = {}
+
+    def observe(self, latency: float, response_bytes: int, error: bool, upstream: Dict[str, float]):
+        self.calls += 1
+        if error:
+            self.errors += 1
+
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.bucket_counts[i] += 1
+                break
+        self.samples.append(latency)
+
+        self.response_bytes_total += response_bytes
+        self.response_bytes_max = max(self.response_bytes_max, response_bytes)
+
+        for source, seconds in upstream.items():
+            self.upstream_seconds[source] = self.upstream_seconds.get(source, 0.0) + seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        samples = sorted(self.samples)
+        cumulative = []
+        running = 0
+        for count in self.bucket_counts:
+            running += count
+            cumulative.append(running)
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency": {
+                "sum": self.latency_sum,
+                "max": self.latency_max,
+                "p50": _percentile(samples, 0.50),
+                "p95": _percentile(samples, 0.95),
+                "p99": _percentile(samples, 0.99),
+                "buckets": cumulative
+            },
+            "response_bytes": {
+                "total": self.response_bytes_total,
+                "max": self.response_bytes_max,
+                "avg": self.response_bytes_total / self.calls if self.calls else 0
+            },
+            "upstream_seconds": dict(self.upstream_seconds)
+        }
+
+
+class ToolMetrics:
+    """Thread-safe per-tool metrics registry"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools: Dict[str, _ToolStats] = {}
+        self.started_at = time.time()
+
+    def record(
+        self,
+        tool_name: str,
+        latency: float,
+        response_bytes: int = 0,
+        error: bool = False,
+        upstream: Optional[Dict[str, float]] = None
+    ):
+        """Record a completed tool call"""
+        with self._lock:
+            stats = self._tools.get(tool_name)
+            if stats is None:
+                stats = self._tools[tool_name] = _ToolStats()
+            stats.observe(latency, response_bytes, error, upstream or {})
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a JSON-serializable view of all metrics"""
+        with self._lock:
+            tools = {name: stats.snapshot() for name, stats in self._tools.items()}
+        return {
+            "uptime_seconds": time.time() - self.started_at,
+            "latency_buckets": list(LATENCY_BUCKETS),
+            "tools": tools
+        }
+
+    def reset(self):
+        """Clear all recorded metrics"""
+        with self._lock:
+            self._tools.clear()
+            self.started_at = time.time()
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def render_prometheus(snapshots: Dict[str, Dict[str, Any]], prefix: str = "vyasaquant_mcp") -> str:
+    """Render metrics snapshots from one or more servers in Prometheus text format
+
+    Args:
+        snapshots: Mapping of server id to ToolMetrics.snapshot() output
+        prefix: Metric name prefix
+
+    Returns:
+        Prometheus exposition format text
+    """
+    lines = []
+
+    def header(name: str, metric_type: str, help_text: str):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+
+    def tool_rows():
+        for server_id, snapshot in snapshots.items():
+            for tool_name, stats in sorted(snapshot.get("tools", {}).items()):
+                yield server_id, tool_name, stats, snapshot.get("latency_buckets", LATENCY_BUCKETS)
+
+    header("tool_calls_total", "counter", "Total tool calls")
+    for server_id, tool_name, stats, _ in tool_rows():
+        lines.append(f"{prefix}_tool_calls_total{_labels(server=server_id, tool=tool_name)} {stats['calls']}")
+
+    header("tool_errors_total", "counter", "Tool calls that returned an error")
+    for server_id, tool_name, stats, _ in tool_rows():
+        lines.append(f"{prefix}_tool_errors_total{_labels(server=server_id, tool=tool_name)} {stats['errors']}")
+
+    header("tool_latency_seconds", "histogram", "Tool execution latency")
+    for server_id, tool_name, stats, buckets in tool_rows():
+        latency = stats["latency"]
+        for bound, count in zip(buckets, latency["buckets"]):
+            lines.append(f"{prefix}_tool_latency_seconds_bucket{_labels(server=server_id, tool=tool_name, le=bound)} {count}")
+        lines.append(f"{prefix}_tool_latency_seconds_bucket{_labels(server=server_id, tool=tool_name, le='+Inf')} {stats['calls']}")
+        lines.append(f"{prefix}_tool_latency_seconds_sum{_labels(server=server_id, tool=tool_name)} {latency['sum']}")
+        lines.append(f"{prefix}_tool_latency_seconds_count{_labels(server=server_id, tool=tool_name)} {stats['calls']}")
+
+    header("tool_latency_recent_seconds", "gauge", "Tool latency percentiles over recent calls")
+    for server_id, tool_name, stats, _ in tool_rows():
+        for quantile in ("p50", "p95", "p99"):
+            value = stats["latency"][quantile]
+            if value is not None:
+                q = f"0.{quantile[1:]}"
+                lines.append(f"{prefix}_tool_latency_recent_seconds{_labels(server=server_id, tool=tool_name, quantile=q)} {value}")
+
+    header("tool_response_bytes_total", "counter", "Serialized response bytes returned by the tool")
+    for server_id, tool_name, stats, _ in tool_rows():
+        lines.append(f"{prefix}_tool_response_bytes_total{_labels(server=server_id, tool=tool_name)} {stats['response_bytes']['total']}")
+
+    header("tool_response_bytes_max", "gauge", "Largest serialized response returned by the tool")
+    for server_id, tool_name, stats, _ in tool_rows():
+        lines.append(f"{prefix}_tool_response_bytes_max{_labels(server=server_id, tool=tool_name)} {stats['response_bytes']['max']}")
+
+    header("tool_upstream_seconds_total", "counter", "Time spent in upstream services (yfinance, database, ...)")
+    for server_id, tool_name, stats, _ in tool_rows():
+        for upstream, seconds in sorted(stats.get("upstream_seconds", {}).items()):
+            lines.append(f"{prefix}_tool_upstream_seconds_total{_labels(server=server_id, tool=tool_name, upstream=upstream)} {seconds}")
+
+    return "\n".join(lines) + "\n"
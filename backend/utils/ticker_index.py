@@ -0,0 +1,305 @@
+"""
+Precomputed lookup structures for the ticker database.
+
+Built once from the CSV and cached to disk (keyed by the CSV's mtime and size),
+so name/symbol lookups are dictionary hits, and substring searches and ranked
+fuzzy matches only touch the rows sharing the query's trigrams.
+"""
+
+import os
+import re
+import bisect
+import pickle
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+
+# Words that say nothing about which company is meant
+NAME_STOPWORDS = {
+    "limited", "ltd", "pvt", "private", "co", "company", "corp", "corporation",
+    "inc", "the", "and", "of"
+}
+
+DEFAULT_MIN_SCORE = 0.35
+# Candidates re-scored per fuzzy lookup, taken by trigram Dice
+CANDIDATE_POOL = 24
+
+
+def normalize_name(name: Any) -> str:
+    """Lowercase, whitespace-collapsed form used for exact name matching"""
+    return " ".join(str(name).lower().split())
+
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def name_tokens(name: Any) -> Tuple[str, ...]:
+    """Alphanumeric words of a company name without legal-form noise ("Ltd", "Limited", ...)"""
+    words = re.sub(r"[^a-z0-9]+", " ", str(name).lower()).split()
+    tokens = tuple(word for word in words if word not in NAME_STOPWORDS)
+    return tokens or tuple(words)
+
+
+def match_grams(tokens: Tuple[str, ...]) -> set:
+    """Trigrams of the space-padded token string, so word starts and ends count"""
+    return trigrams(f" {' '.join(tokens)} ")
+
+
+@lru_cache(maxsize=65536)
+def word_grams(word: str) -> frozenset:
+    return frozenset(trigrams(f" {word} "))
+
+
+def gram_dice(a: set, b: set) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+
+def token_set_similarity(query: Tuple[str, ...], name: Tuple[str, ...]) -> float:
+    """
+    Average of how well the query words are covered by the name and the name
+    words by the query. A word fully matches an equal word or one it is a prefix
+    of ("tata cons" ~ "tata consultancy services"); a misspelt word gets partial
+    credit equal to its trigram similarity when that is at least 0.5.
+    """
+    if not query or not name:
+        return 0.0
+    query_words = set(query)
+    unmatched = set(name)
+    covered = 0.0
+    for word in sorted(query_words, key=len, reverse=True):
+        if word in unmatched:
+            best, credit = word, 1.0
+        else:
+            best, credit = None, 0.0
+            for other in unmatched:
+                if len(word) >= 3 and other.startswith(word):
+                    best, credit = other, 1.0
+                    break
+                similarity = gram_dice(word_grams(word), word_grams(other))
+                if similarity >= 0.5 and similarity > credit:
+                    best, credit = other, similarity
+        if best is not None:
+            unmatched.discard(best)
+            covered += credit
+    name_words = len(set(name))
+    return 0.5 * (covered / len(query_words)) + 0.5 * (min(covered, name_words) / name_words)
+
+
+class TickerIndex:
+    """
+    Lookup structures over ticker database rows.
+
+    - name_to_row / symbol_to_row: exact (normalized) name and symbol maps
+    - trigram postings over "name \\0 symbol" for substring search
+    - sorted prefix keys (words of names, and symbols) for queries shorter than a trigram
+    - padded trigram postings over name tokens for ranked fuzzy matching
+
+    Row numbers follow CSV order, so "first match" keeps its meaning.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.records = records
+        self.names: List[str] = []
+        self.symbols: List[str] = []
+        self.name_to_row: Dict[str, int] = {}
+        self.symbol_to_row: Dict[str, int] = {}
+        self.postings: Dict[str, List[int]] = {}
+        self.prefix_keys: List[str] = []
+        self.prefix_rows: List[int] = []
+        self.tokens: List[Tuple[str, ...]] = []
+        self.gram_counts: List[int] = []
+        self.match_postings: Dict[str, Any] = {}
+
+        prefix_entries = []
+        for row, record in enumerate(records):
+            name = record.get("name")
+            symbol = record.get("symbol")
+            name = normalize_name(name) if isinstance(name, str) else ""
+            symbol = str(symbol).strip() if isinstance(symbol, str) else ""
+            self.names.append(name)
+            self.symbols.append(symbol.lower())
+
+            if name:
+                self.name_to_row.setdefault(name, row)
+                prefix_entries.extend((word, row) for word in set(name.split()))
+            if symbol:
+                self.symbol_to_row.setdefault(symbol, row)
+                self.symbol_to_row.setdefault(symbol.upper(), row)
+                prefix_entries.append((symbol.lower(), row))
+
+            for gram in trigrams(f"{name}\0{symbol.lower()}"):
+                self.postings.setdefault(gram, []).append(row)
+
+            tokens = name_tokens(name) if name else ()
+            grams = match_grams(tokens) if tokens else set()
+            self.tokens.append(tokens)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.match_postings.setdefault(gram, []).append(row)
+
+        prefix_entries.sort()
+        self.prefix_keys = [key for key, _ in prefix_entries]
+        self.prefix_rows = [row for _, row in prefix_entries]
+
+        # Fuzzy matching counts shared trigrams with bincount over these arrays
+        self.match_postings = {
+            gram: np.asarray(rows, dtype=np.int32) for gram, rows in self.match_postings.items()
+        }
+        self.gram_count_array = np.asarray(self.gram_counts, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def find_name(self, name: str) -> Optional[int]:
+        """Row whose name equals name (case- and whitespace-insensitive)"""
+        return self.name_to_row.get(normalize_name(name))
+
+    def find_symbol(self, symbol: str) -> Optional[int]:
+        """Row with this exact symbol (upper-case symbols also match)"""
+        symbol = symbol.strip()
+        row = self.symbol_to_row.get(symbol)
+        return row if row is not None else self.symbol_to_row.get(symbol.upper())
+
+    def find_prefix(self, prefix: str) -> List[int]:
+        """Rows with a name word or symbol starting with prefix, in CSV order"""
+        prefix = prefix.lower()
+        rows = set()
+        start = bisect.bisect_left(self.prefix_keys, prefix)
+        for key, row in zip(self.prefix_keys[start:], self.prefix_rows[start:]):
+            if not key.startswith(prefix):
+                break
+            rows.add(row)
+        return sorted(rows)
+
+    def find_containing(self, term: str, include_symbols: bool = True) -> List[int]:
+        """
+        Rows whose name (or symbol) contains term, in CSV order.
+
+        Terms shorter than three characters fall back to prefix matching.
+        """
+        term = normalize_name(term)
+        if not term:
+            return []
+        if len(term) < 3:
+            return self.find_prefix(term)
+
+        grams = sorted(trigrams(term), key=lambda gram: len(self.postings.get(gram, ())))
+        if not grams or grams[0] not in self.postings:
+            return []
+        candidates = set(self.postings[grams[0]])
+        for gram in grams[1:]:
+            candidates.intersection_update(self.postings.get(gram, ()))
+            if not candidates:
+                return []
+
+        return sorted(
+            row for row in candidates
+            if term in self.names[row] or (include_symbols and term in self.symbols[row])
+        )
+
+    def score(self, query: str, row: int) -> float:
+        """Similarity in [0, 1] between query and the company name at row"""
+        query_tokens = name_tokens(query)
+        query_grams = match_grams(query_tokens)
+        shared = len(query_grams & match_grams(self.tokens[row]))
+        return self._score(query_tokens, len(query_grams), shared, row)
+
+    def _score(self, query_tokens: Tuple[str, ...], query_gram_count: int, shared: int, row: int) -> float:
+        """Mean of trigram Dice and token-set similarity"""
+        name = self.tokens[row]
+        if not query_tokens or not name:
+            return 0.0
+        if query_tokens == name:
+            return 1.0
+        dice = 2 * shared / (query_gram_count + self.gram_counts[row])
+        return round(0.5 * dice + 0.5 * token_set_similarity(query_tokens, name), 4)
+
+    def match(self, query: str, limit: int = 5,
+              min_score: float = DEFAULT_MIN_SCORE) -> List[Tuple[int, float]]:
+        """
+        Rank company names by similarity to query (tolerates misspellings,
+        word order and missing "Ltd"/"Limited").
+
+        Args:
+            query: Company name as typed
+            limit: Maximum number of candidates
+            min_score: Candidates scoring below this are dropped
+
+        Returns:
+            (row, score) pairs, best first; an exact symbol match scores 1.0
+        """
+        query_tokens = name_tokens(query)
+        if not query_tokens or limit <= 0:
+            return []
+
+        query_grams = match_grams(query_tokens)
+        postings = [self.match_postings[gram] for gram in query_grams if gram in self.match_postings]
+
+        scored = {}
+        if postings:
+            shared = np.bincount(np.concatenate(postings), minlength=len(self.records))
+            dice = 2 * shared / (len(query_grams) + self.gram_count_array)
+            pool = max(CANDIDATE_POOL, limit)
+            rows = np.flatnonzero(shared)
+            if len(rows) > pool:
+                rows = rows[np.argpartition(-dice[rows], pool)[:pool]]
+            scored = {
+                int(row): self._score(query_tokens, len(query_grams), int(shared[row]), int(row))
+                for row in rows
+            }
+        symbol_row = self.find_symbol(query) if query.strip() else None
+        if symbol_row is not None:
+            scored[symbol_row] = 1.0
+
+        ranked = sorted(
+            ((row, score) for row, score in scored.items() if score >= min_score),
+            key=lambda item: (-item[1], item[0])
+        )
+        return ranked[:limit]
+
+    @classmethod
+    def from_csv(cls, csv_path: str) -> "TickerIndex":
+        df = pd.read_csv(csv_path)
+        return cls(df.to_dict("records"))
+
+    @classmethod
+    def load_or_build(cls, csv_path: str, cache_path: Optional[str] = None) -> "TickerIndex":
+        """
+        Load the index from cache_path if it was built from the current CSV,
+        otherwise build it from the CSV and rewrite the cache.
+        """
+        stat = os.stat(csv_path)
+        cache_key = (INDEX_VERSION, stat.st_mtime_ns, stat.st_size)
+
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    cached_key, index = pickle.load(f)
+                if cached_key == cache_key:
+                    logger.info("Loaded ticker index (%d records) from %s", len(index), cache_path)
+                    return index
+            except Exception as e:
+                logger.warning("Ignoring unreadable ticker index cache %s: %s", cache_path, e)
+
+        index = cls.from_csv(csv_path)
+        logger.info("Built ticker index from %d records in %s", len(index), csv_path)
+
+        if cache_path:
+            try:
+                tmp_path = Path(f"{cache_path}.tmp")
+                tmp_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "wb") as f:
+                    pickle.dump((cache_key, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+                tmp_path.replace(cache_path)
+            except OSError as e:
+                logger.warning("Could not write ticker index cache %s: %s", cache_path, e)
+        return index
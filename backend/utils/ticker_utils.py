@@ -1,9 +1,14 @@
 import pandas as pd
 import os
+import hashlib
+import tempfile
+import threading
 from typing import Optional
 import logging
 from pathlib import Path
 
+from .ticker_index import TickerIndex, DEFAULT_MIN_SCORE
+
 # Configure file logging for ticker_utils
 log_dir = Path(__file__).parent.parent / "logs"
 log_dir.mkdir(exist_ok=True)
@@ -22,14 +27,28 @@ if not any(isinstance(handler, logging.FileHandler) for handler in logger.handle
 class TickerManager:
     """Manager for ticker symbol operations"""
     
-    def __init__(self, csv_path: str = None):
+    def __init__(self, csv_path: str = None, cache_path: str = None, match_threshold: float = None):
         if csv_path is None:
             # Use absolute path relative to project root
             project_root = Path(__file__).parent.parent  # Go up from utils/ to project root
             csv_path = str(project_root / "data" / "indian_equities_ticker_database.csv")
         
         self.csv_path = csv_path
+        # Precomputed index cache, rebuilt whenever the CSV changes (kept out of the tracked data/ directory)
+        self.cache_path = cache_path or os.getenv("TICKER_INDEX_CACHE") or self._default_cache_path(csv_path)
+        # Minimum fuzzy score for get_symbol_by_name to accept a non-substring match
+        if match_threshold is None:
+            match_threshold = float(os.getenv("TICKER_MATCH_THRESHOLD", "0.6"))
+        self.match_threshold = match_threshold
         self._ticker_df = None
+        self._index = None
+        self._index_lock = threading.Lock()
+    
+    @staticmethod
+    def _default_cache_path(csv_path: str) -> str:
+        """Index cache in the temp directory, one per CSV location"""
+        digest = hashlib.sha1(str(Path(csv_path).resolve()).encode("utf-8")).hexdigest()[:12]
+        return str(Path(tempfile.gettempdir()) / "vyasaquant" / f"{Path(csv_path).stem}-{digest}.index.pkl")
     
     def _load_ticker_data(self) -> pd.DataFrame:
         """Load ticker data from CSV file"""
@@ -46,6 +65,17 @@ class TickerManager:
         
         return self._ticker_df
     
+    def _get_index(self) -> TickerIndex:
+        """Load (or build) the lookup index once"""
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    if not os.path.exists(self.csv_path):
+                        logger.error(f"Error loading ticker data: Ticker database file not found: {self.csv_path}")
+                        raise FileNotFoundError(f"Ticker database file not found: {self.csv_path}")
+                    self._index = TickerIndex.load_or_build(self.csv_path, self.cache_path)
+        return self._index
+    
     def get_symbol_by_name(self, company_name: str) -> Optional[str]:
         """
         Get ticker symbol by company name.
@@ -57,49 +87,36 @@ class TickerManager:
             Ticker symbol if found, None otherwise
         """
         try:
-            logger.info(f"TickerManager: Looking up symbol for '{company_name}'")
-            
-            df = self._load_ticker_data()
-            if df is None:
-                logger.error("TickerManager: Ticker data not loaded")
-                return None
-            
-            logger.info(f"TickerManager: Loaded {len(df)} ticker records")
-            
-            # Clean the input
-            company_name = company_name.strip()
-            logger.info(f"TickerManager: Cleaned company name: '{company_name}'")
+            index = self._get_index()
             
             # Try exact match first (case-insensitive)
-            logger.info("TickerManager: Trying exact match...")
-            exact_match = df[df['name'].str.lower() == company_name.lower()]
-            
-            if not exact_match.empty:
-                symbol = exact_match.iloc[0]['symbol']
-                logger.info(f"TickerManager: Found exact match - Symbol: {symbol}")
+            row = index.find_name(company_name)
+            if row is not None:
+                symbol = index.records[row]['symbol']
+                logger.debug("TickerManager: exact match for %r - Symbol: %s", company_name, symbol)
                 return symbol
             
-            logger.info("TickerManager: No exact match found, trying partial match...")
-            # Try partial match
-            partial_match = df[df['name'].str.contains(company_name, case=False, na=False)]
-            
-            if not partial_match.empty:
-                symbol = partial_match.iloc[0]['symbol']
-                logger.info(f"TickerManager: Found partial match - Symbol: {symbol}")
+            # Try partial match: best-ranked company whose name contains the input
+            rows = index.find_containing(company_name, include_symbols=False)
+            if rows:
+                row = max(rows, key=lambda r: (index.score(company_name, r), -r))
+                symbol = index.records[row]['symbol']
+                logger.debug("TickerManager: partial match for %r - Symbol: %s", company_name, symbol)
                 return symbol
             
-            logger.warning(f"TickerManager: No matches found for '{company_name}'")
-            
-            # Debug: Show some sample company names for reference
-            sample_names = df['name'].head(10).tolist()
-            logger.info(f"TickerManager: Sample company names in database: {sample_names}")
+            # Fall back to the closest fuzzy match (misspellings, word order)
+            matches = index.match(company_name, limit=1, min_score=self.match_threshold)
+            if matches:
+                row, score = matches[0]
+                symbol = index.records[row]['symbol']
+                logger.debug("TickerManager: fuzzy match for %r - Symbol: %s (score %.2f)", company_name, symbol, score)
+                return symbol
             
+            logger.warning("TickerManager: No matches found for %r", company_name)
             return None
             
         except Exception as e:
             logger.error(f"TickerManager: Error in get_symbol_by_name: {str(e)}")
-            import traceback
-            logger.error(f"TickerManager: Traceback: {traceback.format_exc()}")
             return None
     
     def get_company_info(self, symbol: str) -> Optional[dict]:
@@ -113,14 +130,14 @@ class TickerManager:
             Dictionary with company information if found, None otherwise
         """
         try:
-            df = self._load_ticker_data()
+            index = self._get_index()
             
             # Search for the symbol
-            company_data = df[df['symbol'] == symbol]
-            if not company_data.empty:
-                return company_data.iloc[0].to_dict()
+            row = index.find_symbol(symbol)
+            if row is not None:
+                return dict(index.records[row])
             
-            logger.warning(f"No company information found for symbol: {symbol}")
+            logger.debug("No company information found for symbol: %s", symbol)
             return None
             
         except Exception as e:
@@ -139,21 +156,44 @@ class TickerManager:
             List of dictionaries with company information
         """
         try:
-            df = self._load_ticker_data()
+            index = self._get_index()
             
             # Search in both name and symbol columns
-            matches = df[
-                (df['name'].str.contains(search_term, case=False, na=False)) |
-                (df['symbol'].str.contains(search_term, case=False, na=False))
-            ]
+            rows = index.find_containing(search_term)
             
-            results = matches.head(limit).to_dict('records')
-            logger.info(f"Found {len(results)} matches for search term: {search_term}")
+            results = [dict(index.records[row]) for row in rows[:limit]]
+            logger.debug("Found %d matches for search term: %s", len(results), search_term)
             return results
             
         except Exception as e:
             logger.error(f"Error searching companies: {str(e)}")
             return []
 
+    def match_companies(self, company_name: str, limit: int = 5, min_score: float = DEFAULT_MIN_SCORE) -> list:
+        """
+        Rank companies by name similarity
+        
+        Args:
+            company_name: Company name as typed (may be partial or misspelt)
+            limit: Maximum number of candidates
+            min_score: Minimum similarity score (0-1)
+            
+        Returns:
+            List of company dictionaries with a "match_score" key, best first
+        """
+        try:
+            index = self._get_index()
+            
+            results = [
+                {**index.records[row], "match_score": score}
+                for row, score in index.match(company_name, limit=limit, min_score=min_score)
+            ]
+            logger.debug("Ranked %d candidates for: %s", len(results), company_name)
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error matching companies: {str(e)}")
+            return []
+
 # Global ticker manager instance
 ticker_manager = TickerManager() 
\ No newline at end of file